@@ -26,6 +26,7 @@ from ryu.controller.handler import MAIN_DISPATCHER, DEAD_DISPATCHER
 from ryu.controller.handler import CONFIG_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto.ofproto_template import FlowModTemplate
 from ryu.lib.packet import packet
 from ryu.lib.packet import ethernet
 from ryu.lib.packet import ipv4
@@ -66,6 +67,8 @@ class ShortestForwarding(app_manager.RyuApp):
         self.delay_detector = kwargs["network_delay_detector"]
         self.datapaths = {}
         self.weight = self.WEIGHT_MODEL[CONF.weight]
+        # Pre-serialized flow entry used by send_flow_mod().
+        self.flow_template = None
 
     def set_weight_mode(self, weight):
         """
@@ -108,20 +111,33 @@ class ShortestForwarding(app_manager.RyuApp):
                                 match=match, instructions=inst)
         dp.send_msg(mod)
 
+    def get_flow_template(self, datapath):
+        """
+            Get the pre-serialized flow entry for send_flow_mod.
+        """
+        if (self.flow_template is None or
+                self.flow_template.version != datapath.ofproto.OFP_VERSION):
+            ofproto = datapath.ofproto
+            parser = datapath.ofproto_parser
+            match = parser.OFPMatch(in_port=0, eth_type=0,
+                                    ipv4_src='0.0.0.0', ipv4_dst='0.0.0.0')
+            inst = [parser.OFPInstructionActions(
+                ofproto.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(0)])]
+            self.flow_template = FlowModTemplate(
+                datapath,
+                ['in_port', 'eth_type', 'ipv4_src', 'ipv4_dst', 'output'],
+                priority=1, idle_timeout=15, hard_timeout=60,
+                match=match, instructions=inst)
+        return self.flow_template
+
     def send_flow_mod(self, datapath, flow_info, src_port, dst_port):
         """
             Build flow entry, and send it to datapath.
         """
-        parser = datapath.ofproto_parser
-        actions = []
-        actions.append(parser.OFPActionOutput(dst_port))
-
-        match = parser.OFPMatch(
-            in_port=src_port, eth_type=flow_info[0],
-            ipv4_src=flow_info[1], ipv4_dst=flow_info[2])
-
-        self.add_flow(datapath, 1, match, actions,
-                      idle_timeout=15, hard_timeout=60)
+        template = self.get_flow_template(datapath)
+        template.send(datapath, in_port=src_port, eth_type=flow_info[0],
+                      ipv4_src=flow_info[1], ipv4_dst=flow_info[2],
+                      output=dst_port)
 
     def _build_packet_out(self, datapath, buffer_id, src_port, dst_port, data):
         """
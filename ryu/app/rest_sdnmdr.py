@@ -204,7 +204,12 @@ please check the followings.
         }
 """
 
+import collections
 import json
+import time
+
+from ovs.db.idl import ROW_CREATE
+from ovs.db.idl import ROW_DELETE
 
 from ryu.app.ofctl import api as ofctl_api
 from ryu.app.wsgi import ControllerBase
@@ -213,6 +218,7 @@ from ryu.app.wsgi import route
 from ryu.app.wsgi import WSGIApplication
 from ryu.base import app_manager
 from ryu.exception import RyuException
+from ryu.lib import hub
 from ryu.lib.ovs import bridge as ovs_bridge
 from ryu.lib.packet import arp
 from ryu.lib.packet import ether_types
@@ -220,6 +226,7 @@ from ryu.lib.packet.bgp import _RouteDistinguisher
 from ryu.lib.packet.bgp import EvpnNLRI
 from ryu.lib.stringify import StringifyMixin
 from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto.ofproto_template import FlowModTemplate
 from ryu.services.protocols.bgp.bgpspeaker import BGPSpeaker
 from ryu.services.protocols.bgp.bgpspeaker import RF_L2_EVPN
 from ryu.services.protocols.bgp.bgpspeaker import EVPN_MAC_IP_ADV_ROUTE
@@ -237,6 +244,19 @@ PRIORITY_ARP_REPLAY = 2
 TABLE_ID_INGRESS = 0
 TABLE_ID_EGRESS = 1
 
+# Number of the remote clients whose flows are sent at once and then
+# committed by a barrier
+FLOW_BATCH_SIZE = 1000
+FLOW_BARRIER_TIMEOUT = 10  # sec
+# Interval to retry programming the flows while the datapath is not
+# connected
+FLOW_RETRY_INTERVAL = 1  # sec
+
+# Number of the retries to create a VXLAN port for the pending routes
+# before they are dropped
+VXLAN_PORT_MAX_RETRIES = 3
+VXLAN_PORT_RETRY_INTERVAL = 1  # sec
+
 
 # Utility functions
 
@@ -251,6 +271,22 @@ def to_str_list(l):
     return str_list
 
 
+def vxlan_port_name(remote_ip, key):
+    return 'vxlan_%s_%s' % (remote_ip, key)
+
+
+def parse_vxlan_port_name(name):
+    # Returns (remote_ip, key) of VXLAN port named 'vxlan_<remote_ip>_<key>'
+    # or None for the other names.
+    fields = name.split('_')
+    if len(fields) != 3 or fields[0] != 'vxlan':
+        return None
+    try:
+        return fields[1], int(fields[2])
+    except ValueError:
+        return None
+
+
 # Exception classes related to OpenFlow and OVSDB
 
 class RestApiException(RyuException):
@@ -343,16 +379,67 @@ class EvpnNetwork(StringifyMixin):
         ],
     }
 
+    # Attributes of EvpnClient indexed for get_clients()
+    _INDEXED_ATTRS = ('next_hop', 'port', 'ip')
+
     def __init__(self, vni, route_dist, ethernet_tag_id, clients=None):
         super(EvpnNetwork, self).__init__()
         self.vni = vni
         self.route_dist = route_dist
         self.ethernet_tag_id = ethernet_tag_id
-        self.clients = clients or {}
+        self.clients = {}
+
+        # Secondary indexes of the clients
+        # self._indexes = {
+        #     <attribute>: {<value>: {<MAC address>: <EvpnClient>, ...}},
+        #     ...
+        # }
+        self._indexes = dict((k, {}) for k in self._INDEXED_ATTRS)
+
+        for client in (clients or {}).values():
+            self.add_client(client)
+
+    def add_client(self, client):
+        """
+        Adds or replaces the client of the same MAC address.
+        """
+        self.del_client(client.mac)
+        self.clients[client.mac] = client
+        for k, index in self._indexes.items():
+            index.setdefault(getattr(client, k), {})[client.mac] = client
+
+    def del_client(self, mac):
+        """
+        Deletes the client of the given MAC address and returns it,
+        or None if not found.
+        """
+        client = self.clients.pop(mac, None)
+        if client is None:
+            return None
+        for k, index in self._indexes.items():
+            value = getattr(client, k)
+            clients = index[value]
+            del clients[mac]
+            if not clients:
+                del index[value]
+        return client
 
     def get_clients(self, **kwargs):
+        # Looks up the smallest set of the clients from the indexes, and
+        # then filters it by the other attributes.
+        candidates = None
+        for k, v in kwargs.items():
+            index = self._indexes.get(k, None)
+            if index is None:
+                continue
+            clients = index.get(v, {})
+            if candidates is None or len(clients) < len(candidates):
+                candidates = clients
+        if candidates is None:
+            candidates = self.clients
+
         l = []
-        for _, c in self.clients.items():
+        for _, c in candidates.items():
             for k, v in kwargs.items():
                 if getattr(c, k) != v:
                     break
@@ -378,6 +465,22 @@ class EvpnClient(StringifyMixin):
         self.next_hop = next_hop
 
 
+class PendingFlows(object):
+    """
+    Flows of a remote client waiting to be programmed.
+
+    The flows to be deleted and added for the same client are coalesced
+    until programmed, so that a burst of updates for the same MAC address
+    results in at most one addition of the latest flows.
+    """
+    __slots__ = ('time', 'add', 'del_ips')
+
+    def __init__(self, time_):
+        self.time = time_   # when first queued
+        self.add = None     # (<IP address>, <port>) to be added
+        self.del_ips = set()  # IP addresses of ARP reply flows to delete
+
+
 class RestSdnmdr(app_manager.RyuApp):
     OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
     _CONTEXTS = {'wsgi': WSGIApplication}
@@ -400,6 +503,64 @@ class RestSdnmdr(app_manager.RyuApp):
         # }
         self.networks = {}
 
+        # Cache of VXLAN port numbers kept up to date by the changes
+        # notified by OVSDB
+        # self.vxlan_ports = {
+        #     (<remote_ip>, <vni>): <ofport>,
+        #     ...
+        # }
+        self.vxlan_ports = {}
+
+        # Routes waiting for the VXLAN ports to be created
+        # self.pending_vxlan_ports = {
+        #     (<remote_ip>, <vni>): {
+        #         <MAC address or None>: (<func>, <args>),
+        #         ...
+        #     },
+        #     ...
+        # }
+        # where None is the key for Inclusive Multicast Ethernet Tag route.
+        self.pending_vxlan_ports = {}
+
+        # Thread creating the VXLAN ports for the pending routes
+        self.vxlan_port_thread = None
+
+        # Number of the failures to create VXLAN ports for the pending
+        # routes
+        self.vxlan_port_errors = 0
+
+        # FlowModTemplate instances instantiated later
+        # self.flow_templates = {
+        #     <name of builder method>: <instance 'FlowModTemplate'>,
+        #     ...
+        # }
+        self.flow_templates = {}
+
+        # Flows of the remote clients waiting to be programmed in order
+        # self.flow_queue = {
+        #     (<vni>, <MAC address>): <instance 'PendingFlows'>,
+        #     ...
+        # }
+        self.flow_queue = collections.OrderedDict()
+
+        # Thread programming the queued flows
+        self.flow_thread = None
+
+        # Statistics of flow programming. The lags are the seconds from
+        # queueing the flows until the barrier reply for them.
+        self.flow_stats = {
+            'queued': 0,
+            'coalesced': 0,
+            'programmed': 0,
+            'flow_mods': 0,
+            'batches': 0,
+            'barrier_errors': 0,
+            'datapath_errors': 0,
+            'last_lag': 0.0,
+            'max_lag': 0.0,
+            'total_lag': 0.0,
+        }
+
     # Utility methods related to OpenFlow
 
     def _get_datapath(self, dpid):
@@ -459,60 +620,124 @@ class RestSdnmdr(app_manager.RyuApp):
 
         self._del_flow(datapath, PRIORITY_D_PLANE, match)
 
-    def _add_arp_reply_flow(self, datapath, tag, arp_tpa, arp_tha):
+    def _get_flow_template(self, datapath, builder):
+        template = self.flow_templates.get(builder.__name__, None)
+        if (template is not None
+                and template.version == datapath.ofproto.OFP_VERSION):
+            return template
+
+        template = builder(datapath)
+        self.flow_templates[builder.__name__] = template
+
+        return template
+
+    @staticmethod
+    def _arp_reply_flow(datapath):
         ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
 
+        # Placeholders for the variable fields
         match = parser.OFPMatch(
-            metadata=(tag, parser.UINT64_MAX),
+            metadata=(0, parser.UINT64_MAX),
             eth_type=ether_types.ETH_TYPE_ARP,
             arp_op=arp.ARP_REQUEST,
-            arp_tpa=arp_tpa)
+            arp_tpa='0.0.0.0')
 
         actions = [
             parser.NXActionRegMove(
                 src_field="eth_src", dst_field="eth_dst", n_bits=48),
-            parser.OFPActionSetField(eth_src=arp_tha),
+            parser.OFPActionSetField(eth_src='00:00:00:00:00:00'),
             parser.OFPActionSetField(arp_op=arp.ARP_REPLY),
             parser.NXActionRegMove(
                 src_field="arp_sha", dst_field="arp_tha", n_bits=48),
             parser.NXActionRegMove(
                 src_field="arp_spa", dst_field="arp_tpa", n_bits=32),
-            parser.OFPActionSetField(arp_sha=arp_tha),
-            parser.OFPActionSetField(arp_spa=arp_tpa),
+            parser.OFPActionSetField(arp_sha='00:00:00:00:00:00'),
+            parser.OFPActionSetField(arp_spa='0.0.0.0'),
             parser.OFPActionOutput(ofproto.OFPP_IN_PORT)]
         instructions = [
             parser.OFPInstructionActions(
                 ofproto.OFPIT_APPLY_ACTIONS, actions)]
 
-        self._add_flow(datapath, PRIORITY_ARP_REPLAY, match, instructions,
-                       table_id=TABLE_ID_EGRESS)
+        return FlowModTemplate(
+            datapath,
+            ['metadata', 'arp_tpa', 'set_eth_src', 'set_arp_sha',
+             'set_arp_spa'],
+            table_id=TABLE_ID_EGRESS,
+            priority=PRIORITY_ARP_REPLAY,
+            match=match,
+            instructions=instructions)
 
-    def _del_arp_reply_flow(self, datapath, tag, arp_tpa):
+    @staticmethod
+    def _arp_reply_del_flow(datapath):
+        ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
 
+        # Placeholders for the variable fields
         match = parser.OFPMatch(
-            metadata=(tag, parser.UINT64_MAX),
+            metadata=(0, parser.UINT64_MAX),
             eth_type=ether_types.ETH_TYPE_ARP,
             arp_op=arp.ARP_REQUEST,
-            arp_tpa=arp_tpa)
+            arp_tpa='0.0.0.0')
 
-        self._del_flow(datapath, PRIORITY_ARP_REPLAY, match,
-                       table_id=TABLE_ID_EGRESS)
+        return FlowModTemplate(
+            datapath, ['metadata', 'arp_tpa'],
+            table_id=TABLE_ID_EGRESS,
+            command=ofproto.OFPFC_DELETE,
+            priority=PRIORITY_ARP_REPLAY,
+            out_port=ofproto.OFPP_ANY,
+            out_group=ofproto.OFPG_ANY,
+            match=match)
 
-    def _add_l2_switching_flow(self, datapath, tag, eth_dst, out_port):
+    @staticmethod
+    def _l2_switching_flow(datapath):
         ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
 
-        match = parser.OFPMatch(metadata=(tag, parser.UINT64_MAX),
-                                eth_dst=eth_dst)
-        actions = [parser.OFPActionOutput(out_port)]
+        # Placeholders for the variable fields
+        match = parser.OFPMatch(metadata=(0, parser.UINT64_MAX),
+                                eth_dst='00:00:00:00:00:00')
+        actions = [parser.OFPActionOutput(0)]
         instructions = [
             parser.OFPInstructionActions(
                 ofproto.OFPIT_APPLY_ACTIONS, actions)]
 
-        self._add_flow(datapath, PRIORITY_D_PLANE, match, instructions,
-                       table_id=TABLE_ID_EGRESS)
+        return FlowModTemplate(
+            datapath, ['metadata', 'eth_dst', 'output'],
+            table_id=TABLE_ID_EGRESS,
+            priority=PRIORITY_D_PLANE,
+            match=match,
+            instructions=instructions)
+
+    @staticmethod
+    def _l2_switching_del_flow(datapath):
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+
+        # Placeholders for the variable fields
+        match = parser.OFPMatch(metadata=(0, parser.UINT64_MAX),
+                                eth_dst='00:00:00:00:00:00')
+
+        return FlowModTemplate(
+            datapath, ['metadata', 'eth_dst'],
+            table_id=TABLE_ID_EGRESS,
+            command=ofproto.OFPFC_DELETE,
+            priority=PRIORITY_D_PLANE,
+            out_port=ofproto.OFPP_ANY,
+            out_group=ofproto.OFPG_ANY,
+            match=match)
+
+    def _serialize_flow(self, datapath, builder, **values):
+        template = self._get_flow_template(datapath, builder)
+        datapath.xid = (datapath.xid + 1) & datapath.ofproto.MAX_XID
+
+        return template.serialize(xid=datapath.xid, **values)
+
+    def _add_l2_switching_flow(self, datapath, tag, eth_dst, out_port):
+        template = self._get_flow_template(datapath, self._l2_switching_flow)
+
+        template.send(datapath, metadata=tag, eth_dst=eth_dst,
+                      output=out_port)
 
     def _del_l2_switching_flow(self, datapath, tag, eth_dst):
         parser = datapath.ofproto_parser
@@ -531,6 +756,128 @@ class RestSdnmdr(app_manager.RyuApp):
         self._del_flow(datapath, PRIORITY_D_PLANE, match,
                        table_id=TABLE_ID_EGRESS)
 
+    # Utility methods for programming the flows of the remote clients
+    # asynchronously
+
+    def _queue_remote_client_flows(self, vni, mac, ip, out_port=None):
+        # Queues the flows for the remote client to be added if out_port
+        # is given, otherwise deleted. The flows for the same client not
+        # yet programmed are coalesced.
+        pending = self.flow_queue.get((vni, mac), None)
+        if pending is None:
+            pending = PendingFlows(time.time())
+            self.flow_queue[(vni, mac)] = pending
+        else:
+            self.flow_stats['coalesced'] += 1
+        self.flow_stats['queued'] += 1
+
+        if out_port is None:
+            pending.add = None
+            pending.del_ips.add(ip)
+        else:
+            # Note: OFPFC_ADD overwrites the existing flow.
+            pending.add = (ip, out_port)
+            pending.del_ips.discard(ip)
+
+        if self.flow_thread is None:
+            self.flow_thread = hub.spawn(self._program_flows)
+
+    def _drop_remote_client_flows(self, vni):
+        for key in [key for key in self.flow_queue if key[0] == vni]:
+            del self.flow_queue[key]
+
+    def _cancel_remote_client_flows(self, datapath, vni, mac):
+        # Cancels the queued flows for the client of the given MAC address
+        # before writing the flows for the local client synchronously, so
+        # that the queued ones do not overwrite them later. The ARP reply
+        # flows to be deleted are deleted at once.
+        pending = self.flow_queue.pop((vni, mac), None)
+        if pending is None:
+            return
+
+        template = self._get_flow_template(
+            datapath, self._arp_reply_del_flow)
+        for ip in pending.del_ips:
+            template.send(datapath, metadata=vni, arp_tpa=ip)
+
+    def _program_flows(self):
+        try:
+            while self.flow_queue and self.speaker is not None:
+                batch = [self.flow_queue.popitem(last=False)
+                         for _ in range(min(FLOW_BATCH_SIZE,
+                                            len(self.flow_queue)))]
+                if not self._program_flow_batch(batch):
+                    # Keeps the flows until the datapath is connected.
+                    self._requeue_flows(batch)
+                    hub.sleep(FLOW_RETRY_INTERVAL)
+        finally:
+            self.flow_thread = None
+
+    def _requeue_flows(self, batch):
+        # Puts the batch back at the head of the queue. The flows queued
+        # for the same clients meanwhile supersede the batch.
+        queue = collections.OrderedDict(batch)
+        for key, pending in self.flow_queue.items():
+            queue.pop(key, None)
+            queue[key] = pending
+        self.flow_queue = queue
+
+    def _program_flow_batch(self, batch):
+        # Returns False if not programmed as the datapath is not connected.
+        datapath = self._get_datapath(self.speaker.dpid)
+        if datapath is None:
+            self.flow_stats['datapath_errors'] += 1
+            self.logger.debug('No such datapath: %s', self.speaker.dpid)
+            return False
+
+        bufs = []
+        for (vni, mac), pending in batch:
+            if pending.add is None:
+                bufs.append(self._serialize_flow(
+                    datapath, self._l2_switching_del_flow,
+                    metadata=vni, eth_dst=mac))
+            for ip in pending.del_ips:
+                bufs.append(self._serialize_flow(
+                    datapath, self._arp_reply_del_flow,
+                    metadata=vni, arp_tpa=ip))
+            if pending.add is not None:
+                ip, out_port = pending.add
+                bufs.append(self._serialize_flow(
+                    datapath, self._l2_switching_flow,
+                    metadata=vni, eth_dst=mac, output=out_port))
+                bufs.append(self._serialize_flow(
+                    datapath, self._arp_reply_flow,
+                    metadata=vni, arp_tpa=ip, set_eth_src=mac,
+                    set_arp_sha=mac, set_arp_spa=ip))
+
+        # Sends all the FlowMods at once and then waits for the barrier
+        # reply, which ensures the switch has processed them.
+        datapath.send(b''.join(bufs))
+        parser = datapath.ofproto_parser
+        try:
+            with hub.Timeout(FLOW_BARRIER_TIMEOUT):
+                ofctl_api.send_msg(
+                    self, parser.OFPBarrierRequest(datapath),
+                    reply_cls=parser.OFPBarrierReply)
+        except hub.Timeout:
+            self.flow_stats['barrier_errors'] += 1
+            self.logger.debug('Timed out waiting for barrier reply')
+        except Exception as e:
+            self.flow_stats['barrier_errors'] += 1
+            self.logger.debug('Cannot get barrier reply: %s', e)
+
+        now = time.time()
+        lags = [now - pending.time for _, pending in batch]
+        stats = self.flow_stats
+        stats['programmed'] += len(batch)
+        stats['flow_mods'] += len(bufs)
+        stats['batches'] += 1
+        stats['last_lag'] = max(lags)
+        stats['max_lag'] = max(stats['max_lag'], stats['last_lag'])
+        stats['total_lag'] += sum(lags)
+
+        return True
+
     # Utility methods related to OVSDB
 
     def _get_ovs_bridge(self, dpid):
@@ -546,17 +893,49 @@ class RestSdnmdr(app_manager.RyuApp):
             return self.ovs
 
         try:
-            self.ovs = ovs_bridge.OVSBridge(
+            ovs = ovs_bridge.OVSBridge(
                 CONF=self.CONF,
                 datapath_id=datapath.id,
                 ovsdb_addr=ovsdb_addr)
-            self.ovs.init()
+            ovs.init()
         except Exception as e:
             self.logger.exception('Cannot initiate OVSDB connection: %s', e)
             return None
 
+        if self.ovs is not None:
+            self.ovs.remove_row_listener('Interface',
+                                         self._vxlan_port_listener)
+        self.ovs = ovs
+        self._init_vxlan_ports()
+
         return self.ovs
 
+    def _init_vxlan_ports(self):
+        # Loads the existing VXLAN ports, and then keeps the cache up to
+        # date by the changes of Interface table notified by OVSDB.
+        self.vxlan_ports = {}
+        self.ovs.add_row_listener('Interface', self._vxlan_port_listener)
+        try:
+            ifaces = self.ovs.find_db_attributes('Interface', 'type=vxlan')
+        except Exception as e:
+            self.logger.debug('Cannot get VXLAN ports: %s', e)
+            return
+        for iface in ifaces:
+            self._vxlan_port_listener(ROW_CREATE, iface)
+
+    def _vxlan_port_listener(self, event, row, updates=None):
+        key = parse_vxlan_port_name(row.name)
+        if key is None:
+            return
+
+        if event == ROW_DELETE:
+            self.vxlan_ports.pop(key, None)
+        elif row.ofport and row.ofport[0] > 0:
+            self.vxlan_ports[key] = row.ofport[0]
+        else:
+            # Not yet assigned or failed to create
+            self.vxlan_ports.pop(key, None)
+
     def _get_ofport(self, dpid, port_name):
         ovs = self._get_ovs_bridge(dpid)
         if ovs is None:
@@ -570,27 +949,101 @@ class RestSdnmdr(app_manager.RyuApp):
             return None
 
     def _get_vxlan_port(self, dpid, remote_ip, key):
-        # Searches VXLAN port named 'vxlan_<remote_ip>_<key>'
-        return self._get_ofport(dpid, 'vxlan_%s_%s' % (remote_ip, key))
+        # Searches VXLAN port named 'vxlan_<remote_ip>_<key>' in the cache
+        if self._get_ovs_bridge(dpid) is None:
+            return None
 
-    def _add_vxlan_port(self, dpid, remote_ip, key):
-        # If VXLAN port already exists, returns OFPort number
-        vxlan_port = self._get_vxlan_port(dpid, remote_ip, key)
-        if vxlan_port is not None:
-            return vxlan_port
+        return self.vxlan_ports.get((remote_ip, key), None)
 
+    def _add_vxlan_ports(self, dpid, keys):
         ovs = self._get_ovs_bridge(dpid)
         if ovs is None:
-            return None
+            return
+
+        # Adds VXLAN ports named 'vxlan_<remote_ip>_<key>' which do not
+        # exist yet in a single transaction. The port numbers are stored
+        # into the cache when notified by OVSDB.
+        ports = [
+            dict(name=vxlan_port_name(remote_ip, key),
+                 tunnel_type='vxlan',
+                 remote_ip=remote_ip,
+                 key=key)
+            for remote_ip, key in keys
+            if (remote_ip, key) not in self.vxlan_ports]
+        try:
+            ovs.add_tunnel_ports(ports)
+        except Exception as e:
+            self.logger.debug('Cannot create VXLAN ports: %s', e)
+
+    def _wait_vxlan_port(self, remote_ip, key, route, func, *args):
+        # Calls func(vxlan_port, *args) if VXLAN port already exists.
+        # Otherwise, defers it until the port is created by
+        # _provision_vxlan_ports(), which creates the ports for all the
+        # routes received in a burst at once.
+        vxlan_port = self._get_vxlan_port(self.speaker.dpid, remote_ip, key)
+        if vxlan_port is not None:
+            func(vxlan_port, *args)
+            return
+
+        routes = self.pending_vxlan_ports.setdefault((remote_ip, key), {})
+        routes[route] = (func, args)
+        if self.vxlan_port_thread is None:
+            self.vxlan_port_thread = hub.spawn(self._provision_vxlan_ports)
 
-        # Adds VXLAN port named 'vxlan_<remote_ip>_<key>'
-        ovs.add_vxlan_port(
-            name='vxlan_%s_%s' % (remote_ip, key),
-            remote_ip=remote_ip,
-            key=key)
+    def _cancel_vxlan_port(self, remote_ip, key, route):
+        routes = self.pending_vxlan_ports.get((remote_ip, key), {})
+        return routes.pop(route, None) is not None
+
+    def _provision_vxlan_ports(self):
+        # Number of the retries for each VXLAN port not created yet
+        retries = {}
+        try:
+            while self.pending_vxlan_ports and self.speaker is not None:
+                keys = list(self.pending_vxlan_ports.keys())
+                self._add_vxlan_ports(self.speaker.dpid, keys)
+
+                # Note: The routes withdrawn while creating the ports have
+                # been removed from the pending routes.
+                failed = False
+                for remote_ip, key in keys:
+                    routes = self.pending_vxlan_ports.pop(
+                        (remote_ip, key), {})
+                    vxlan_port = self.vxlan_ports.get((remote_ip, key), None)
+                    if vxlan_port is not None:
+                        retries.pop((remote_ip, key), None)
+                        for func, args in routes.values():
+                            func(vxlan_port, *args)
+                        continue
+                    if not routes:
+                        continue
 
-        # Returns VXLAN port number
-        return self._get_vxlan_port(dpid, remote_ip, key)
+                    self.vxlan_port_errors += 1
+                    retry = retries.get((remote_ip, key), 0) + 1
+                    if retry > VXLAN_PORT_MAX_RETRIES:
+                        retries.pop((remote_ip, key), None)
+                        self.logger.error(
+                            'Cannot create a new VXLAN port: %s, '
+                            'dropped %d routes',
+                            vxlan_port_name(remote_ip, key), len(routes))
+                        continue
+                    retries[(remote_ip, key)] = retry
+                    self.logger.debug(
+                        'Cannot create a new VXLAN port: %s, retry %d/%d',
+                        vxlan_port_name(remote_ip, key),
+                        retry, VXLAN_PORT_MAX_RETRIES)
+
+                    # Re-queues the routes unless superseded by the ones
+                    # received while creating the ports.
+                    pending = self.pending_vxlan_ports.setdefault(
+                        (remote_ip, key), {})
+                    for route, func_args in routes.items():
+                        pending.setdefault(route, func_args)
+                    failed = True
+
+                if failed:
+                    hub.sleep(VXLAN_PORT_RETRY_INTERVAL)
+        finally:
+            self.vxlan_port_thread = None
 
     def _del_vxlan_port(self, dpid, remote_ip, key):
         ovs = self._get_ovs_bridge(dpid)
@@ -602,8 +1055,9 @@ class RestSdnmdr(app_manager.RyuApp):
         if vxlan_port is None:
             return None
 
-        # Adds VXLAN port named 'vxlan_<remote_ip>_<key>'
-        ovs.del_port('vxlan_%s_%s' % (remote_ip, key))
+        # Deletes VXLAN port named 'vxlan_<remote_ip>_<key>'
+        ovs.del_port(vxlan_port_name(remote_ip, key))
+        self.vxlan_ports.pop((remote_ip, key), None)
 
         # Returns deleted VXLAN port number
         return vxlan_port
@@ -621,32 +1075,29 @@ class RestSdnmdr(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
-        vxlan_port = self._add_vxlan_port(
-            dpid=self.speaker.dpid,
-            remote_ip=ev.nexthop,
-            key=ev.path.nlri.vni)
-        if vxlan_port is None:
-            self.logger.debug('Cannot create a new VXLAN port: %s',
-                              'vxlan_%s_%s' % (ev.nexthop, ev.path.nlri.vni))
+        self._wait_vxlan_port(
+            ev.nexthop, network.vni, ev.path.nlri.mac_addr,
+            self._add_remote_client,
+            network.vni, ev.path.nlri.mac_addr, ev.path.nlri.ip_addr,
+            ev.nexthop)
+
+    def _add_remote_client(self, vxlan_port, vni, mac, ip, next_hop):
+        network = self.networks.get(vni, None)
+        if network is None:
+            self.logger.debug('No such VNI registered: %s', vni)
             return
 
-        self._add_l2_switching_flow(
-            datapath=datapath,
-            tag=network.vni,
-            eth_dst=ev.path.nlri.mac_addr,
+        self._queue_remote_client_flows(
+            vni=network.vni,
+            mac=mac,
+            ip=ip,
             out_port=vxlan_port)
 
-        self._add_arp_reply_flow(
-            datapath=datapath,
-            tag=network.vni,
-            arp_tpa=ev.path.nlri.ip_addr,
-            arp_tha=ev.path.nlri.mac_addr)
-
-        network.clients[ev.path.nlri.mac_addr] = EvpnClient(
+        network.add_client(EvpnClient(
             port=vxlan_port,
-            mac=ev.path.nlri.mac_addr,
-            ip=ev.path.nlri.ip_addr,
-            next_hop=ev.nexthop)
+            mac=mac,
+            ip=ip,
+            next_hop=next_hop))
 
     def _evpn_incl_mcast_etag_route_handler(self, ev):
         # Note: For the VLAN Based service, we use RT(=RD) assigned
@@ -663,13 +1114,13 @@ class RestSdnmdr(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
-        vxlan_port = self._add_vxlan_port(
-            dpid=self.speaker.dpid,
-            remote_ip=ev.nexthop,
-            key=vni)
-        if vxlan_port is None:
-            self.logger.debug('Cannot create a new VXLAN port: %s',
-                              'vxlan_%s_%s' % (ev.nexthop, vni))
+        self._wait_vxlan_port(
+            ev.nexthop, vni, None, self._add_remote_network, vni)
+
+    def _add_remote_network(self, vxlan_port, vni):
+        datapath = self._get_datapath(self.speaker.dpid)
+        if datapath is None:
+            self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
         self._add_network_ingress_flow(
@@ -694,22 +1145,22 @@ class RestSdnmdr(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
+        if self._cancel_vxlan_port(
+                ev.nexthop, network.vni, ev.path.nlri.mac_addr):
+            # Withdrawn before installing the flows
+            return
+
         client = network.clients.get(ev.path.nlri.mac_addr, None)
         if client is None:
             self.logger.debug('No such client: %s', ev.path.nlri.mac_addr)
             return
 
-        self._del_l2_switching_flow(
-            datapath=datapath,
-            tag=network.vni,
-            eth_dst=ev.path.nlri.mac_addr)
-
-        self._del_arp_reply_flow(
-            datapath=datapath,
-            tag=network.vni,
-            arp_tpa=ev.path.nlri.ip_addr)
+        self._queue_remote_client_flows(
+            vni=network.vni,
+            mac=ev.path.nlri.mac_addr,
+            ip=ev.path.nlri.ip_addr)
 
-        network.clients.pop(ev.path.nlri.mac_addr)
+        network.del_client(ev.path.nlri.mac_addr)
 
     def _evpn_withdraw_incl_mcast_etag_route_handler(self, ev):
         # Note: For the VLAN Based service, we use RT(=RD) assigned
@@ -726,6 +1177,8 @@ class RestSdnmdr(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
+        self._cancel_vxlan_port(ev.nexthop, vni, None)
+
         vxlan_port = self._get_vxlan_port(
             dpid=self.speaker.dpid,
             remote_ip=ev.nexthop,
@@ -766,6 +1219,10 @@ class RestSdnmdr(app_manager.RyuApp):
         else:
             self._evpn_route_handler(ev)
 
+    def _best_path_changes_handler(self, evs):
+        for ev in evs:
+            self._best_path_change_handler(ev)
+
     def _peer_down_handler(self, remote_ip, remote_as):
         neighbor = self.speaker.neighbors.get(remote_ip, None)
         if neighbor is None:
@@ -796,9 +1253,13 @@ class RestSdnmdr(app_manager.RyuApp):
             dpid=dpid,
             as_number=as_number,
             router_id=router_id,
-            best_path_change_handler=self._best_path_change_handler,
+            best_path_change_handler=None,
             peer_down_handler=self._peer_down_handler,
             peer_up_handler=self._peer_up_handler)
+        # Handles the best path changes in batches apart from the BGP
+        # processing, so that the OVSDB and OpenFlow work does not delay
+        # the route convergence.
+        self.speaker.best_path_subscribe(self._best_path_changes_handler)
 
         return {self.speaker.router_id: self.speaker.to_jsondict()}
 
@@ -865,9 +1326,8 @@ class RestSdnmdr(app_manager.RyuApp):
             raise NeighborNotFound(address=address)
 
         for network in self.networks.values():
-            for mac, client in list(network.clients.items()):
-                if client.next_hop == address:
-                    network.clients.pop(mac)
+            for client in network.get_clients(next_hop=address):
+                network.del_client(client.mac)
 
         self.speaker.neighbor_del(address=address)
 
@@ -938,11 +1398,13 @@ class RestSdnmdr(app_manager.RyuApp):
                 vni=vni,
                 mac=client.mac)
 
+        self._drop_remote_client_flows(vni)
         self._del_network_egress_flow(
             datapath=datapath,
             tag=vni)
 
         for address in self.speaker.neighbors:
+            self.pending_vxlan_ports.pop((address, vni), None)
             self._del_vxlan_port(
                 dpid=self.speaker.dpid,
                 remote_ip=address,
@@ -960,6 +1422,20 @@ class RestSdnmdr(app_manager.RyuApp):
 
         return {vni: network.to_jsondict()}
 
+    def get_flow_stats(self):
+        if self.speaker is None:
+            raise BGPSpeakerNotFound()
+
+        stats = dict(self.flow_stats)
+        stats['pending'] = len(self.flow_queue)
+        if stats['programmed']:
+            stats['avg_lag'] = stats['total_lag'] / stats['programmed']
+        else:
+            stats['avg_lag'] = 0.0
+        del stats['total_lag']
+
+        return stats
+
     def add_client(self, vni, port, mac, ip):
         if self.speaker is None:
             raise BGPSpeakerNotFound()
@@ -979,6 +1455,8 @@ class RestSdnmdr(app_manager.RyuApp):
             except ValueError:
                 raise OFPortNotFound(port_name=port)
 
+        self._cancel_remote_client_flows(datapath, network.vni, mac)
+
         self._add_network_ingress_flow(
             datapath=datapath,
             tag=network.vni,
@@ -1010,7 +1488,7 @@ class RestSdnmdr(app_manager.RyuApp):
             mac=mac,
             ip=ip,
             next_hop=self.speaker.router_id)
-        network.clients[mac] = client
+        network.add_client(client)
 
         return {vni: client.to_jsondict()}
 
@@ -1032,6 +1510,8 @@ class RestSdnmdr(app_manager.RyuApp):
         elif client.next_hop != self.speaker.router_id:
             raise ClientNotLocal(mac=mac)
 
+        self._cancel_remote_client_flows(datapath, network.vni, mac)
+
         self._del_network_ingress_flow(
             datapath=datapath,
             in_port=client.port,
@@ -1052,7 +1532,7 @@ class RestSdnmdr(app_manager.RyuApp):
             mac_addr=mac,
             ip_addr=client.ip)
 
-        client = network.clients.pop(mac)
+        client = network.del_client(mac)
 
         return {vni: client.to_jsondict()}
 
@@ -1274,6 +1754,74 @@ class RestSdnmdrController(ControllerBase):
         return Response(content_type='application/json',
                         body=json.dumps(body))
 
+    @route(API_NAME, '/sdnmdr/speakers/flows', methods=['GET'])
+    @get_method()
+    def get_flow_stats(self, **kwargs):
+        """
+        Gets the statistics of programming the flows for the remote
+        clients.
+
+        Usage:
+
+            ======= =====================
+            Method  URI
+            ======= =====================
+            GET     /sdnmdr/speakers/flows
+            ======= =====================
+
+        Response parameters:
+
+            ================ ==========================================
+            Attribute        Description
+            ================ ==========================================
+            queued           Number of the queued flow updates
+            coalesced        Number of the updates coalesced with the
+                             pending updates for the same client
+            pending          Number of the clients waiting for the flow
+                             programming
+            programmed       Number of the programmed clients
+            flow_mods        Number of the sent FlowMod messages
+            batches          Number of the batches committed by barrier
+            barrier_errors   Number of the barriers without reply
+            datapath_errors  Number of the batches kept to retry as
+                             the datapath is not connected
+            last_lag         Max seconds from queueing to the barrier
+                             reply in the last batch
+            max_lag          Max seconds from queueing to the barrier
+                             reply
+            avg_lag          Average seconds from queueing to the
+                             barrier reply
+            ================ ==========================================
+
+        Example::
+
+            $ curl -X GET http://localhost:8080/sdnmdr/speakers/flows |
+             python -m json.tool
+
+        ::
+
+            {
+                "avg_lag": 0.0125,
+                "barrier_errors": 0,
+                "batches": 2,
+                "coalesced": 1,
+                "datapath_errors": 0,
+                "flow_mods": 4,
+                "last_lag": 0.011,
+                "max_lag": 0.014,
+                "pending": 0,
+                "programmed": 2,
+                "queued": 3
+            }
+        """
+        try:
+            body = self.sdnmdr_app.get_flow_stats()
+        except BGPSpeakerNotFound as e:
+            return e.to_response(status=404)
+
+        return Response(content_type='application/json',
+                        body=json.dumps(body))
+
     @route(API_NAME, '/sdnmdr/neighbors', methods=['POST'])
     @post_method(
         keywords={
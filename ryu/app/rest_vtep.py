@@ -206,6 +206,9 @@ please check the followings.
 
 import json
 
+from ovs.db.idl import ROW_CREATE
+from ovs.db.idl import ROW_DELETE
+
 from ryu.app.ofctl import api as ofctl_api
 from ryu.app.wsgi import ControllerBase
 from ryu.app.wsgi import Response
@@ -213,6 +216,7 @@ from ryu.app.wsgi import route
 from ryu.app.wsgi import WSGIApplication
 from ryu.base import app_manager
 from ryu.exception import RyuException
+from ryu.lib import hub
 from ryu.lib.ovs import bridge as ovs_bridge
 from ryu.lib.packet import arp
 from ryu.lib.packet import ether_types
@@ -237,6 +241,11 @@ PRIORITY_ARP_REPLAY = 2
 TABLE_ID_INGRESS = 0
 TABLE_ID_EGRESS = 1
 
+# Number of the retries to create a VXLAN port for the pending routes
+# before they are dropped
+VXLAN_PORT_MAX_RETRIES = 3
+VXLAN_PORT_RETRY_INTERVAL = 1  # sec
+
 
 # Utility functions
 
@@ -251,6 +260,22 @@ def to_str_list(l):
     return str_list
 
 
+def vxlan_port_name(remote_ip, key):
+    return 'vxlan_%s_%s' % (remote_ip, key)
+
+
+def parse_vxlan_port_name(name):
+    # Returns (remote_ip, key) of VXLAN port named 'vxlan_<remote_ip>_<key>'
+    # or None for the other names.
+    fields = name.split('_')
+    if len(fields) != 3 or fields[0] != 'vxlan':
+        return None
+    try:
+        return fields[1], int(fields[2])
+    except ValueError:
+        return None
+
+
 # Exception classes related to OpenFlow and OVSDB
 
 class RestApiException(RyuException):
@@ -400,6 +425,32 @@ class RestVtep(app_manager.RyuApp):
         # }
         self.networks = {}
 
+        # Cache of VXLAN port numbers kept up to date by the changes
+        # notified by OVSDB
+        # self.vxlan_ports = {
+        #     (<remote_ip>, <vni>): <ofport>,
+        #     ...
+        # }
+        self.vxlan_ports = {}
+
+        # Routes waiting for the VXLAN ports to be created
+        # self.pending_vxlan_ports = {
+        #     (<remote_ip>, <vni>): {
+        #         <MAC address or None>: (<func>, <args>),
+        #         ...
+        #     },
+        #     ...
+        # }
+        # where None is the key for Inclusive Multicast Ethernet Tag route.
+        self.pending_vxlan_ports = {}
+
+        # Thread creating the VXLAN ports for the pending routes
+        self.vxlan_port_thread = None
+
+        # Number of the failures to create VXLAN ports for the pending
+        # routes
+        self.vxlan_port_errors = 0
+
     # Utility methods related to OpenFlow
 
     def _get_datapath(self, dpid):
@@ -546,17 +597,49 @@ class RestVtep(app_manager.RyuApp):
             return self.ovs
 
         try:
-            self.ovs = ovs_bridge.OVSBridge(
+            ovs = ovs_bridge.OVSBridge(
                 CONF=self.CONF,
                 datapath_id=datapath.id,
                 ovsdb_addr=ovsdb_addr)
-            self.ovs.init()
+            ovs.init()
         except Exception as e:
             self.logger.exception('Cannot initiate OVSDB connection: %s', e)
             return None
 
+        if self.ovs is not None:
+            self.ovs.remove_row_listener('Interface',
+                                         self._vxlan_port_listener)
+        self.ovs = ovs
+        self._init_vxlan_ports()
+
         return self.ovs
 
+    def _init_vxlan_ports(self):
+        # Loads the existing VXLAN ports, and then keeps the cache up to
+        # date by the changes of Interface table notified by OVSDB.
+        self.vxlan_ports = {}
+        self.ovs.add_row_listener('Interface', self._vxlan_port_listener)
+        try:
+            ifaces = self.ovs.find_db_attributes('Interface', 'type=vxlan')
+        except Exception as e:
+            self.logger.debug('Cannot get VXLAN ports: %s', e)
+            return
+        for iface in ifaces:
+            self._vxlan_port_listener(ROW_CREATE, iface)
+
+    def _vxlan_port_listener(self, event, row, updates=None):
+        key = parse_vxlan_port_name(row.name)
+        if key is None:
+            return
+
+        if event == ROW_DELETE:
+            self.vxlan_ports.pop(key, None)
+        elif row.ofport and row.ofport[0] > 0:
+            self.vxlan_ports[key] = row.ofport[0]
+        else:
+            # Not yet assigned or failed to create
+            self.vxlan_ports.pop(key, None)
+
     def _get_ofport(self, dpid, port_name):
         ovs = self._get_ovs_bridge(dpid)
         if ovs is None:
@@ -570,27 +653,101 @@ class RestVtep(app_manager.RyuApp):
             return None
 
     def _get_vxlan_port(self, dpid, remote_ip, key):
-        # Searches VXLAN port named 'vxlan_<remote_ip>_<key>'
-        return self._get_ofport(dpid, 'vxlan_%s_%s' % (remote_ip, key))
+        # Searches VXLAN port named 'vxlan_<remote_ip>_<key>' in the cache
+        if self._get_ovs_bridge(dpid) is None:
+            return None
 
-    def _add_vxlan_port(self, dpid, remote_ip, key):
-        # If VXLAN port already exists, returns OFPort number
-        vxlan_port = self._get_vxlan_port(dpid, remote_ip, key)
-        if vxlan_port is not None:
-            return vxlan_port
+        return self.vxlan_ports.get((remote_ip, key), None)
 
+    def _add_vxlan_ports(self, dpid, keys):
         ovs = self._get_ovs_bridge(dpid)
         if ovs is None:
-            return None
+            return
+
+        # Adds VXLAN ports named 'vxlan_<remote_ip>_<key>' which do not
+        # exist yet in a single transaction. The port numbers are stored
+        # into the cache when notified by OVSDB.
+        ports = [
+            dict(name=vxlan_port_name(remote_ip, key),
+                 tunnel_type='vxlan',
+                 remote_ip=remote_ip,
+                 key=key)
+            for remote_ip, key in keys
+            if (remote_ip, key) not in self.vxlan_ports]
+        try:
+            ovs.add_tunnel_ports(ports)
+        except Exception as e:
+            self.logger.debug('Cannot create VXLAN ports: %s', e)
+
+    def _wait_vxlan_port(self, remote_ip, key, route, func, *args):
+        # Calls func(vxlan_port, *args) if VXLAN port already exists.
+        # Otherwise, defers it until the port is created by
+        # _provision_vxlan_ports(), which creates the ports for all the
+        # routes received in a burst at once.
+        vxlan_port = self._get_vxlan_port(self.speaker.dpid, remote_ip, key)
+        if vxlan_port is not None:
+            func(vxlan_port, *args)
+            return
 
-        # Adds VXLAN port named 'vxlan_<remote_ip>_<key>'
-        ovs.add_vxlan_port(
-            name='vxlan_%s_%s' % (remote_ip, key),
-            remote_ip=remote_ip,
-            key=key)
+        routes = self.pending_vxlan_ports.setdefault((remote_ip, key), {})
+        routes[route] = (func, args)
+        if self.vxlan_port_thread is None:
+            self.vxlan_port_thread = hub.spawn(self._provision_vxlan_ports)
 
-        # Returns VXLAN port number
-        return self._get_vxlan_port(dpid, remote_ip, key)
+    def _cancel_vxlan_port(self, remote_ip, key, route):
+        routes = self.pending_vxlan_ports.get((remote_ip, key), {})
+        return routes.pop(route, None) is not None
+
+    def _provision_vxlan_ports(self):
+        # Number of the retries for each VXLAN port not created yet
+        retries = {}
+        try:
+            while self.pending_vxlan_ports and self.speaker is not None:
+                keys = list(self.pending_vxlan_ports.keys())
+                self._add_vxlan_ports(self.speaker.dpid, keys)
+
+                # Note: The routes withdrawn while creating the ports have
+                # been removed from the pending routes.
+                failed = False
+                for remote_ip, key in keys:
+                    routes = self.pending_vxlan_ports.pop(
+                        (remote_ip, key), {})
+                    vxlan_port = self.vxlan_ports.get((remote_ip, key), None)
+                    if vxlan_port is not None:
+                        retries.pop((remote_ip, key), None)
+                        for func, args in routes.values():
+                            func(vxlan_port, *args)
+                        continue
+                    if not routes:
+                        continue
+
+                    self.vxlan_port_errors += 1
+                    retry = retries.get((remote_ip, key), 0) + 1
+                    if retry > VXLAN_PORT_MAX_RETRIES:
+                        retries.pop((remote_ip, key), None)
+                        self.logger.error(
+                            'Cannot create a new VXLAN port: %s, '
+                            'dropped %d routes',
+                            vxlan_port_name(remote_ip, key), len(routes))
+                        continue
+                    retries[(remote_ip, key)] = retry
+                    self.logger.debug(
+                        'Cannot create a new VXLAN port: %s, retry %d/%d',
+                        vxlan_port_name(remote_ip, key),
+                        retry, VXLAN_PORT_MAX_RETRIES)
+
+                    # Re-queues the routes unless superseded by the ones
+                    # received while creating the ports.
+                    pending = self.pending_vxlan_ports.setdefault(
+                        (remote_ip, key), {})
+                    for route, func_args in routes.items():
+                        pending.setdefault(route, func_args)
+                    failed = True
+
+                if failed:
+                    hub.sleep(VXLAN_PORT_RETRY_INTERVAL)
+        finally:
+            self.vxlan_port_thread = None
 
     def _del_vxlan_port(self, dpid, remote_ip, key):
         ovs = self._get_ovs_bridge(dpid)
@@ -602,8 +759,9 @@ class RestVtep(app_manager.RyuApp):
         if vxlan_port is None:
             return None
 
-        # Adds VXLAN port named 'vxlan_<remote_ip>_<key>'
-        ovs.del_port('vxlan_%s_%s' % (remote_ip, key))
+        # Deletes VXLAN port named 'vxlan_<remote_ip>_<key>'
+        ovs.del_port(vxlan_port_name(remote_ip, key))
+        self.vxlan_ports.pop((remote_ip, key), None)
 
         # Returns deleted VXLAN port number
         return vxlan_port
@@ -621,32 +779,40 @@ class RestVtep(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
-        vxlan_port = self._add_vxlan_port(
-            dpid=self.speaker.dpid,
-            remote_ip=ev.nexthop,
-            key=ev.path.nlri.vni)
-        if vxlan_port is None:
-            self.logger.debug('Cannot create a new VXLAN port: %s',
-                              'vxlan_%s_%s' % (ev.nexthop, ev.path.nlri.vni))
+        self._wait_vxlan_port(
+            ev.nexthop, network.vni, ev.path.nlri.mac_addr,
+            self._add_remote_client,
+            network.vni, ev.path.nlri.mac_addr, ev.path.nlri.ip_addr,
+            ev.nexthop)
+
+    def _add_remote_client(self, vxlan_port, vni, mac, ip, next_hop):
+        network = self.networks.get(vni, None)
+        if network is None:
+            self.logger.debug('No such VNI registered: %s', vni)
+            return
+
+        datapath = self._get_datapath(self.speaker.dpid)
+        if datapath is None:
+            self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
         self._add_l2_switching_flow(
             datapath=datapath,
             tag=network.vni,
-            eth_dst=ev.path.nlri.mac_addr,
+            eth_dst=mac,
             out_port=vxlan_port)
 
         self._add_arp_reply_flow(
             datapath=datapath,
             tag=network.vni,
-            arp_tpa=ev.path.nlri.ip_addr,
-            arp_tha=ev.path.nlri.mac_addr)
+            arp_tpa=ip,
+            arp_tha=mac)
 
-        network.clients[ev.path.nlri.mac_addr] = EvpnClient(
+        network.clients[mac] = EvpnClient(
             port=vxlan_port,
-            mac=ev.path.nlri.mac_addr,
-            ip=ev.path.nlri.ip_addr,
-            next_hop=ev.nexthop)
+            mac=mac,
+            ip=ip,
+            next_hop=next_hop)
 
     def _evpn_incl_mcast_etag_route_handler(self, ev):
         # Note: For the VLAN Based service, we use RT(=RD) assigned
@@ -663,13 +829,13 @@ class RestVtep(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
-        vxlan_port = self._add_vxlan_port(
-            dpid=self.speaker.dpid,
-            remote_ip=ev.nexthop,
-            key=vni)
-        if vxlan_port is None:
-            self.logger.debug('Cannot create a new VXLAN port: %s',
-                              'vxlan_%s_%s' % (ev.nexthop, vni))
+        self._wait_vxlan_port(
+            ev.nexthop, vni, None, self._add_remote_network, vni)
+
+    def _add_remote_network(self, vxlan_port, vni):
+        datapath = self._get_datapath(self.speaker.dpid)
+        if datapath is None:
+            self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
         self._add_network_ingress_flow(
@@ -694,6 +860,11 @@ class RestVtep(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
+        if self._cancel_vxlan_port(
+                ev.nexthop, network.vni, ev.path.nlri.mac_addr):
+            # Withdrawn before installing the flows
+            return
+
         client = network.clients.get(ev.path.nlri.mac_addr, None)
         if client is None:
             self.logger.debug('No such client: %s', ev.path.nlri.mac_addr)
@@ -726,6 +897,8 @@ class RestVtep(app_manager.RyuApp):
             self.logger.debug('No such datapath: %s', self.speaker.dpid)
             return
 
+        self._cancel_vxlan_port(ev.nexthop, vni, None)
+
         vxlan_port = self._get_vxlan_port(
             dpid=self.speaker.dpid,
             remote_ip=ev.nexthop,
@@ -943,6 +1116,7 @@ class RestVtep(app_manager.RyuApp):
             tag=vni)
 
         for address in self.speaker.neighbors:
+            self.pending_vxlan_ports.pop((address, vni), None)
             self._del_vxlan_port(
                 dpid=self.speaker.dpid,
                 remote_ip=address,
@@ -4,9 +4,8 @@ from ryu.controller.handler import MAIN_DISPATCHER, CONFIG_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.ofproto import ofproto_v1_3
 from ryu.lib.packet import packet
-from ryu.lib.packet import ethernet
-from ryu.lib.packet import ether_types
 from ryu.lib.packet import arp
+from ryu.lib.packet import packet_rewriter
 from ryu.lib.ofp_pktinfilter import packet_in_filter, RequiredTypeFilter
 from ryu.topology import api as topo_api
 from conf_mgr import SDNMDRConfigManager
@@ -66,24 +65,18 @@ class ArpProxy(app_manager.RyuApp):
             return
         self.logger.info('find mac for %s :%s:', dst_ip,dst_mac )
         actions = [parser.OFPActionOutput(in_port)]
-        arp_reply = packet.Packet()
-        arp_reply.add_protocol(
-            ethernet.ethernet(
-                ethertype=ether_types.ETH_TYPE_ARP,
-                src=dst_mac,
-                dst=src_mac
-            )
+        # Turn a copy of the request into the reply, as msg.data is shared
+        # with the other observers of the event
+        arp_reply = packet_rewriter.PacketRewriter(bytearray(msg.data))
+        arp_reply.set_field(
+            eth_src=dst_mac,
+            eth_dst=src_mac,
+            arp_op=arp.ARP_REPLY,
+            arp_spa=dst_ip,
+            arp_sha=dst_mac,
+            arp_tpa=src_ip,
+            arp_tha=src_mac
         )
-        arp_reply.add_protocol(
-            arp.arp(
-                opcode=arp.ARP_REPLY,
-                src_ip=dst_ip,
-                src_mac=dst_mac,
-                dst_ip=src_ip,
-                dst_mac=src_mac
-            )
-        )
-        arp_reply.serialize()
         out = parser.OFPPacketOut(
             datapath=datapath,
             buffer_id=ofproto.OFP_NO_BUFFER,
@@ -4,6 +4,7 @@ from ryu.controller import ofp_event
 from ryu.controller.handler import MAIN_DISPATCHER, CONFIG_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto.ofproto_template import FlowModTemplate
 from ryu.topology import api as topo_api
 
 
@@ -80,11 +81,18 @@ class FwdUtil(app_manager.RyuApp):
 
 
     def install_path(self, match, path, nx_graph, pre_actions=[]):
+        # All flow entries along the path share the same match and actions
+        # except the output port, so serializes the message only once.
+        template = None
         for index, dpid in enumerate(path[:-1]):
             port_no = nx_graph[path[index]][path[index + 1]]['src_port']
             dp = self.get_datapath(dpid)
-            actions = [dp.ofproto_parser.OFPActionOutput(port_no)]
-            self.add_flow(dp, 1, match, pre_actions+actions)
+            if template is None or \
+                    template.version != dp.ofproto.OFP_VERSION:
+                actions = [dp.ofproto_parser.OFPActionOutput(port_no)]
+                template = self.get_flow_template(
+                    dp, 1, match, pre_actions+actions)
+            template.send(dp, output=port_no)
 
     def add_flow(self, datapath, priority, match, actions):
         ofproto = datapath.ofproto
@@ -99,6 +107,18 @@ class FwdUtil(app_manager.RyuApp):
                                 instructions=inst)
         datapath.send_msg(mod)
 
+    def get_flow_template(self, datapath, priority, match, actions):
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+
+        inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS,
+                                             actions)]
+        return FlowModTemplate(datapath, ['output'],
+                               priority=priority,
+                               match=match,
+                               hard_timeout=0,
+                               instructions=inst)
+
     def get_datapath(self, dpid):
         if dpid not in self.dps:
             switch = topo_api.get_switch(self, dpid)[0]
@@ -112,6 +112,10 @@ class Sdnmdr(app_manager.RyuApp):
         
         self.logger.info(self.hop_db.hops)
 
+    def _best_path_changes_handler(self, evs):
+        for ev in evs:
+            self._best_path_change_handler(ev)
+
     def _peer_down_handler(self, remote_ip, remote_as):
         neighbor = self.speaker.neighbors.get(remote_ip, None)
         if neighbor is None:
@@ -135,9 +139,12 @@ class Sdnmdr(app_manager.RyuApp):
         self.speaker = SdnmdrSpeaker(
             as_number=as_number,
             router_id=router_id,
-            best_path_change_handler=self._best_path_change_handler,
+            best_path_change_handler=None,
             peer_down_handler=self._peer_down_handler,
             peer_up_handler=self._peer_up_handler)
+        # Handles the best path changes in batches apart from the BGP
+        # processing.
+        self.speaker.best_path_subscribe(self._best_path_changes_handler)
 
         return {self.speaker.router_id: self.speaker.to_jsondict()}
 
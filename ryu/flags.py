@@ -81,6 +81,8 @@ DEFAULT_ZSERV_VERSION = 2  # Version of Ubuntu 16.04 LTS packaged Quagga
 DEFAULT_ZSERV_CLIENT_ROUTE_TYPE = 'BGP'
 DEFAULT_ZSERV_INTERVAL = 10
 DEFAULT_ZSERV_DATABASE = 'sqlite:///zebra.db'
+DEFAULT_ZSERV_DB_FLUSH_INTERVAL = 1
+DEFAULT_ZSERV_DB_FLUSH_SIZE = 1000
 DEFAULT_ZSERV_ROUTER_ID = '1.1.1.1'
 # For the backward compatibility with Quagga, the default FRRouting version
 # should be None.
@@ -119,6 +121,15 @@ CONF.register_cli_opts([
         'db-url', default=DEFAULT_ZSERV_DATABASE,
         help='URL to database used by Zebra protocol service '
              '(default: %s)' % DEFAULT_ZSERV_DATABASE),
+    cfg.IntOpt(
+        'db-flush-interval', default=DEFAULT_ZSERV_DB_FLUSH_INTERVAL,
+        help='Interval in seconds to write the route changes to database '
+             '(default: %s)' % DEFAULT_ZSERV_DB_FLUSH_INTERVAL),
+    cfg.IntOpt(
+        'db-flush-size', default=DEFAULT_ZSERV_DB_FLUSH_SIZE,
+        help='Number of the route changes to write to database '
+             'without waiting for the flush interval '
+             '(default: %s)' % DEFAULT_ZSERV_DB_FLUSH_SIZE),
     cfg.StrOpt(
         'router-id', default=DEFAULT_ZSERV_ROUTER_ID,
         help='Initial Router ID used by Zebra protocol service '
@@ -0,0 +1,232 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Indexed reader of MRT format files for the bulk ingestion.
+
+mrtlib.Reader reads and decodes the records one by one from a file
+object. This module maps the whole file into memory, indexes the offsets
+of the records by scanning only their headers, and decodes any range of
+the records on demand, optionally in parallel with a process pool.
+"""
+
+import array
+import bz2
+import gzip
+import mmap
+import multiprocessing
+import struct
+
+import six
+
+from ryu.lib import mrtlib
+
+
+# Number of the records decoded at once by a worker process
+DEFAULT_CHUNK_SIZE = 1000
+
+_HEADER = struct.Struct(mrtlib.MrtRecord._HEADER_FMT)
+_EXT_TS_TYPES = frozenset(mrtlib.MrtRecord._EXT_TS_TYPES)
+_EXT_TS_HEADER_SIZE = mrtlib.ExtendedTimestampMrtRecord.HEADER_SIZE
+
+_DECOMPRESSORS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.BZ2File,
+}
+
+
+def _is_thread_patched():
+    # multiprocessing.Pool does not work with the threading module
+    # monkey patched by eventlet, e.g., in ryu-manager.
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+
+def _parse_records(buf):
+    # Decodes the concatenated records in *buf*.
+    # Runs in the worker processes, so must be picklable.
+    records = []
+    while buf:
+        record, buf = mrtlib.MrtRecord.parse(buf)
+        records.append(record)
+    return records
+
+
+class BatchReader(object):
+    """
+    MRT format file reader which indexes the records in batch
+
+    ================ ====================================================
+    Argument         Description
+    ================ ====================================================
+    file_obj         File object which reading MRT format file in binary
+                     mode or path to MRT format file
+    use_mmap         (Optional) If True (default), the file is mapped
+                     into memory instead of being read.
+    ================ ====================================================
+
+    The files whose path ends with '.gz' or '.bz2' are decompressed into
+    memory. A file object of a compressed file should be given with
+    use_mmap=False.
+
+    The index of the records is built once on the first access and holds
+    only their offsets, i.e., 8 bytes per record. If the file is
+    truncated, the incomplete record at the end is dropped.
+
+    Example of usage::
+
+        from ryu.lib import mrtbatch
+
+        reader = mrtbatch.BatchReader('rib.20161101.0000')
+        print('%d records' % len(reader))
+
+        # decode the last record only
+        print(reader.record(len(reader) - 1))
+
+        # decode all records with 4 worker processes
+        for record in reader.parse(processes=4):
+            print(record)
+    """
+
+    def __init__(self, file_obj, use_mmap=True):
+        if isinstance(file_obj, six.string_types):
+            for ext, open_ in _DECOMPRESSORS.items():
+                if file_obj.endswith(ext):
+                    file_obj = open_(file_obj, 'rb')
+                    use_mmap = False
+                    break
+            else:
+                file_obj = open(file_obj, 'rb')
+        self._mmap = None
+        try:
+            if use_mmap:
+                self._mmap = mmap.mmap(file_obj.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+                self._buf = self._mmap
+            else:
+                self._buf = file_obj.read()
+        finally:
+            file_obj.close()
+        self._offsets = None
+
+    def close(self):
+        self._offsets = None
+        self._buf = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return len(self.offsets()) - 1
+
+    def _index(self):
+        buf = self._buf
+        size = len(buf)
+        hdr_size = _HEADER.size
+        unpack_from = _HEADER.unpack_from
+        pos = 0
+        offsets = array.array('Q')
+        append = offsets.append
+        while pos + hdr_size <= size:
+            _, type_, _, length = unpack_from(buf, pos)
+            if type_ in _EXT_TS_TYPES:
+                end = pos + _EXT_TS_HEADER_SIZE + length
+            else:
+                end = pos + hdr_size + length
+            if end > size:
+                break
+            append(pos)
+            pos = end
+        append(pos)
+        return offsets
+
+    def offsets(self):
+        """
+        Returns an array of the offsets of all records in the file,
+        followed by the end offset of the last record.
+        """
+        if self._offsets is None:
+            self._offsets = self._index()
+        return self._offsets
+
+    def _range(self, start, stop):
+        offsets = self.offsets()
+        start, stop, _ = slice(start, stop).indices(len(offsets) - 1)
+        return start, max(start, stop)
+
+    def record(self, index):
+        """
+        Decodes the record at the given index into mrtlib.MrtRecord.
+        """
+        offsets = self.offsets()
+        if not -len(self) <= index < len(self):
+            raise IndexError('record index out of range')
+        index %= len(self)
+        record, _ = mrtlib.MrtRecord.parse(
+            self._buf[offsets[index]:offsets[index + 1]])
+        return record
+
+    def records(self, start=None, stop=None):
+        """
+        Decodes the records in the given range of indexes one by one in
+        this process.
+        """
+        offsets = self.offsets()
+        start, stop = self._range(start, stop)
+        for i in range(start, stop):
+            record, _ = mrtlib.MrtRecord.parse(
+                self._buf[offsets[i]:offsets[i + 1]])
+            yield record
+
+    def _chunks(self, start, stop, chunk_size):
+        offsets = self.offsets()
+        for i in range(start, stop, chunk_size):
+            end = min(i + chunk_size, stop)
+            yield self._buf[offsets[i]:offsets[end]]
+
+    def parse(self, processes=None, chunk_size=DEFAULT_CHUNK_SIZE,
+              start=None, stop=None):
+        """
+        Decodes the records in the given range of indexes with a pool of
+        *processes* worker processes, the number of CPUs by default.
+
+        The records are decoded in chunks of *chunk_size* records and
+        yielded in the order of the file. Note that the decoded records
+        are pickled to be passed from the worker processes, so this is
+        worth only for the files of many records.
+
+        If the threading module is monkey patched by eventlet, the
+        records are decoded in this process same as ``records()``.
+        """
+        start, stop = self._range(start, stop)
+        if _is_thread_patched():
+            for record in self.records(start, stop):
+                yield record
+            return
+
+        pool = multiprocessing.Pool(processes)
+        try:
+            for records in pool.imap(
+                    _parse_records,
+                    self._chunks(start, stop, chunk_size)):
+                for record in records:
+                    yield record
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
@@ -735,7 +735,9 @@ class TableDump2RibGenericMrtMessage(TableDump2MrtMessage):
         (seq_num, afi, safi) = struct.unpack_from(cls._HEADER_FMT, buf)
         rest = buf[cls.HEADER_SIZE:]
 
-        nlri, rest = bgp.BGPNLRI.parser(rest)
+        # Parses NLRI of the given AFI/SAFI, e.g., VPNv4 or EVPN NLRI.
+        addr_cls = bgp._ADDR_CLASSES.get((afi, safi), bgp.BGPNLRI)
+        nlri, rest = addr_cls.parser(rest)
 
         entry_count, rib_entries, _ = cls.parse_rib_entries(rest)
 
@@ -1146,10 +1148,11 @@ class Reader(object):
         if len(header_buf) < MrtRecord.HEADER_SIZE:
             raise StopIteration()
 
-        # Hack to avoid eating memory up
-        self._f.seek(-MrtRecord.HEADER_SIZE, 1)
+        # Note: Reads the rest of the record instead of seeking back to
+        # the header, because seeking backward in the compressed files
+        # (e.g., bz2 or gzip) decompresses the file from the beginning.
         required_len = MrtRecord.parse_pre(header_buf)
-        buf = self._f.read(required_len)
+        buf = header_buf + self._f.read(required_len - MrtRecord.HEADER_SIZE)
         record, _ = MrtRecord.parse(buf)
 
         return record
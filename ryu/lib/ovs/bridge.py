@@ -295,8 +295,9 @@ class OVSBridge(object):
             'add-bond', (self.br_name, name, ifaces), options)
         self.run_command([command_add])
 
-    def add_tunnel_port(self, name, tunnel_type, remote_ip,
-                        local_ip=None, key=None, ofport=None):
+    def _tunnel_port_commands(self, name, tunnel_type, remote_ip,
+                              local_ip=None, key=None, ofport=None,
+                              may_exist=False):
         options = 'remote_ip=%(remote_ip)s' % locals()
         if key:
             options += ',key=%(key)s' % locals()
@@ -308,9 +309,33 @@ class OVSBridge(object):
         if ofport:
             args.append('ofport_request=%(ofport)s' % locals())
 
-        command_add = ovs_vsctl.VSCtlCommand('add-port', (self.br_name, name))
+        command_add = ovs_vsctl.VSCtlCommand(
+            'add-port', (self.br_name, name),
+            '--may_exist' if may_exist else None)
         command_set = ovs_vsctl.VSCtlCommand('set', args)
-        self.run_command([command_add, command_set])
+        return [command_add, command_set]
+
+    def add_tunnel_port(self, name, tunnel_type, remote_ip,
+                        local_ip=None, key=None, ofport=None):
+        self.run_command(self._tunnel_port_commands(
+            name, tunnel_type, remote_ip,
+            local_ip=local_ip, key=key, ofport=ofport))
+
+    def add_tunnel_ports(self, ports):
+        """
+        Creates the tunnel ports in a single transaction.
+
+        The existing ports of the same names are updated.
+
+        :param ports: List of dictionaries of the keyword arguments for
+                      add_tunnel_port()
+        """
+        commands = []
+        for port in ports:
+            commands.extend(
+                self._tunnel_port_commands(may_exist=True, **port))
+        if commands:
+            self.run_command(commands)
 
     def add_gre_port(self, name, remote_ip,
                      local_ip=None, key=None, ofport=None):
@@ -326,6 +351,16 @@ class OVSBridge(object):
         command = ovs_vsctl.VSCtlCommand('del-port', (self.br_name, port_name))
         self.run_command([command])
 
+    def add_row_listener(self, table_name, func):
+        """
+        Registers the listener called when the rows in the given table
+        change. See VSCtl.add_row_listener() for details.
+        """
+        self.vsctl.add_row_listener(table_name, func)
+
+    def remove_row_listener(self, table_name, func):
+        self.vsctl.remove_row_listener(table_name, func)
+
     def _get_ports(self, get_port):
         ports = []
         port_names = self.get_port_name_list()
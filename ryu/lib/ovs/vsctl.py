@@ -977,8 +977,90 @@ class VSCtlCommand(StringifyMixin):
         return option in self.options
 
 
+class _Idl(idl.Idl):
+    """
+    Idl which notifies the changes of the rows to the listeners.
+    """
+
+    def __init__(self, remote, schema_helper, listeners):
+        super(_Idl, self).__init__(remote, schema_helper)
+        self.listeners = listeners
+
+    def notify(self, event, row, updates=None):
+        for func in self.listeners.get(row._table.name, []):
+            try:
+                func(event, row, updates)
+            except Exception as e:
+                LOG.exception('Error in listener %s: %s', func, e)
+
+
+# remote -> {table name: [listener, ...]}
+_idl_listeners = {}
+
+# Interval to process the monitor updates arriving between the commands
+_MONITOR_INTERVAL = 1  # sec
+
+
+class _IdlSession(object):
+    """
+    Long-lived IDL session to the OVSDB server.
+
+    The IDL monitors all the tables and columns of Open_vSwitch database,
+    so its rows are the local replica of the database which is kept up to
+    date by the monitor updates. The session is shared by the VSCtl
+    instances for the same remote and the lock serializes the accesses.
+    """
+
+    def __init__(self, remote, schema_json):
+        super(_IdlSession, self).__init__()
+        self.remote = remote
+        self.schema_json = schema_json
+        schema_helper = idl.SchemaHelper(None, schema_json)
+        schema_helper.register_all()
+        self.schema = schema_helper.get_idl_schema()
+        self.idl = _Idl(remote, schema_helper,
+                        _idl_listeners.setdefault(remote, {}))
+        self.lock = hub.Semaphore()
+        self._thread = None
+
+    def is_connected(self):
+        # Note: Idl does not expose the connection state of the session.
+        return self.idl._session.is_connected()
+
+    def start_monitor(self):
+        if self._thread is None:
+            self._thread = hub.spawn(self._monitor)
+
+    def _monitor(self):
+        # Notifies the listeners of the changes without waiting for the
+        # next command. Only the thread holding the lock reads from the
+        # session, so that no two threads wait on the same socket.
+        while True:
+            hub.sleep(_MONITOR_INTERVAL)
+            with self.lock:
+                self.idl.run()
+
+    def close(self):
+        if self._thread is not None:
+            hub.kill(self._thread)
+            self._thread = None
+        self.idl.close()
+
+
+# remote -> _IdlSession
+_idl_sessions = {}
+
+
 class VSCtl(object):
 
+    # Commands which only read the database. These are served from the
+    # local replica without any transaction to the OVSDB server.
+    _READ_ONLY_COMMANDS = frozenset([
+        'init', 'show', 'list-br', 'br-exists', 'br-to-vlan', 'br-to-parent',
+        'br-get-external-id', 'list-ports', 'port-to-br', 'list-ifaces',
+        'iface-to-br', 'get-controller', 'get-fail-mode', 'list', 'find',
+        'get', 'list-ifaces-verbose'])
+
     def _reset(self):
         self.schema_helper = None
         self.ovs = None
@@ -998,6 +1080,64 @@ class VSCtl(object):
         self.wait_for_reload = True
         self.dry_run = False
 
+    def _get_idl_session(self):
+        session = _idl_sessions.get(self.remote)
+        if session is None:
+            schema_json = self._rpc_get_schema_json(
+                vswitch_idl.OVSREC_DB_NAME)
+            session = _IdlSession(self.remote, schema_json)
+            # Another thread might have opened the session while fetching
+            # the schema.
+            if _idl_sessions.setdefault(self.remote, session) is not session:
+                session.close()
+                session = _idl_sessions[self.remote]
+            elif any(_idl_listeners.get(self.remote, {}).values()):
+                session.start_monitor()
+        return session
+
+    def _close_idl_session(self, session):
+        if _idl_sessions.get(session.remote) is session:
+            del _idl_sessions[session.remote]
+        session.close()
+
+    def add_row_listener(self, table_name, func):
+        """
+        Registers the listener called when the rows in the given table
+        of the local replica change.
+
+        The listener is called as ``func(event, row, updates)`` while
+        processing the monitor updates from the remote, where *event* is
+        one of ovs.db.idl.ROW_CREATE, ROW_UPDATE or ROW_DELETE, and
+        *updates* is the row containing the old values of the updated
+        columns for ROW_UPDATE. When the session is opened again, the
+        listener is notified of all the rows with ROW_CREATE.
+
+        The listeners are shared by all VSCtl instances for the same
+        remote.
+        """
+        listeners = _idl_listeners.setdefault(self.remote, {})
+        listeners.setdefault(table_name, []).append(func)
+        self._get_idl_session().start_monitor()
+
+    def remove_row_listener(self, table_name, func):
+        """
+        Unregisters the listener registered by add_row_listener().
+        """
+        listeners = _idl_listeners.get(self.remote, {})
+        if func in listeners.get(table_name, []):
+            listeners[table_name].remove(func)
+
+    def close(self):
+        """
+        Closes the IDL session to the remote.
+
+        The session is shared by all VSCtl instances for the same remote,
+        and is opened again by the next command.
+        """
+        session = _idl_sessions.get(self.remote)
+        if session is not None:
+            self._close_idl_session(session)
+
     def _rpc_get_schema_json(self, database):
         LOG.debug('remote %s', self.remote)
         error, stream_ = stream.Stream.open_block(
@@ -1015,13 +1155,9 @@ class VSCtl(object):
             vsctl_fatal('error %s' % reply.error)
         return reply.result
 
-    def _init_schema_helper(self):
-        if self.schema_json is None:
-            self.schema_json = self._rpc_get_schema_json(
-                vswitch_idl.OVSREC_DB_NAME)
-            schema_helper = idl.SchemaHelper(None, self.schema_json)
-            schema_helper.register_all()
-            self.schema = schema_helper.get_idl_schema()
+    def _init_schema_helper(self, session):
+        self.schema_json = session.schema_json
+        self.schema = session.schema
         # LOG.debug('schema_json %s', schema_json)
         self.schema_helper = idl.SchemaHelper(None, self.schema_json)
 
@@ -1037,6 +1173,8 @@ class VSCtl(object):
             VSCtl._idl_block(idl_)
 
     def _run_prerequisites(self, commands):
+        # Note: The IDL session monitors all the columns, so registering
+        # the columns here only validates the table and column names.
         schema_helper = self.schema_helper
         schema_helper.register_table(vswitch_idl.OVSREC_TABLE_OPEN_VSWITCH)
         if self.wait_for_reload:
@@ -1052,6 +1190,23 @@ class VSCtl(object):
             command._prerequisite(ctx, command)
             ctx.done()
 
+    def _do_vsctl_read_only(self, idl_, commands):
+        # The transaction is never committed, but required for verify().
+        self.txn = idl.Transaction(idl_)
+        ovs_rows = idl_.tables[vswitch_idl.OVSREC_TABLE_OPEN_VSWITCH].rows
+        ovs_ = list(ovs_rows.values())[0]
+
+        ctx = VSCtlContext(idl_, self.txn, ovs_)
+        for command in commands:
+            if not command._run:
+                continue
+            command._run(ctx, command)
+        LOG.debug('result:\n%s', [command.result for command in commands])
+        ctx.done()
+
+        self.txn.abort()
+        self.txn = None
+
     def _do_vsctl(self, idl_, commands):
         self.txn = idl.Transaction(idl_)
         if self.dry_run:
@@ -1131,25 +1286,53 @@ class VSCtl(object):
         :type commands: list of VSCtlCommand
         """
         self._reset()
-        self._init_schema_helper()
+        session = self._get_idl_session()
+        self._init_schema_helper(session)
         self._run_prerequisites(commands)
 
-        idl_ = idl.Idl(self.remote, self.schema_helper)
+        with session.lock:
+            try:
+                self._do_idl(session, commands)
+            except Exception:
+                raise
+            except BaseException:
+                # e.g., hub.Timeout while waiting for the reply of the
+                # transaction. Drops the session in the unknown state.
+                self._close_idl_session(session)
+                raise
+            finally:
+                if self.txn:
+                    self.txn.abort()
+                    self.txn = None
+
+    def _do_idl(self, session, commands):
+        idl_ = session.idl
+
+        # Catches up with the monitor updates received since the last
+        # commands, or waits for the initial contents of the database
+        # (again after reconnecting).
         seqno = idl_.change_seqno
-        while True:
+        if idl_.run():
+            seqno = idl_.change_seqno
+        elif not idl_.has_ever_connected() or not session.is_connected():
             self._idl_wait(idl_, seqno)
-
             seqno = idl_.change_seqno
-            if self._do_vsctl(idl_, commands):
-                break
 
+        if (all(command.command in self._READ_ONLY_COMMANDS
+                for command in commands) and
+                idl_.tables[vswitch_idl.OVSREC_TABLE_OPEN_VSWITCH].rows):
+            self._do_vsctl_read_only(idl_, commands)
+            return
+
+        while not self._do_vsctl(idl_, commands):
             if self.txn:
                 self.txn.abort()
                 self.txn = None
             # TODO:XXX
             # ovsdb_symbol_table_destroy(symtab)
 
-        idl_.close()
+            self._idl_wait(idl_, seqno)
+            seqno = idl_.change_seqno
 
     def _run_command(self, commands):
         """
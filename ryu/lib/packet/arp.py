@@ -51,6 +51,8 @@ class arp(packet_base.PacketBase):
     dst_ip         Protocol address of target.           '192.0.2.2'
     ============== ===================================== =====================
     """
+    __slots__ = ('hwtype', 'proto', 'hlen', 'plen', 'opcode', 'src_mac',
+                 'src_ip', 'dst_mac', 'dst_ip')
 
     _PACK_STR = '!HHBBH6s4s6s4s'
     _MIN_LEN = struct.calcsize(_PACK_STR)
@@ -710,6 +710,7 @@ class BGPFourOctetAsRD(_RouteDistinguisher):
 
 @six.add_metaclass(abc.ABCMeta)
 class _AddrPrefix(StringifyMixin):
+    __slots__ = ('length', 'addr')
     _PACK_STR = '!B'  # length
 
     def __init__(self, length, addr, prefixes=None, **kwargs):
@@ -736,8 +737,10 @@ class _AddrPrefix(StringifyMixin):
 
     @classmethod
     def parser(cls, buf):
-        (length, ) = struct.unpack_from(cls._PACK_STR, six.binary_type(buf))
-        rest = buf[struct.calcsize(cls._PACK_STR):]
+        size = struct.calcsize(cls._PACK_STR)
+        (length, ) = struct.unpack_from(cls._PACK_STR,
+                                        six.binary_type(buf[:size]))
+        rest = buf[size:]
         byte_length = (length + 7) // 8
         addr = cls._from_bin(rest[:byte_length])
         rest = rest[byte_length:]
@@ -862,6 +865,8 @@ class _LabelledAddrPrefix(_AddrPrefix):
 
 
 class _UnlabelledAddrPrefix(_AddrPrefix):
+    __slots__ = ()
+
     @classmethod
     def _to_bin(cls, addr):
         return cls._prefix_to_bin((addr,))
@@ -873,6 +878,8 @@ class _UnlabelledAddrPrefix(_AddrPrefix):
 
 
 class _IPAddrPrefix(_AddrPrefix):
+    __slots__ = ()
+
     @staticmethod
     def _prefix_to_bin(addr):
         (addr,) = addr
@@ -880,10 +887,14 @@ class _IPAddrPrefix(_AddrPrefix):
 
     @staticmethod
     def _prefix_from_bin(addr):
-        return addrconv.ipv4.bin_to_text(pad(addr, 4)),
+        # Note: socket.inet_ntoa() is used instead of addrconv here, since
+        # this is called for every IPv4 NLRI received.
+        return socket.inet_ntoa(six.binary_type(pad(addr, 4))),
 
 
 class _IP6AddrPrefix(_AddrPrefix):
+    __slots__ = ()
+
     @staticmethod
     def _prefix_to_bin(addr):
         (addr,) = addr
@@ -931,6 +942,7 @@ class _VPNAddrPrefix(_AddrPrefix):
 
 
 class IPAddrPrefix(_UnlabelledAddrPrefix, _IPAddrPrefix):
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv4_UC
     _TYPE = {
         'ascii': [
@@ -948,6 +960,7 @@ class IPAddrPrefix(_UnlabelledAddrPrefix, _IPAddrPrefix):
 
 
 class IP6AddrPrefix(_UnlabelledAddrPrefix, _IP6AddrPrefix):
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv6_UC
     _TYPE = {
         'ascii': [
@@ -3394,6 +3407,28 @@ def _get_addr_class(afi, safi):
         return _BinAddrPrefix
 
 
+def _parse_nlri_list(addr_cls, buf):
+    """Parses the NLRIs of *addr_cls* packed in *buf* into a list.
+
+    The NLRIs of _AddrPrefix subclasses are sliced out of *buf* by their
+    length fields and parsed one by one, so the rest of *buf* is not
+    copied for each NLRI.
+    """
+    nlri = []
+    if issubclass(addr_cls, _AddrPrefix):
+        offset = 0
+        while offset < len(buf):
+            end = offset + 1 + (six.indexbytes(buf, offset) + 7) // 8
+            n, _ = addr_cls.parser(buf[offset:end])
+            nlri.append(n)
+            offset = end
+    else:
+        while buf:
+            n, buf = addr_cls.parser(buf)
+            nlri.append(n)
+    return nlri
+
+
 class _OptParam(StringifyMixin, TypeDisp, _Value):
     _PACK_STR = '!BB'  # type, length
 
@@ -3627,15 +3662,18 @@ class _PathAttribute(StringifyMixin, TypeDisp, _Value):
 
     @classmethod
     def parser(cls, buf):
+        size = struct.calcsize(cls._PACK_STR)
         (flags, type_) = struct.unpack_from(cls._PACK_STR,
-                                            six.binary_type(buf))
-        rest = buf[struct.calcsize(cls._PACK_STR):]
+                                            six.binary_type(buf[:size]))
+        rest = buf[size:]
         if (flags & BGP_ATTR_FLAG_EXTENDED_LENGTH) != 0:
             len_pack_str = cls._PACK_STR_EXT_LEN
         else:
             len_pack_str = cls._PACK_STR_LEN
-        (length,) = struct.unpack_from(len_pack_str, six.binary_type(rest))
-        rest = rest[struct.calcsize(len_pack_str):]
+        size = struct.calcsize(len_pack_str)
+        (length,) = struct.unpack_from(len_pack_str,
+                                       six.binary_type(rest[:size]))
+        rest = rest[size:]
         value = bytes(rest[:length])
         rest = rest[length:]
         subcls = cls._lookup_type(type_)
@@ -4819,10 +4857,7 @@ class BGPPathAttributeMpReachNLRI(_PathAttribute):
 
         nlri_bin = rest[cls._RESERVED_LENGTH:]
         addr_cls = _get_addr_class(afi, safi)
-        nlri = []
-        while nlri_bin:
-            n, nlri_bin = addr_cls.parser(nlri_bin)
-            nlri.append(n)
+        nlri = _parse_nlri_list(addr_cls, nlri_bin)
 
         rf = RouteFamily(afi, safi)
         if rf == RF_IPv4_VPN:
@@ -4940,10 +4975,7 @@ class BGPPathAttributeMpUnreachNLRI(_PathAttribute):
 
         nlri_bin = buf[struct.calcsize(cls._VALUE_PACK_STR):]
         addr_cls = _get_addr_class(afi, safi)
-        nlri = []
-        while nlri_bin:
-            n, nlri_bin = addr_cls.parser(nlri_bin)
-            nlri.append(n)
+        nlri = _parse_nlri_list(addr_cls, nlri_bin)
 
         return {
             'afi': afi,
@@ -5217,8 +5249,8 @@ class BGPMessage(packet_base.PacketBase, TypeDisp):
         if len(buf) < cls._HDR_LEN:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), cls._HDR_LEN))
-        (marker, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR,
-                                                   six.binary_type(buf))
+        (marker, len_, type_) = struct.unpack_from(
+            cls._HDR_PACK_STR, six.binary_type(buf[:cls._HDR_LEN]))
         msglen = len_
         if len(buf) < msglen:
             raise stream_parser.StreamParser.TooSmallException(
@@ -5424,19 +5456,13 @@ class BGPUpdate(BGPMessage):
         binpathattrs = buf[offset + 2:
                            offset + 2 + total_path_attribute_len]
         binnlri = buf[offset + 2 + total_path_attribute_len:]
-        withdrawn_routes = []
-        while binroutes:
-            r, binroutes = BGPWithdrawnRoute.parser(binroutes)
-            withdrawn_routes.append(r)
+        withdrawn_routes = _parse_nlri_list(BGPWithdrawnRoute, binroutes)
         path_attributes = []
         while binpathattrs:
             pa, binpathattrs = _PathAttribute.parser(binpathattrs)
             path_attributes.append(pa)
         offset += 2 + total_path_attribute_len
-        nlri = []
-        while binnlri:
-            n, binnlri = BGPNLRI.parser(binnlri)
-            nlri.append(n)
+        nlri = _parse_nlri_list(BGPNLRI, binnlri)
         return {
             "withdrawn_routes_len": withdrawn_routes_len,
             "withdrawn_routes": withdrawn_routes,
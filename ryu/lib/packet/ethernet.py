@@ -37,6 +37,7 @@ class ethernet(packet_base.PacketBase):
     ethertype      ether type           0x0800
     ============== ==================== =====================
     """
+    __slots__ = ('dst', 'src', 'ethertype')
 
     _PACK_STR = '!6s6sH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
@@ -67,6 +67,7 @@ class icmp(packet_base.PacketBase):
                    of the original packet.
     ============== ====================
     """
+    __slots__ = ('type', 'code', 'csum', 'data')
 
     _PACK_STR = '!BBH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
@@ -68,6 +68,9 @@ class ipv4(packet_base.PacketBase):
                    Options, or None for  no Options
     ============== ======================================== ==================
     """
+    __slots__ = ('version', 'header_length', 'tos', 'total_length',
+                 'identification', 'flags', 'offset', 'ttl', 'proto', 'csum',
+                 'src', 'dst', 'option')
 
     _PACK_STR = '!BBHHHBBH4s4s'
     _MIN_LEN = struct.calcsize(_PACK_STR)
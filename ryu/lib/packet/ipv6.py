@@ -58,6 +58,8 @@ class ipv6(packet_base.PacketBase):
     ext_hdrs       Extension Headers
     ============== ======================================== ==================
     """
+    __slots__ = ('version', 'traffic_class', 'flow_label', 'payload_length',
+                 'nxt', 'hop_limit', 'src', 'dst', 'ext_hdrs')
 
     _PACK_STR = '!IHBB16s16s'
     _MIN_LEN = struct.calcsize(_PACK_STR)
@@ -52,6 +52,7 @@ class Packet(StringifyMixin):
 
     *data* should be omitted when encoding a packet.
     """
+    __slots__ = ('data', 'protocols')
 
     # Ignore data field when outputting json representation.
     _base_attributes = ['data']
@@ -99,7 +100,9 @@ class Packet(StringifyMixin):
                 data = p.serialize(self.data, prev)
             else:
                 data = six.binary_type(p)
-            self.data = bytearray(data + self.data)
+            # Prepends the header in place rather than concatenating
+            # the whole payload again for every layer.
+            self.data[0:0] = data
 
     @classmethod
     def from_jsondict(cls, dict_, decode_string=base64.b64decode,
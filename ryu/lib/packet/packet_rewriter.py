@@ -0,0 +1,286 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-place rewriter of the header fields in a raw Ethernet frame.
+"""
+
+import struct
+
+import six
+
+from ryu.lib import addrconv
+from . import ether_types as ether
+from . import in_proto as inet
+from . import packet_utils
+
+
+_VLAN_TPIDS = (ether.ETH_TYPE_8021Q, ether.ETH_TYPE_8021AD)
+_ETH_TYPE_OFFSET = 12
+_VLAN_TAG_LEN = 4
+_IPV4_CSUM_OFFSET = 10
+_IPV6_HEADER_LEN = 40
+
+# Offset of the checksum field and the minimum header length of the upper
+# layer protocols whose checksum covers the IP pseudo header.
+_L4_CSUM = {
+    inet.IPPROTO_TCP: (16, 20),
+    inet.IPPROTO_UDP: (6, 8),
+    inet.IPPROTO_ICMPV6: (2, 4),
+}
+
+# Name -> [(layer, offset in layer, size, address converter, mask), ...]
+# The first entry whose layer exists in the packet is used.
+_FIELDS = {
+    'eth_dst': [('eth', 0, 6, addrconv.mac, None)],
+    'eth_src': [('eth', 6, 6, addrconv.mac, None)],
+    'vlan_vid': [('vlan', 2, 2, None, 0x0fff)],
+    'vlan_pcp': [('vlan', 2, 2, None, 0xe000)],
+    'arp_op': [('arp', 6, 2, None, None)],
+    'arp_sha': [('arp', 8, 6, addrconv.mac, None)],
+    'arp_spa': [('arp', 14, 4, addrconv.ipv4, None)],
+    'arp_tha': [('arp', 18, 6, addrconv.mac, None)],
+    'arp_tpa': [('arp', 24, 4, addrconv.ipv4, None)],
+    'ip_dscp': [('ipv4', 1, 1, None, 0xfc)],
+    'ip_ecn': [('ipv4', 1, 1, None, 0x03)],
+    'nw_ttl': [('ipv4', 8, 1, None, None),
+               ('ipv6', 7, 1, None, None)],
+    'ipv4_src': [('ipv4', 12, 4, addrconv.ipv4, None)],
+    'ipv4_dst': [('ipv4', 16, 4, addrconv.ipv4, None)],
+    'ipv6_src': [('ipv6', 8, 16, addrconv.ipv6, None)],
+    'ipv6_dst': [('ipv6', 24, 16, addrconv.ipv6, None)],
+    'tcp_src': [('tcp', 0, 2, None, None)],
+    'tcp_dst': [('tcp', 2, 2, None, None)],
+    'udp_src': [('udp', 0, 2, None, None)],
+    'udp_dst': [('udp', 2, 2, None, None)],
+}
+
+_INT_PACK_STR = {1: '!B', 2: '!H'}
+
+
+def _mask_shift(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+class PacketRewriter(object):
+    """Rewriter of the header fields in a raw Ethernet frame.
+
+    Rewriting a few header fields with packet.Packet decodes and
+    serializes all of the protocol headers and calculates the checksums
+    over the whole packet again. This class locates the headers once and
+    overwrites the fields in the buffer instead, and updates the IPv4,
+    TCP, UDP and ICMPv6 checksums incrementally (RFC1624). The checksums
+    are kept correct even if the buffer is truncated after the headers,
+    e.g., the data of OFPPacketIn with max_len.
+
+    *data* is the raw frame. If it is a bytearray, it is modified in
+    place. Otherwise, it is copied into a bytearray.
+    The rewritten frame is available as ``data`` attribute.
+
+    The fields are named after the OpenFlow match fields and take the
+    same representation as the packet library, e.g., '192.0.2.1' for
+    IPv4 addresses. vlan_vid is the VLAN ID without OFPVID_PRESENT bit
+    and nw_ttl is the IPv4 TTL or the IPv6 hop limit.
+
+    Example::
+
+        rewriter = PacketRewriter(msg.data)
+        rewriter.set_field(eth_dst='00:00:00:00:00:02',
+                           ipv4_dst='192.0.2.2')
+        rewriter.dec_nw_ttl()
+        datapath.send_msg(parser.OFPPacketOut(..., data=rewriter.data))
+    """
+
+    def __init__(self, data):
+        if not isinstance(data, bytearray):
+            data = bytearray(data)
+        self.data = data
+        self._offsets = {}
+        self._l4_proto = None
+        self._locate()
+
+    def _locate(self):
+        # Note: The offsets of the IP headers are always even here, so
+        # the 16-bit words of the checksums are aligned to the frame.
+        data = self.data
+        offsets = {}
+        self._l4_proto = None
+        if len(data) < _ETH_TYPE_OFFSET + 2:
+            self._offsets = offsets
+            return
+        offsets['eth'] = 0
+
+        pos = _ETH_TYPE_OFFSET
+        (eth_type, ) = struct.unpack_from('!H', data, pos)
+        while eth_type in _VLAN_TPIDS and len(data) >= pos + 6:
+            offsets.setdefault('vlan', pos)
+            pos += _VLAN_TAG_LEN
+            (eth_type, ) = struct.unpack_from('!H', data, pos)
+        pos += 2
+
+        if eth_type == ether.ETH_TYPE_ARP and len(data) >= pos + 28:
+            offsets['arp'] = pos
+        elif eth_type == ether.ETH_TYPE_IP and len(data) >= pos + 20:
+            offsets['ipv4'] = pos
+            (ver_ihl, flags_offset, proto) = struct.unpack_from(
+                '!B5xHxB', data, pos)
+            if flags_offset & 0x1fff == 0:
+                self._locate_l4(offsets, proto, pos + (ver_ihl & 0xf) * 4)
+        elif eth_type == ether.ETH_TYPE_IPV6 and \
+                len(data) >= pos + _IPV6_HEADER_LEN:
+            offsets['ipv6'] = pos
+            (nxt, ) = struct.unpack_from('!B', data, pos + 6)
+            self._locate_l4(offsets, nxt, pos + _IPV6_HEADER_LEN)
+        self._offsets = offsets
+
+    def _locate_l4(self, offsets, proto, pos):
+        if proto not in _L4_CSUM:
+            return
+        _, min_len = _L4_CSUM[proto]
+        if len(self.data) < pos + min_len:
+            return
+        self._l4_proto = proto
+        offsets['l4'] = pos
+        if proto == inet.IPPROTO_TCP:
+            offsets['tcp'] = pos
+        elif proto == inet.IPPROTO_UDP:
+            offsets['udp'] = pos
+
+    def _field(self, name):
+        try:
+            specs = _FIELDS[name]
+        except KeyError:
+            raise ValueError('unknown field %s' % name)
+        for layer, offset, size, conv, mask in specs:
+            if layer in self._offsets:
+                return (self._offsets[layer] + offset, size, conv, mask)
+        raise ValueError('packet has no %s field' % name)
+
+    def _l4_csum_offset(self):
+        if 'l4' not in self._offsets:
+            return None
+        pos = self._offsets['l4'] + _L4_CSUM[self._l4_proto][0]
+        if (self._l4_proto == inet.IPPROTO_UDP and 'ipv4' in self._offsets
+                and self.data[pos:pos + 2] == b'\x00\x00'):
+            # UDP over IPv4 without checksum
+            return None
+        return pos
+
+    def _csum_offsets(self, pos):
+        # Returns the offsets of the checksums which cover the given
+        # position of the frame.
+        csums = []
+        l4_pos = self._offsets.get('l4')
+        ipv4_pos = self._offsets.get('ipv4')
+        ipv6_pos = self._offsets.get('ipv6')
+        if l4_pos is not None and pos >= l4_pos:
+            csums.append(self._l4_csum_offset())
+        elif ipv4_pos is not None and pos >= ipv4_pos:
+            csums.append(ipv4_pos + _IPV4_CSUM_OFFSET)
+            if pos >= ipv4_pos + 12:
+                # Source and destination addresses in the pseudo header
+                csums.append(self._l4_csum_offset())
+        elif ipv6_pos is not None and pos >= ipv6_pos + 8:
+            csums.append(self._l4_csum_offset())
+        return [c for c in csums if c is not None]
+
+    def _write(self, pos, buf):
+        start = pos & ~1
+        end = (pos + len(buf) + 1) & ~1
+        old = six.binary_type(self.data[start:end])
+        self.data[pos:pos + len(buf)] = buf
+        new = six.binary_type(self.data[start:end])
+        for csum_pos in self._csum_offsets(pos):
+            (csum, ) = struct.unpack_from('!H', self.data, csum_pos)
+            csum = packet_utils.checksum_update(csum, old, new)
+            if csum == 0 and self._l4_proto == inet.IPPROTO_UDP and \
+                    csum_pos == self._l4_csum_offset():
+                csum = 0xffff
+            struct.pack_into('!H', self.data, csum_pos, csum)
+
+    def has_field(self, name):
+        """Returns True if the packet has the field *name*."""
+        try:
+            self._field(name)
+        except ValueError:
+            return False
+        return True
+
+    def get_field(self, name):
+        """Returns the value of the field *name*.
+
+        Raises ValueError if the packet has no such field.
+        """
+        pos, size, conv, mask = self._field(name)
+        if conv is not None:
+            return conv.bin_to_text(six.binary_type(self.data[pos:pos + size]))
+        (value, ) = struct.unpack_from(_INT_PACK_STR[size], self.data, pos)
+        if mask is not None:
+            value = (value & mask) >> _mask_shift(mask)
+        return value
+
+    def set_field(self, **kwargs):
+        """Overwrites the fields given as keyword arguments.
+
+        Raises ValueError if the packet has no such field.
+        """
+        for name, value in kwargs.items():
+            pos, size, conv, mask = self._field(name)
+            if conv is not None:
+                buf = conv.text_to_bin(value)
+            else:
+                if mask is not None:
+                    (old, ) = struct.unpack_from(
+                        _INT_PACK_STR[size], self.data, pos)
+                    value = (old & ~mask |
+                             value << _mask_shift(mask) & mask)
+                buf = struct.pack(_INT_PACK_STR[size], value)
+            self._write(pos, buf)
+
+    def dec_nw_ttl(self):
+        """Decrements IPv4 TTL or IPv6 hop limit and returns the new value.
+
+        Raises ValueError if the value is already zero.
+        """
+        ttl = self.get_field('nw_ttl')
+        if ttl == 0:
+            raise ValueError('nw_ttl is already zero')
+        self.set_field(nw_ttl=ttl - 1)
+        return ttl - 1
+
+    def push_vlan(self, ethertype=ether.ETH_TYPE_8021Q):
+        """Pushes a new outermost VLAN tag.
+
+        Same as OFPActionPushVlan, VLAN ID and priority are copied from
+        the existing outermost VLAN tag, or zero if the packet is not
+        tagged.
+        """
+        if 'vlan' in self._offsets:
+            tci = self.data[_ETH_TYPE_OFFSET + 2:_ETH_TYPE_OFFSET + 4]
+        else:
+            tci = b'\x00\x00'
+        self.data[_ETH_TYPE_OFFSET:_ETH_TYPE_OFFSET] = \
+            struct.pack('!H', ethertype) + six.binary_type(tci)
+        self._locate()
+
+    def pop_vlan(self):
+        """Pops the outermost VLAN tag.
+
+        Raises ValueError if the packet is not tagged.
+        """
+        if 'vlan' not in self._offsets:
+            raise ValueError('packet has no VLAN tag')
+        del self.data[_ETH_TYPE_OFFSET:_ETH_TYPE_OFFSET + _VLAN_TAG_LEN]
+        self._locate()
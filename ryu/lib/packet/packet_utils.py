@@ -99,6 +99,30 @@ def checksum_ip(ipvx, length, payload):
     buf = header + payload
     return checksum(buf)
 
+
+def checksum_update(csum, old, new):
+    """
+    Incrementally update the Internet checksum.
+
+    Returns the checksum *csum* updated for the change of the checksummed
+    data from *old* to *new*, as described by RFC1624 Eqn. 3.
+    *old* and *new* are the same length of bytes which start at
+    the 16-bit boundary of the checksummed data.
+    """
+    if len(old) != len(new):
+        raise ValueError('old and new must be the same length')
+    if len(old) % 2:
+        old = six.binary_type(old) + b'\x00'
+        new = six.binary_type(new) + b'\x00'
+    fmt = '!%dH' % (len(old) // 2)
+    # HC' = ~(~HC + ~m + m')
+    s = ~csum & 0xffff
+    for m, m_ in zip(struct.unpack(fmt, old), struct.unpack(fmt, new)):
+        s += (~m & 0xffff) + m_
+    s = (s & 0xffff) + (s >> 16)
+    s += (s >> 16)
+    return ~s & 0xffff
+
 _MODX = 4102
 
 
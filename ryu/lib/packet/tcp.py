@@ -76,6 +76,8 @@ class tcp(packet_base.PacketBase):
                    None if no options.
     ============== ====================
     """
+    __slots__ = ('src_port', 'dst_port', 'seq', 'ack', 'offset', 'bits',
+                 'window_size', 'csum', 'urgent', 'option')
 
     _PACK_STR = '!HHIIBBHHH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
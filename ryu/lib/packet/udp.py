@@ -41,6 +41,7 @@ class udp(packet_base.PacketBase):
                    (0 means automatically-calculate when encoding)
     ============== ====================
     """
+    __slots__ = ('src_port', 'dst_port', 'total_length', 'csum')
 
     _PACK_STR = '!HHHH'
     _MIN_LEN = struct.calcsize(_PACK_STR)
@@ -30,6 +30,7 @@ from . import ether_types as ether
 
 @six.add_metaclass(abc.ABCMeta)
 class _vlan(packet_base.PacketBase):
+    __slots__ = ('pcp', 'cfi', 'vid', 'ethertype')
     _PACK_STR = "!HH"
     _MIN_LEN = struct.calcsize(_PACK_STR)
 
@@ -71,6 +72,7 @@ class vlan(_vlan):
     ethertype      EtherType
     ============== ====================
     """
+    __slots__ = ()
 
     def __init__(self, pcp=0, cfi=0, vid=0, ethertype=ether.ETH_TYPE_IP):
         super(vlan, self).__init__(pcp, cfi, vid, ethertype)
@@ -109,6 +111,7 @@ class svlan(_vlan):
     ethertype      EtherType
     ============== ====================
     """
+    __slots__ = ()
 
     def __init__(self, pcp=0, cfi=0, vid=0, ethertype=ether.ETH_TYPE_8021Q):
         super(svlan, self).__init__(pcp, cfi, vid, ethertype)
@@ -0,0 +1,335 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batch decoder of the fixed L2-L4 header fields in PCAP files.
+
+pcaplib.Reader and packet.Packet decode one packet at a time into the
+Python objects. This module decodes the headers of all packets in a
+PCAP file at once into a NumPy structured array, whose fields are
+named after the OpenFlow match fields, and builds packet.Packet
+instances only for the packets which are requested.
+
+This module requires NumPy.
+"""
+
+import mmap
+import struct
+
+import numpy
+import six
+
+from ryu.lib import pcaplib
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_v1_3
+
+
+# Data link type of Ethernet
+LINKTYPE_ETHERNET = 1
+
+# Fields of the decoded headers.
+# The fields which do not exist in a packet are set to zero.
+#
+# ========== ===========================================================
+# Field      Description
+# ========== ===========================================================
+# ts         Timestamp in seconds
+# offset     Offset of the packet data in the PCAP file
+# caplen     Length of the captured packet data
+# len        Original length of the packet
+# eth_dst    Ethernet destination address as an integer
+# eth_src    Ethernet source address as an integer
+# vlan_vid   VLAN ID of the outermost VLAN tag with OFPVID_PRESENT bit.
+#            OFPVID_NONE(0) if the packet is not tagged.
+# eth_type   Ethernet type (after the VLAN tags)
+# ip_len     IPv4 total length or IPv6 payload length + 40
+# ip_proto   IPv4 protocol or IPv6 next header
+# ipv4_src   IPv4 source address as an integer
+# ipv4_dst   IPv4 destination address as an integer
+# ipv6_src   IPv6 source address as 16 bytes
+# ipv6_dst   IPv6 destination address as 16 bytes
+# tcp_src    TCP source port
+# tcp_dst    TCP destination port
+# tcp_flags  TCP flags
+# udp_src    UDP source port
+# udp_dst    UDP destination port
+# ========== ===========================================================
+HEADER_DTYPE = numpy.dtype([
+    ('ts', numpy.float64),
+    ('offset', numpy.uint64),
+    ('caplen', numpy.uint32),
+    ('len', numpy.uint32),
+    ('eth_dst', numpy.uint64),
+    ('eth_src', numpy.uint64),
+    ('vlan_vid', numpy.uint16),
+    ('eth_type', numpy.uint16),
+    ('ip_len', numpy.uint16),
+    ('ip_proto', numpy.uint8),
+    ('ipv4_src', numpy.uint32),
+    ('ipv4_dst', numpy.uint32),
+    ('ipv6_src', numpy.uint8, (16,)),
+    ('ipv6_dst', numpy.uint8, (16,)),
+    ('tcp_src', numpy.uint16),
+    ('tcp_dst', numpy.uint16),
+    ('tcp_flags', numpy.uint16),
+    ('udp_src', numpy.uint16),
+    ('udp_dst', numpy.uint16),
+])
+
+_VLAN_TYPES = (ether_types.ETH_TYPE_8021Q, ether_types.ETH_TYPE_8021AD)
+_MAX_VLAN_TAGS = 2
+_ETH_HEADER_LEN = 14
+_VLAN_HEADER_LEN = 4
+_IPV6_HEADER_LEN = 40
+_IPV4_FRAG_OFFSET_MASK = 0x1fff
+
+
+class _Gather(object):
+    """
+    Reads the big endian integers at the given offsets of all packets.
+    Returns zero for the packets which are too short.
+    """
+
+    def __init__(self, data, end):
+        self.data = data
+        self.end = end
+
+    def uint(self, pos, size, valid=None):
+        ok = pos + size <= self.end
+        if valid is not None:
+            ok &= valid
+        pos = numpy.where(ok, pos, 0)
+        value = numpy.zeros(len(pos), dtype=numpy.uint64)
+        for i in range(size):
+            value <<= numpy.uint64(8)
+            value |= self.data[pos + i]
+        value[~ok] = 0
+        return value
+
+    def bytes(self, pos, size, valid=None):
+        ok = pos + size <= self.end
+        if valid is not None:
+            ok &= valid
+        pos = numpy.where(ok, pos, 0)
+        value = self.data[pos[:, numpy.newaxis] + numpy.arange(size)]
+        value[~ok] = 0
+        return value
+
+
+class BatchReader(object):
+    """
+    PCAP file reader which decodes the packet headers in batch
+
+    ================ ====================================================
+    Argument         Description
+    ================ ====================================================
+    file_obj         File object which reading PCAP file in binary mode
+                     or path to PCAP file
+    use_mmap         (Optional) If True (default), the file is mapped
+                     into memory instead of being read.
+    ================ ====================================================
+
+    Only Ethernet (LINKTYPE_ETHERNET) is supported as the data link type.
+    IPv6 extension headers are not parsed, so ip_proto is the next header
+    field of the IPv6 header.
+
+    Example of usage::
+
+        from ryu.lib import pcapbatch
+
+        reader = pcapbatch.BatchReader('test.pcap')
+        headers = reader.headers()
+        print('%d packets' % len(headers))
+
+        # select HTTP requests and decode them into packet.Packet
+        http = reader.filter('(ip_proto == 6) & (tcp_dst == 80)')
+        for pkt in reader.packets(http[:10]):
+            print(pkt)
+    """
+
+    def __init__(self, file_obj, use_mmap=True):
+        if isinstance(file_obj, six.string_types):
+            file_obj = open(file_obj, 'rb')
+        self._mmap = None
+        try:
+            if use_mmap:
+                self._mmap = mmap.mmap(file_obj.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+                self._buf = self._mmap
+            else:
+                self._buf = file_obj.read()
+        finally:
+            file_obj.close()
+
+        self.pcap_header, self._byteorder = pcaplib.PcapFileHdr.parser(
+            self._buf[:pcaplib.PcapFileHdr.FILE_HDR_SIZE])
+        if self.pcap_header.network != LINKTYPE_ETHERNET:
+            raise ValueError('Unsupported data link type: %d'
+                             % self.pcap_header.network)
+        self._headers = None
+
+    def close(self):
+        self._headers = None
+        self._buf = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return len(self.headers())
+
+    def _index(self):
+        if self._byteorder == 'big':
+            hdr = struct.Struct(pcaplib.PcapPktHdr._PKT_HDR_FMT_BIG_ENDIAN)
+        else:
+            hdr = struct.Struct(
+                pcaplib.PcapPktHdr._PKT_HDR_FMT_LITTLE_ENDIAN)
+        buf = self._buf
+        size = len(buf)
+        hdr_size = hdr.size
+        unpack_from = hdr.unpack_from
+        pos = pcaplib.PcapFileHdr.FILE_HDR_SIZE
+        records = []
+        append = records.append
+        while pos + hdr_size <= size:
+            rec = unpack_from(buf, pos)
+            pos += hdr_size
+            append(rec + (pos,))
+            pos += rec[2]
+        index = numpy.array(records, dtype=numpy.uint64).reshape(-1, 5)
+        # drop the last packet if the file is truncated.
+        return index[index[:, 4] + index[:, 2] <= size]
+
+    def headers(self):
+        """
+        Returns a NumPy structured array of HEADER_DTYPE which contains
+        the decoded headers of all packets in the file.
+        """
+        if self._headers is None:
+            self._headers = self._decode(self._index())
+        return self._headers
+
+    def _decode(self, index):
+        n = len(index)
+        hdrs = numpy.zeros(n, dtype=HEADER_DTYPE)
+        hdrs['ts'] = index[:, 0] + index[:, 1] / 1e6
+        hdrs['caplen'] = index[:, 2]
+        hdrs['len'] = index[:, 3]
+        hdrs['offset'] = index[:, 4]
+        if n == 0:
+            return hdrs
+
+        data = numpy.frombuffer(self._buf, dtype=numpy.uint8)
+        off = index[:, 4].astype(numpy.int64)
+        g = _Gather(data, off + index[:, 2].astype(numpy.int64))
+
+        # Ethernet and VLAN
+        hdrs['eth_dst'] = g.uint(off, 6)
+        hdrs['eth_src'] = g.uint(off + 6, 6)
+        pos = off + 12
+        eth_type = g.uint(pos, 2)
+        vlan_vid = numpy.zeros(n, dtype=numpy.uint64)
+        for i in range(_MAX_VLAN_TAGS):
+            tagged = ((eth_type == _VLAN_TYPES[0]) |
+                      (eth_type == _VLAN_TYPES[1]))
+            if i == 0:
+                vid = g.uint(pos + 2, 2, tagged) & 0x0fff
+                vlan_vid = numpy.where(
+                    tagged, vid | ofproto_v1_3.OFPVID_PRESENT, 0)
+            pos = numpy.where(tagged, pos + _VLAN_HEADER_LEN, pos)
+            eth_type = numpy.where(tagged, g.uint(pos, 2, tagged),
+                                   eth_type)
+        hdrs['vlan_vid'] = vlan_vid
+        hdrs['eth_type'] = eth_type
+        l3 = pos + 2
+
+        # IPv4
+        is_ipv4 = eth_type == ether_types.ETH_TYPE_IP
+        ihl = (g.uint(l3, 1, is_ipv4) & 0x0f).astype(numpy.int64) * 4
+        is_ipv4 &= ihl >= 20
+        hdrs['ipv4_src'] = g.uint(l3 + 12, 4, is_ipv4)
+        hdrs['ipv4_dst'] = g.uint(l3 + 16, 4, is_ipv4)
+        frag_off = g.uint(l3 + 6, 2, is_ipv4) & _IPV4_FRAG_OFFSET_MASK
+
+        # IPv6
+        is_ipv6 = eth_type == ether_types.ETH_TYPE_IPV6
+        hdrs['ipv6_src'] = g.bytes(l3 + 8, 16, is_ipv6)
+        hdrs['ipv6_dst'] = g.bytes(l3 + 24, 16, is_ipv6)
+
+        ip_proto = numpy.where(is_ipv4, g.uint(l3 + 9, 1, is_ipv4),
+                               g.uint(l3 + 6, 1, is_ipv6))
+        hdrs['ip_proto'] = ip_proto
+        hdrs['ip_len'] = numpy.where(
+            is_ipv4, g.uint(l3 + 2, 2, is_ipv4),
+            numpy.where(is_ipv6,
+                        g.uint(l3 + 4, 2, is_ipv6) + _IPV6_HEADER_LEN, 0))
+
+        # TCP and UDP
+        # Note: Non-first fragments do not contain L4 header.
+        l4 = numpy.where(is_ipv4, l3 + ihl, l3 + _IPV6_HEADER_LEN)
+        has_l4 = (is_ipv4 & (frag_off == 0)) | is_ipv6
+        is_tcp = has_l4 & (ip_proto == in_proto.IPPROTO_TCP)
+        is_udp = has_l4 & (ip_proto == in_proto.IPPROTO_UDP)
+        hdrs['tcp_src'] = g.uint(l4, 2, is_tcp)
+        hdrs['tcp_dst'] = g.uint(l4 + 2, 2, is_tcp)
+        hdrs['tcp_flags'] = g.uint(l4 + 12, 2, is_tcp) & 0x01ff
+        hdrs['udp_src'] = g.uint(l4, 2, is_udp)
+        hdrs['udp_dst'] = g.uint(l4 + 2, 2, is_udp)
+
+        return hdrs
+
+    def filter(self, expr, headers=None):
+        """
+        Returns the headers which match the given expression.
+
+        ``expr`` is either a function which takes the structured array
+        and returns a boolean array, or a string of the expression of
+        NumPy arrays whose variables are the field names of
+        HEADER_DTYPE. e.g.) ``'(ip_proto == 6) & (tcp_dst == 80)'``
+
+        ``headers`` is the headers to be filtered. The default is all
+        headers in the file.
+        """
+        if headers is None:
+            headers = self.headers()
+        if callable(expr):
+            return headers[expr(headers)]
+
+        code = compile(expr, '<filter>', 'eval')
+        for name in code.co_names:
+            if name not in HEADER_DTYPE.names:
+                raise ValueError('Unknown field in filter: %s' % name)
+        namespace = dict((name, headers[name]) for name in code.co_names)
+        mask = eval(code, {'__builtins__': {}}, namespace)
+        return headers[numpy.broadcast_to(mask, headers.shape)]
+
+    def data(self, header):
+        """
+        Returns the packet data of the given header record.
+        """
+        offset = int(header['offset'])
+        return bytes(self._buf[offset:offset + int(header['caplen'])])
+
+    def packets(self, headers=None):
+        """
+        Decodes the packets of the given headers (the default is all
+        packets in the file) into packet.Packet instances on demand.
+        """
+        if headers is None:
+            headers = self.headers()
+        for header in headers:
+            yield packet.Packet(self.data(header))
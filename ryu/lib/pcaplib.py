@@ -223,6 +223,9 @@ class Reader(object):
         # Read pcap data with out header
         self._pcap_body = self._fp.read()
         self._fp.close()
+        # Note: Slicing memoryview does not copy the rest of pcap data
+        # for each packet.
+        self._pcap_body_view = memoryview(self._pcap_body)
         self._next_pos = 0
 
     def __iter__(self):
@@ -231,13 +234,13 @@ class Reader(object):
     def next(self):
         try:
             pkt_hdr, pkt_data = PcapPktHdr.parser(
-                self._pcap_body[self._next_pos:], self._file_byteorder)
+                self._pcap_body_view[self._next_pos:], self._file_byteorder)
             self._next_pos += pkt_hdr.incl_len + PcapPktHdr.PKT_HDR_SIZE
 
         except IndexError:
             raise StopIteration()
 
-        return pkt_hdr.ts_sec + (pkt_hdr.ts_usec / 1e6), pkt_data
+        return pkt_hdr.ts_sec + (pkt_hdr.ts_usec / 1e6), pkt_data.tobytes()
 
     # for Python 3 compatible
     __next__ = next
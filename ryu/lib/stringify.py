@@ -17,7 +17,6 @@
 from __future__ import print_function
 
 import base64
-import inspect
 
 import six
 
@@ -38,13 +37,17 @@ import six
 # 'len', 'property', 'set', 'type'
 # A bit more generic way is adopted
 
-_RESERVED_KEYWORD = dir(six.moves.builtins)
+_RESERVED_KEYWORD = frozenset(dir(six.moves.builtins))
 
 _mapdict = lambda f, d: dict([(k, f(v)) for k, v in d.items()])
 _mapdict_key = lambda f, d: dict([(f(k), v) for k, v in d.items()])
 _mapdict_kv = lambda f, d: dict([(k, f(k, v)) for k, v in d.items()])
 
 
+# Types which are json values as they are.
+_SCALAR_TYPES = six.integer_types + (float, bool)
+
+
 class TypeDescr(object):
     pass
 
@@ -55,13 +58,13 @@ class AsciiStringType(TypeDescr):
         # TODO: AsciiStringType data should probably be stored as
         # text_type in class data.  This isinstance() check exists
         # because OFPDescStats violates this.
-        if six.PY3 and isinstance(v, six.text_type):
+        if v is None or (six.PY3 and isinstance(v, six.text_type)):
             return v
         return six.text_type(v, 'ascii')
 
     @staticmethod
     def decode(v):
-        if six.PY3:
+        if v is None or six.PY3:
             return v
         return v.encode('ascii')
 
@@ -114,6 +117,11 @@ _types = {
 
 class StringifyMixin(object):
 
+    # Note: Sub classes can define __slots__ in order to reduce the memory
+    # footprint. The attributes defined by __slots__ are included in the
+    # str and json representations as well as the ordinary attributes.
+    __slots__ = ()
+
     _TYPE = {}
     """_TYPE class attribute is used to annotate types of attributes.
 
@@ -187,11 +195,7 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_type(cls, k):
-        if hasattr(cls, '_TYPE'):
-            for t, attrs in cls._TYPE.items():
-                if k in attrs:
-                    return _types[t]
-        return None
+        return _class_plan(cls).types.get(k, None)
 
     @classmethod
     def _get_encoder(cls, k, encode_string):
@@ -207,7 +211,9 @@ class StringifyMixin(object):
     @classmethod
     def _get_default_encoder(cls, encode_string):
         def _encode(v):
-            if isinstance(v, (bytes, six.text_type)):
+            if v is None or isinstance(v, _SCALAR_TYPES):
+                json_value = v
+            elif isinstance(v, (bytes, six.text_type)):
                 if isinstance(v, six.text_type):
                     v = v.encode('utf-8')
                 json_value = encode_string(v)
@@ -258,11 +264,16 @@ class StringifyMixin(object):
                        have explicit type annotations in _TYPE class attribute.
         =============  =====================================================
         """
+        plan = _class_plan(self.__class__)
+        if plan.custom_encode:
+            encode = lambda key, val: self._encode_value(key, val,
+                                                         encode_string)
+        else:
+            encode = plan.encoder(encode_string)
         dict_ = {}
-        encode = lambda key, val: self._encode_value(key, val, encode_string)
         for k, v in obj_attrs(self):
             dict_[k] = encode(k, v)
-        return {self.__class__.__name__: dict_}
+        return {plan.name: dict_}
 
     @classmethod
     def cls_from_jsondict_key(cls, k):
@@ -318,11 +329,7 @@ class StringifyMixin(object):
 
     @staticmethod
     def _restore_args(dict_):
-        def restore(k):
-            if k in _RESERVED_KEYWORD:
-                return k + '_'
-            return k
-        return _mapdict_key(restore, dict_)
+        return _mapdict_key(_restore_arg, dict_)
 
     @classmethod
     def from_jsondict(cls, dict_, decode_string=base64.b64decode,
@@ -348,9 +355,14 @@ class StringifyMixin(object):
         additional_args (Optional) Additional kwargs for constructor.
         =============== =====================================================
         """
-        decode = lambda k, x: cls._decode_value(k, x, decode_string,
-                                                **additional_args)
-        kwargs = cls._restore_args(_mapdict_kv(decode, dict_))
+        plan = _class_plan(cls)
+        if plan.custom_decode:
+            decode = lambda k, x: cls._decode_value(k, x, decode_string,
+                                                    **additional_args)
+        else:
+            decode = plan.decoder(decode_string)
+        kwargs = dict((_restore_arg(k), decode(k, v))
+                      for k, v in dict_.items())
         try:
             return cls(**dict(kwargs, **additional_args))
         except TypeError:
@@ -366,6 +378,138 @@ class StringifyMixin(object):
                                     registered_dict.values()])
 
 
+def _restore_arg(k):
+    if k in _RESERVED_KEYWORD:
+        return k + '_'
+    return k
+
+
+class _ClassPlan(object):
+    """
+    Per-class plan for the str and json representations.
+
+    A plan is compiled once for each class by _class_plan() and caches
+    the class-name key, the attribute names to be enumerated and the
+    encoder/decoder for each attribute so that to_jsondict() and
+    from_jsondict() do not need to look them up for every object.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.name = cls.__name__
+
+        slots = set()
+        for c in cls.__mro__:
+            names = c.__dict__.get('__slots__', ())
+            if isinstance(names, six.string_types):
+                names = (names,)
+            slots.update(k for k in names
+                         if k not in ('__dict__', '__weakref__'))
+        self.slots = frozenset(slots)
+        self.opt = frozenset(getattr(cls, '_opt_attributes', []))
+
+        # The first match wins as well as the former linear search.
+        self.types = {}
+        for t, attrs in getattr(cls, '_TYPE', {}).items():
+            for k in attrs:
+                self.types.setdefault(k, _types[t])
+
+        # Subclasses can override _encode_value() and _decode_value().
+        # In that case, those methods are called for each attribute.
+        self.custom_encode = False
+        self.custom_decode = False
+        if issubclass(cls, StringifyMixin):
+            self.custom_encode = (cls._encode_value.__func__ is not
+                                  StringifyMixin._encode_value.__func__)
+            self.custom_decode = (cls._decode_value.__func__ is not
+                                  StringifyMixin._decode_value.__func__)
+
+        # {tuple of instance attribute names: tuple of attribute names}
+        self._attrs = {}
+        # {encode_string: encoder}, {decode_string: decoder}
+        self._encoders = {}
+        self._decoders = {}
+
+    def _is_attr(self, k, base):
+        if k in self.opt:
+            return True
+        elif k.startswith('_') or k in base:
+            return False
+        # Note: The attributes defined by __slots__ are descriptors of
+        # the class, so they can not be distinguished from the class
+        # attributes by hasattr(cls, k).
+        return k in self.slots or not hasattr(self.cls, k)
+
+    def attrs(self, instance_attrs):
+        """
+        Returns the sorted names of the attributes to be enumerated for
+        an instance which has the given instance attributes.
+        """
+        names = self._attrs.get(instance_attrs, None)
+        if names is None:
+            # Note: _base_attributes of OpenFlow messages is set when
+            # the first instance is created, so that it is looked up here
+            # instead of compiling the plan.
+            base = getattr(self.cls, '_base_attributes', [])
+            names = self.slots.union(instance_attrs, self.opt)
+            names = tuple(sorted(k for k in names if self._is_attr(k, base)))
+            self._attrs[instance_attrs] = names
+        return names
+
+    def encoder(self, encode_string):
+        """
+        Returns the function which converts (attribute name, value)
+        into the json value.
+        """
+        encoder = self._encoders.get(encode_string, None)
+        if encoder is None:
+            default = self.cls._get_default_encoder(encode_string)
+            encoders = dict((k, t.encode) for k, t in self.types.items())
+
+            def encoder(k, v):
+                return encoders.get(k, default)(v)
+
+            _cache_coder(self._encoders, encode_string, encoder)
+        return encoder
+
+    def decoder(self, decode_string):
+        """
+        Returns the function which converts (attribute name, json value)
+        into the python value.
+        """
+        decoder = self._decoders.get(decode_string, None)
+        if decoder is None:
+            default = self.cls._get_default_decoder(decode_string)
+            decoders = dict((k, t.decode) for k, t in self.types.items())
+
+            def decoder(k, json_value):
+                return decoders.get(k, default)(json_value)
+
+            _cache_coder(self._decoders, decode_string, decoder)
+        return decoder
+
+
+def _cache_coder(cache, key, coder):
+    # Usually, only a few kinds of encode_string/decode_string are used,
+    # but clear the cache in case the functions are generated every time.
+    if len(cache) >= _MAX_CODERS:
+        cache.clear()
+    cache[key] = coder
+
+
+def _class_plan(cls):
+    try:
+        return _CLASS_PLANS[cls]
+    except KeyError:
+        plan = _ClassPlan(cls)
+        _CLASS_PLANS[cls] = plan
+        return plan
+
+
+_CLASS_PLANS = {}
+_MAX_CODERS = 8
+
+
 def obj_python_attrs(msg_):
     """iterate object attributes for stringify purposes
     """
@@ -376,18 +520,15 @@ def obj_python_attrs(msg_):
         for k in msg_._fields:
             yield(k, getattr(msg_, k))
         return
-    base = getattr(msg_, '_base_attributes', [])
-    opt = getattr(msg_, '_opt_attributes', [])
-    for k, v in inspect.getmembers(msg_):
-        if k in opt:
-            pass
-        elif k.startswith('_'):
-            continue
-        elif callable(v):
-            continue
-        elif k in base:
+    plan = _class_plan(msg_.__class__)
+    opt = plan.opt
+    for k in plan.attrs(tuple(getattr(msg_, '__dict__', ()))):
+        try:
+            v = getattr(msg_, k)
+        except AttributeError:
+            # unset slot or missing optional attribute
             continue
-        elif hasattr(msg_.__class__, k):
+        if k not in opt and callable(v):
             continue
         yield (k, v)
 
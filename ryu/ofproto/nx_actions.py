@@ -439,6 +439,7 @@ def generate(ofp_name, ofpp_name):
             'ascii': [
                 'dst',
                 'value',
+                'mask',
             ]
         }
 
@@ -465,7 +466,6 @@ def generate(ofp_name, ofpp_name):
                 value = self.value
             else:
                 value = (self.value, self.mask)
-                self._TYPE['ascii'].append('mask')
 
             n, value, mask = ofp.oxm_from_user(self.dst, value)
             len_ = ofp.oxm_serialize(n, value, mask, data, 0)
@@ -176,6 +176,7 @@ def ofp_instruction_from_jsondict(dp, jsonlist, encap=True):
 
 
 class StringifyMixin(stringify.StringifyMixin):
+    __slots__ = ()
     _class_prefixes = ["OFP", "ONF", "MT", "NX"]
 
     @classmethod
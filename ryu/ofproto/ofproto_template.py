@@ -0,0 +1,285 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pre-serialized OFPFlowMod templates.
+
+Applications frequently install many flow entries which differ only in
+a few fields (e.g., the destination address and the output port).
+Building an OFPFlowMod instance and serializing it for each entry is
+relatively expensive, so FlowModTemplate serializes a skeleton message
+once and then patches the variable fields into a copy of the skeleton
+buffer at the offsets found while parsing the skeleton.
+
+Example::
+
+    tmpl = FlowModTemplate(
+        datapath, ['ipv4_dst', 'output'],
+        priority=1,
+        match=parser.OFPMatch(eth_type=0x0800, ipv4_dst='0.0.0.0'),
+        instructions=[parser.OFPInstructionActions(
+            ofproto.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(0)])])
+
+    for ip, port in routes:
+        tmpl.send(datapath, ipv4_dst=ip, output=port)
+"""
+
+import binascii
+import re
+import socket
+import struct
+
+import six
+
+from ryu import utils
+from ryu.lib import addrconv
+from ryu.lib import type_desc
+from ryu.ofproto import ofproto_v1_2
+
+
+# Field names of OFP_FLOW_MOD_PACK_STR0 in the order of the pack string.
+# 'importance' is available only on OpenFlow 1.4 or later.
+_FLOW_MOD_FIELDS = ('cookie', 'cookie_mask', 'table_id', 'command',
+                    'idle_timeout', 'hard_timeout', 'priority', 'buffer_id',
+                    'out_port', 'out_group', 'flags', 'importance')
+
+# Prefix of the variable name which indicates the value of
+# OFPActionSetField. e.g.) 'set_eth_dst'
+SET_FIELD_PREFIX = 'set_'
+
+# Variable name which indicates the port number of OFPActionOutput.
+OUTPUT = 'output'
+
+_XID_PACK = struct.Struct('!I')
+_OXM_HEADER_SIZE = 4
+_ACTION_HEADER_PACK_STR = '!HH'
+_OUTPUT_PORT_OFFSET = 4
+_SET_FIELD_OXM_OFFSET = 4
+
+_INT_PACK_STR = {1: '!B', 2: '!H', 4: '!I', 8: '!Q'}
+
+
+def _int_encoder(size):
+    pack_str = _INT_PACK_STR.get(size, None)
+    if pack_str is None:
+        return type_desc.IntDescr(size).from_user
+    return struct.Struct(pack_str).pack
+
+
+def _ipv4_to_bin(text):
+    try:
+        return socket.inet_pton(socket.AF_INET, text)
+    except (socket.error, TypeError, ValueError):
+        return addrconv.ipv4.text_to_bin(text)
+
+
+def _ipv6_to_bin(text):
+    try:
+        return socket.inet_pton(socket.AF_INET6, text)
+    except (socket.error, TypeError, ValueError):
+        return addrconv.ipv6.text_to_bin(text)
+
+
+def _mac_to_bin(text):
+    try:
+        binary = binascii.unhexlify(text.replace(':', ''))
+    except (TypeError, ValueError, binascii.Error):
+        binary = None
+    if binary is None or len(binary) != 6:
+        return addrconv.mac.text_to_bin(text)
+    return binary
+
+
+def _value_encoder(t, size):
+    """
+    Returns the function to convert the user value into the binary
+    representation of the given type description.
+    """
+    if isinstance(t, type_desc.IntDescr):
+        return _int_encoder(size)
+    elif t is type_desc.IPv4Addr:
+        return _ipv4_to_bin
+    elif t is type_desc.IPv6Addr:
+        return _ipv6_to_bin
+    elif t is type_desc.MacAddr:
+        return _mac_to_bin
+
+    def _encode(value):
+        binary = t.from_user(value)
+        if isinstance(binary, tuple):
+            # The CIDR notation of IPv[46]Addr can not be applied
+            # to the fixed size slot.
+            binary = binary[0]
+        return binary
+    return _encode
+
+
+def _parse_flow_mod_header(ofproto):
+    """
+    Returns the dictionary of the fixed fields in OFPFlowMod header.
+    e.g.) {'priority': (offset, size, encoder), ...}
+    """
+    fields = {}
+    names = iter(_FLOW_MOD_FIELDS)
+    offset = ofproto.OFP_HEADER_SIZE
+    fmt = ofproto.OFP_FLOW_MOD_PACK_STR0.lstrip('!')
+    for count, code in re.findall(r'(\d*)([a-zA-Z])', fmt):
+        size = struct.calcsize('!' + count + code)
+        if code != 'x':
+            fields[next(names)] = (offset, size,
+                                   struct.Struct('!' + code).pack)
+        offset += size
+    return fields
+
+
+class FlowModTemplate(object):
+    """
+    Pre-serialized OFPFlowMod message whose some fields are variable.
+
+    ============ ==========================================================
+    Argument     Description
+    ============ ==========================================================
+    datapath     A ryu.controller.Datapath (or ProtocolDesc) instance used
+                 to build the skeleton message.
+    variables    List of the variable names. See the following table.
+    kwargs       Arguments for OFPFlowMod. 'match' and 'instructions' must
+                 contain the placeholder values for the variable fields.
+    ============ ==========================================================
+
+    The following variable names are available.
+
+    ================== ====================================================
+    Variable name      Description
+    ================== ====================================================
+    <OFPFlowMod field> Field of OFPFlowMod header. e.g.) 'priority',
+                       'idle_timeout', 'cookie'
+    <OXM field>        Value of the OXM field in the match.
+                       e.g.) 'ipv4_dst'. If the field is masked, only the
+                       value is replaced and the mask is kept.
+    'set_<OXM field>'  Value of the OFPActionSetField in the instructions.
+                       e.g.) 'set_eth_dst'
+    'output'           Port number of the first OFPActionOutput in the
+                       instructions.
+    ================== ====================================================
+
+    Only OpenFlow 1.2 or later is supported.
+    """
+
+    def __init__(self, datapath, variables, **kwargs):
+        super(FlowModTemplate, self).__init__()
+        self.ofproto = datapath.ofproto
+        if self.ofproto.OFP_VERSION < ofproto_v1_2.OFP_VERSION:
+            raise ValueError('FlowModTemplate requires OpenFlow 1.2 or later')
+
+        msg = datapath.ofproto_parser.OFPFlowMod(datapath=datapath, **kwargs)
+        msg.serialize()
+        self.version = self.ofproto.OFP_VERSION
+        self.variables = tuple(variables)
+        self._buf = six.binary_type(msg.buf)
+
+        available = self._find_fields()
+        self._fields = {}
+        for name in self.variables:
+            if name not in available:
+                raise ValueError('Variable field not found in template: %s'
+                                 % name)
+            self._fields[name] = available[name]
+
+    def _find_fields(self):
+        fields = _parse_flow_mod_header(self.ofproto)
+        ofproto = self.ofproto
+        buf = self._buf
+
+        # struct ofp_match
+        offset = ofproto.OFP_FLOW_MOD_SIZE - ofproto.OFP_MATCH_SIZE
+        (_, match_len) = struct.unpack_from('!HH', buf, offset)
+        fields.update(self._find_oxm_fields(
+            buf, offset + _OXM_HEADER_SIZE, offset + match_len))
+        offset += utils.round_up(match_len, 8)
+
+        # struct ofp_instruction
+        while offset < len(buf):
+            (type_, len_) = struct.unpack_from('!HH', buf, offset)
+            if type_ in (ofproto.OFPIT_APPLY_ACTIONS,
+                         ofproto.OFPIT_WRITE_ACTIONS):
+                self._find_action_fields(
+                    fields, buf,
+                    offset + ofproto.OFP_INSTRUCTION_ACTIONS_SIZE,
+                    offset + len_)
+            offset += len_
+
+        return fields
+
+    def _find_oxm_fields(self, buf, offset, end, prefix=''):
+        fields = {}
+        ofproto = self.ofproto
+        while offset < end:
+            (num, value, mask, field_len) = ofproto.oxm_parse(buf, offset)
+            name = ofproto.oxm_to_user_header(num)
+            value_len = len(value)
+            value_offset = offset + field_len - value_len
+            if mask is not None:
+                value_offset -= len(mask)
+            try:
+                t = ofproto._oxm_field_desc(num).type
+            except KeyError:
+                t = type_desc.IntDescr(value_len)
+            fields.setdefault(prefix + name,
+                              (value_offset, value_len,
+                               _value_encoder(t, value_len)))
+            offset += field_len
+        return fields
+
+    def _find_action_fields(self, fields, buf, offset, end):
+        ofproto = self.ofproto
+        while offset < end:
+            (type_, len_) = struct.unpack_from(
+                _ACTION_HEADER_PACK_STR, buf, offset)
+            if type_ == ofproto.OFPAT_OUTPUT:
+                fields.setdefault(OUTPUT, (offset + _OUTPUT_PORT_OFFSET, 4,
+                                           _int_encoder(4)))
+            elif type_ == ofproto.OFPAT_SET_FIELD:
+                oxm_offset = offset + _SET_FIELD_OXM_OFFSET
+                (_, _, _, field_len) = ofproto.oxm_parse(buf, oxm_offset)
+                for k, v in self._find_oxm_fields(
+                        buf, oxm_offset, oxm_offset + field_len,
+                        prefix=SET_FIELD_PREFIX).items():
+                    fields.setdefault(k, v)
+            offset += len_
+
+    def serialize(self, xid=0, **values):
+        """
+        Returns a bytearray of OFPFlowMod message which the given
+        variable values are patched into.
+        """
+        buf = bytearray(self._buf)
+        _XID_PACK.pack_into(buf, 4, xid)
+        fields = self._fields
+        for name, value in values.items():
+            try:
+                (offset, size, encode) = fields[name]
+            except KeyError:
+                raise ValueError('Unknown variable field: %s' % name)
+            buf[offset:offset + size] = encode(value)
+        return buf
+
+    def send(self, datapath, **values):
+        """
+        Patches the given variable values and sends the message to
+        the given datapath. Returns the result of Datapath.send().
+        """
+        assert datapath.ofproto.OFP_VERSION == self.version
+        datapath.xid = (datapath.xid + 1) & self.ofproto.MAX_XID
+        return datapath.send(self.serialize(xid=datapath.xid, **values))
@@ -837,6 +837,8 @@ class OFPMatch(StringifyMixin):
                 VLAN-tagged(vlan_id=5)   x
                 ====================== =====
     """
+    __slots__ = ('fields', 'type', 'length', '_fields2', '_serialized',
+                 '_old_wc', '_old_flow')
 
     def __init__(self, type_=None, length=None, _ordered_fields=None,
                  **kwargs):
@@ -846,8 +848,10 @@ class OFPMatch(StringifyMixin):
         define.
         """
         super(OFPMatch, self).__init__()
-        self._wc = FlowWildcards()
-        self._flow = Flow()
+        # FlowWildcards and Flow are used only by the old API
+        # (set_* methods), so they are instantiated on demand.
+        self._old_wc = None
+        self._old_flow = None
         self.fields = []
         self.type = ofproto.OFPMT_OXM
         self.length = length
@@ -1005,9 +1009,22 @@ class OFPMatch(StringifyMixin):
         """
         self.fields.append(OFPMatchField.make(header, value, mask))
 
+    @property
+    def _wc(self):
+        if self._old_wc is None:
+            self._old_wc = FlowWildcards()
+        return self._old_wc
+
+    @property
+    def _flow(self):
+        if self._old_flow is None:
+            self._old_flow = Flow()
+        return self._old_flow
+
     def _composed_with_old_api(self):
         return (self.fields and not self._fields2) or \
-            self._wc.__dict__ != FlowWildcards().__dict__
+            (self._old_wc is not None and
+             self._old_wc.__dict__ != FlowWildcards().__dict__)
 
     def serialize(self, buf, offset):
         """
@@ -2756,6 +2773,7 @@ class OFPFlowMod(MsgBase):
 
 
 class OFPInstruction(StringifyMixin):
+    __slots__ = ()
     _INSTRUCTION_TYPES = {}
 
     @staticmethod
@@ -2860,6 +2878,8 @@ class OFPInstructionActions(OFPInstruction):
 
     ``type`` attribute corresponds to ``type_`` parameter of __init__.
     """
+    __slots__ = ('type', 'actions', 'len')
+
     def __init__(self, type_, actions=None, len_=None):
         super(OFPInstructionActions, self).__init__()
         self.type = type_
@@ -2943,6 +2963,8 @@ class OFPInstructionMeter(OFPInstruction):
 
 
 class OFPActionHeader(StringifyMixin):
+    __slots__ = ('type', 'len')
+
     def __init__(self, type_, len_):
         self.type = type_
         self.len = len_
@@ -2953,6 +2975,7 @@ class OFPActionHeader(StringifyMixin):
 
 
 class OFPAction(OFPActionHeader):
+    __slots__ = ()
     _ACTION_TYPES = {}
 
     @staticmethod
@@ -2993,6 +3016,8 @@ class OFPActionOutput(OFPAction):
     max_len          Max length to send to controller
     ================ ======================================================
     """
+    __slots__ = ('port', 'max_len')
+
     def __init__(self, port, max_len=ofproto.OFPCML_MAX,
                  type_=None, len_=None):
         super(OFPActionOutput, self).__init__()
@@ -3976,6 +4001,11 @@ class OFPDescStatsReply(OFPMultipartReply):
 
 
 class OFPFlowStats(StringifyMixin):
+    __slots__ = ('table_id', 'duration_sec', 'duration_nsec', 'priority',
+                 'idle_timeout', 'hard_timeout', 'flags', 'cookie',
+                 'packet_count', 'byte_count', 'match', 'instructions',
+                 'length')
+
     def __init__(self, table_id=None, duration_sec=None, duration_nsec=None,
                  priority=None, idle_timeout=None, hard_timeout=None,
                  flags=None, cookie=None, packet_count=None,
@@ -79,6 +79,13 @@ class BgpWSJsonRpc(app_manager.RyuApp):
         show['params'] = ['rib', family]
         return call('operator.show', **show)
 
+    @rpc_public('show.rib.page')
+    def _show_rib_page(self, family='ipv4', cursor=None, limit=1000,
+                       prefix=None, community=None, as_path=None):
+        return call('operator.routes.page', source='rib', addr_family=family,
+                    cursor=cursor, limit=limit, prefix=prefix,
+                    community=community, as_path=as_path)
+
 
 class BgpWSJsonRpcController(ControllerBase):
     def __init__(self, req, link, data, **config):
@@ -74,3 +74,26 @@ def operator_set(**kwargs):
 @register(name="operator.clear")
 def operator_clear(**kwargs):
     return operator_run('clear', **kwargs)
+
+
+_ROUTES_PAGE = {
+    'rib': INTERNAL_API.get_rib_routes_page,
+    'vrf': INTERNAL_API.get_vrf_routes_page,
+    'neighbor': INTERNAL_API.get_neighbor_routes_page,
+}
+
+_ROUTES_ITER = {
+    'rib': INTERNAL_API.iter_rib_routes,
+    'vrf': INTERNAL_API.iter_vrf_routes,
+    'neighbor': INTERNAL_API.iter_neighbor_routes,
+}
+
+
+@register(name="operator.routes.page")
+def operator_routes_page(source, **kwargs):
+    return _ROUTES_PAGE[source](**kwargs)
+
+
+@register(name="operator.routes.iter")
+def operator_routes_iter(source, **kwargs):
+    return _ROUTES_ITER[source](**kwargs)
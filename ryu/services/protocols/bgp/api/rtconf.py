@@ -24,6 +24,7 @@ from ryu.services.protocols.bgp.api.base import FLOWSPEC_FAMILY
 from ryu.services.protocols.bgp.api.base import FLOWSPEC_RULES
 from ryu.services.protocols.bgp.api.base import FLOWSPEC_ACTIONS
 from ryu.services.protocols.bgp.core_manager import CORE_MANAGER
+from ryu.services.protocols.bgp.mrt import MrtReplayer
 from ryu.services.protocols.bgp.rtconf.base import ConfWithId
 from ryu.services.protocols.bgp.rtconf.base import RuntimeConfigError
 from ryu.services.protocols.bgp.rtconf import neighbors
@@ -291,9 +292,12 @@ def del_network(prefix):
 
 
 @register(name='bmp.start')
-def bmp_start(host, port):
+def bmp_start(host, port, **kwargs):
     core = CORE_MANAGER.get_core_service()
-    return core.start_bmp(host, port)
+    try:
+        return core.start_bmp(host, port, **kwargs)
+    except ValueError as e:
+        raise RuntimeConfigError(desc=str(e))
 
 
 @register(name='bmp.stop')
@@ -302,6 +306,39 @@ def bmp_stop(host, port):
     return core.stop_bmp(host, port)
 
 
+@register(name='bmp.stats')
+def bmp_stats(host, port):
+    core = CORE_MANAGER.get_core_service()
+    return core.get_bmp_stats(host, port)
+
+
+# =============================================================================
+# MRT dump related APIs
+# =============================================================================
+
+
+@register(name='mrt.start')
+def mrt_start(dump_dir, **kwargs):
+    core = CORE_MANAGER.get_core_service()
+    return core.start_mrt(dump_dir, **kwargs)
+
+
+@register(name='mrt.stop')
+def mrt_stop():
+    core = CORE_MANAGER.get_core_service()
+    return core.stop_mrt()
+
+
+@register(name='mrt.replay')
+def mrt_replay(records, **kwargs):
+    core = CORE_MANAGER.get_core_service()
+    try:
+        replayer = MrtReplayer(core, **kwargs)
+    except ValueError as e:
+        raise RuntimeConfigError(desc=str(e))
+    return replayer.replay(records)
+
+
 # =============================================================================
 # BGP Flow Specification Routes related APIs
 # =============================================================================
@@ -16,9 +16,13 @@
 
 """
 
+from collections import OrderedDict
+import logging
+
 import netaddr
 from ryu.lib import hub
 from ryu.lib import ip
+from ryu.lib.mrtbatch import BatchReader
 from ryu.lib.packet.bgp import (
     BGPFlowSpecTrafficActionCommunity,
     BGPFlowSpecVlanActionCommunity,
@@ -127,7 +131,14 @@ from ryu.services.protocols.bgp.rtconf.neighbors import CONNECT_MODE
 from ryu.services.protocols.bgp.rtconf.neighbors import LOCAL_ADDRESS
 from ryu.services.protocols.bgp.rtconf.neighbors import LOCAL_PORT
 from ryu.services.protocols.bgp.rtconf.vrfs import SUPPORTED_VRF_RF
+from ryu.services.protocols.bgp.operator.internal_api import \
+    DEFAULT_PAGE_SIZE
 from ryu.services.protocols.bgp.info_base.base import Filter
+from ryu.services.protocols.bgp.bmp import BMP_OVERFLOW_RECONNECT
+from ryu.services.protocols.bgp.bmp import DEFAULT_BMP_QUEUE_SIZE
+from ryu.services.protocols.bgp.mrt import DEFAULT_QUEUE_SIZE
+from ryu.services.protocols.bgp.mrt import DEFAULT_RIB_INTERVAL
+from ryu.services.protocols.bgp.mrt import DEFAULT_UPDATES_INTERVAL
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
 from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
@@ -135,6 +146,8 @@ from ryu.services.protocols.bgp.info_base.vpnv6 import Vpnv6Path
 from ryu.services.protocols.bgp.info_base.evpn import EvpnPath
 
 
+LOG = logging.getLogger('bgpspeaker.bgpspeaker')
+
 NEIGHBOR_CONF_MED = MULTI_EXIT_DISC  # for backward compatibility
 RF_VPN_V4 = vrfs.VRF_RF_IPV4
 RF_VPN_V6 = vrfs.VRF_RF_IPV6
@@ -158,6 +171,10 @@ FLOWSPEC_VLAN_RW_OUTER = BGPFlowSpecVlanActionCommunity.REWRITE_OUTER
 FLOWSPEC_TPID_TI = BGPFlowSpecTPIDActionCommunity.TI
 FLOWSPEC_TPID_TO = BGPFlowSpecTPIDActionCommunity.TO
 
+# Default maximum number of the prefix changes in a batch delivered to
+# the subscribers of the best path changes.
+DEFAULT_BEST_PATH_BATCH_SIZE = 1000
+
 
 class EventPrefix(object):
     """
@@ -219,6 +236,131 @@ class EventPrefix(object):
             return None
 
 
+class BestPathSubscription(object):
+    """
+    Queue of the best path changes delivered in batches.
+
+    Returned by ``BGPSpeaker.best_path_subscribe``. The changes are
+    coalesced per prefix until the subscriber takes them: only the latest
+    change of each prefix is delivered, and a prefix added and withdrawn
+    again before the subscriber takes it is not delivered at all. So the
+    queue never grows beyond the number of prefixes however slow the
+    subscriber is, and never blocks the BGP processing.
+
+    The subscriber takes the lists of ``EventPrefix`` instances by calling
+    ``get`` or by iterating this object in its own greenthread, from which
+    it may also pass them on to another process.
+
+    ================ ======================================================
+    Attribute        Description
+    ================ ======================================================
+    batch_size       The maximum number of the changes in a batch
+    interval         Seconds to wait for more changes to coalesce after
+                     the first change queued to the empty queue
+    closed           True if unsubscribed
+    ================ ======================================================
+    """
+
+    def __init__(self, batch_size=DEFAULT_BEST_PATH_BATCH_SIZE, interval=0):
+        if batch_size < 1:
+            raise ValueError('Invalid batch size: %s' % batch_size)
+        if interval < 0:
+            raise ValueError('Invalid interval: %s' % interval)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.closed = False
+
+        # Pending changes keyed by (route family, formatted NLRI) in the
+        # order of the first change of each prefix.
+        # Value: (True if the first change was a withdrawal, EventPrefix)
+        self._pending = OrderedDict()
+        # Prefixes delivered as added and not withdrawn yet.
+        self._announced = set()
+        self._waiter = hub.Event()
+
+        self._received = 0
+        self._coalesced = 0
+        self._delivered = 0
+
+    def put(self, ev):
+        """Queues the change `ev`, an instance of ``EventPrefix``."""
+        if self.closed:
+            return
+
+        self._received += 1
+        path = ev.path
+        key = (path.route_family, path.nlri.formatted_nlri_str)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = (ev.is_withdraw, ev)
+            self._waiter.set()
+            return
+
+        self._coalesced += 1
+        first_is_withdraw = pending[0]
+        if (ev.is_withdraw and not first_is_withdraw
+                and key not in self._announced):
+            # Cancels the addition the subscriber has never seen.
+            del self._pending[key]
+        else:
+            self._pending[key] = (first_is_withdraw, ev)
+
+    def get(self, timeout=None):
+        """Returns the list of the queued changes, at most ``batch_size``.
+
+        Waits for any change to be queued up to `timeout` seconds, or
+        forever if omitted. Returns an empty list on timeout or after
+        unsubscribed.
+        """
+        if not self._pending and not self.closed:
+            self._waiter.clear()
+            self._waiter.wait(timeout)
+            if self._pending and self.interval:
+                # Gives the following changes the time to be coalesced.
+                hub.sleep(self.interval)
+
+        evs = []
+        while self._pending and len(evs) < self.batch_size:
+            key, (_, ev) = self._pending.popitem(last=False)
+            if ev.is_withdraw:
+                self._announced.discard(key)
+            else:
+                self._announced.add(key)
+            evs.append(ev)
+        self._delivered += len(evs)
+
+        return evs
+
+    def __iter__(self):
+        """Yields the lists of the changes until unsubscribed."""
+        while not self.closed:
+            evs = self.get()
+            if evs:
+                yield evs
+
+    def close(self):
+        """Discards the queued changes and stops the delivery."""
+        self.closed = True
+        self._pending.clear()
+        self._announced.clear()
+        self._waiter.set()
+
+    def get_stats(self):
+        """Returns the counters of the changes as a dictionary.
+
+        ``received`` and ``delivered`` are the numbers of the changes
+        queued and taken by the subscriber, ``coalesced`` is the number of
+        the changes merged into the earlier ones of the same prefix and
+        ``queued`` is the number of the changes waiting.
+        """
+        return {
+            'received': self._received,
+            'coalesced': self._coalesced,
+            'delivered': self._delivered,
+            'queued': len(self._pending),
+        }
+
+
 class BGPSpeaker(object):
     def __init__(self, as_number, router_id,
                  bgp_server_hosts=DEFAULT_BGP_SERVER_HOSTS,
@@ -261,7 +403,9 @@ class BGPSpeaker(object):
         ``best_path_change_handler``, if specified, is called when any
         best remote path is changed due to an update message or remote
         peer down. The handler is supposed to take one argument, the
-        instance of an EventPrefix class instance.
+        instance of an EventPrefix class instance. The handler is called
+        in the BGP processing, see ``best_path_subscribe`` to receive the
+        changes in batches apart from it.
 
         ``peer_down_handler``, if specified, is called when BGP peering
         session goes down.
@@ -300,6 +444,7 @@ class BGPSpeaker(object):
 
         super(BGPSpeaker, self).__init__()
 
+        self._best_path_subscriptions = []
         settings = {
             LOCAL_AS: as_number,
             ROUTER_ID: router_id,
@@ -348,9 +493,19 @@ class BGPSpeaker(object):
 
         ev = EventPrefix(path, is_withdraw)
 
+        for subscription in self._best_path_subscriptions:
+            subscription.put(ev)
+
         if self._best_path_change_handler:
             self._best_path_change_handler(ev)
 
+    def _deliver_best_path_changes(self, subscription, handler):
+        for evs in subscription:
+            try:
+                handler(evs)
+            except Exception as e:
+                LOG.exception('Best path change handler failed: %s', e)
+
     def _init_signal_listeners(self):
         CORE_MANAGER.get_core_service()._signal_bus.register_listener(
             BgpSignalBus.BGP_BEST_PATH_CHANGED,
@@ -380,8 +535,46 @@ class BGPSpeaker(object):
     def shutdown(self):
         """ Shutdown BGP speaker
         """
+        for subscription in self._best_path_subscriptions:
+            subscription.close()
+        del self._best_path_subscriptions[:]
         call('core.stop')
 
+    def best_path_subscribe(self, handler=None,
+                            batch_size=DEFAULT_BEST_PATH_BATCH_SIZE,
+                            interval=0):
+        """ This method subscribes to the best path changes in batches.
+
+        Returns an instance of ``BestPathSubscription`` which queues the
+        changes coalesced per prefix, so that the subscriber never stalls
+        the BGP processing even if it is slow.
+
+        ``handler``, if specified, is called with a list of EventPrefix
+        instances in a greenthread spawned for this subscription.
+        Otherwise, the caller takes the lists from the returned object.
+
+        ``batch_size`` specifies the maximum number of the changes in a
+        list.
+
+        ``interval`` specifies the seconds to wait for more changes to
+        coalesce before delivering the first change. The default is 0.
+        """
+        subscription = BestPathSubscription(batch_size, interval)
+        self._best_path_subscriptions.append(subscription)
+        if handler:
+            hub.spawn(self._deliver_best_path_changes, subscription, handler)
+
+        return subscription
+
+    def best_path_unsubscribe(self, subscription):
+        """ This method stops the subscription returned by
+        ``best_path_subscribe``.
+
+        ``subscription`` specifies the subscription to stop.
+        """
+        self._best_path_subscriptions.remove(subscription)
+        subscription.close()
+
     def neighbor_add(self, address, remote_as,
                      enable_ipv4=DEFAULT_CAP_MBGP_IPV4,
                      enable_ipv6=DEFAULT_CAP_MBGP_IPV6,
@@ -1082,6 +1275,37 @@ class BGPSpeaker(object):
 
         return call('operator.show', **show)
 
+    def vrfs_get_page(self, route_dist, route_family, cursor=None,
+                      limit=DEFAULT_PAGE_SIZE, prefix=None,
+                      community=None, as_path=None):
+        """ This method returns a page of the routes present for the vrf
+        in the same format as vrfs_get() with 'json' format.
+
+        ``route_dist`` specifies a route distinguisher value.
+
+        ``route_family`` specifies route family of the VRF
+        ('ipv4', 'ipv6' or 'evpn').
+
+        See rib_get_page() for the other parameters and the result.
+        """
+        return call('operator.routes.page', source='vrf',
+                    vrf_id=route_dist, vrf_rf=route_family, cursor=cursor,
+                    limit=limit, prefix=prefix, community=community,
+                    as_path=as_path)
+
+    def vrfs_iter(self, route_dist, route_family,
+                  page_size=DEFAULT_PAGE_SIZE,
+                  prefix=None, community=None, as_path=None):
+        """ This method returns an iterator of the routes present for the
+        vrf in the same format as vrfs_get() with 'json' format.
+
+        See vrfs_get_page() and rib_iter() for the parameters.
+        """
+        return call('operator.routes.iter', source='vrf',
+                    vrf_id=route_dist, vrf_rf=route_family,
+                    page_size=page_size, prefix=prefix,
+                    community=community, as_path=as_path)
+
     def rib_get(self, family='all', format='json'):
         """ This method returns the BGP routing information in a json
         format. This will be improved soon.
@@ -1101,6 +1325,47 @@ class BGPSpeaker(object):
 
         return call('operator.show', **show)
 
+    def rib_get_page(self, family, cursor=None, limit=DEFAULT_PAGE_SIZE,
+                     prefix=None, community=None, as_path=None):
+        """ This method returns a page of the BGP routing information
+        in the same format as rib_get() with 'json' format.
+
+        ``family`` specifies the address family of the RIB (e.g. 'ipv4').
+
+        ``prefix``, ``community`` and ``as_path`` filter the routes
+        during the walk. ``prefix`` selects the routes of the prefixes
+        covered by it (e.g., '10.0.0.0/8'), ``community`` selects the
+        routes with the given community (e.g., '65000:100'), and
+        ``as_path`` is a regular expression searched in the AS path
+        joined by spaces (e.g., '^65001 ').
+
+        Returns a dict of 'routes', the list of up to ``limit`` routes,
+        and 'next', the cursor to pass as ``cursor`` to get the next page,
+        which is None when all the routes have been returned. A page may
+        have less than ``limit`` routes before the end when the filters
+        select few routes. The routes are returned in the order of the
+        prefixes, so that the pages are consistent while the routes are
+        added or removed during the walk.
+        """
+        return call('operator.routes.page', source='rib',
+                    addr_family=family, cursor=cursor, limit=limit,
+                    prefix=prefix, community=community, as_path=as_path)
+
+    def rib_iter(self, family, page_size=DEFAULT_PAGE_SIZE,
+                 prefix=None, community=None, as_path=None):
+        """ This method returns an iterator of the BGP routing
+        information in the same format as rib_get() with 'json' format.
+
+        The routes are collected in pages of ``page_size`` routes, and
+        the other threads, e.g., the route processing, run between the
+        pages, so that large tables are dumped without blocking BGP.
+
+        See rib_get_page() for the other parameters.
+        """
+        return call('operator.routes.iter', source='rib',
+                    addr_family=family, page_size=page_size,
+                    prefix=prefix, community=community, as_path=as_path)
+
     def neighbor_get(self, route_type, address, format='json'):
         """ This method returns the BGP adj-RIB-in/adj-RIB-out information
         in a json format.
@@ -1130,6 +1395,41 @@ class BGPSpeaker(object):
 
         return call('operator.show', **show)
 
+    def neighbor_get_page(self, route_type, address, family='all',
+                          cursor=None, limit=DEFAULT_PAGE_SIZE,
+                          prefix=None, community=None, as_path=None):
+        """ This method returns a page of the BGP adj-RIB-in/adj-RIB-out
+        information in the same format as neighbor_get() with 'json'
+        format.
+
+        ``route_type`` specifies 'received-routes' or 'sent-routes'.
+
+        ``address`` specifies the IP address of the peer.
+
+        ``family`` specifies the address family of the routes
+        (e.g. 'ipv4'), or 'all' (default).
+
+        See rib_get_page() for the other parameters and the result.
+        """
+        return call('operator.routes.page', source='neighbor',
+                    route_type=route_type, address=address,
+                    addr_family=family, cursor=cursor, limit=limit,
+                    prefix=prefix, community=community, as_path=as_path)
+
+    def neighbor_iter(self, route_type, address, family='all',
+                      page_size=DEFAULT_PAGE_SIZE,
+                      prefix=None, community=None, as_path=None):
+        """ This method returns an iterator of the BGP adj-RIB-in/
+        adj-RIB-out information in the same format as neighbor_get()
+        with 'json' format.
+
+        See neighbor_get_page() and rib_iter() for the parameters.
+        """
+        return call('operator.routes.iter', source='neighbor',
+                    route_type=route_type, address=address,
+                    addr_family=family, page_size=page_size,
+                    prefix=prefix, community=community, as_path=as_path)
+
     def neighbors_get(self, format='json'):
         """ This method returns a list of the BGP neighbors.
 
@@ -1237,7 +1537,9 @@ class BGPSpeaker(object):
 
         return call(func_name, **param)
 
-    def bmp_server_add(self, address, port):
+    def bmp_server_add(self, address, port,
+                       queue_size=DEFAULT_BMP_QUEUE_SIZE,
+                       overflow=BMP_OVERFLOW_RECONNECT):
         """This method registers a new BMP (BGP monitoring Protocol)
         server. The BGP speaker starts to send BMP messages to the
         server. Currently, only one BMP server can be registered.
@@ -1245,12 +1547,26 @@ class BGPSpeaker(object):
         ``address`` specifies the IP address of a BMP server.
 
         ``port`` specifies the listen port number of a BMP server.
+
+        ``queue_size`` specifies the max number of the BMP messages
+        waiting to be sent to the server. The default is 10000.
+
+        ``overflow`` specifies what to do when the queue is full, e.g., on
+        a slow server. The following values are available.
+
+        - BMP_OVERFLOW_RECONNECT = 'reconnect'
+          Resets the session and sends the current routes again on the
+          new session. This is the default.
+        - BMP_OVERFLOW_DROP = 'drop'
+          Drops the new messages.
         """
 
         func_name = 'bmp.start'
         param = {
             'host': address,
             'port': port,
+            'queue_size': queue_size,
+            'overflow': overflow,
         }
 
         call(func_name, **param)
@@ -1271,6 +1587,134 @@ class BGPSpeaker(object):
 
         call(func_name, **param)
 
+    def bmp_server_stats(self, address, port):
+        """ This method returns the statistics of the BMP messages sent to
+        the registered BMP server as a dict, or None if not registered.
+
+        ``address`` specifies the IP address of a BMP server.
+
+        ``port`` specifies the listen port number of a BMP server.
+
+        The dict has the following keys.
+
+        - connected: Whether the session is established
+        - queued: Number of the messages waiting to be sent
+        - max_queued: Max number of the messages waited at once
+        - sent: Number of the messages sent
+        - dropped: Number of the messages dropped on the queue overflow
+        - resets: Number of the sessions reset on the queue overflow
+        - lag: Seconds the oldest message in the queue has waited
+        - max_lag: Max seconds the sent messages waited
+        """
+
+        func_name = 'bmp.stats'
+        param = {
+            'host': address,
+            'port': port,
+        }
+
+        return call(func_name, **param)
+
+    def mrt_dump_start(self, dump_dir,
+                       rib_interval=DEFAULT_RIB_INTERVAL,
+                       updates_interval=DEFAULT_UPDATES_INTERVAL,
+                       compress=False, queue_size=DEFAULT_QUEUE_SIZE):
+        """This method starts to dump the routing information in MRT
+        format (RFC6396) into files. Currently, only one dump directory
+        can be registered.
+
+        ``dump_dir`` specifies the directory to write the files into.
+
+        ``rib_interval`` specifies the interval in seconds to write the
+        snapshots of the global and VRF tables into 'rib.YYYYMMDD.hhmm'
+        files as TABLE_DUMP_V2 records. Each VRF table is written as a
+        view named 'RD:family'. 0 disables the snapshots.
+        The default is 7200 seconds.
+
+        ``updates_interval`` specifies the interval in seconds to rotate
+        'updates.YYYYMMDD.hhmm' files, into which the UPDATE messages
+        received from and sent to the neighbors are written as BGP4MP
+        records. The default is 900 seconds.
+
+        ``compress`` specifies whether to compress the files with gzip.
+
+        ``queue_size`` specifies the max number of the UPDATE messages
+        waiting to be written. The messages exceeding it are dropped
+        instead of delaying the route processing.
+        The default is 10000.
+
+        The snapshots can be read with
+        ``ryu.services.protocols.bgp.mrt.read_rib``, e.g., to restore the
+        routes on restart.
+        """
+
+        func_name = 'mrt.start'
+        param = {
+            'dump_dir': dump_dir,
+            'rib_interval': rib_interval,
+            'updates_interval': updates_interval,
+            'compress': compress,
+            'queue_size': queue_size,
+        }
+
+        call(func_name, **param)
+
+    def mrt_dump_stop(self):
+        """ This method stops to dump the routing information in MRT
+        format.
+        """
+
+        func_name = 'mrt.stop'
+
+        call(func_name)
+
+    def mrt_replay(self, file_name, neighbor=None, rate=None,
+                   peer_index=None, processes=None):
+        """This method replays the routes in a MRT format file, e.g., of
+        the RouteViews or RIPE RIS archives, and returns the number of
+        the replayed routes. The routes are taken from TABLE_DUMP_V2 RIB
+        records and from the UPDATE messages in BGP4MP records.
+
+        ``file_name`` specifies the path to the MRT format file. The
+        files whose name ends with '.gz' or '.bz2' are decompressed.
+
+        ``neighbor`` specifies the IP address of an established neighbor.
+        If specified, the routes are handled as received from the
+        neighbor. Otherwise, IPv4 and IPv6 unicast routes are added as
+        the local routes with their path attributes, in the same way as
+        prefix_add().
+
+        ``rate`` specifies the max number of the routes replayed per
+        second. The default is not limited.
+
+        ``peer_index`` specifies the index of the peer in PEER_INDEX_TABLE
+        whose RIB entries are replayed. The default is the first entry
+        of each prefix.
+
+        ``processes`` specifies the number of the worker processes to
+        decode the records in parallel. The default is to decode them in
+        this process, which is recommended unless running as a
+        standalone script.
+        """
+        reader = BatchReader(file_name)
+        try:
+            if processes:
+                records = reader.parse(processes=processes)
+            else:
+                records = reader.records()
+
+            func_name = 'mrt.replay'
+            param = {
+                'records': records,
+                'neighbor': neighbor,
+                'rate': rate,
+                'peer_index': peer_index,
+            }
+
+            return call(func_name, **param)
+        finally:
+            reader.close()
+
     def attribute_map_set(self, address, attribute_maps,
                           route_dist=None, route_family=RF_VPN_V4):
         """This method sets attribute mapping to a neighbor.
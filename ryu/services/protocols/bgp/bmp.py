@@ -17,8 +17,10 @@ from ryu.services.protocols.bgp.base import Activity
 from ryu.lib import hub
 from ryu.lib.packet import bmp
 from ryu.lib.packet import bgp
+import collections
 import socket
 import logging
+import time
 from calendar import timegm
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
@@ -27,6 +29,19 @@ from ryu.lib.packet.bgp import BGPPathAttributeMpUnreachNLRI
 
 LOG = logging.getLogger('bgpspeaker.bmp')
 
+# Default max number of the BMP messages queued to be sent
+DEFAULT_BMP_QUEUE_SIZE = 10000
+
+# Policies when the queue is full
+# Drops the new messages.
+BMP_OVERFLOW_DROP = 'drop'
+# Resets the BMP session, then the station discards the information
+# received and the client sends the current adj-RIB-in again.
+BMP_OVERFLOW_RECONNECT = 'reconnect'
+
+# Max number of the BMP messages sent at once
+BMP_SEND_BATCH_SIZE = 100
+
 
 class BMPClient(Activity):
     """A BMP client.
@@ -35,9 +50,19 @@ class BMPClient(Activity):
     If BMP session is established, transfer information about peers
     (e.g. received and sent open msgs, contents of adj-rib-in, other stats)
 
+    The messages are queued and sent in batches on the background thread
+    without blocking the route processing. If the queue has *queue_size*
+    messages, e.g., on a slow BMP station, *overflow* policy is applied,
+    BMP_OVERFLOW_RECONNECT or BMP_OVERFLOW_DROP.
+    On each session, the contents of adj-rib-in of the established peers
+    are sent from their snapshots.
     """
 
-    def __init__(self, core_service, host, port):
+    def __init__(self, core_service, host, port,
+                 queue_size=DEFAULT_BMP_QUEUE_SIZE,
+                 overflow=BMP_OVERFLOW_RECONNECT):
+        if overflow not in (BMP_OVERFLOW_DROP, BMP_OVERFLOW_RECONNECT):
+            raise ValueError('Invalid overflow policy: %s' % overflow)
         super(BMPClient, self).__init__(name='BMPClient(%s:%s)' % (host, port))
         self._core_service = core_service
         self._core_service.signal_bus.register_listener(
@@ -56,6 +81,16 @@ class BMPClient(Activity):
         self.server_address = (host, port)
         self._connect_retry_event = hub.Event()
         self._connect_retry_time = 5
+        self.queue_size = queue_size
+        self.overflow = overflow
+        # (time enqueued, BMP message) to be sent
+        self._queue = collections.deque()
+        self._queue_event = hub.Event()
+        self.max_queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.resets = 0
+        self.max_lag = 0
 
     def _run(self):
         self._connect_retry_event.set()
@@ -79,20 +114,71 @@ class BMPClient(Activity):
         if not self._socket:
             return
         assert isinstance(msg, bmp.BMPMessage)
-        self._socket.send(msg.serialize())
+        if len(self._queue) >= self.queue_size:
+            self._on_overflow()
+            return
+        self._queue.append((time.time(), msg))
+        self.max_queued = max(self.max_queued, len(self._queue))
+        self._queue_event.set()
+
+    def _on_overflow(self):
+        if self.overflow == BMP_OVERFLOW_DROP:
+            self.dropped += 1
+            return
+
+        LOG.warning('%s: Resetting BMP session with %d messages queued',
+                    self.name, len(self._queue))
+        self.resets += 1
+        self._reset_session(self._socket)
+
+    def _reset_session(self, sock):
+        # Makes recv() in _handle_bmp_session() return to reconnect.
+        self._queue.clear()
+        self._queue_event.set()
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+
+    def get_stats(self):
+        """Returns the statistics of the messages sent to the station.
+
+        *lag* is the seconds for which the oldest message in the queue
+        has been waiting, and *max_lag* is the max of the seconds for which
+        the sent messages waited.
+        """
+        lag = 0
+        if self._queue:
+            lag = time.time() - self._queue[0][0]
+        return {
+            'connected': self._socket is not None,
+            'queued': len(self._queue),
+            'max_queued': self.max_queued,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'resets': self.resets,
+            'lag': lag,
+            'max_lag': self.max_lag,
+        }
 
     def on_adj_rib_in_changed(self, data):
+        if not self._socket:
+            return
         peer = data['peer']
         path = data['received_route']
         msg = self._construct_route_monitoring(peer, path)
         self._send(msg)
 
     def on_adj_up(self, data):
+        if not self._socket:
+            return
         peer = data['peer']
         msg = self._construct_peer_up_notification(peer)
         self._send(msg)
 
     def on_adj_down(self, data):
+        if not self._socket:
+            return
         peer = data['peer']
         msg = self._construct_peer_down_notification(peer)
         self._send(msg)
@@ -199,35 +285,90 @@ class BMPClient(Activity):
 
         return msg
 
-    def _handle_bmp_session(self, socket):
-
-        self._socket = socket
-        # send init message
+    def _iter_initial_messages(self):
+        # Yields the messages sent first on a session, i.e., initiation
+        # message and peer-up message and the contents of adj-rib-in of
+        # each peer taken when it is reached.
         init_info = {'type': bmp.BMP_INIT_TYPE_STRING,
                      'value': u'This is Ryu BGP BMP message'}
-        init_msg = bmp.BMPInitiation([init_info])
-        self._send(init_msg)
+        yield bmp.BMPInitiation([init_info])
 
         # send peer-up message for each peers
         peer_manager = self._core_service.peer_manager
+        peers = [p for p in peer_manager.iterpeers if p.in_established()]
+        for peer in peers:
+            if not peer.in_established():
+                continue
+            yield self._construct_peer_up_notification(peer)
+
+            for path in list(peer._adj_rib_in.values()):
+                yield self._construct_route_monitoring(peer, path)
+
+    def _iter_queued_messages(self, sock):
+        while self._socket is sock:
+            if not self._queue:
+                # Sends the messages so far before waiting for more.
+                yield None
+                self._queue_event.clear()
+                if not self._queue and self._socket is sock:
+                    self._queue_event.wait()
+                continue
+            enqueued, msg = self._queue.popleft()
+            self.max_lag = max(self.max_lag, time.time() - enqueued)
+            yield msg
+
+    def _write(self, sock, msgs):
+        # Sends the messages in batches of BMP_SEND_BATCH_SIZE messages,
+        # or the messages so far if None is given.
+        bufs = []
+        for msg in msgs:
+            if msg is not None:
+                try:
+                    bufs.append(msg.serialize())
+                except Exception as e:
+                    LOG.error('%s: Failed to encode %s: %s',
+                              self.name, msg, e)
+                    continue
+                if len(bufs) < BMP_SEND_BATCH_SIZE:
+                    continue
+            if bufs:
+                sock.sendall(b''.join(bufs))
+                self.sent += len(bufs)
+                bufs = []
+            # Yields to the other threads, e.g., while sending adj-rib-in.
+            self.pause(0)
+        if bufs:
+            sock.sendall(b''.join(bufs))
+            self.sent += len(bufs)
+
+    def _write_loop(self, sock):
+        try:
+            self._write(sock, self._iter_initial_messages())
+            self._write(sock, self._iter_queued_messages(sock))
+        except socket.error as e:
+            LOG.debug('%s: Failed to send BMP messages: %s', self.name, e)
+            self._reset_session(sock)
 
-        for peer in (p for p in peer_manager.iterpeers if p.in_established()):
-            msg = self._construct_peer_up_notification(peer)
-            self._send(msg)
+    def _handle_bmp_session(self, socket):
 
-            for path in peer._adj_rib_in.values():
-                msg = self._construct_route_monitoring(peer, path)
-                self._send(msg)
+        self._socket = socket
+        self._queue.clear()
+        self._spawn('BMPClient writer', self._write_loop, socket)
 
         # TODO periodically send stats to bmpstation
 
         while True:
             # bmpstation shouldn't send any packet to bmpclient.
             # this recv() is only meant to detect socket closed
-            ret = self._socket.recv(1)
+            try:
+                ret = self._socket.recv(1)
+            except IOError:
+                ret = b''
             if len(ret) == 0:
                 LOG.debug('BMP socket is closed. retry connecting..')
                 self._socket = None
+                self._queue.clear()
+                self._queue_event.set()
                 self._connect_retry_event.set()
                 break
 
@@ -43,6 +43,7 @@ from ryu.services.protocols.bgp.utils.rtfilter import RouteTargetManager
 from ryu.services.protocols.bgp.rtconf.neighbors import CONNECT_MODE_ACTIVE
 from ryu.services.protocols.bgp.utils import stats
 from ryu.services.protocols.bgp.bmp import BMPClient
+from ryu.services.protocols.bgp.mrt import MrtDumper
 from ryu.lib import sockopt
 from ryu.lib import ip
 
@@ -131,6 +132,9 @@ class CoreService(Factory, Activity):
         # BMP clients key: (host, port) value: BMPClient instance
         self.bmpclients = {}
 
+        # MrtDumper instance (initialized by start_mrt)
+        self.mrt_dumper = None
+
     def _init_signal_listeners(self):
         self._signal_bus.register_listener(
             BgpSignalBus.BGP_DEST_CHANGED,
@@ -469,14 +473,14 @@ class CoreService(Factory, Activity):
             peer._host_bind_port = bind_port
             self._spawn_activity(bgp_proto, peer)
 
-    def start_bmp(self, host, port):
+    def start_bmp(self, host, port, **kwargs):
         if (host, port) in self.bmpclients:
             bmpclient = self.bmpclients[(host, port)]
             if bmpclient.started:
                 LOG.warning("bmpclient is already running for %s:%s",
                             host, port)
                 return False
-        bmpclient = BMPClient(self, host, port)
+        bmpclient = BMPClient(self, host, port, **kwargs)
         self.bmpclients[(host, port)] = bmpclient
         self._spawn_activity(bmpclient)
         return True
@@ -488,3 +492,27 @@ class CoreService(Factory, Activity):
 
         bmpclient = self.bmpclients[(host, port)]
         bmpclient.stop()
+
+    def get_bmp_stats(self, host, port):
+        if (host, port) not in self.bmpclients:
+            LOG.warning("no bmpclient is running for %s:%s", host, port)
+            return None
+
+        return self.bmpclients[(host, port)].get_stats()
+
+    def start_mrt(self, dump_dir, **kwargs):
+        if self.mrt_dumper is not None and self.mrt_dumper.started:
+            LOG.warning("MRT dumper is already running for %s",
+                        self.mrt_dumper.dump_dir)
+            return False
+        self.mrt_dumper = MrtDumper(self, dump_dir, **kwargs)
+        self._spawn_activity(self.mrt_dumper)
+        return True
+
+    def stop_mrt(self):
+        if self.mrt_dumper is None or not self.mrt_dumper.started:
+            LOG.warning("no MRT dumper is running")
+            return False
+        self.mrt_dumper.stop()
+        self.mrt_dumper = None
+        return True
@@ -1,6 +1,7 @@
 import logging
 import netaddr
 
+from ryu.services.protocols.bgp.base import OrderedDict
 from ryu.services.protocols.bgp.base import SUPPORTED_GLOBAL_RF
 from ryu.services.protocols.bgp.model import OutgoingRoute
 from ryu.services.protocols.bgp.peer import Peer
@@ -11,9 +12,121 @@ from ryu.lib.packet.bgp import RF_RTC_UC
 from ryu.lib.packet.bgp import RouteTargetMembershipNLRI
 from ryu.services.protocols.bgp.utils.bgp \
     import clone_path_and_update_med_for_target_neighbor
+from ryu.services.protocols.bgp.utils.bgp import get_update_pack_key
 LOG = logging.getLogger('bgpspeaker.core_managers.peer_manager')
 
 
+class _GroupRoute(object):
+    """The route computed for the members of an update group."""
+    __slots__ = ('path', 'block', 'update', 'pack_key', 'pending')
+
+    def __init__(self, path, block, update, pack_key, pending=None):
+        self.path = path
+        self.block = block
+        self.update = update
+        self.pack_key = pack_key
+        # Members which may still take this withdrawal, or None if this
+        # route is not a withdrawal.
+        self.pending = pending
+
+    def is_for(self, path):
+        # The withdrawals of a prefix are the same regardless of the
+        # withdrawn paths, which are cloned for each peer.
+        return (self.path is path or
+                (path.is_withdraw and self.path.is_withdraw))
+
+
+class UpdateGroup(object):
+    """Peers which share the same outbound policy and capabilities.
+
+    The out filters, the attribute maps and the construction of UPDATE
+    messages give the same result for all members of a group, so a route
+    is evaluated and encoded once for the group and the result is shared
+    by the members. The group Adj-RIB-out holds the latest route of each
+    prefix, which also serves the initial updates to a new member. A
+    withdrawal is dropped once taken by all the members of the group at
+    the time, except the source of the path, or once they leave. As some
+    members may never take it, e.g., due to the member specific
+    conditions below, at most MAX_WITHDRAWALS of them are kept and the
+    oldest one is dropped beyond it, to be computed again if needed.
+    *progress* counts the routes each member has taken from the group.
+
+    The member specific conditions, e.g., not to send the path back to
+    its source, are still checked for each peer by
+    Peer.communicate_path before the routes are queued.
+    """
+
+    # Max. number of the withdrawals kept for the members
+    MAX_WITHDRAWALS = 10000
+
+    def __init__(self, key):
+        self.key = key
+        self.members = set()
+        self.progress = {}
+        self._adj_rib_out = {}
+        # Withdrawals in the group Adj-RIB-out in the order of computation
+        self._withdrawals = OrderedDict()
+        # Number of the routes computed for the group
+        self.computed = 0
+
+    def __len__(self):
+        return len(self._adj_rib_out)
+
+    def add_member(self, peer):
+        self.members.add(peer)
+        self.progress[peer] = 0
+
+    def remove_member(self, peer):
+        self.members.discard(peer)
+        self.progress.pop(peer, None)
+        for nlri_str, route in list(self._withdrawals.items()):
+            route.pending.discard(peer)
+            if not route.pending:
+                self._drop_withdrawal(nlri_str)
+
+    def _drop_withdrawal(self, nlri_str):
+        route = self._withdrawals.pop(nlri_str)
+        if self._adj_rib_out.get(nlri_str) is route:
+            del self._adj_rib_out[nlri_str]
+
+    def get_update(self, peer, outgoing_route):
+        """Returns the result of the out filter, the UPDATE message and
+        its key for pack_updates of *outgoing_route* to be sent to
+        *peer*, which is computed only by the first member.
+        """
+        path = outgoing_route.path
+        nlri_str = path.nlri.formatted_nlri_str
+        route = self._adj_rib_out.get(nlri_str)
+        if route is None or not route.is_for(path):
+            block, blocked_cause = peer._apply_out_filter(path)
+            if block:
+                LOG.debug('prefix : %s is not sent by filter : %s',
+                          path.nlri, blocked_cause)
+                update = pack_key = None
+            else:
+                update = peer._construct_update(outgoing_route)
+                pack_key = get_update_pack_key(update)
+            pending = None
+            if path.is_withdraw:
+                # The path is never sent back to its source.
+                pending = set(self.members)
+                pending.discard(path.source)
+            route = _GroupRoute(path, block, update, pack_key, pending)
+            self._withdrawals.pop(nlri_str, None)
+            self._adj_rib_out[nlri_str] = route
+            if path.is_withdraw:
+                self._withdrawals[nlri_str] = route
+                if len(self._withdrawals) > self.MAX_WITHDRAWALS:
+                    self._drop_withdrawal(next(iter(self._withdrawals)))
+            self.computed += 1
+        self.progress[peer] = self.progress.get(peer, 0) + 1
+        if route.pending is not None:
+            route.pending.discard(peer)
+            if not route.pending and nlri_str in self._withdrawals:
+                self._drop_withdrawal(nlri_str)
+        return route.block, route.update, route.pack_key
+
+
 class PeerManager(object):
     def __init__(
             self, core_service, neighbors_conf,
@@ -30,6 +143,12 @@ class PeerManager(object):
         self._peer_to_rtfilter_map = {}
         self._neighbors_conf = neighbors_conf
 
+        # Update groups
+        # Key: Peer.update_group_key()
+        # Value: UpdateGroup instance
+        self._update_groups = {}
+        self._peer_to_update_group = {}
+
     @property
     def iterpeers(self):
         return iter(self._peers.values())
@@ -47,6 +166,7 @@ class PeerManager(object):
         neigh_ip_address = neigh_conf.ip_address
         peer = self._peers.get(neigh_ip_address)
         peer.stop()
+        self._leave_update_group(peer)
         del self._peers[neigh_ip_address]
         self._core_service.on_peer_removed(peer)
 
@@ -58,11 +178,45 @@ class PeerManager(object):
 
         Cleans up the paths in global tables that was received from this peer.
         """
+        self._leave_update_group(peer)
         LOG.debug('Cleaning obsolete paths whose source/version: %s/%s',
                   peer.ip_address, peer.version_num)
         # Launch clean-up for each global tables.
         self._table_manager.clean_stale_routes(peer)
 
+    @property
+    def update_groups(self):
+        return list(self._update_groups.values())
+
+    def get_update_group(self, peer):
+        """Returns the update group of the given established peer.
+
+        The peer joins the group of its current outbound policy, leaving
+        the previous one if the policy has been changed.
+        """
+        key = peer.update_group_key()
+        group = self._peer_to_update_group.get(peer)
+        if group is not None and group.key == key:
+            return group
+        self._leave_update_group(peer)
+        group = self._update_groups.get(key)
+        if group is None:
+            group = UpdateGroup(key)
+            self._update_groups[key] = group
+            LOG.debug('Created update group %s', key)
+        group.add_member(peer)
+        self._peer_to_update_group[peer] = group
+        return group
+
+    def _leave_update_group(self, peer):
+        group = self._peer_to_update_group.pop(peer, None)
+        if group is None:
+            return
+        group.remove_member(peer)
+        if not group.members:
+            del self._update_groups[group.key]
+            LOG.debug('Removed update group %s', group.key)
+
     def _get_non_rtc_peers(self):
         non_rtc_peer_list = set()
         for peer in self._peers.values():
@@ -89,10 +89,23 @@ class TableCoreManager(object):
         # (VRF) Tables to which the routes with a given route target
         # should be imported.
         #
-        # Key: RouteTarget
-        # Value: List of tables.
+        # Key: (RouteTarget, VRF RouteFamily)
+        # Value: Set of tables.
         self._tables_for_rt = {}
 
+        # VPN destinations whose best path has a given route target, to
+        # import only the matching paths into a VRF table.
+        #
+        # Key: (RouteTarget, VPN RouteFamily)
+        # Value: Dict of id(destination) to destination.
+        self._vpn_dests_for_rt = {}
+
+        # Keys of the above index for each VPN destination.
+        #
+        # Key: id(destination)
+        # Value: Frozenset of (RouteTarget, VPN RouteFamily).
+        self._rt_keys_for_vpn_dest = {}
+
         # Global/Default tables, keyed by RouteFamily.
         self._global_tables = {}
 
@@ -140,24 +153,43 @@ class TableCoreManager(object):
         :type import_rts: set of strings
 
         Checks if we have any path RT common with VRF table's import RT.
+        Only the VPN destinations indexed by the import RTs are visited.
         """
-        if vrf_table.route_family == Vrf4Table.ROUTE_FAMILY:
-            vpn_table = self.get_vpn4_table()
-        elif vrf_table.route_family == Vrf6Table.ROUTE_FAMILY:
-            vpn_table = self.get_vpn6_table()
-        elif vrf_table.route_family == VrfEvpnTable.ROUTE_FAMILY:
-            vpn_table = self.get_evpn_table()
-        elif vrf_table.route_family == Vrf4FlowSpecTable.ROUTE_FAMILY:
-            vpn_table = self.get_vpnv4fs_table()
-        elif vrf_table.route_family == Vrf6FlowSpecTable.ROUTE_FAMILY:
-            vpn_table = self.get_vpnv6fs_table()
-        elif vrf_table.route_family == L2vpnFlowSpecTable.ROUTE_FAMILY:
-            vpn_table = self.get_l2vpnfs_table()
-        else:
-            raise ValueError('Invalid VRF table route family: %s' %
-                             vrf_table.route_family)
+        if import_rts is None:
+            import_rts = vrf_table.import_rts
 
-        vrf_table.import_vpn_paths_from_table(vpn_table, import_rts)
+        vpn_dests = {}
+        for rt in import_rts:
+            vpn_dests.update(self._vpn_dests_for_rt.get(
+                (rt, vrf_table.VPN_ROUTE_FAMILY), {}))
+
+        vrf_table.import_vpn_paths_from_dests(vpn_dests.values(), import_rts)
+
+    def update_vpn_dest_rt_index(self, vpn_dest):
+        """Updates the index of `vpn_dest` by the RTs of its best path.
+
+        Should be called whenever the best path of `vpn_dest` changes.
+        """
+        dest_id = id(vpn_dest)
+        best_path = vpn_dest.best_path
+        if best_path is None:
+            rt_keys = frozenset()
+        else:
+            route_family = best_path.route_family
+            rt_keys = frozenset(
+                (rt, route_family) for rt in best_path.get_rts())
+
+        old_rt_keys = self._rt_keys_for_vpn_dest.pop(dest_id, frozenset())
+        for rt_key in old_rt_keys - rt_keys:
+            vpn_dests = self._vpn_dests_for_rt[rt_key]
+            del vpn_dests[dest_id]
+            if not vpn_dests:
+                del self._vpn_dests_for_rt[rt_key]
+        for rt_key in rt_keys - old_rt_keys:
+            self._vpn_dests_for_rt.setdefault(rt_key, {})[dest_id] = vpn_dest
+
+        if rt_keys:
+            self._rt_keys_for_vpn_dest[dest_id] = rt_keys
 
     def learn_path(self, path):
         """Inserts `path` into correct global table.
@@ -460,10 +492,9 @@ class TableCoreManager(object):
         affected_tables = set()
         route_family = vrf_table.route_family
         for rt in rts:
-            rt_rf_id = rt + ':' + str(route_family)
-            rt_specific_tables = self._tables_for_rt.get(rt_rf_id)
-            affected_tables.update(rt_specific_tables)
+            rt_specific_tables = self._tables_for_rt.get((rt, route_family))
             if rt_specific_tables:
+                affected_tables.update(rt_specific_tables)
                 try:
                     rt_specific_tables.remove(vrf_table)
                 except KeyError:
@@ -474,8 +505,7 @@ class TableCoreManager(object):
 
         # Remove records of RT that have no tables associated with it.
         for rt in rts_with_no_table:
-            rt_rf_id = rt + ':' + str(route_family)
-            del self._tables_for_rt[rt_rf_id]
+            del self._tables_for_rt[(rt, route_family)]
 
     def create_and_link_vrf_table(self, vrf_conf):
         """Factory method to create VRF table for given `vrf_conf`.
@@ -522,11 +552,10 @@ class TableCoreManager(object):
     def _link_vrf_table(self, vrf_table, rt_list):
         route_family = vrf_table.route_family
         for rt in rt_list:
-            rt_rf_id = rt + ':' + str(route_family)
-            table_set = self._tables_for_rt.get(rt_rf_id)
+            table_set = self._tables_for_rt.get((rt, route_family))
             if table_set is None:
                 table_set = set()
-                self._tables_for_rt[rt_rf_id] = table_set
+                self._tables_for_rt[(rt, route_family)] = table_set
             table_set.add(vrf_table)
             LOG.debug('Added VrfTable %s to import RT table list: %s',
                       vrf_table, rt)
@@ -593,8 +622,7 @@ class TableCoreManager(object):
                              vpn_path.route_family)
 
         for rt in path_rts:
-            rt_rf_id = rt + ':' + str(route_family)
-            vrf_rt_tables = self._tables_for_rt.get(rt_rf_id)
+            vrf_rt_tables = self._tables_for_rt.get((rt, route_family))
             if vrf_rt_tables:
                 interested_tables.update(vrf_rt_tables)
 
@@ -910,6 +938,6 @@ class TableCoreManager(object):
 
             tables = [self._global_tables.get(route_family)]
         else:
-            tables = self._global_tables.values()
+            tables = list(self._global_tables.values())
         for table in tables:
             table.cleanup_paths_for_peer(peer)
@@ -24,9 +24,14 @@ from abc import abstractmethod
 from copy import copy
 import logging
 import functools
+import struct
+import time
+import weakref
 import netaddr
 import six
 
+from ryu.lib import hub
+from ryu.lib import ip
 from ryu.lib.packet.bgp import RF_IPv4_UC
 from ryu.lib.packet.bgp import RouteTargetMembershipNLRI
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_EXTENDED_COMMUNITIES
@@ -37,8 +42,13 @@ from ryu.services.protocols.bgp.base import OrderedDict
 from ryu.services.protocols.bgp.constants import VPN_TABLE
 from ryu.services.protocols.bgp.constants import VRF_TABLE
 from ryu.services.protocols.bgp.model import OutgoingRoute
+from ryu.services.protocols.bgp.processor import best_path_key
+from ryu.services.protocols.bgp.processor import BgpProcessorError
 from ryu.services.protocols.bgp.processor import BPR_ONLY_PATH
 from ryu.services.protocols.bgp.processor import BPR_UNKNOWN
+from ryu.services.protocols.bgp.processor import select_best_path
+from ryu.services.protocols.bgp.utils.radix import RadixTree
+from ryu.services.protocols.bgp.utils.sorteddict import SortedKeyDict
 
 
 LOG = logging.getLogger('bgpspeaker.info_base.base')
@@ -54,8 +64,36 @@ class Table(object):
     """
     ROUTE_FAMILY = RF_IPv4_UC
 
+    # Width in bits of the addresses of IP prefixes stored in this table,
+    # or None if this table does not store IP prefixes.
+    # If given, the destinations are also indexed by their prefixes to
+    # support longest match and covering/covered prefix lookups.
+    PREFIX_BITS = None
+
+    # True if the destinations are indexed by the peers which they have
+    # the paths from or the routes sent to, so that the paths for a peer
+    # are cleaned up without walking the whole table.
+    INDEX_BY_PEER = True
+
+    # Max. time (in seconds) spent in cleaning up the paths for a peer
+    # before yielding to the other greenthreads.
+    CLEANUP_SLICE_TIME = 0.05
+
     def __init__(self, scope_id, core_service, signal_bus):
-        self._destinations = dict()
+        if self.PREFIX_BITS is not None:
+            self._destinations = dict()
+            self._prefix_index = RadixTree(self.PREFIX_BITS)
+        else:
+            # Keys are kept sorted to walk the table from a key instead.
+            self._destinations = SortedKeyDict()
+            self._prefix_index = None
+        # Destinations indexed by the peers if INDEX_BY_PEER is True.
+        # Destinations which no longer have anything for the peer are
+        # removed from the index on the next cleanup for the peer.
+        #
+        # Key: Peer
+        # Value: Dict of id(destination) to destination.
+        self._dests_for_peer = {}
         # Scope in which this table exists.
         # If this table represents the VRF, then this could be a VPN ID.
         # For global/VPN tables this should be None
@@ -85,6 +123,35 @@ class Table(object):
     def values(self):
         return iter(self._destinations.values())
 
+    def items_after(self, key=None, prefix=None):
+        """Returns an iterator of the pairs of the table key and the
+        destination in the order of the table keys, starting after *key*
+        if given.
+
+        IP prefixes are ordered by address and then length, and resumed
+        in O(prefix length) time. The other keys are ordered as strings
+        and resumed in O(log n) time.
+        The table must not be modified while the iterator is in use; to
+        walk the table across the modifications, resume from the last key
+        instead.
+
+        If *prefix* is given, only the destinations of the prefixes
+        covered by it are returned. Raises ValueError if this table does
+        not store IP prefixes.
+        """
+        if self._prefix_index is not None or prefix is not None:
+            if key is not None:
+                key = self._prefix_key(key)
+            if prefix is None:
+                dests = self._prefix_index.values(after=key)
+            else:
+                dests = self._prefix_index.covered(
+                    *self._prefix_key(prefix), after=key)
+        else:
+            dests = (self._destinations[k]
+                     for k in self._destinations.keys_after(key))
+        return ((self._table_key(dest.nlri), dest) for dest in dests)
+
     def insert(self, path):
         self._validate_path(path)
         self._validate_nlri(path.nlri)
@@ -98,6 +165,7 @@ class Table(object):
         self._validate_path(sent_route.path)
         dest = self._get_or_create_dest(sent_route.path.nlri)
         dest.add_sent_route(sent_route)
+        self._index_dest_for_peer(sent_route.sent_peer, dest)
 
     def _insert_path(self, path):
         """Add new path to destination identified by given prefix.
@@ -106,6 +174,8 @@ class Table(object):
         dest = self._get_or_create_dest(path.nlri)
         # Add given path to matching Dest.
         dest.add_new_path(path)
+        if path.source is not None:
+            self._index_dest_for_peer(path.source, dest)
         # Return updated destination.
         return dest
 
@@ -119,25 +189,52 @@ class Table(object):
         # Return updated destination.
         return dest
 
+    def _index_dest_for_peer(self, peer, dest):
+        if not self.INDEX_BY_PEER:
+            return
+        dests = self._dests_for_peer.get(peer)
+        if dests is None:
+            dests = self._dests_for_peer[peer] = {}
+        dests[id(dest)] = dest
+
     def cleanup_paths_for_peer(self, peer):
         """Remove old paths from whose source is `peer`
 
         Old paths have source version number that is less than current peer
         version number. Also removes sent paths to this peer.
+
+        If INDEX_BY_PEER is True, only the destinations indexed for `peer`
+        are visited, yielding to the other greenthreads every
+        CLEANUP_SLICE_TIME seconds. The routes sent to `peer` after the
+        cleanup started are kept.
         """
         LOG.debug('Cleaning paths from table %s for peer %s', self, peer)
-        for dest in self.values():
+        if self.INDEX_BY_PEER:
+            dests = self._dests_for_peer.pop(peer, {})
+        else:
+            dests = dict((id(dest), dest) for dest in self.values())
+
+        deadline = time.time() + self.CLEANUP_SLICE_TIME
+        for dest in dests.values():
             # Remove paths learned from this source
             paths_deleted = dest.remove_old_paths_from_source(peer)
-            # Remove sent paths to this peer
-            had_sent = dest.remove_sent_route(peer)
-            if had_sent:
-                LOG.debug('Removed sent route %s for %s', dest.nlri, peer)
+            # Re-indexed if updated for this peer while yielding.
+            if id(dest) not in self._dests_for_peer.get(peer, {}):
+                # Remove sent paths to this peer
+                had_sent = dest.remove_sent_route(peer)
+                if had_sent:
+                    LOG.debug('Removed sent route %s for %s', dest.nlri, peer)
+                if dest.has_path_from(peer):
+                    self._index_dest_for_peer(peer, dest)
             # If any paths are removed we enqueue respective destination for
             # future processing.
             if paths_deleted:
                 self._signal_bus.dest_changed(dest)
 
+            if time.time() > deadline:
+                hub.sleep(0)
+                deadline = time.time() + self.CLEANUP_SLICE_TIME
+
     def clean_uninteresting_paths(self, interested_rts):
         """Cleans table of any path that do not have any RT in common
          with `interested_rts`.
@@ -165,11 +262,15 @@ class Table(object):
         self._validate_nlri(nlri)
         dest = self._get_dest(nlri)
         if dest:
-            self._destinations.pop(dest)
+            self.delete_dest(dest)
         return dest
 
     def delete_dest(self, dest):
         del self._destinations[self._table_key(dest.nlri)]
+        for dests in self._dests_for_peer.values():
+            dests.pop(id(dest), None)
+        if self._prefix_index is not None:
+            self._prefix_index.delete(*self._prefix_key(dest.nlri.prefix))
 
     def _validate_nlri(self, nlri):
         """Validated *nlri* is the type that this table stores/supports.
@@ -193,6 +294,9 @@ class Table(object):
         if dest is None:
             dest = self._create_dest(nlri)
             self._destinations[table_key] = dest
+            if self._prefix_index is not None:
+                self._prefix_index.set(*self._prefix_key(nlri.prefix),
+                                       value=dest)
         return dest
 
     def _get_dest(self, nlri):
@@ -200,6 +304,60 @@ class Table(object):
         dest = self._destinations.get(table_key)
         return dest
 
+    def _prefix_key(self, prefix):
+        # Returns the key of *prefix* in the prefix index, e.g.,
+        # (0x0a000000, 8) for '10.0.0.0/8'. Without the length, *prefix*
+        # is taken as a host address.
+        if self._prefix_index is None:
+            raise ValueError('Prefix lookup is not supported by %s' % self)
+        addr, _, length = prefix.partition('/')
+        if not length:
+            length = self.PREFIX_BITS
+        try:
+            key = ip.text_to_int(addr), int(length)
+        except netaddr.AddrFormatError as e:
+            raise ValueError(str(e))
+        # Validates here, as the lookups of the prefix index are lazy.
+        if not 0 <= key[1] <= self.PREFIX_BITS:
+            raise ValueError('Invalid prefix length: %s' % prefix)
+        return key
+
+    def get_exact_match(self, prefix):
+        """Returns the destination of the given prefix, or None if not
+        found. The host bits of the prefix are ignored.
+
+        Raises ValueError if this table does not store IP prefixes.
+        """
+        key = self._prefix_key(prefix)
+        return self._prefix_index.get(*key)
+
+    def get_longest_match(self, prefix):
+        """Returns the destination of the longest prefix which covers the
+        given prefix or host address, or None if no prefix covers it.
+
+        Raises ValueError if this table does not store IP prefixes.
+        """
+        key = self._prefix_key(prefix)
+        return self._prefix_index.longest_match(*key)
+
+    def get_covering(self, prefix):
+        """Returns an iterator of the destinations of the prefixes which
+        cover the given prefix, including itself, from the shortest one.
+
+        Raises ValueError if this table does not store IP prefixes.
+        """
+        key = self._prefix_key(prefix)
+        return self._prefix_index.covering(*key)
+
+    def get_covered(self, prefix):
+        """Returns an iterator of the destinations of the prefixes covered
+        by the given prefix, including itself, in the order of address.
+
+        Raises ValueError if this table does not store IP prefixes.
+        """
+        key = self._prefix_key(prefix)
+        return self._prefix_index.covered(*key)
+
     def is_for_vrf(self):
         """Returns true if this table instance represents a VRF.
         """
@@ -223,6 +381,7 @@ class NonVrfPathProcessingMixin(object):
     Applies to most of Destinations except for VrfDest
     because they are processed at VRF level, so different logic applies.
     """
+    __slots__ = ()
 
     def __init__(self):
         self._core_service = None  # not assigned yet
@@ -284,6 +443,10 @@ class Destination(object):
     a routing information base table *Table*.
     """
 
+    __slots__ = ('_table', '_core_service', '_nlri', '_known_path_list',
+                 '_new_path_list', '_best_path', '_best_path_reason',
+                 '_withdraw_list', '_sent_routes',
+                 'next_dest_to_process', 'prev_dest_to_process')
     ROUTE_FAMILY = RF_IPv4_UC
 
     def __init__(self, table, nlri):
@@ -445,6 +608,17 @@ class Destination(object):
                 removed_paths.append(path)
         return removed_paths
 
+    def has_path_from(self, source):
+        """Returns *True* if any of the known or new paths is from *source*.
+        """
+        for path in self._known_path_list:
+            if path.source == source:
+                return True
+        for path in self._new_path_list:
+            if path.source == source:
+                return True
+        return False
+
     def withdraw_if_sent_to(self, peer):
         """Sends a withdraw for this destination to given `peer`.
 
@@ -596,26 +770,13 @@ class Destination(object):
         Returns current best path among `known_paths`.
         """
         if not self._known_path_list:
-            from ryu.services.protocols.bgp.processor import BgpProcessorError
             raise BgpProcessorError(desc='Need at-least one known path to'
                                     ' compute best path')
 
         # We pick the first path as current best path. This helps in breaking
         # tie between two new paths learned in one cycle for which best-path
         # calculation steps lead to tie.
-        current_best_path = self._known_path_list[0]
-        best_path_reason = BPR_ONLY_PATH
-        for next_path in self._known_path_list[1:]:
-            from ryu.services.protocols.bgp.processor import compute_best_path
-            # Compare next path with current best path.
-            new_best_path, reason = \
-                compute_best_path(self._core_service.asn, current_best_path,
-                                  next_path)
-            best_path_reason = reason
-            if new_best_path is not None:
-                current_best_path = new_best_path
-
-        return current_best_path, best_path_reason
+        return select_best_path(self._core_service.asn, self._known_path_list)
 
     def withdraw_uninteresting_paths(self, interested_rts):
         """Withdraws paths that are no longer interesting.
@@ -688,6 +849,102 @@ class Destination(object):
         return str(self) >= str(other)
 
 
+class PathAttrSet(object):
+    """Immutable map of path attribute type to path attribute.
+
+    The paths which have the identical path attributes share one
+    instance. Use PathAttrSet.intern() to get the instance instead of
+    instantiating this class.
+    """
+    __slots__ = ('_attrs', '__weakref__')
+
+    # Interned instances keyed by the wire encoding of the path attributes.
+    # An entry is removed when the last path which refers to the instance
+    # is deleted.
+    _interned = weakref.WeakValueDictionary()
+
+    # Recently interned instances keyed by the identities of the given path
+    # attributes. The paths created from the same UPDATE message share the
+    # path attribute objects, so this saves encoding them for each path.
+    # The given path attributes are kept in order to keep their identities
+    # valid.
+    _recent = OrderedDict()
+    _MAX_RECENT = 64
+
+    def __init__(self, attrs):
+        self._attrs = attrs
+
+    @classmethod
+    def intern(cls, pattrs):
+        """Returns the interned instance which has the same path attributes
+        as the given dict *pattrs*.
+        """
+        if isinstance(pattrs, cls):
+            return pattrs
+        items = tuple(pattrs.items())
+        id_key = tuple((t, id(attr)) for t, attr in items)
+        recent = cls._recent.get(id_key)
+        if recent is not None:
+            return recent[1]
+
+        try:
+            # Note: serialize() fixes up flags and length of the path
+            # attribute, so serializes the copies not to modify the given
+            # path attributes.
+            wire = b''.join(
+                six.binary_type(copy(attr).serialize()) for _, attr in items)
+        except (struct.error, ValueError):
+            # e.g., AS_PATH which has four-octet AS numbers but is not
+            # encoded in four-octet. Such path attributes are shared only
+            # among the paths from the same UPDATE message.
+            wire = None
+        interned = None
+        if wire is not None:
+            interned = cls._interned.get(wire)
+        if interned is None:
+            interned = cls(OrderedDict(items))
+            if wire is not None:
+                cls._interned[wire] = interned
+
+        cls._recent[id_key] = (items, interned)
+        if len(cls._recent) > cls._MAX_RECENT:
+            cls._recent.popitem(last=False)
+        return interned
+
+    def get(self, attr_type, default=None):
+        return self._attrs.get(attr_type, default)
+
+    def items(self):
+        return self._attrs.items()
+
+    def keys(self):
+        return self._attrs.keys()
+
+    def values(self):
+        return self._attrs.values()
+
+    def copy(self):
+        """Returns the path attributes as a new mutable OrderedDict."""
+        return OrderedDict(self._attrs)
+
+    def __getitem__(self, attr_type):
+        return self._attrs[attr_type]
+
+    def __contains__(self, attr_type):
+        return attr_type in self._attrs
+
+    def __iter__(self):
+        return iter(self._attrs)
+
+    def __len__(self):
+        return len(self._attrs)
+
+    def __repr__(self):
+        return repr(self._attrs)
+
+    __str__ = __repr__
+
+
 @six.add_metaclass(ABCMeta)
 class Path(object):
     """Represents a way of reaching an IP destination.
@@ -697,7 +954,8 @@ class Path(object):
     """
     __slots__ = ('_source', '_path_attr_map', '_nlri', '_source_version_num',
                  '_exported_from', '_nexthop', 'next_path', 'prev_path',
-                 '_is_withdraw', 'med_set_by_target_neighbor')
+                 '_is_withdraw', 'med_set_by_target_neighbor',
+                 '_best_path_key')
     ROUTE_FAMILY = RF_IPv4_UC
 
     def __init__(self, source, nlri, src_ver_num, pattrs=None, nexthop=None,
@@ -741,10 +999,8 @@ class Path(object):
         self._source = source
 
         # Path attribute of this path.
-        if pattrs:
-            self._path_attr_map = copy(pattrs)
-        else:
-            self._path_attr_map = OrderedDict()
+        # The identical path attributes are shared with the other paths.
+        self._path_attr_map = PathAttrSet.intern(pattrs or {})
 
         # NLRI that this path represents.
         self._nlri = nlri
@@ -765,6 +1021,9 @@ class Path(object):
         # The Destination from which this path was exported, if any.
         self._exported_from = None
 
+        # (local ASN, key) cached by get_best_path_key().
+        self._best_path_key = None
+
     @property
     def source_version_num(self):
         return self._source_version_num
@@ -791,12 +1050,23 @@ class Path(object):
 
     @property
     def pathattr_map(self):
-        return copy(self._path_attr_map)
+        return self._path_attr_map.copy()
 
     @property
     def nexthop(self):
         return self._nexthop
 
+    def get_best_path_key(self, local_asn):
+        """Returns the key of this path for best path selection.
+
+        See processor.best_path_key for details.
+        """
+        if self._best_path_key is None or \
+                self._best_path_key[0] != local_asn:
+            self._best_path_key = (local_asn,
+                                   best_path_key(local_asn, self))
+        return self._best_path_key[1]
+
     def get_pattr(self, pattr_type, default=None):
         """Returns path attribute of given type.
 
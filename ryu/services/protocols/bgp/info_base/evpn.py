@@ -34,6 +34,7 @@ class EvpnDest(VpnDest):
 
     Store EVPN Paths.
     """
+    __slots__ = ()
     ROUTE_FAMILY = RF_L2_EVPN
 
 
@@ -49,11 +50,13 @@ class EvpnTable(VpnTable):
 
 class EvpnPath(VpnPath):
     """Represents a way of reaching an EVPN destination."""
+    __slots__ = ()
     ROUTE_FAMILY = RF_L2_EVPN
     VRF_PATH_CLASS = None  # defined in init - anti cyclic import hack
     NLRI_CLASS = EvpnNLRI
 
     def __init__(self, *args, **kwargs):
         super(EvpnPath, self).__init__(*args, **kwargs)
-        from ryu.services.protocols.bgp.info_base.vrfevpn import VrfEvpnPath
-        self.VRF_PATH_CLASS = VrfEvpnPath
+        if EvpnPath.VRF_PATH_CLASS is None:
+            from ryu.services.protocols.bgp.info_base.vrfevpn import VrfEvpnPath
+            EvpnPath.VRF_PATH_CLASS = VrfEvpnPath
@@ -36,6 +36,7 @@ class IPv4FlowSpecDest(Destination, NonVrfPathProcessingMixin):
 
     Store Flow Specification Paths.
     """
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv4_FLOWSPEC
 
     def _best_path_lost(self):
@@ -77,6 +78,7 @@ class IPv4FlowSpecTable(Table):
 
 class IPv4FlowSpecPath(Path):
     """Represents a way of reaching an IPv4 Flow Specification destination."""
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv4_FLOWSPEC
     VRF_PATH_CLASS = None  # defined in init - anti cyclic import hack
     NLRI_CLASS = FlowSpecIPv4NLRI
@@ -85,9 +87,10 @@ class IPv4FlowSpecPath(Path):
         # Set dummy IP address.
         kwargs['nexthop'] = '0.0.0.0'
         super(IPv4FlowSpecPath, self).__init__(*args, **kwargs)
-        from ryu.services.protocols.bgp.info_base.vrf4fs import (
-            Vrf4FlowSpecPath)
-        self.VRF_PATH_CLASS = Vrf4FlowSpecPath
+        if IPv4FlowSpecPath.VRF_PATH_CLASS is None:
+            from ryu.services.protocols.bgp.info_base.vrf4fs import (
+                Vrf4FlowSpecPath)
+            IPv4FlowSpecPath.VRF_PATH_CLASS = Vrf4FlowSpecPath
         # Because the IPv4 Flow Specification does not require nexthop,
         # initialize with None.
         self._nexthop = None
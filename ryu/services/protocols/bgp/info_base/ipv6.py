@@ -35,6 +35,7 @@ class IPv6Dest(Destination, NonVrfPathProcessingMixin):
 
     Store IPv6 Paths.
     """
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv6_UC
 
     def _best_path_lost(self):
@@ -54,6 +55,7 @@ class Ipv6Table(Table):
     paths.
     """
     ROUTE_FAMILY = RF_IPv6_UC
+    PREFIX_BITS = 128
     VPN_DEST_CLASS = IPv6Dest
 
     def __init__(self, core_service, signal_bus):
@@ -76,14 +78,16 @@ class Ipv6Table(Table):
 
 class Ipv6Path(Path):
     """Represents a way of reaching an v6 destination."""
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv6_UC
     VRF_PATH_CLASS = None  # defined in init - anti cyclic import hack
     NLRI_CLASS = IPAddrPrefix
 
     def __init__(self, *args, **kwargs):
         super(Ipv6Path, self).__init__(*args, **kwargs)
-        from ryu.services.protocols.bgp.info_base.vrf6 import Vrf6Path
-        self.VRF_PATH_CLASS = Vrf6Path
+        if Ipv6Path.VRF_PATH_CLASS is None:
+            from ryu.services.protocols.bgp.info_base.vrf6 import Vrf6Path
+            Ipv6Path.VRF_PATH_CLASS = Vrf6Path
 
 
 class Ipv6PrefixFilter(PrefixFilter):
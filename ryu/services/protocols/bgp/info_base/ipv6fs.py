@@ -36,6 +36,7 @@ class IPv6FlowSpecDest(Destination, NonVrfPathProcessingMixin):
 
     Store Flow Specification Paths.
     """
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv6_FLOWSPEC
 
     def _best_path_lost(self):
@@ -77,6 +78,7 @@ class IPv6FlowSpecTable(Table):
 
 class IPv6FlowSpecPath(Path):
     """Represents a way of reaching an IPv6 Flow Specification destination."""
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv6_FLOWSPEC
     VRF_PATH_CLASS = None  # defined in init - anti cyclic import hack
     NLRI_CLASS = FlowSpecIPv6NLRI
@@ -85,9 +87,10 @@ class IPv6FlowSpecPath(Path):
         # Set dummy IP address.
         kwargs['nexthop'] = '::'
         super(IPv6FlowSpecPath, self).__init__(*args, **kwargs)
-        from ryu.services.protocols.bgp.info_base.vrf6fs import (
-            Vrf6FlowSpecPath)
-        self.VRF_PATH_CLASS = Vrf6FlowSpecPath
+        if IPv6FlowSpecPath.VRF_PATH_CLASS is None:
+            from ryu.services.protocols.bgp.info_base.vrf6fs import (
+                Vrf6FlowSpecPath)
+            IPv6FlowSpecPath.VRF_PATH_CLASS = Vrf6FlowSpecPath
         # Because the IPv6 Flow Specification does not require nexthop,
         # initialize with None.
         self._nexthop = None
@@ -59,6 +59,7 @@ class VpnTable(Table):
 
 @six.add_metaclass(abc.ABCMeta)
 class VpnPath(Path):
+    __slots__ = ()
     ROUTE_FAMILY = None
     VRF_PATH_CLASS = None
     NLRI_CLASS = None
@@ -93,17 +94,20 @@ class VpnPath(Path):
 @six.add_metaclass(abc.ABCMeta)
 class VpnDest(Destination, NonVrfPathProcessingMixin):
     """Base class for VPN destinations."""
+    __slots__ = ()
 
     def _best_path_lost(self):
         old_best_path = self._best_path
         NonVrfPathProcessingMixin._best_path_lost(self)
         self._core_service._signal_bus.best_path_changed(old_best_path, True)
 
+        tm = self._core_service.table_manager
+        tm.update_vpn_dest_rt_index(self)
+
         # Best-path might have been imported into VRF tables, we have to
         # withdraw from them, if the source is a peer.
         if old_best_path:
             withdraw_clone = old_best_path.clone(for_withdrawal=True)
-            tm = self._core_service.table_manager
             tm.import_single_vpn_path_to_all_vrfs(
                 withdraw_clone, path_rts=old_best_path.get_rts()
             )
@@ -112,7 +116,9 @@ class VpnDest(Destination, NonVrfPathProcessingMixin):
         NonVrfPathProcessingMixin._new_best_path(self, best_path)
         self._core_service._signal_bus.best_path_changed(best_path, False)
 
-        # Extranet feature requires that we import new best path into VRFs.
         tm = self._core_service.table_manager
+        tm.update_vpn_dest_rt_index(self)
+
+        # Extranet feature requires that we import new best path into VRFs.
         tm.import_single_vpn_path_to_all_vrfs(
             self._best_path, self._best_path.get_rts())
@@ -71,6 +71,10 @@ class VrfTable(Table):
     VRF_PATH_CLASS = None
     VRF_DEST_CLASS = None
 
+    # The paths for a peer are withdrawn from the VPN tables instead of
+    # being cleaned up in VRF tables.
+    INDEX_BY_PEER = False
+
     def __init__(self, vrf_conf, core_service, signal_bus):
         Table.__init__(self, vrf_conf.route_dist, core_service, signal_bus)
         self._vrf_conf = vrf_conf
@@ -133,16 +137,19 @@ class VrfTable(Table):
                 LOCAL_ROUTES: local_route_count}
 
     def import_vpn_paths_from_table(self, vpn_table, import_rts=None):
-        for vpn_dest in vpn_table.values():
+        self.import_vpn_paths_from_dests(vpn_table.values(), import_rts)
+
+    def import_vpn_paths_from_dests(self, vpn_dests, import_rts=None):
+        if import_rts is None:
+            import_rts = set(self.import_rts)
+        else:
+            import_rts = set(import_rts)
+
+        for vpn_dest in vpn_dests:
             vpn_path = vpn_dest.best_path
             if not vpn_path:
                 continue
 
-            if import_rts is None:
-                import_rts = set(self.import_rts)
-            else:
-                import_rts = set(import_rts)
-
             path_rts = vpn_path.get_rts()
             if import_rts.intersection(path_rts):
                 # TODO(PH): When (re-)implementing extranet, check what should
@@ -353,6 +360,7 @@ class VrfTable(Table):
 @six.add_metaclass(abc.ABCMeta)
 class VrfDest(Destination):
     """Base class for VRF destination."""
+    __slots__ = ('_route_dist',)
 
     def __init__(self, table, nlri):
         super(VrfDest, self).__init__(table, nlri)
@@ -37,18 +37,21 @@ LOG = logging.getLogger('bgpspeaker.info_base.vrf4')
 
 class Vrf4Path(VrfPath):
     """Represents a way of reaching an IP destination with a VPN."""
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv4_UC
     VPN_PATH_CLASS = Vpnv4Path
     VPN_NLRI_CLASS = LabelledVPNIPAddrPrefix
 
 
 class Vrf4Dest(VrfDest):
+    __slots__ = ()
     ROUTE_FAMILY = RF_IPv4_UC
 
 
 class Vrf4Table(VrfTable):
     """Virtual Routing and Forwarding information base for IPv4."""
     ROUTE_FAMILY = RF_IPv4_UC
+    PREFIX_BITS = 32
     VPN_ROUTE_FAMILY = RF_IPv4_VPN
     NLRI_CLASS = IPAddrPrefix
     VRF_PATH_CLASS = Vrf4Path
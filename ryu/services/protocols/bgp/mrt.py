@@ -0,0 +1,552 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+ Exports the routing information of the BGP speaker in MRT format
+ [RFC6396].
+"""
+
+import collections
+import gzip
+import logging
+import os
+import time
+
+from ryu.lib import hub
+from ryu.lib import ip
+from ryu.lib import mrtlib
+from ryu.lib.packet import bgp
+from ryu.lib.packet.bgp import RF_IPv4_UC
+from ryu.lib.packet.bgp import RF_IPv6_UC
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_NEXT_HOP
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MP_REACH_NLRI
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MP_UNREACH_NLRI
+from ryu.lib.packet.bgp import BGPPathAttributeNextHop
+from ryu.lib.packet.bgp import BGPPathAttributeMpReachNLRI
+from ryu.lib.packet.bgp import BGPUpdate
+from ryu.services.protocols.bgp.base import Activity
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
+from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
+
+LOG = logging.getLogger('bgpspeaker.mrt')
+
+# Default interval in seconds of the RIB snapshots
+DEFAULT_RIB_INTERVAL = 7200
+
+# Default interval in seconds to rotate the files of the UPDATE messages
+DEFAULT_UPDATES_INTERVAL = 900
+
+# Default max number of the UPDATE messages queued to be written
+DEFAULT_QUEUE_SIZE = 10000
+
+# Number of the destinations dumped at once before yielding to the other
+# threads during a RIB snapshot.
+RIB_DUMP_BATCH_SIZE = 1000
+
+# Peer index of the paths originated by this speaker in PEER_INDEX_TABLE
+LOCAL_PEER_INDEX = 0
+
+# Number of the routes replayed at once before yielding to the other
+# threads if the rate is not limited.
+REPLAY_BATCH_SIZE = 1000
+
+# Message classes of the AFI/SAFI-specific RIB subtypes. The other route
+# families are dumped as RIB_GENERIC subtype.
+_RIB_MESSAGES = {
+    RF_IPv4_UC: mrtlib.TableDump2RibIPv4UnicastMrtMessage,
+    RF_IPv6_UC: mrtlib.TableDump2RibIPv6UnicastMrtMessage,
+}
+
+# Path classes of the route families which can be replayed as the local
+# routes
+_LOCAL_PATHS = {
+    RF_IPv4_UC: Ipv4Path,
+    RF_IPv6_UC: Ipv6Path,
+}
+
+# A route read from a RIB snapshot.
+# peer is a mrtlib.MrtPeer instance, and path_attributes is the list of
+# the path attributes including NEXT_HOP or MP_REACH_NLRI.
+MrtRoute = collections.namedtuple(
+    'MrtRoute', ['view_name', 'peer', 'route_family', 'nlri',
+                 'path_attributes', 'originated_time'])
+
+
+def read_rib(f):
+    """Reads the routes from a RIB snapshot written by MrtDumper.
+
+    *f* is a file object of the snapshot in binary mode, e.g.,
+    gzip.open('rib.20170101.0000.gz', 'rb').
+    Yields MrtRoute instances in the order of the snapshot. The records
+    are read one by one without loading the whole file, so that a full
+    table is reloaded for warm restart with a constant memory.
+    """
+    view_name = ''
+    peers = []
+    for record in mrtlib.Reader(f):
+        msg = record.message
+        if isinstance(msg, mrtlib.TableDump2PeerIndexTableMrtMessage):
+            view_name = msg.view_name
+            peers = msg.peer_entries
+            continue
+        elif isinstance(msg, mrtlib.TableDump2RibGenericMrtMessage):
+            route_family = bgp.get_rf(msg.afi, msg.safi)
+            nlri = msg.nlri
+        elif isinstance(msg, mrtlib.TableDump2RibIPv4UnicastMrtMessage):
+            route_family = RF_IPv4_UC
+            nlri = msg.prefix
+        elif isinstance(msg, mrtlib.TableDump2RibIPv6UnicastMrtMessage):
+            route_family = RF_IPv6_UC
+            nlri = msg.prefix
+        else:
+            continue
+        for entry in msg.rib_entries:
+            yield MrtRoute(view_name, peers[entry.peer_index], route_family,
+                           nlri, entry.bgp_attributes,
+                           entry.originated_time)
+
+
+class MrtDumper(Activity):
+    """Writes the routing information in MRT format into files.
+
+    The RIB snapshots of the global and VRF tables are written as
+    TABLE_DUMP_V2 records into 'rib.YYYYMMDD.hhmm' files in *dump_dir*
+    every *rib_interval* seconds. Each table has its own PEER_INDEX_TABLE
+    with the view name, '' for the global tables and 'RD:family' for the
+    VRF tables, e.g., '65000:100:ipv4'.
+
+    The UPDATE messages received from and sent to the peers are written
+    as BGP4MP records with BGP4MP_MESSAGE_AS4 and
+    BGP4MP_MESSAGE_AS4_LOCAL subtypes respectively into
+    'updates.YYYYMMDD.hhmm' files, which are rotated every
+    *updates_interval* seconds.
+
+    If *compress* is True, the files are gzip compressed and named with
+    '.gz' suffix.
+
+    The messages are queued and written on the background thread. If the
+    queue has *queue_size* messages, e.g., on a slow disk, the new
+    messages are dropped instead of blocking the route processing, and
+    counted as *dropped*. The snapshots are written in batches of
+    RIB_DUMP_BATCH_SIZE destinations, yielding to the other threads
+    between the batches.
+
+    Note: The snapshot of a route in the other families than IPv4
+    unicast has the MP_REACH_NLRI attribute of the full form including
+    the NLRI of the route.
+    """
+
+    def __init__(self, core_service, dump_dir,
+                 rib_interval=DEFAULT_RIB_INTERVAL,
+                 updates_interval=DEFAULT_UPDATES_INTERVAL,
+                 compress=False, queue_size=DEFAULT_QUEUE_SIZE):
+        super(MrtDumper, self).__init__(name='MrtDumper(%s)' % dump_dir)
+        self._core_service = core_service
+        self.dump_dir = dump_dir
+        self.rib_interval = rib_interval
+        self.updates_interval = updates_interval
+        self.compress = compress
+        self._queue_size = queue_size
+        self._queue = hub.Queue(queue_size)
+        self._updates_file = None
+        self.dropped = 0
+        self._core_service.signal_bus.register_listener(
+            BgpSignalBus.BGP_UPDATE_RECEIVED,
+            lambda _, data: self._enqueue_update(data, False)
+        )
+        self._core_service.signal_bus.register_listener(
+            BgpSignalBus.BGP_UPDATE_SENT,
+            lambda _, data: self._enqueue_update(data, True)
+        )
+
+    def _enqueue_update(self, data, sent):
+        if not self.started:
+            return
+        if self._queue.qsize() >= self._queue_size:
+            self.dropped += 1
+            return
+        self._queue.put((time.time(), data['peer'], data['update'], sent))
+
+    def _run(self):
+        if self.rib_interval:
+            self._spawn('MrtDumper RIB snapshots', self._rib_dump_loop)
+        self._write_updates()
+
+    def stop(self):
+        self._close_updates_file()
+        super(MrtDumper, self).stop()
+
+    def _file_path(self, name, timestamp):
+        path = os.path.join(
+            self.dump_dir,
+            time.strftime(name + '.%Y%m%d.%H%M', time.gmtime(timestamp)))
+        if self.compress:
+            path += '.gz'
+        return path
+
+    def _open(self, path):
+        if self.compress:
+            return gzip.open(path, 'ab')
+        return open(path, 'ab')
+
+    def _close_updates_file(self):
+        if self._updates_file is not None:
+            self._updates_file.close()
+            self._updates_file = None
+
+    def _next_time(self, now, interval):
+        # Aligns the time to rotate the files to the interval.
+        return (now // interval + 1) * interval
+
+    def _write_updates(self):
+        rotate_at = self._next_time(time.time(), self.updates_interval)
+        dropped = 0
+        while self.started:
+            now = time.time()
+            if now >= rotate_at:
+                self._close_updates_file()
+                rotate_at = self._next_time(now, self.updates_interval)
+                if self.dropped > dropped:
+                    LOG.warning('%s: Dropped %d UPDATE messages',
+                                self.name, self.dropped - dropped)
+                    dropped = self.dropped
+            try:
+                item = self._queue.get(timeout=rotate_at - now)
+            except hub.QueueEmpty:
+                continue
+            if not self.started:
+                break
+            timestamp, peer, update, sent = item
+            try:
+                record = self._construct_bgp4mp_record(peer, update,
+                                                       timestamp, sent)
+                buf = record.serialize()
+            except Exception as e:
+                LOG.error('%s: Failed to encode %s: %s', self.name, update, e)
+                continue
+            if self._updates_file is None:
+                self._updates_file = self._open(
+                    self._file_path('updates', timestamp))
+            self._updates_file.write(buf)
+
+    def _rib_dump_loop(self):
+        while self.started:
+            self.dump_rib()
+            now = time.time()
+            self.pause(self._next_time(now, self.rib_interval) - now)
+
+    def dump_rib(self):
+        """Writes a RIB snapshot and returns the path of the file.
+
+        The snapshot is written into a temporary file and renamed when
+        completed.
+        """
+        now = time.time()
+        path = self._file_path('rib', now)
+        tmp_path = path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        f = self._open(tmp_path)
+        try:
+            self._write_rib(f, int(now))
+        finally:
+            f.close()
+        os.rename(tmp_path, path)
+        LOG.debug('%s: Wrote RIB snapshot %s', self.name, path)
+        return path
+
+    def _write_rib(self, f, timestamp):
+        table_manager = self._core_service.table_manager
+        global_tables = sorted(table_manager.global_tables.items(),
+                               key=lambda x: (x[0].afi, x[0].safi))
+        views = [('', [table for _, table in global_tables])]
+        for (route_dist, vrf_rf), table in sorted(
+                table_manager.get_vrf_tables().items()):
+            views.append(('%s:%s' % (route_dist, vrf_rf), [table]))
+
+        for view_name, tables in views:
+            peers, peer_index = self._construct_peer_index_record(
+                view_name, timestamp)
+            f.write(peers.serialize())
+            seq_num = 0
+            for table in tables:
+                for dests in self._iter_batches(table):
+                    for dest in dests:
+                        try:
+                            record = self._construct_rib_record(
+                                seq_num, dest, peer_index, timestamp)
+                            if record is None:
+                                continue
+                            buf = record.serialize()
+                        except Exception as e:
+                            LOG.error('%s: Failed to encode %s: %s',
+                                      self.name, dest, e)
+                            continue
+                        f.write(buf)
+                        seq_num = (seq_num + 1) & 0xffffffff
+
+    def _iter_batches(self, table):
+        # Yields the lists of the destinations in the table, resuming the
+        # walk from the last one after yielding to the other threads.
+        # Resuming takes O(prefix length) time on the IP tables and
+        # O(log n) time on the others, whose keys are kept sorted, so the
+        # walk stays linear while the table is modified in between.
+        key = None
+        while True:
+            dests = []
+            for key, dest in table.items_after(key):
+                dests.append(dest)
+                if len(dests) >= RIB_DUMP_BATCH_SIZE:
+                    break
+            if not dests:
+                return
+            yield dests
+            self.pause(0)
+
+    def _construct_peer_index_record(self, view_name, timestamp):
+        peer_manager = self._core_service.peer_manager
+        entries = [mrtlib.MrtPeer(self._core_service.router_id, '0.0.0.0',
+                                  self._core_service.asn)]
+        peer_index = {None: LOCAL_PEER_INDEX}
+        for peer in peer_manager.iterpeers:
+            if peer.in_established():
+                bgp_id = peer.protocol.recv_open_msg.bgp_identifier
+            else:
+                bgp_id = '0.0.0.0'
+            peer_index[peer] = len(entries)
+            entries.append(mrtlib.MrtPeer(bgp_id, peer.ip_address,
+                                          peer.remote_as))
+
+        message = mrtlib.TableDump2PeerIndexTableMrtMessage(
+            bgp_id=self._core_service.router_id,
+            peer_entries=entries,
+            view_name=view_name)
+        record = mrtlib.TableDump2MrtRecord(message, timestamp=timestamp)
+        return record, peer_index
+
+    def _construct_path_attributes(self, path):
+        pattrs = path.pathattr_map
+        pattrs.pop(BGP_ATTR_TYPE_MP_UNREACH_NLRI, None)
+        if path.route_family == RF_IPv4_UC:
+            pattrs.pop(BGP_ATTR_TYPE_MP_REACH_NLRI, None)
+            if BGP_ATTR_TYPE_NEXT_HOP not in pattrs:
+                pattrs[BGP_ATTR_TYPE_NEXT_HOP] = BGPPathAttributeNextHop(
+                    path.nexthop)
+        else:
+            # Replaces MP_REACH_NLRI of the UPDATE, which may have the
+            # other NLRIs, with the one of only this route.
+            pattrs.pop(BGP_ATTR_TYPE_NEXT_HOP, None)
+            pattrs[BGP_ATTR_TYPE_MP_REACH_NLRI] = \
+                BGPPathAttributeMpReachNLRI(
+                    path.route_family.afi, path.route_family.safi,
+                    path.nexthop, [path.nlri])
+        return list(pattrs.values())
+
+    def _construct_rib_record(self, seq_num, dest, peer_index, timestamp):
+        entries = []
+        for path in dest.known_path_list:
+            index = peer_index.get(path.source)
+            if index is None:
+                # Learned from a peer added after PEER_INDEX_TABLE
+                continue
+            entries.append(mrtlib.MrtRibEntry(
+                index, timestamp, self._construct_path_attributes(path)))
+        if not entries:
+            return None
+
+        route_family = dest.known_path_list[0].route_family
+        msg_cls = _RIB_MESSAGES.get(route_family)
+        if msg_cls is not None:
+            message = msg_cls(seq_num, dest.nlri, entries)
+        else:
+            message = mrtlib.TableDump2RibGenericMrtMessage(
+                seq_num, route_family.afi, route_family.safi, dest.nlri,
+                entries)
+        return mrtlib.TableDump2MrtRecord(message, timestamp=timestamp)
+
+    def _construct_bgp4mp_record(self, peer, update, timestamp, sent):
+        if sent:
+            msg_cls = mrtlib.Bgp4MpMessageAs4LocalMrtMessage
+        else:
+            msg_cls = mrtlib.Bgp4MpMessageAs4MrtMessage
+
+        peer_ip = peer.ip_address
+        local_ip = peer.host_bind_ip
+        if local_ip is None or \
+                ip.valid_ipv4(peer_ip) != ip.valid_ipv4(local_ip):
+            local_ip = '0.0.0.0' if ip.valid_ipv4(peer_ip) else '::'
+
+        message = msg_cls(peer_as=peer.remote_as,
+                          local_as=peer.local_as or self._core_service.asn,
+                          if_index=0,
+                          peer_ip=peer_ip,
+                          local_ip=local_ip,
+                          bgp_message=update)
+        return mrtlib.Bgp4MpMrtRecord(message, timestamp=int(timestamp))
+
+
+def _rib_entry_update(route_family, nlri, entry):
+    # Constructs an UPDATE message which advertises the RIB entry.
+    pattrs = OrderedDict((a.type, a) for a in entry.bgp_attributes)
+    pattrs.pop(BGP_ATTR_TYPE_MP_UNREACH_NLRI, None)
+    mp_reach = pattrs.pop(BGP_ATTR_TYPE_MP_REACH_NLRI, None)
+    if route_family == RF_IPv4_UC:
+        return BGPUpdate(path_attributes=list(pattrs.values()), nlri=[nlri])
+    if mp_reach is None:
+        return None
+    # Note: The RIB entries of the files written by the other
+    # implementations may have MP_REACH_NLRI of the abbreviated form
+    # without NLRI, so reconstructs it with the NLRI of the record.
+    pattrs.pop(BGP_ATTR_TYPE_NEXT_HOP, None)
+    pattrs[BGP_ATTR_TYPE_MP_REACH_NLRI] = BGPPathAttributeMpReachNLRI(
+        route_family.afi, route_family.safi, mp_reach.next_hop, [nlri])
+    return BGPUpdate(path_attributes=list(pattrs.values()))
+
+
+def _update_routes(update):
+    # Yields the route family, the NLRI, the next hop and whether it is
+    # withdrawn of each route in the UPDATE message.
+    next_hop = update.get_path_attr(BGP_ATTR_TYPE_NEXT_HOP)
+    for nlri in update.nlri:
+        yield RF_IPv4_UC, nlri, next_hop and next_hop.value, False
+    for nlri in update.withdrawn_routes:
+        yield RF_IPv4_UC, nlri, None, True
+    mp_reach = update.get_path_attr(BGP_ATTR_TYPE_MP_REACH_NLRI)
+    if mp_reach is not None:
+        for nlri in mp_reach.nlri:
+            yield mp_reach.route_family, nlri, mp_reach.next_hop, False
+    mp_unreach = update.get_path_attr(BGP_ATTR_TYPE_MP_UNREACH_NLRI)
+    if mp_unreach is not None:
+        for nlri in mp_unreach.withdrawn_routes:
+            yield mp_unreach.route_family, nlri, None, True
+
+
+class MrtReplayer(object):
+    """Replays the routes in MRT records into the BGP speaker.
+
+    The routes are taken from TABLE_DUMP_V2 RIB records and from the
+    UPDATE messages in BGP4MP records, e.g., of the RouteViews or RIPE
+    RIS archives, and given to replay() as decoded mrtlib.MrtRecord
+    instances in the order of the file, e.g., by mrtbatch.BatchReader.
+
+    If *neighbor* is None, the routes are learned as the local routes
+    with their path attributes, in the same way as BGPSpeaker.prefix_add.
+    Only IPv4 and IPv6 unicast routes are replayed in this mode.
+    Otherwise, the routes are injected as UPDATE messages received from
+    the neighbor of the given address, which must be established, and go
+    through its filters and the best path selection as usual.
+
+    *rate* limits the number of the replayed routes per second. If it is
+    None, the routes are replayed as fast as possible, yielding to the
+    other threads every REPLAY_BATCH_SIZE routes.
+
+    *peer_index* selects the RIB entry of the peer at the given index of
+    PEER_INDEX_TABLE for each prefix. By default, the first entry is
+    used. The BGP4MP records are replayed regardless of it.
+    """
+
+    def __init__(self, core_service, neighbor=None, rate=None,
+                 peer_index=None):
+        self._core_service = core_service
+        self._peer = None
+        if neighbor is not None:
+            self._peer = core_service.peer_manager.get_by_addr(neighbor)
+            if self._peer is None or not self._peer.in_established():
+                raise ValueError('Neighbor %s is not established' % neighbor)
+        self.rate = rate
+        self.peer_index = peer_index
+        self.replayed = 0
+
+    def _record_updates(self, record):
+        msg = record.message
+        if isinstance(msg, mrtlib.Bgp4MpMessageMrtMessage):
+            if isinstance(msg.bgp_message, BGPUpdate):
+                yield msg.bgp_message
+            return
+        elif isinstance(msg, mrtlib.TableDump2RibGenericMrtMessage):
+            route_family = bgp.get_rf(msg.afi, msg.safi)
+            nlri = msg.nlri
+        elif isinstance(msg, mrtlib.TableDump2RibIPv4UnicastMrtMessage):
+            route_family = RF_IPv4_UC
+            nlri = msg.prefix
+        elif isinstance(msg, mrtlib.TableDump2RibIPv6UnicastMrtMessage):
+            route_family = RF_IPv6_UC
+            nlri = msg.prefix
+        else:
+            return
+        for entry in msg.rib_entries:
+            if self.peer_index is None or entry.peer_index == self.peer_index:
+                update = _rib_entry_update(route_family, nlri, entry)
+                if update is not None:
+                    yield update
+                return
+
+    def _learn_local(self, update):
+        # Learns the routes in the UPDATE message as the local routes.
+        count = 0
+        pattrs = OrderedDict(
+            (a.type, a) for a in update.path_attributes
+            if a.type not in (BGP_ATTR_TYPE_NEXT_HOP,
+                              BGP_ATTR_TYPE_MP_REACH_NLRI,
+                              BGP_ATTR_TYPE_MP_UNREACH_NLRI))
+        table_manager = self._core_service.table_manager
+        for route_family, nlri, next_hop, is_withdraw in \
+                _update_routes(update):
+            path_cls = _LOCAL_PATHS.get(route_family)
+            if path_cls is None or not (is_withdraw or next_hop):
+                continue
+            table_manager.learn_path(path_cls(
+                None, nlri, 1, pattrs=pattrs, nexthop=next_hop,
+                is_withdraw=is_withdraw))
+            count += 1
+        return count
+
+    def _inject(self, update):
+        # Handles the UPDATE message as received from the neighbor.
+        self._peer.handle_msg(update)
+        return sum(1 for _ in _update_routes(update))
+
+    def replay(self, records):
+        """Replays the routes in *records* and returns the number of the
+        replayed routes.
+        """
+        if self._peer is not None:
+            handle = self._inject
+        else:
+            handle = self._learn_local
+        start = time.time()
+        count = 0
+        batch = 0
+        for record in records:
+            for update in self._record_updates(record):
+                n = handle(update)
+                if not n:
+                    continue
+                count += n
+                batch += n
+                self.replayed = count
+                if self.rate:
+                    # Sleeps until the time to replay the next route.
+                    delay = start + count / float(self.rate) - time.time()
+                    if delay > 0:
+                        hub.sleep(delay)
+                elif batch >= REPLAY_BATCH_SIZE:
+                    batch = 0
+                    hub.sleep(0)
+        LOG.info('Replayed %d routes in %.1f seconds',
+                 count, time.time() - start)
+        return count
@@ -28,7 +28,8 @@ class RibBase(Command, RouteFormatterMixin):
 
 class Rib(RibBase):
     help_msg = 'show all routes for address family'
-    param_help_msg = '<address-family>'
+    param_help_msg = ('<address-family> '
+                      '[<prefix> [exact|longest|shorter|longer]]')
     command = 'rib'
 
     def __init__(self, *args, **kwargs):
@@ -37,15 +38,17 @@ class Rib(RibBase):
             'all': self.All}
 
     def action(self, params):
-        if len(params) != 1 or params[0] not in self.supported_families:
+        if (not 1 <= len(params) <= 3 or
+                params[0] not in self.supported_families):
             return WrongParamResp()
         from ryu.services.protocols.bgp.operator.internal_api \
             import WrongParamError
         try:
-            return CommandsResponse(
-                STATUS_OK,
-                self.api.get_single_rib_routes(params[0])
-            )
+            if len(params) == 1:
+                routes = self.api.get_single_rib_routes(params[0])
+            else:
+                routes = self.api.get_single_rib_routes_by_prefix(*params)
+            return CommandsResponse(STATUS_OK, routes)
         except WrongParamError as e:
             return WrongParamResp(e)
 
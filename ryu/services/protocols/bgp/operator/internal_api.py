@@ -1,6 +1,11 @@
 import logging
+import re
 import traceback
 
+import six
+
+from ryu.lib import hub
+from ryu.lib import ip
 from ryu.lib.packet.bgp import RouteFamily
 from ryu.lib.packet.bgp import RF_IPv4_UC
 from ryu.lib.packet.bgp import RF_IPv6_UC
@@ -17,6 +22,7 @@ from ryu.lib.packet.bgp import BGP_ATTR_TYPE_ORIGIN
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_AS_PATH
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MULTI_EXIT_DISC
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_LOCAL_PREF
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_COMMUNITIES
 from ryu.lib.packet.bgp import BGP_ATTR_ORIGIN_IGP
 from ryu.lib.packet.bgp import BGP_ATTR_ORIGIN_EGP
 from ryu.lib.packet.bgp import BGP_ATTR_ORIGIN_INCOMPLETE
@@ -25,6 +31,10 @@ from ryu.services.protocols.bgp.base import add_bgp_error_metadata
 from ryu.services.protocols.bgp.base import BGPSException
 from ryu.services.protocols.bgp.base import SUPPORTED_GLOBAL_RF
 from ryu.services.protocols.bgp.core_manager import CORE_MANAGER
+from ryu.services.protocols.bgp.operator.views.bgp import \
+    ReceivedRouteDetailView
+from ryu.services.protocols.bgp.operator.views.bgp import \
+    SentRouteDetailView
 
 
 LOG = logging.getLogger('bgpspeaker.operator.internal_api')
@@ -32,6 +42,91 @@ LOG = logging.getLogger('bgpspeaker.operator.internal_api')
 INTERNAL_API_ERROR = 100
 INTERNAL_API_SUB_ERROR = 101
 
+# Default number of the routes in a page of the paginated route dumps.
+DEFAULT_PAGE_SIZE = 1000
+
+# Number of the destinations scanned for a page per the page size, which
+# bounds the time of a page with the filters matching few routes.
+PAGE_SCAN_FACTOR = 10
+
+_NEIGHBOR_ROUTE_TYPES = {
+    'received-routes': ('adj_rib_in', ReceivedRouteDetailView),
+    'sent-routes': ('adj_rib_out', SentRouteDetailView),
+}
+
+
+def _prefix_to_int(prefix):
+    # Returns the address width, the address as an integer and the length
+    # of *prefix* given as 'addr/length', or None if it is not IP prefix.
+    addr, _, length = prefix.partition('/')
+    if ip.valid_ipv4(addr):
+        width = 32
+    elif ip.valid_ipv6(addr):
+        width = 128
+    else:
+        return None
+    length = int(length) if length else width
+    if not 0 <= length <= width:
+        return None
+    return width, ip.text_to_int(addr) >> (width - length), length
+
+
+def _path_filter(prefix=None, community=None, as_path=None):
+    """Returns the function which tests if the given path matches all of
+    the given conditions, or None if no condition is given.
+
+    *prefix* matches the paths to the IP prefixes covered by it.
+    *community* matches the paths with the community given as an integer
+    or 'AS:value' string. *as_path* is the regular expression searched in
+    the AS numbers of the AS_PATH joined by spaces, e.g., '^65001 '.
+    """
+    conds = []
+    if prefix is not None:
+        key = _prefix_to_int(prefix)
+        if key is None:
+            raise WrongParamError('Invalid prefix: %s' % prefix)
+        width, addr, length = key
+
+        def _match_prefix(path):
+            path_key = _prefix_to_int(getattr(path.nlri, 'prefix', ''))
+            if path_key is None or path_key[0] != width:
+                return False
+            return (path_key[2] >= length and
+                    path_key[1] >> (path_key[2] - length) == addr)
+        conds.append(_match_prefix)
+
+    if community is not None:
+        try:
+            if isinstance(community, six.string_types) and ':' in community:
+                high, low = community.split(':')
+                community = int(high) << 16 | int(low)
+            else:
+                community = int(community)
+        except ValueError:
+            raise WrongParamError('Invalid community: %s' % community)
+
+        def _match_community(path):
+            comm = path.get_pattr(BGP_ATTR_TYPE_COMMUNITIES)
+            return comm is not None and community in comm.communities
+        conds.append(_match_community)
+
+    if as_path is not None:
+        try:
+            as_path_re = re.compile(as_path)
+        except re.error as e:
+            raise WrongParamError('Invalid AS_PATH regex: %s' % e)
+
+        def _match_as_path(path):
+            aspath = path.get_pattr(BGP_ATTR_TYPE_AS_PATH)
+            segs = aspath.path_seg_list if aspath else []
+            return as_path_re.search(
+                ' '.join(str(asn) for seg in segs for asn in seg)) is not None
+        conds.append(_match_as_path)
+
+    if not conds:
+        return None
+    return lambda path: all(cond(path) for cond in conds)
+
 
 class InternalApi(object):
 
@@ -83,6 +178,53 @@ class InternalApi(object):
         return CORE_MANAGER.get_core_service().table_manager.get_vrf_tables()
 
     def get_single_rib_routes(self, addr_family):
+        gtable = self._get_global_table(addr_family)
+        if gtable is not None:
+            return [self._dst_to_dict(dst)
+                    for dst in sorted(gtable.values())]
+        else:
+            return []
+
+    def get_single_rib_routes_by_prefix(self, addr_family, prefix,
+                                        match='exact'):
+        """Returns the routes of the given IP prefix in the global table.
+
+        *match* selects the routes to return.
+
+        ========= ==================================================
+        match     Routes
+        ========= ==================================================
+        exact     The route of *prefix*
+        longest   The route of the longest prefix covering *prefix*
+        shorter   The routes of the prefixes covering *prefix*
+        longer    The routes of the prefixes covered by *prefix*
+        ========= ==================================================
+        """
+        gtable = self._get_global_table(addr_family)
+        if gtable is None:
+            return []
+        try:
+            if match == 'exact':
+                dsts = [gtable.get_exact_match(prefix)]
+            elif match == 'longest':
+                dsts = [gtable.get_longest_match(prefix)]
+            elif match == 'shorter':
+                dsts = list(gtable.get_covering(prefix))
+            elif match == 'longer':
+                dsts = list(gtable.get_covered(prefix))
+            else:
+                raise WrongParamError('Unknown match type: %s' % match)
+        except ValueError as e:
+            raise WrongParamError(str(e))
+        return [self._dst_to_dict(dst) for dst in dsts if dst is not None]
+
+    def _get_global_table(self, addr_family):
+        rf = self._get_route_family(addr_family)
+        table_manager = self.get_core_service().table_manager
+        return table_manager.get_global_table_by_route_family(rf)
+
+    @staticmethod
+    def _get_route_family(addr_family):
         rfs = {
             'ipv4': RF_IPv4_UC,
             'ipv6': RF_IPv6_UC,
@@ -100,16 +242,184 @@ class InternalApi(object):
             raise WrongParamError('Unknown or unsupported family: %s' %
                                   addr_family)
 
-        rf = rfs.get(addr_family)
-        table_manager = self.get_core_service().table_manager
-        gtable = table_manager.get_global_table_by_route_family(rf)
-        if gtable is not None:
-            return [self._dst_to_dict(dst)
-                    for dst in sorted(gtable.values())]
+        return rfs.get(addr_family)
+
+    def get_rib_routes_page(self, addr_family, cursor=None,
+                            limit=DEFAULT_PAGE_SIZE, prefix=None,
+                            community=None, as_path=None):
+        """Returns a page of the routes in the global table.
+
+        The routes are returned in the order of the prefixes as a dict
+        of 'routes', the list of up to *limit* routes formatted same as
+        get_single_rib_routes(), and 'next', the cursor to pass to get
+        the next page, which is None if the walk has finished. A page may
+        have less than *limit* routes before the walk finishes, because
+        a page scans a bounded number of the destinations.
+
+        The routes are filtered by *prefix*, *community* and *as_path*
+        during the walk, and only the paths matching all of them are
+        returned. See _path_filter() for details.
+        """
+        gtable = self._get_global_table(addr_family)
+        if gtable is None:
+            return {'routes': [], 'next': None}
+        return self._get_table_routes_page(gtable, cursor, limit,
+                                           prefix, community, as_path)
+
+    def get_vrf_routes_page(self, vrf_id, vrf_rf, cursor=None,
+                            limit=DEFAULT_PAGE_SIZE, prefix=None,
+                            community=None, as_path=None):
+        """Returns a page of the routes in the VRF table.
+
+        See get_rib_routes_page() for the parameters and the result.
+        """
+        vrf = self._get_vrf_table(vrf_id, vrf_rf)
+        if not vrf:
+            raise WrongParamError('wrong vpn name %s' % str((vrf_id, vrf_rf)))
+        return self._get_table_routes_page(vrf, cursor, limit,
+                                           prefix, community, as_path)
+
+    def get_neighbor_routes_page(self, route_type, address,
+                                 addr_family='all', cursor=None,
+                                 limit=DEFAULT_PAGE_SIZE, prefix=None,
+                                 community=None, as_path=None):
+        """Returns a page of the routes received from ('received-routes')
+        or sent to ('sent-routes') the given neighbor.
+
+        The routes are formatted same as "show neighbor received-routes"
+        command. See get_rib_routes_page() for the other parameters and
+        the result.
+        """
+        if route_type not in _NEIGHBOR_ROUTE_TYPES:
+            raise WrongParamError('Unknown route type: %s' % route_type)
+        rib_name, view_cls = _NEIGHBOR_ROUTE_TYPES[route_type]
+        if addr_family == 'all':
+            rf = None
         else:
-            return []
+            rf = self._get_route_family(addr_family)
+        peer = self.get_core_service().peer_manager.get_by_addr(address)
+        if peer is None:
+            raise WrongParamError('Unknown neighbor: %s' % address)
+        self._check_page_limit(limit)
+        match = _path_filter(prefix, community, as_path)
+
+        rib = getattr(peer, rib_name)
+
+        def _items():
+            for key in rib.keys_after(cursor):
+                route = rib.get(key)
+                if route is None:
+                    # Removed while walking
+                    yield key, None
+                    continue
+                path = route.path
+                if ((rf is not None and path.route_family != rf) or
+                        (match is not None and not match(path))):
+                    yield key, None
+                    continue
+                yield key, view_cls(route).encode()
+
+        try:
+            return self._get_routes_page(_items(), limit)
+        except (TypeError, ValueError) as e:
+            # Invalid cursor
+            raise WrongParamError(str(e))
+
+    def iter_rib_routes(self, addr_family, page_size=DEFAULT_PAGE_SIZE,
+                        **filters):
+        """Yields the routes in the global table.
+
+        The routes are dumped page by page with get_rib_routes_page(),
+        yielding to the other threads between the pages, so that the
+        table is walked without blocking the route processing.
+        """
+        return self._iter_routes(self.get_rib_routes_page, addr_family,
+                                 limit=page_size, **filters)
+
+    def iter_vrf_routes(self, vrf_id, vrf_rf, page_size=DEFAULT_PAGE_SIZE,
+                        **filters):
+        """Yields the routes in the VRF table.
+
+        See iter_rib_routes() for details.
+        """
+        return self._iter_routes(self.get_vrf_routes_page, vrf_id, vrf_rf,
+                                 limit=page_size, **filters)
+
+    def iter_neighbor_routes(self, route_type, address, addr_family='all',
+                             page_size=DEFAULT_PAGE_SIZE, **filters):
+        """Yields the routes received from or sent to the given neighbor.
+
+        See iter_rib_routes() for details.
+        """
+        return self._iter_routes(self.get_neighbor_routes_page, route_type,
+                                 address, addr_family=addr_family,
+                                 limit=page_size, **filters)
+
+    @staticmethod
+    def _iter_routes(get_page, *args, **kwargs):
+        # Validates the parameters before the first iteration.
+        page = get_page(*args, **kwargs)
+
+        def _iter(page):
+            while True:
+                for route in page['routes']:
+                    yield route
+                if page['next'] is None:
+                    return
+                hub.sleep(0)
+                page = get_page(*args, cursor=page['next'], **kwargs)
+
+        return _iter(page)
+
+    def _get_table_routes_page(self, table, cursor, limit,
+                               prefix, community, as_path):
+        self._check_page_limit(limit)
+        # The IP tables walk only the covered prefixes with their index.
+        indexed = prefix is not None and table.PREFIX_BITS is not None
+        match = _path_filter(None if indexed else prefix,
+                             community, as_path)
+
+        def _items():
+            for key, dst in table.items_after(
+                    cursor, prefix=prefix if indexed else None):
+                paths = dst.known_path_list
+                if match is not None:
+                    paths = [p for p in paths if match(p)]
+                    if not paths:
+                        yield key, None
+                        continue
+                yield key, self._dst_to_dict(dst, paths)
+
+        try:
+            return self._get_routes_page(_items(), limit)
+        except ValueError as e:
+            # Invalid cursor or prefix
+            raise WrongParamError(str(e))
+
+    @staticmethod
+    def _get_routes_page(items, limit):
+        # Collects up to *limit* routes from the pairs of the key and the
+        # route, which is None if filtered out, scanning a bounded number
+        # of them.
+        routes = []
+        key = None
+        scanned = 0
+        for key, route in items:
+            scanned += 1
+            if route is not None:
+                routes.append(route)
+            if len(routes) >= limit or scanned >= limit * PAGE_SCAN_FACTOR:
+                break
+        else:
+            key = None
+        return {'routes': routes, 'next': key}
+
+    @staticmethod
+    def _check_page_limit(limit):
+        if not isinstance(limit, six.integer_types) or limit <= 0:
+            raise WrongParamError('Invalid page size: %s' % limit)
 
-    def _dst_to_dict(self, dst):
+    def _dst_to_dict(self, dst, paths=None):
         ret = {'paths': [],
                'prefix': dst.nlri_str}
 
@@ -161,7 +471,9 @@ class InternalApi(object):
                     'origin': origin,
                     'localpref': localpref}
 
-        for path in dst.known_path_list:
+        if paths is None:
+            paths = dst.known_path_list
+        for path in paths:
             ret['paths'].append(_path_to_dict(dst, path))
 
         return ret
@@ -38,6 +38,7 @@ from ryu.services.protocols.bgp.rtconf.neighbors import NeighborConfListener
 from ryu.services.protocols.bgp.rtconf.neighbors import CONNECT_MODE_PASSIVE
 from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
 from ryu.services.protocols.bgp.speaker import BgpProtocol
+from ryu.services.protocols.bgp.speaker import BGP_MAX_MSG_LEN
 from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
 from ryu.services.protocols.bgp.info_base.vpnv6 import Vpnv6Path
@@ -45,6 +46,7 @@ from ryu.services.protocols.bgp.rtconf.vrfs import VRF_RF_IPV4, VRF_RF_IPV6
 from ryu.services.protocols.bgp.utils import bgp as bgp_utils
 from ryu.services.protocols.bgp.utils.evtlet import EventletIOFactory
 from ryu.services.protocols.bgp.utils import stats
+from ryu.services.protocols.bgp.utils.sorteddict import SortedKeyDict
 from ryu.services.protocols.bgp.utils.validation import is_valid_old_asn
 
 from ryu.lib.packet import bgp
@@ -106,6 +108,10 @@ from ryu.lib.packet import safi as subaddr_family
 
 LOG = logging.getLogger('bgpspeaker.peer')
 
+# Maximum number of the successive outgoing routes which are packed into
+# UPDATE messages at once.
+MAX_OUTGOING_ROUTES_PER_SEND = 1024
+
 
 def is_valid_state(state):
     """Returns True if given state is a valid bgp finite state machine state.
@@ -366,10 +372,11 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         self._out_filters = self._neigh_conf.out_filter
 
         # Adj-rib-in
-        self._adj_rib_in = {}
+        # Keys are kept sorted to dump the routes page by page.
+        self._adj_rib_in = SortedKeyDict()
 
         # Adj-rib-out
-        self._adj_rib_out = {}
+        self._adj_rib_out = SortedKeyDict()
 
         # attribute maps
         self._attribute_maps = {}
@@ -484,6 +491,32 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
         self._attribute_maps[key] = _attr_maps
         self.on_update_attribute_maps()
 
+    def update_group_key(self):
+        """Returns the key of the outbound policy and the capabilities of
+        this peer, which determine the UPDATE messages sent to this peer.
+
+        The peers of the same key share an update group.
+        """
+        attribute_maps = sorted(
+            (label, repr(maps.get(const.ATTR_MAPS_ORG_KEY)))
+            for label, maps in self._attribute_maps.items())
+        return (
+            self.is_route_server_client,
+            self.is_route_reflector_client,
+            self.is_ebgp_peer(),
+            self.local_as,
+            self._common_conf.router_id,
+            self._common_conf.cluster_id,
+            self._common_conf.local_pref,
+            self._neigh_conf.next_hop or self.host_bind_ip,
+            self._neigh_conf.is_next_hop_self,
+            self._neigh_conf.multi_exit_disc,
+            tuple(self._neigh_conf.soo_list or ()),
+            self.is_four_octet_as_number_cap_valid(),
+            repr(self._out_filters),
+            tuple(attribute_maps),
+        )
+
     def is_mpbgp_cap_valid(self, route_family):
         if not self.in_established:
             raise ValueError('Invalid request: Peer not in established state')
@@ -706,41 +739,81 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
                               self._enqueue_eor_msg, rr_msg)
             LOG.debug('Enhanced RR max. EOR timer set.')
 
-    def _send_outgoing_route(self, outgoing_route):
-        """Constructs `Update` message from given `outgoing_route` and sends
-        it to peer.
+    def _send_outgoing_routes(self, outgoing_routes):
+        """Constructs `Update` messages from given `outgoing_routes` and sends
+        them to peer.
 
-        Also, checks if any policies prevent sending this message.
+        Also, checks if any policies prevent sending these routes.
         Populates Adj-RIB-out with corresponding `SentRoute`.
+        The routes which have the same path attributes are packed into
+        the same `Update` messages.
         """
+        # The filters and the update messages are shared with the peers
+        # of the same outbound policy.
+        update_group = self._peer_manager.get_update_group(self)
+        updates = []
+        pack_keys = []
+        sent_routes = []
+        nlri_strs = set()
+        for outgoing_route in outgoing_routes:
+            path = outgoing_route.path
+            nlri_str = path.nlri.formatted_nlri_str
+            if nlri_str in nlri_strs:
+                # Sends the former routes first not to reorder the updates
+                # for the same prefix by packing.
+                self._send_updates(updates, pack_keys, sent_routes)
+                updates = []
+                pack_keys = []
+                sent_routes = []
+                nlri_strs = set()
+            nlri_strs.add(nlri_str)
+
+            block, update, pack_key = update_group.get_update(
+                self, outgoing_route)
+            sent_route = SentRoute(path, self, block)
+            self._adj_rib_out[nlri_str] = sent_route
+            self._signal_bus.adj_rib_out_changed(self, sent_route)
 
-        path = outgoing_route.path
-        block, blocked_cause = self._apply_out_filter(path)
+            if not block:
+                updates.append(update)
+                pack_keys.append(pack_key)
+
+            # We have to create sent_route for every OutgoingRoute which is
+            # not a withdraw or was for route-refresh msg.
+            if (not path.is_withdraw and
+                    not outgoing_route.for_route_refresh):
+                sent_routes.append(sent_route)
 
-        nlri_str = outgoing_route.path.nlri.formatted_nlri_str
-        sent_route = SentRoute(outgoing_route.path, self, block)
-        self._adj_rib_out[nlri_str] = sent_route
-        self._signal_bus.adj_rib_out_changed(self, sent_route)
+        self._send_updates(updates, pack_keys, sent_routes)
 
-        # TODO(PH): optimized by sending several prefixes per update.
-        # Construct and send update message.
-        if not block:
-            update_msg = self._construct_update(outgoing_route)
+    def _send_updates(self, updates, pack_keys, sent_routes):
+        for update_msg in bgp_utils.pack_updates(updates, BGP_MAX_MSG_LEN,
+                                                 pack_keys):
             self._protocol.send(update_msg)
             # Collect update statistics.
             self.state.incr(PeerCounterNames.SENT_UPDATES)
-        else:
-            LOG.debug('prefix : %s is not sent by filter : %s',
-                      path.nlri, blocked_cause)
-
-        # We have to create sent_route for every OutgoingRoute which is
-        # not a withdraw or was for route-refresh msg.
-        if (not outgoing_route.path.is_withdraw and
-                not outgoing_route.for_route_refresh):
-            # Update the destination with new sent route.
-            tm = self._core_service.table_manager
+
+        # Update the destination with new sent route.
+        tm = self._core_service.table_manager
+        for sent_route in sent_routes:
             tm.remember_sent_route(sent_route)
 
+    def _pop_outgoing_routes(self, outgoing_route):
+        """Pops the successive `OutgoingRoute`s following the given
+        `outgoing_route` from the outgoing message list.
+        """
+        outgoing_routes = [outgoing_route]
+        while len(outgoing_routes) < MAX_OUTGOING_ROUTES_PER_SEND:
+            outgoing_msg = self.outgoing_msg_list.pop_first()
+            if outgoing_msg is None:
+                break
+            if not isinstance(outgoing_msg, OutgoingRoute):
+                # Keeps the order of the other messages.
+                self.outgoing_msg_list.prepend(outgoing_msg)
+                break
+            outgoing_routes.append(outgoing_msg)
+        return outgoing_routes
+
     def _process_outgoing_msg_list(self):
         while True:
             outgoing_msg = None
@@ -766,7 +839,8 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             if isinstance(outgoing_msg, BGPRouteRefresh):
                 self._send_outgoing_route_refresh_msg(outgoing_msg)
             elif isinstance(outgoing_msg, OutgoingRoute):
-                self._send_outgoing_route(outgoing_msg)
+                self._send_outgoing_routes(
+                    self._pop_outgoing_routes(outgoing_msg))
 
             # EOR are enqueued as plain Update messages.
             elif isinstance(outgoing_msg, BGPUpdate):
@@ -1191,7 +1265,9 @@ class Peer(Source, Sink, NeighborConfListener, Activity):
             if path_extcomm_attr:
                 # SOO list can be configured per VRF and/or per Neighbor.
                 # NeighborConf has this setting we add this to existing list.
-                communities = path_extcomm_attr.communities
+                # Note: Copies the list because the path attributes are
+                # shared with the other paths.
+                communities = list(path_extcomm_attr.communities)
                 if self._neigh_conf.soo_list:
                     # construct extended community
                     soo_list = self._neigh_conf.soo_list
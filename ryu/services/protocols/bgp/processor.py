@@ -17,7 +17,9 @@
 """
 
 import logging
+import time
 
+from ryu.lib import ip
 from ryu.services.protocols.bgp.base import Activity
 from ryu.services.protocols.bgp.base import add_bgp_error_metadata
 from ryu.services.protocols.bgp.base import BGP_PROCESSOR_ERROR_CODE
@@ -63,6 +65,15 @@ class BgpProcessor(Activity):
     # Max. number of destinations processed per cycle.
     MAX_DEST_PROCESSED_PER_CYCLE = 100
 
+    # Bounds of the number of destinations processed per cycle when it is
+    # adapted to the queue depth and the processing time.
+    MIN_ADAPTIVE_DEST_PROCESSED_PER_CYCLE = 10
+    MAX_ADAPTIVE_DEST_PROCESSED_PER_CYCLE = 10000
+
+    # Target time (in seconds) of a processing cycle, i.e., the max. latency
+    # of the other greenthreads while destinations are processed.
+    DEST_PROCESS_CYCLE_TIME = 0.05
+
     #
     # DestQueue
     #
@@ -75,12 +86,20 @@ class BgpProcessor(Activity):
         prev_attr_name='prev_dest_to_process')
 
     def __init__(self, core_service, work_units_per_cycle=None):
+        """Initializes the processor.
+
+        If `work_units_per_cycle` is given, the number of destinations
+        processed per cycle is fixed to it. Otherwise, it starts from
+        MAX_DEST_PROCESSED_PER_CYCLE and is adapted so that a cycle takes
+        about DEST_PROCESS_CYCLE_TIME while the queue is deep.
+        """
         Activity.__init__(self)
         # Back pointer to core service instance that created this processor.
         self._core_service = core_service
         self._dest_queue = BgpProcessor._DestQueue()
         self._rtdest_queue = BgpProcessor._DestQueue()
         self.dest_que_evt = EventletIOFactory.create_custom_event()
+        self.adaptive = work_units_per_cycle is None
         self.work_units_per_cycle =\
             work_units_per_cycle or BgpProcessor.MAX_DEST_PROCESSED_PER_CYCLE
 
@@ -96,7 +115,13 @@ class BgpProcessor(Activity):
             # We then process a batch of other destinations (we do not process
             # all destination here as we want to give change to other
             # greenthread to run)
-            self._process_dest()
+            if self.adaptive:
+                start = time.time()
+                dest_processed = self._process_dest(
+                    deadline=start + BgpProcessor.DEST_PROCESS_CYCLE_TIME)
+                self._adapt_work_units(dest_processed, time.time() - start)
+            else:
+                self._process_dest()
 
             if self._dest_queue.is_empty():
                 # If we have no destinations queued for processing, we wait.
@@ -105,7 +130,7 @@ class BgpProcessor(Activity):
             else:
                 self.pause(0)
 
-    def _process_dest(self):
+    def _process_dest(self, deadline=None):
         dest_processed = 0
         LOG.debug('Processing destination...')
         while (dest_processed < self.work_units_per_cycle and
@@ -115,6 +140,39 @@ class BgpProcessor(Activity):
             if next_dest:
                 next_dest.process()
                 dest_processed += 1
+                if deadline is not None and time.time() > deadline:
+                    break
+        return dest_processed
+
+    def _adapt_work_units(self, dest_processed, elapsed):
+        """Adapts the number of destinations processed per cycle.
+
+        The batch is scaled to DEST_PROCESS_CYCLE_TIME according to the
+        time taken by the last cycle. It grows only while the queue is
+        deeper than the batch, and shrinks whenever the cycle took too
+        long. A cycle is also cut short at DEST_PROCESS_CYCLE_TIME, so
+        that a sudden increase of the processing time does not block
+        the other greenthreads for the whole batch.
+        """
+        target = BgpProcessor.DEST_PROCESS_CYCLE_TIME
+        work_units = self.work_units_per_cycle
+        if elapsed > target:
+            work_units = int(round(dest_processed * target / elapsed))
+        elif (dest_processed >= work_units and
+              not self._dest_queue.is_empty()):
+            # Grow at most twice per cycle to follow the changes of load.
+            work_units *= 2
+            if elapsed > 0:
+                work_units = min(work_units,
+                                 int(round(dest_processed * target / elapsed)))
+        else:
+            return
+
+        self.work_units_per_cycle = max(
+            BgpProcessor.MIN_ADAPTIVE_DEST_PROCESSED_PER_CYCLE,
+            min(work_units, BgpProcessor.MAX_ADAPTIVE_DEST_PROCESSED_PER_CYCLE))
+        LOG.debug('Destinations processed per cycle: %d',
+                  self.work_units_per_cycle)
 
     def _process_rtdest(self):
         LOG.debug('Processing RT NLRI destination...')
@@ -173,6 +231,13 @@ BPR_IGP_COST = 'IGP Cost'
 BPR_ROUTER_ID = 'Router ID'
 BPR_CLUSTER_LIST = 'Cluster List'
 
+# Preference of the ORIGIN attribute values, the greater is preferred.
+_ORIGIN_PREF = {
+    BGP_ATTR_ORIGIN_IGP: 3,
+    BGP_ATTR_ORIGIN_EGP: 2,
+    BGP_ATTR_ORIGIN_INCOMPLETE: 1,
+}
+
 
 def _compare_by_version(path1, path2):
     """Returns the current/latest learned path.
@@ -265,6 +330,117 @@ def compute_best_path(local_asn, path1, path2):
     return best_path, best_path_reason
 
 
+# Reasons corresponding to the elements of the key of best_path_key().
+_BEST_PATH_KEY_REASONS = (
+    BPR_LOCAL_PREF,
+    BPR_LOCAL_ORIGIN,
+    BPR_ASPATH,
+    BPR_ORIGIN,
+    BPR_MED,
+    BPR_ASN,
+    BPR_ROUTER_ID,
+    BPR_CLUSTER_LIST,
+)
+
+
+def best_path_key(local_asn, path):
+    """Returns the key of the given path for best path selection.
+
+    The key is a tuple of the values compared in the steps of
+    `compute_best_path`, and the greater key is the better path.
+    The steps which are not supported (reachable next hop, weight and
+    IGP cost) are omitted.
+    The first element is LOCAL_PREF or None if the path has no
+    LOCAL_PREF, in which case local-pref is not compared.
+    """
+    source = path.source
+    local_pref = path.get_pattr(BGP_ATTR_TYPE_LOCAL_PREF)
+    if local_pref:
+        local_pref = local_pref.value
+    else:
+        local_pref = None
+
+    as_path = path.get_pattr(BGP_ATTR_TYPE_AS_PATH)
+    assert as_path
+    as_path_len = as_path.get_as_path_len()
+    assert as_path_len is not None
+
+    origin = path.get_pattr(BGP_ATTR_TYPE_ORIGIN)
+    assert origin is not None
+    origin_pref = _ORIGIN_PREF.get(origin.value)
+    if origin_pref is None:
+        LOG.error('Invalid origin value encountered %s.', origin)
+        origin_pref = 0
+
+    med = path.get_pattr(BGP_ATTR_TYPE_MULTI_EXIT_DISC)
+    med = med.value if med else 0
+
+    asn = getattr(source, 'remote_as', local_asn)
+    is_ebgp = asn != local_asn
+
+    # Router ID is compared only between iBGP paths received from peers.
+    # The paths from NC are already selected by the local origin.
+    router_id = 0
+    if not is_ebgp and hasattr(source, 'protocol'):
+        originator_id = path.get_pattr(BGP_ATTR_TYPE_ORIGINATOR_ID)
+        if originator_id:
+            router_id = originator_id.value
+        else:
+            router_id = source.protocol.recv_open_msg.bgp_identifier
+        # Lower router ID is preferred.
+        router_id = -ip.ipv4_to_int(router_id)
+
+    cluster_list = path.get_pattr(BGP_ATTR_TYPE_CLUSTER_LIST)
+    cluster_list_len = len(cluster_list.value) if cluster_list else 0
+
+    return (local_pref,
+            source is None,
+            -as_path_len,
+            origin_pref,
+            -med,
+            is_ebgp,
+            router_id,
+            -cluster_list_len)
+
+
+def _best_path_key_reason(key1, key2):
+    for reason, value1, value2 in zip(_BEST_PATH_KEY_REASONS, key1, key2):
+        if value1 != value2 and value1 is not None and value2 is not None:
+            return reason
+    return BPR_UNKNOWN
+
+
+def select_best_path(local_asn, paths):
+    """Selects the best path among the given paths.
+
+    Returns the same best path and reason as comparing the first path
+    with the following paths one by one with `compute_best_path`, i.e.,
+    the earlier path is kept on a tie, and the reason is of the last
+    comparison.
+    The keys of the paths are computed by `best_path_key` only once and
+    cached on the paths.
+    """
+    if len(paths) == 1:
+        return paths[0], BPR_ONLY_PATH
+
+    best_path = paths[0]
+    best_key = best_path.get_best_path_key(local_asn)
+    key = best_key
+    for path in paths[1:]:
+        key = path.get_best_path_key(local_asn)
+        if best_key[0] is None or key[0] is None:
+            # Local-pref is not compared if either path has no LOCAL_PREF.
+            is_better = key[1:] > best_key[1:]
+        else:
+            is_better = key > best_key
+        prev_key = best_key
+        if is_better:
+            best_path = path
+            best_key = key
+
+    return best_path, _best_path_key_reason(prev_key, key)
+
+
 def _cmp_by_reachable_nh(path1, path2):
     """Compares given paths and selects best path based on reachable next-hop.
 
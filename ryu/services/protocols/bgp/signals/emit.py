@@ -8,6 +8,8 @@ class BgpSignalBus(SignalBus):
     BGP_VRF_ADDED = ('core', 'vrf', 'added')
     BGP_NOTIFICATION_RECEIVED = ('bgp', 'notification_received')
     BGP_NOTIFICATION_SENT = ('bgp', 'notification_sent')
+    BGP_UPDATE_RECEIVED = ('bgp', 'update_received')
+    BGP_UPDATE_SENT = ('bgp', 'update_sent')
     BGP_VRF_STATS_CONFIG_CHANGED = (
         'core', 'vrf', 'config', 'stats', 'changed'
     )
@@ -35,6 +37,16 @@ class BgpSignalBus(SignalBus):
             notification
         )
 
+    def bgp_update_received(self, peer, update):
+        return self.emit_signal(
+            self.BGP_UPDATE_RECEIVED,
+            {'peer': peer, 'update': update})
+
+    def bgp_update_sent(self, peer, update):
+        return self.emit_signal(
+            self.BGP_UPDATE_SENT,
+            {'peer': peer, 'update': update})
+
     def dest_changed(self, dest):
         return self.emit_signal(
             self.BGP_DEST_CHANGED,
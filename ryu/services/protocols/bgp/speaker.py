@@ -22,6 +22,7 @@ import struct
 import traceback
 from socket import IPPROTO_TCP, TCP_NODELAY
 from eventlet import semaphore
+import six
 
 from ryu.lib.packet import bgp
 from ryu.lib.packet.bgp import AS_TRANS
@@ -58,6 +59,9 @@ LOG = logging.getLogger('bgpspeaker.speaker')
 BGP_MIN_MSG_LEN = 19
 BGP_MAX_MSG_LEN = 4096
 
+# Max. number of bytes received from the socket at once.
+BGP_RECV_BUF_SIZE = 65536
+
 # Keep-alive singleton.
 _KEEP_ALIVE = BGPKeepAlive()
 
@@ -102,7 +106,7 @@ class BgpProtocol(Protocol, Activity):
         Activity.__init__(self, name=activity_name)
         # Initialize instance variables.
         self._peer = None
-        self._recv_buff = b''
+        self._recv_buff = bytearray()
         self._socket = socket
         self._socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
         self._sendlock = semaphore.Semaphore()
@@ -308,53 +312,63 @@ class BgpProtocol(Protocol, Activity):
             - `next_bytes`: next set of bytes received from peer.
         """
         # Append buffer with received bytes.
-        self._recv_buff += next_bytes
-
-        while True:
-            # If current buffer size is less then minimum bgp message size, we
-            # return as we do not have a complete bgp message to work with.
-            if len(self._recv_buff) < BGP_MIN_MSG_LEN:
-                return
-
-            # Parse message header into elements.
-            auth, length, ptype = BgpProtocol.parse_msg_header(
-                self._recv_buff[:BGP_MIN_MSG_LEN])
-
-            # Check if we have valid bgp message marker.
-            # We should get default marker since we are not supporting any
-            # authentication.
-            if (auth != BgpProtocol.MESSAGE_MARKER):
-                LOG.error('Invalid message marker received: %s', auth)
-                raise bgp.NotSync()
-
-            # Check if we have valid bgp message length.
-            check = (length < BGP_MIN_MSG_LEN or length > BGP_MAX_MSG_LEN)
-
-            # RFC says: The minimum length of the OPEN message is 29
-            # octets (including the message header).
-            check2 = (ptype == BGP_MSG_OPEN and length < BGPOpen._MIN_LEN)
-
-            # RFC says: A KEEPALIVE message consists of only the
-            # message header and has a length of 19 octets.
-            check3 = (ptype == BGP_MSG_KEEPALIVE and
-                      length != BGPKeepAlive._MIN_LEN)
+        buff = self._recv_buff
+        buff += next_bytes
 
-            # RFC says: The minimum length of the UPDATE message is 23
-            # octets.
-            check4 = (ptype == BGP_MSG_UPDATE and
-                      length < BGPUpdate._MIN_LEN)
-
-            if any((check, check2, check3, check4)):
-                raise bgp.BadLen(ptype, length)
-
-            # If we have partial message we wait for rest of the message.
-            if len(self._recv_buff) < length:
-                return
-            msg, _, rest = BGPMessage.parser(self._recv_buff)
-            self._recv_buff = rest
-
-            # If we have a valid bgp message we call message handler.
-            self._handle_msg(msg)
+        # Messages are extracted at their offsets and the consumed bytes are
+        # removed at once, so that the rest of buffer is not copied for each
+        # message.
+        offset = 0
+        try:
+            while True:
+                # If current buffer size is less then minimum bgp message
+                # size, we return as we do not have a complete bgp message to
+                # work with.
+                if len(buff) - offset < BGP_MIN_MSG_LEN:
+                    return
+
+                # Parse message header into elements.
+                auth, length, ptype = BgpProtocol.parse_msg_header(
+                    six.binary_type(buff[offset:offset + BGP_MIN_MSG_LEN]))
+
+                # Check if we have valid bgp message marker.
+                # We should get default marker since we are not supporting any
+                # authentication.
+                if (auth != BgpProtocol.MESSAGE_MARKER):
+                    LOG.error('Invalid message marker received: %s', auth)
+                    raise bgp.NotSync()
+
+                # Check if we have valid bgp message length.
+                check = (length < BGP_MIN_MSG_LEN or length > BGP_MAX_MSG_LEN)
+
+                # RFC says: The minimum length of the OPEN message is 29
+                # octets (including the message header).
+                check2 = (ptype == BGP_MSG_OPEN and length < BGPOpen._MIN_LEN)
+
+                # RFC says: A KEEPALIVE message consists of only the
+                # message header and has a length of 19 octets.
+                check3 = (ptype == BGP_MSG_KEEPALIVE and
+                          length != BGPKeepAlive._MIN_LEN)
+
+                # RFC says: The minimum length of the UPDATE message is 23
+                # octets.
+                check4 = (ptype == BGP_MSG_UPDATE and
+                          length < BGPUpdate._MIN_LEN)
+
+                if any((check, check2, check3, check4)):
+                    raise bgp.BadLen(ptype, length)
+
+                # If we have partial message we wait for rest of the message.
+                if len(buff) - offset < length:
+                    return
+                msg, _, _ = BGPMessage.parser(
+                    six.binary_type(buff[offset:offset + length]))
+                offset += length
+
+                # If we have a valid bgp message we call message handler.
+                self._handle_msg(msg)
+        finally:
+            del buff[:offset]
 
     def send_notification(self, code, subcode):
         """Utility to send notification message.
@@ -400,6 +414,8 @@ class BgpProtocol(Protocol, Activity):
             self._signal_bus.bgp_notification_sent(self._peer, msg)
         else:
             LOG.debug('Sent msg to %s >> %s', self._remotename, msg)
+            if msg.type == BGP_MSG_UPDATE:
+                self._signal_bus.bgp_update_sent(self._peer, msg)
 
     def stop(self):
         Activity.stop(self)
@@ -504,6 +520,9 @@ class BgpProtocol(Protocol, Activity):
             if self._expiry:
                 self._expiry.reset()
 
+        if msg.type == BGP_MSG_UPDATE:
+            self._signal_bus.bgp_update_received(self._peer, msg)
+
         # Call peer message handler for appropriate messages.
         if (msg.type in
                 (BGP_MSG_UPDATE, BGP_MSG_KEEPALIVE, BGP_MSG_ROUTE_REFRESH)):
@@ -551,11 +570,10 @@ class BgpProtocol(Protocol, Activity):
         """Sits in tight loop collecting data received from peer and
         processing it.
         """
-        required_len = BGP_MIN_MSG_LEN
         conn_lost_reason = "Connection lost as protocol is no longer active"
         try:
             while True:
-                next_bytes = self._socket.recv(required_len)
+                next_bytes = self._socket.recv(BGP_RECV_BUF_SIZE)
                 if len(next_bytes) == 0:
                     conn_lost_reason = 'Peer closed connection'
                     break
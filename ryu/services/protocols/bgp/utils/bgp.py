@@ -16,6 +16,7 @@
 """
  Utilities related to bgp data types and models.
 """
+from collections import OrderedDict
 import logging
 
 import netaddr
@@ -37,6 +38,7 @@ from ryu.lib.packet.bgp import (
     RouteTargetMembershipNLRI,
     BGP_ATTR_TYPE_MULTI_EXIT_DISC,
     BGPPathAttributeMultiExitDisc,
+    BGPPathAttributeMpReachNLRI,
     BGPPathAttributeMpUnreachNLRI,
     BGPPathAttributeAs4Path,
     BGPPathAttributeAs4Aggregator,
@@ -168,6 +170,108 @@ def create_end_of_rib_update():
 UPDATE_EOR = create_end_of_rib_update()
 
 
+def get_update_pack_key(update):
+    """Returns the key to group the given UPDATE message, which carries
+    a single route, with the others which can be packed into the same
+    message, the NLRI of the route and the MP_(UN)REACH_NLRI attribute
+    which carries the NLRI if any.
+
+    Returns None as the key if the message cannot be packed.
+    The result can be computed in advance and given to pack_updates.
+    """
+    if update.withdrawn_routes:
+        return ('withdrawn', ), update.withdrawn_routes[0], None
+    if update.nlri:
+        attrs_bin = b''.join(
+            bytes(pa.serialize()) for pa in update.path_attributes)
+        return ('nlri', attrs_bin), update.nlri[0], None
+
+    mp_attr = None
+    attrs_bin = []
+    for pa in update.path_attributes:
+        if isinstance(pa, BGPPathAttributeMpReachNLRI) and pa.nlri:
+            mp_attr = pa
+            attrs_bin.append(bytes(pa.serialize_next_hop()))
+            nlri = pa.nlri[0]
+        elif (isinstance(pa, BGPPathAttributeMpUnreachNLRI)
+              and pa.withdrawn_routes):
+            mp_attr = pa
+            nlri = pa.withdrawn_routes[0]
+        else:
+            attrs_bin.append(bytes(pa.serialize()))
+    if mp_attr is None:
+        return None, None, None
+    key = (mp_attr.type, mp_attr.afi, mp_attr.safi, b''.join(attrs_bin))
+    return key, nlri, mp_attr
+
+
+def _build_packed_update(template, mp_attr, nlri_list):
+    if mp_attr is None:
+        if template.withdrawn_routes:
+            return BGPUpdate(withdrawn_routes=nlri_list)
+        return BGPUpdate(path_attributes=template.path_attributes,
+                         nlri=nlri_list)
+
+    if isinstance(mp_attr, BGPPathAttributeMpReachNLRI):
+        new_mp_attr = BGPPathAttributeMpReachNLRI(
+            mp_attr.afi, mp_attr.safi, mp_attr.next_hop_list, nlri_list)
+    else:
+        new_mp_attr = BGPPathAttributeMpUnreachNLRI(
+            mp_attr.afi, mp_attr.safi, nlri_list)
+    path_attributes = [new_mp_attr if pa is mp_attr else pa
+                       for pa in template.path_attributes]
+    return BGPUpdate(path_attributes=path_attributes)
+
+
+def pack_updates(updates, max_len, pack_keys=None):
+    """Packs the given UPDATE messages, each of which carries a single
+    route, into fewer UPDATE messages.
+
+    The routes which have the same path attributes are packed into one
+    message up to *max_len* bytes, and so are the withdrawn routes of the
+    same route family. The caller must not give more than one route for
+    the same prefix, because the routes are reordered by grouping.
+    The messages which cannot be packed are returned as they are.
+
+    *pack_keys* is the list of the results of get_update_pack_key for
+    the messages, if computed in advance.
+    """
+    if pack_keys is None:
+        pack_keys = [get_update_pack_key(update) for update in updates]
+    groups = OrderedDict()
+    packed = []
+    for update, (key, nlri, mp_attr) in zip(updates, pack_keys):
+        if key is None:
+            packed.append(update)
+            continue
+        if key in groups:
+            groups[key][2].append(nlri)
+        else:
+            groups[key] = (update, mp_attr, [nlri])
+
+    for template, mp_attr, nlri_list in groups.values():
+        if len(nlri_list) == 1:
+            packed.append(template)
+            continue
+        # Reserves one more byte for the extended length of
+        # MP_(UN)REACH_NLRI attribute.
+        base_len = (len(template.serialize()) + 1
+                    - len(nlri_list[0].serialize()))
+        chunk = []
+        chunk_len = base_len
+        for nlri in nlri_list:
+            nlri_len = len(nlri.serialize())
+            if chunk and chunk_len + nlri_len > max_len:
+                packed.append(_build_packed_update(template, mp_attr, chunk))
+                chunk = []
+                chunk_len = base_len
+            chunk.append(nlri)
+            chunk_len += nlri_len
+        packed.append(_build_packed_update(template, mp_attr, chunk))
+
+    return packed
+
+
 def create_rt_extended_community(value, subtype=2):
     """
     Creates an instance of the BGP Route Target Community (if "subtype=2")
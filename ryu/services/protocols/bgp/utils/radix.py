@@ -0,0 +1,281 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Binary radix (Patricia) tree keyed by IP prefixes.
+"""
+
+# Marks the nodes which only join the subtrees and hold no value.
+_EMPTY = object()
+
+
+class _Node(object):
+    __slots__ = ('key', 'length', 'value', 'left', 'right')
+
+    def __init__(self, key, length, value):
+        self.key = key
+        self.length = length
+        self.value = value
+        self.left = None
+        self.right = None
+
+
+class RadixTree(object):
+    """Path compressed binary radix tree keyed by prefixes.
+
+    A prefix is given as the pair of its address as an integer and its
+    length in bits, e.g., (0x0a000000, 8) for 10.0.0.0/8 in a tree of
+    32 bits width. The host bits of the address are ignored.
+
+    Lookups walk at most *width* nodes, i.e., take O(prefix length)
+    time independent of the number of prefixes, and the values are
+    iterated in the order of address and then length without creating
+    a list of them.
+
+    Example::
+
+        tree = RadixTree(32)
+        tree.set(ip.ipv4_to_int('10.0.0.0'), 8, 'a')
+        tree.set(ip.ipv4_to_int('10.1.0.0'), 16, 'b')
+        tree.longest_match(ip.ipv4_to_int('10.1.2.3'))  # 'b'
+        list(tree.covering(ip.ipv4_to_int('10.1.2.0'), 24))  # ['a', 'b']
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self._root = None
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _mask(self, key, length):
+        shift = self.width - length
+        return key >> shift << shift
+
+    def _bit(self, key, pos):
+        # Returns the bit at *pos* counted from the most significant bit.
+        return (key >> (self.width - 1 - pos)) & 1
+
+    def _common_length(self, key1, length1, key2, length2):
+        length = min(length1, length2)
+        diff = (key1 ^ key2) >> (self.width - length)
+        return length - diff.bit_length()
+
+    def _validate(self, key, length):
+        if not 0 <= length <= self.width:
+            raise ValueError('Invalid prefix length: %s' % length)
+        if not 0 <= key < 1 << self.width:
+            raise ValueError('Invalid prefix address: %s' % key)
+        return self._mask(key, length)
+
+    def _child(self, node, key):
+        if self._bit(key, node.length):
+            return node.right
+        return node.left
+
+    def _set_child(self, parent, node):
+        if parent is None:
+            self._root = node
+        elif self._bit(node.key, parent.length):
+            parent.right = node
+        else:
+            parent.left = node
+
+    def set(self, key, length, value):
+        """Sets *value* to the prefix *key*/*length*."""
+        key = self._validate(key, length)
+        parent = None
+        node = self._root
+        while node is not None:
+            common = self._common_length(key, length, node.key, node.length)
+            if common < node.length:
+                break
+            if node.length == length:
+                if node.value is _EMPTY:
+                    self._len += 1
+                node.value = value
+                return
+            parent = node
+            node = self._child(node, key)
+
+        new = _Node(key, length, value)
+        self._len += 1
+        if node is None:
+            self._set_child(parent, new)
+        elif common == length:
+            # The new prefix covers the existing node.
+            self._set_child(new, node)
+            self._set_child(parent, new)
+        else:
+            # The prefixes diverge at *common* bits.
+            glue = _Node(self._mask(key, common), common, _EMPTY)
+            self._set_child(glue, node)
+            self._set_child(glue, new)
+            self._set_child(parent, glue)
+
+    def _find(self, key, length):
+        # Returns the list of nodes from the root to the prefix.
+        nodes = []
+        node = self._root
+        while node is not None and node.length <= length:
+            if self._mask(key, node.length) != node.key:
+                break
+            nodes.append(node)
+            if node.length == length:
+                if node.value is _EMPTY:
+                    break
+                return nodes
+            node = self._child(node, key)
+        return None
+
+    def get(self, key, length, default=None):
+        """Returns the value of the prefix *key*/*length* exactly."""
+        nodes = self._find(self._validate(key, length), length)
+        if nodes is None:
+            return default
+        return nodes[-1].value
+
+    def delete(self, key, length):
+        """Deletes the prefix *key*/*length* and returns its value.
+
+        Raises KeyError if the prefix is not found.
+        """
+        nodes = self._find(self._validate(key, length), length)
+        if nodes is None:
+            raise KeyError((key, length))
+        node = nodes[-1]
+        value = node.value
+        node.value = _EMPTY
+        self._len -= 1
+
+        # Removes the node if it no longer joins two subtrees, and then
+        # the parent if it is a glue node left with a single child.
+        parents = nodes[:-1]
+        while node.value is _EMPTY:
+            parent = parents.pop() if parents else None
+            if node.left is not None and node.right is not None:
+                break
+            child = node.left if node.left is not None else node.right
+            if child is not None:
+                self._set_child(parent, child)
+                break
+            if parent is None:
+                self._root = None
+                break
+            if parent.left is node:
+                parent.left = None
+            else:
+                parent.right = None
+            node = parent
+        return value
+
+    def longest_match(self, key, length=None, default=None):
+        """Returns the value of the longest prefix which covers
+        *key*/*length*, i.e., the address *key* if *length* is omitted.
+        """
+        if length is None:
+            length = self.width
+        key = self._validate(key, length)
+        found = default
+        for value in self.covering(key, length):
+            found = value
+        return found
+
+    def covering(self, key, length):
+        """Yields the values of the prefixes which cover *key*/*length*,
+        including itself, from the shortest one.
+        """
+        key = self._validate(key, length)
+        node = self._root
+        while node is not None and node.length <= length:
+            if self._mask(key, node.length) != node.key:
+                return
+            if node.value is not _EMPTY:
+                yield node.value
+            if node.length == length:
+                return
+            node = self._child(node, key)
+
+    def covered(self, key, length, after=None):
+        """Yields the values of the prefixes covered by *key*/*length*,
+        including itself, in the order of address and then length.
+
+        If *after* is given as a pair of address and length, the prefixes
+        up to it in this order are skipped without visiting them.
+        """
+        key = self._validate(key, length)
+        node = self._root
+        while node is not None and node.length < length:
+            if self._mask(key, node.length) != node.key:
+                return
+            node = self._child(node, key)
+        if node is None or self._mask(node.key, length) != key:
+            return
+        for value in self._walk(self._seek(node, after)):
+            yield value
+
+    def values(self, after=None):
+        """Yields all values in the order of address and then length.
+
+        If *after* is given as a pair of address and length, the prefixes
+        up to it in this order are skipped without visiting them, so that
+        a walk is resumed in O(width) time.
+        """
+        return self._walk(self._seek(self._root, after))
+
+    def _seek(self, node, after):
+        # Returns the stack of the subtrees under *node* which hold the
+        # prefixes ordered after *after*, the next subtree at the top.
+        # The nodes are visited in pre-order, which is the order of
+        # address and then length.
+        if node is None:
+            return []
+        if after is None:
+            return [node]
+        key, length = after
+        key = self._validate(key, length)
+        stack = []
+        while node is not None:
+            if (node.key, node.length) > (key, length):
+                # All the prefixes in this subtree are ordered after.
+                stack.append(node)
+                break
+            if (node.length >= length or
+                    self._mask(key, node.length) != node.key):
+                if node.length == length and node.key == key:
+                    # Resumes from the children of the given prefix.
+                    stack.extend(n for n in (node.right, node.left)
+                                 if n is not None)
+                # Otherwise, this subtree is ordered before.
+                break
+            if self._bit(key, node.length):
+                node = node.right
+            else:
+                if node.right is not None:
+                    stack.append(node.right)
+                node = node.left
+        return stack
+
+    @staticmethod
+    def _walk(stack):
+        while stack:
+            node = stack.pop()
+            if node.value is not _EMPTY:
+                yield node.value
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
@@ -0,0 +1,161 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Dictionary which keeps its keys sorted to resume walks from a key.
+"""
+
+import bisect
+
+
+class SortedKeyList(object):
+    """Sorted list of unique keys split into chunks.
+
+    Adding and removing a key take O(log n) comparisons and move at most
+    a chunk of keys, instead of the whole list, so that the order is kept
+    up to date as the keys change.
+    """
+
+    # Max. number of the keys in a chunk is the double of this.
+    CHUNK_SIZE = 512
+
+    def __init__(self):
+        self._chunks = []
+        # Last key of each chunk.
+        self._maxes = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return self.keys_after()
+
+    def _locate(self, key):
+        # Returns the index of the chunk which does or would hold *key*.
+        i = bisect.bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+        return i
+
+    def add(self, key):
+        """Adds *key* if not present."""
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+        i = self._locate(key)
+        chunk = self._chunks[i]
+        j = bisect.bisect_left(chunk, key)
+        if j < len(chunk) and chunk[j] == key:
+            return
+        chunk.insert(j, key)
+        self._maxes[i] = chunk[-1]
+        self._len += 1
+        if len(chunk) > self.CHUNK_SIZE * 2:
+            self._chunks.insert(i + 1, chunk[self.CHUNK_SIZE:])
+            del chunk[self.CHUNK_SIZE:]
+            self._maxes.insert(i, chunk[-1])
+
+    def discard(self, key):
+        """Removes *key* if present."""
+        if not self._chunks:
+            return
+        i = self._locate(key)
+        chunk = self._chunks[i]
+        j = bisect.bisect_left(chunk, key)
+        if j == len(chunk) or chunk[j] != key:
+            return
+        del chunk[j]
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def clear(self):
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+
+    def keys_after(self, key=None):
+        """Yields the keys in order, starting after *key* if given.
+
+        Finding the start takes O(log n) time. The keys added or removed
+        while iterating may or may not be yielded, but the iteration does
+        not fail.
+        """
+        if key is None:
+            i = j = 0
+        else:
+            i = bisect.bisect_right(self._maxes, key)
+            if i == len(self._maxes):
+                return
+            j = bisect.bisect_right(self._chunks[i], key)
+        for chunk in self._chunks[i:]:
+            for k in chunk[j:]:
+                yield k
+            j = 0
+
+
+class SortedKeyDict(dict):
+    """Dictionary which walks its keys in order from a given key.
+
+    The keys are kept in a SortedKeyList as the dictionary is modified,
+    so that a walk resumed from a key does not sort the keys again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SortedKeyDict, self).__init__()
+        self._keys = SortedKeyList()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._keys.add(key)
+        super(SortedKeyDict, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super(SortedKeyDict, self).__delitem__(key)
+        self._keys.discard(key)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._keys.discard(key)
+        return super(SortedKeyDict, self).pop(key, *args)
+
+    def popitem(self):
+        key, value = super(SortedKeyDict, self).popitem()
+        self._keys.discard(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super(SortedKeyDict, self).clear()
+        self._keys.clear()
+
+    def keys_after(self, key=None):
+        """Yields the keys in order, starting after *key* if given."""
+        return self._keys.keys_after(key)
@@ -46,19 +46,65 @@ def _uuid_to_row(atom, base):
     return value
 
 
-def dictify(row):
+def dictify(row, columns=None):
     if row is None:
         return
 
     result = {}
 
     for key, value in row._data.items():
+        if columns is not None and key not in columns:
+            continue
         result[key] = value.to_python(_uuid_to_row)
         hub.sleep(0)
 
     return result
 
 
+def _to_model_row(row, uuid, columns=None):
+    result = model.Row(dictify(row, columns))
+    result['_uuid'] = uuid
+    return result
+
+
+def _merge_row_events(pending, ev):
+    """Merges the row event *ev* into the *pending* event of the same row
+    and returns the merged one, or None if they cancel each other.
+    """
+    if pending is None:
+        return ev
+
+    ev_cls, args = ev
+    pending_cls, pending_args = pending
+    table = args[0]
+
+    if ev_cls is event.EventRowDelete:
+        if pending_cls is event.EventRowInsert:
+            return None
+        if pending_cls is event.EventRowUpdate:
+            return (ev_cls, (table, pending_args[1]))
+        return ev
+
+    if ev_cls is event.EventRowInsert:
+        if pending_cls is event.EventRowDelete:
+            return (event.EventRowUpdate, (table, pending_args[1], args[1]))
+        return ev
+
+    # EventRowUpdate
+    if pending_cls is event.EventRowDelete:
+        return ev
+
+    new = model.Row(pending_args[-1])
+    new.update(args[2])
+    if pending_cls is event.EventRowInsert:
+        return (pending_cls, (table, new))
+
+    # Keeps the values before the first update.
+    old = model.Row(args[1])
+    old.update(pending_args[1])
+    return (pending_cls, (table, old, new))
+
+
 def transact_block(request, connection):
     """Emulate jsonrpc.Connection.transact_block without blocking eventlet.
     """
@@ -198,7 +244,22 @@ def _filter_schema(schema, schema_tables, exclude_table_columns):
 # NOTE(jkoelker) Wrap ovs's Idl to accept an existing session, and
 #                trigger callbacks on changes
 class Idl(idl.Idl):
-    def __init__(self, session, schema):
+    """IDL which buffers the row changes as the events.
+
+    *event_columns* is a dict of a table name to the column names to watch.
+    The updates of the other columns of the table produce no events, and
+    the rows in the events of the table include only the watched columns
+    and the "name" column, if any, to identify the rows.
+    The tables not included produce the events of any change with the
+    whole rows.
+
+    *coalesce_intervals* is a dict of a table name to seconds. The events
+    of the table in this interval are merged per row and buffered as one
+    EventRowBatch event.
+    """
+
+    def __init__(self, session, schema, event_columns=None,
+                 coalesce_intervals=None):
         if not isinstance(schema, idl.SchemaHelper):
             schema = idl.SchemaHelper(schema_json=schema)
             schema.register_all()
@@ -208,6 +269,19 @@ class Idl(idl.Idl):
         # NOTE(jkoelker) event buffer
         self._events = []
 
+        self._event_columns = dict(
+            (table, frozenset(columns))
+            for table, columns in (event_columns or {}).items())
+        # Columns included in the rows of the events
+        self._event_row_columns = dict(
+            (table, columns.union(['name']))
+            for table, columns in self._event_columns.items())
+        self._coalesce_intervals = dict(
+            (table, interval * 1000)
+            for table, interval in (coalesce_intervals or {}).items())
+        # Table name -> (deadline in msec, OrderedDict of uuid -> event)
+        self._pending_events = {}
+
         self.tables = schema.tables
         self.readonly = schema.readonly
         self._db = schema
@@ -240,15 +314,47 @@ class Idl(idl.Idl):
 
     @property
     def events(self):
+        if self._pending_events:
+            current = now()
+            for table, (deadline, rows) in list(self._pending_events.items()):
+                if deadline > current:
+                    continue
+                del self._pending_events[table]
+                if rows:
+                    self._events.append(
+                        (event.EventRowBatch, (table, list(rows.values()))))
+
         events = self._events
         self._events = []
         return events
 
+    def _append_event(self, table, uuid, ev):
+        interval = self._coalesce_intervals.get(table.name)
+        if interval is None:
+            self._events.append(ev)
+            return
+
+        if table.name not in self._pending_events:
+            self._pending_events[table.name] = (
+                now() + interval, collections.OrderedDict())
+        rows = self._pending_events[table.name][1]
+        ev = _merge_row_events(rows.pop(uuid, None), ev)
+        if ev is not None:
+            rows[uuid] = ev
+
     def __process_update(self, table, uuid, old, new):
+        watched = self._event_columns.get(table.name)
+        if watched is not None and old and new:
+            # NOTE: "old" of the update notification has only the columns
+            #       modified, so the updates of the unwatched columns are
+            #       dropped without converting the rows.
+            if watched.isdisjoint(old):
+                return idl.Idl.__process_update(self, table, uuid, old, new)
+        columns = self._event_row_columns.get(table.name)
+
         old_row = table.rows.get(uuid)
         if old_row is not None:
-            old_row = model.Row(dictify(old_row))
-            old_row['_uuid'] = uuid
+            old_row = _to_model_row(old_row, uuid, columns)
 
         changed = idl.Idl.__process_update(self, table, uuid, old, new)
 
@@ -257,17 +363,14 @@ class Idl(idl.Idl):
                 ev = (event.EventRowDelete, (table.name, old_row))
 
             elif not old:
-                new_row = model.Row(dictify(table.rows.get(uuid)))
-                new_row['_uuid'] = uuid
+                new_row = _to_model_row(table.rows.get(uuid), uuid, columns)
                 ev = (event.EventRowInsert, (table.name, new_row))
 
             else:
-                new_row = model.Row(dictify(table.rows.get(uuid)))
-                new_row['_uuid'] = uuid
-
+                new_row = _to_model_row(table.rows.get(uuid), uuid, columns)
                 ev = (event.EventRowUpdate, (table.name, old_row, new_row))
 
-            self._events.append(ev)
+            self._append_event(table, uuid, ev)
 
         return changed
 
@@ -276,6 +379,7 @@ class RemoteOvsdb(app_manager.RyuApp):
     _EVENTS = [event.EventRowUpdate,
                event.EventRowDelete,
                event.EventRowInsert,
+               event.EventRowBatch,
                event.EventInterfaceDeleted,
                event.EventInterfaceInserted,
                event.EventInterfaceUpdated,
@@ -286,7 +390,8 @@ class RemoteOvsdb(app_manager.RyuApp):
     @classmethod
     def factory(cls, sock, address, probe_interval=None, min_backoff=None,
                 max_backoff=None, schema_tables=None,
-                schema_exclude_columns=None, *args, **kwargs):
+                schema_exclude_columns=None, event_columns=None,
+                coalesce_intervals=None, *args, **kwargs):
         schema_exclude_columns = schema_exclude_columns or {}
         ovs_stream = stream.Stream(sock, None, None)
         connection = jsonrpc.Connection(ovs_stream)
@@ -320,7 +425,8 @@ class RemoteOvsdb(app_manager.RyuApp):
         fsm.connected(now())
 
         session = jsonrpc.Session(fsm, connection)
-        idl = Idl(session, schemas[0])
+        idl = Idl(session, schemas[0], event_columns=event_columns,
+                  coalesce_intervals=coalesce_intervals)
 
         system_id = discover_system_id(idl)
 
@@ -58,6 +58,27 @@ class EventRowUpdate(ryu_event.EventBase):
                                                        self.old['_uuid'])
 
 
+class EventRowBatch(ryu_event.EventBase):
+    """ Row changes of a table coalesced in its interval
+
+    `events` is the list of EventRowInsert, EventRowUpdate and
+    EventRowDelete, at most one per row, in the order of the first change
+    of each row. EventRowUpdate has the values before the first change as
+    `old` and the values after the last change as `new`.
+    """
+    def __init__(self, system_id, table, events):
+        super(EventRowBatch, self).__init__()
+        self.system_id = system_id
+        self.table = table
+        self.events = [ev_cls(system_id, *args) for ev_cls, args in events]
+        self.event_type = 'Batch'
+
+    def __str__(self):
+        return '%s<system_id=%s table=%s, events=%d>' % (
+            self.__class__.__name__, self.system_id, self.table,
+            len(self.events))
+
+
 class EventModifyRequest(ryu_event.EventRequestBase):
     """ Dispatch a modify function to OVSDB
 
@@ -43,12 +43,42 @@ opts = (cfg.StrOpt('address', default='0.0.0.0', help='OVSDB address'),
         cfg.ListOpt('schema-exclude-columns', default=[],
                     help='Table columns in the OVSDB schema to filter out.  '
                          'Values should be in the format: <table>.<column>.'
-                         'Ex: Bridge.netflow,Interface.statistics')
+                         'Ex: Bridge.netflow,Interface.statistics'),
+        cfg.ListOpt('event-columns', default=[],
+                    help='Table columns to watch for the row update events. '
+                         'The updates of the other columns of the tables '
+                         'are not notified.  Values should be in the '
+                         'format: <table>.<column>.  '
+                         'Ex: Interface.name,Interface.link_state'),
+        cfg.ListOpt('event-coalesce-intervals', default=[],
+                    help='Seconds to coalesce the row events of the tables '
+                         'into EventRowBatch.  Values should be in the '
+                         'format: <table>:<seconds>.  Ex: Interface:1.0')
         )
 
 cfg.CONF.register_opts(opts, 'ovsdb')
 
 
+def _parse_table_values(name, values, sep, convert=str):
+    """Parses the option values in the format: <table><sep><value>
+
+    Returns the list of the pairs of the table name and the converted
+    value. Raises ValueError if any of the values is malformed.
+    """
+    result = []
+    for v in values:
+        try:
+            tbl, value = v.split(sep)
+            if not tbl or not value:
+                raise ValueError()
+            result.append((tbl, convert(value)))
+        except ValueError:
+            raise ValueError(
+                'Invalid value for ovsdb.%s option: "%s".  Values should be '
+                'in the format: <table>%s<value>' % (name, v, sep))
+    return result
+
+
 class OVSDB(app_manager.RyuApp):
     _EVENTS = [event.EventNewOVSDBConnection,
                event.EventModifyRequest,
@@ -63,6 +93,22 @@ class OVSDB(app_manager.RyuApp):
         self._max_backoff = self.CONF.ovsdb.max_backoff
         self._clients = {}
 
+        # Parses the table options once, not to fail on every connection.
+        self._schema_exclude_columns = {}
+        for tbl, col in _parse_table_values(
+                'schema-exclude-columns',
+                self.CONF.ovsdb.schema_exclude_columns, '.'):
+            self._schema_exclude_columns.setdefault(tbl, []).append(col)
+
+        self._event_columns = {}
+        for tbl, col in _parse_table_values(
+                'event-columns', self.CONF.ovsdb.event_columns, '.'):
+            self._event_columns.setdefault(tbl, []).append(col)
+
+        self._coalesce_intervals = dict(_parse_table_values(
+            'event-coalesce-intervals',
+            self.CONF.ovsdb.event_coalesce_intervals, ':', float))
+
     def _accept(self, server):
         if self.CONF.ovsdb.whitelist:
             def check(address):
@@ -133,21 +179,15 @@ class OVSDB(app_manager.RyuApp):
 
     def _start_remote(self, sock, client_address):
         schema_tables = cfg.CONF.ovsdb.schema_tables
-        schema_ex_col = {}
-        if cfg.CONF.ovsdb.schema_exclude_columns:
-            for c in cfg.CONF.ovsdb.schema_exclude_columns:
-                tbl, col = c.split('.')
-                if tbl in schema_ex_col:
-                    schema_ex_col[tbl].append(col)
-                else:
-                    schema_ex_col[tbl] = [col]
-
-        app = client.RemoteOvsdb.factory(sock, client_address,
-                                         probe_interval=self._probe_interval,
-                                         min_backoff=self._min_backoff,
-                                         max_backoff=self._max_backoff,
-                                         schema_tables=schema_tables,
-                                         schema_exclude_columns=schema_ex_col)
+        app = client.RemoteOvsdb.factory(
+            sock, client_address,
+            probe_interval=self._probe_interval,
+            min_backoff=self._min_backoff,
+            max_backoff=self._max_backoff,
+            schema_tables=schema_tables,
+            schema_exclude_columns=self._schema_exclude_columns,
+            event_columns=self._event_columns,
+            coalesce_intervals=self._coalesce_intervals)
 
         if app:
             self._clients[app.name] = app
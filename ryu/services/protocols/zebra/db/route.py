@@ -15,6 +15,8 @@
 
 from __future__ import absolute_import
 
+from collections import OrderedDict
+import itertools
 import logging
 import socket
 
@@ -23,6 +25,7 @@ from sqlalchemy import Boolean
 from sqlalchemy import Integer
 from sqlalchemy import String
 
+from ryu.lib import hub
 from ryu.lib import ip
 from ryu.lib.packet import safi as packet_safi
 from ryu.lib.packet import zebra
@@ -73,6 +76,16 @@ class Route(base.Base):
     is_selected = Column(Boolean, default=False)
 
 
+def _route_family(destination):
+    dest_addr, dest_prefix_num = destination.split('/')
+    dest_prefix_num = int(dest_prefix_num)
+    if ip.valid_ipv4(dest_addr) and 0 <= dest_prefix_num <= 32:
+        return socket.AF_INET
+    elif ip.valid_ipv6(dest_addr) and 0 <= dest_prefix_num <= 128:
+        return socket.AF_INET6
+    return None
+
+
 @base.sql_function
 def ip_route_show(session, destination, device, **kwargs):
     """
@@ -148,13 +161,8 @@ def ip_route_add(session, destination, device=None, gateway='', source='',
                 destination, device)
             return route
 
-    dest_addr, dest_prefix_num = destination.split('/')
-    dest_prefix_num = int(dest_prefix_num)
-    if ip.valid_ipv4(dest_addr) and 0 <= dest_prefix_num <= 32:
-        family = socket.AF_INET
-    elif ip.valid_ipv6(dest_addr) and 0 <= dest_prefix_num <= 128:
-        family = socket.AF_INET6
-    else:
+    family = _route_family(destination)
+    if family is None:
         LOG.debug('Invalid IP address for "prefix": %s', destination)
         return None
     safi = packet_safi.UNICAST
@@ -199,3 +207,215 @@ def ip_route_delete(session, destination, **kwargs):
         session.delete(route)
 
     return routes
+
+
+class RouteTable(object):
+    """
+    Route table cached in memory and written behind to database.
+
+    The routes are loaded from database at first and kept in memory
+    indexed by destination prefix, then the reads are served from memory.
+    The changes are written to database in one transaction when
+    "flush_size" changes are pending, or every "flush_interval" seconds
+    after "start()" is called. The changes failed to be written are kept
+    pending to be written again.
+
+    Note: Sets "expire_on_commit" of the given session to False, so that
+    the cached routes are not loaded from database again after commit.
+
+    The methods take the same arguments as the functions of this module
+    except for "session".
+
+    :param session: Session instance connecting to database.
+    :param flush_interval: Interval in seconds to write the changes.
+    :param flush_size: Number of the changes to write without waiting for
+     "flush_interval".
+    """
+
+    def __init__(self, session, flush_interval=1, flush_size=1000):
+        self.session = session
+        self.session.expire_on_commit = False
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._thread = None
+
+        # Destination prefix -> list of routes
+        self._routes = {}
+        # Destination prefix -> selected route
+        self._selected = {}
+
+        # Routes to be inserted (as keys) and to be deleted
+        self._added = OrderedDict()
+        self._deleted = []
+
+        for route in session.query(Route).all():
+            self._index(route)
+
+    def _index(self, route):
+        self._routes.setdefault(route.destination, []).append(route)
+        if route.is_selected:
+            self._selected[route.destination] = route
+
+    def _unindex(self, route):
+        routes = self._routes[route.destination]
+        routes.remove(route)
+        if not routes:
+            del self._routes[route.destination]
+        if self._selected.get(route.destination) is route:
+            del self._selected[route.destination]
+
+    def _changed(self):
+        if len(self._added) + len(self._deleted) >= self.flush_size:
+            self.flush()
+
+    def show(self, destination, device, **kwargs):
+        """
+        Returns a selected route record matching the given filtering rules.
+
+        See "ip_route_show()" for the arguments.
+        """
+        intf = interface.ip_link_show(self.session, ifname=device)
+        if not intf:
+            LOG.debug('Interface "%s" does not exist', device)
+            return None
+
+        routes = self.show_all(
+            destination=destination, ifindex=intf.ifindex, **kwargs)
+        return routes[0] if routes else None
+
+    def show_all(self, **kwargs):
+        """
+        Returns a list of route records matching the given filtering rules.
+
+        See "ip_route_show_all()" for the arguments.
+        """
+        if 'destination' in kwargs:
+            routes = self._routes.get(kwargs['destination'], [])
+        elif kwargs.get('is_selected'):
+            routes = self._selected.values()
+        else:
+            routes = itertools.chain.from_iterable(self._routes.values())
+
+        return [route for route in routes
+                if all(getattr(route, k) == v for k, v in kwargs.items())]
+
+    def add(self, destination, device=None, gateway='', source='',
+            ifindex=0, route_type=zebra.ZEBRA_ROUTE_KERNEL,
+            is_selected=True):
+        """
+        Adds a route record.
+
+        See "ip_route_add()" for the arguments.
+        """
+        if device:
+            intf = interface.ip_link_show(self.session, ifname=device)
+            if not intf:
+                LOG.debug('Interface "%s" does not exist', device)
+                return None
+            ifindex = ifindex or intf.ifindex
+
+            route = self.show(destination=destination, device=device)
+            if route:
+                LOG.debug(
+                    'Route to "%s" already exists on "%s" device',
+                    destination, device)
+                return route
+
+        family = _route_family(destination)
+        if family is None:
+            LOG.debug('Invalid IP address for "prefix": %s', destination)
+            return None
+
+        if is_selected:
+            for old_route in self._routes.get(destination, []):
+                if old_route.is_selected:
+                    LOG.debug(
+                        'Set existing route to unselected: %s', old_route)
+                    old_route.is_selected = False
+            self._selected.pop(destination, None)
+
+        new_route = Route(
+            family=family,
+            safi=packet_safi.UNICAST,
+            destination=destination,
+            gateway=gateway,
+            ifindex=ifindex,
+            source=source,
+            route_type=route_type,
+            is_selected=is_selected)
+
+        self._index(new_route)
+        self._added[new_route] = None
+        self._changed()
+
+        return new_route
+
+    def delete(self, destination, **kwargs):
+        """
+        Deletes route record(s).
+
+        See "ip_route_delete()" for the arguments.
+        """
+        routes = self.show_all(destination=destination, **kwargs)
+        for route in routes:
+            self._unindex(route)
+            if route in self._added:
+                # Not written to database yet
+                del self._added[route]
+            else:
+                self._deleted.append(route)
+
+        if routes:
+            self._changed()
+
+        return routes
+
+    def flush(self):
+        """
+        Writes the pending changes to database in one transaction.
+        """
+        added, self._added = self._added, OrderedDict()
+        deleted, self._deleted = self._deleted, []
+        if not (added or deleted or self.session.dirty):
+            return
+
+        # Rolling back discards the updates of the routes in memory.
+        selected = [(route, route.is_selected)
+                    for route in self.session.dirty
+                    if isinstance(route, Route)]
+        try:
+            self.session.add_all(list(added))
+            for route in deleted:
+                self.session.delete(route)
+            self.session.commit()
+        except Exception as e:
+            LOG.error('Error in writing routes: %s', e)
+            self.session.rollback()
+
+            # Keeps the changes pending to be consistent with memory.
+            added.update(self._added)
+            self._added = added
+            self._deleted = deleted + self._deleted
+            for route, is_selected in selected:
+                route.is_selected = is_selected
+
+    def _flush_loop(self):
+        while True:
+            hub.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        """
+        Starts the thread writing the changes every "flush_interval".
+        """
+        if self._thread is None:
+            self._thread = hub.spawn(self._flush_loop)
+
+    def stop(self):
+        """
+        Stops the thread and writes the pending changes.
+        """
+        if self._thread is not None:
+            hub.kill(self._thread)
+            self._thread = None
+        self.flush()
@@ -196,6 +196,12 @@ class ZServer(RyuApp):
         # Initial Router ID for Zebra server
         self.router_id = CONF.router_id
 
+        # Routes cached in memory and written behind to database
+        self.routes = db.route.RouteTable(
+            SESSION,
+            flush_interval=CONF.db_flush_interval,
+            flush_size=CONF.db_flush_size)
+
     def start(self):
         super(ZServer, self).start()
 
@@ -219,17 +225,21 @@ class ZServer(RyuApp):
         if self.zapi_connection_family == socket.AF_UNIX:
             os.chmod(CONF.server_host, 0o777)
 
+        self.routes.start()
         self._add_lo_interface()
 
         return hub.spawn(self.zserv.serve_forever)
 
+    def stop(self):
+        self.routes.stop()
+        super(ZServer, self).stop()
+
     def _add_lo_interface(self):
         intf = db.interface.ip_link_add(SESSION, 'lo')
         if intf:
             self.logger.debug('Added interface "%s": %s', intf.ifname, intf)
 
-        route = db.route.ip_route_add(
-            SESSION,
+        route = self.routes.add(
             destination='127.0.0.0/8',
             device='lo',
             source='127.0.0.1/8',
@@ -286,8 +296,8 @@ class ZServer(RyuApp):
                     hw_addr=intf.hw_addr))
             ev.zclient.send_msg(msg)
 
-            routes = db.route.ip_route_show_all(
-                SESSION, ifindex=intf.ifindex, is_selected=True)
+            routes = self.routes.show_all(
+                ifindex=intf.ifindex, is_selected=True)
             self.logger.debug('Server will response routes: %s', routes)
             for route in routes:
                 dest, _ = route.destination.split('/')
@@ -307,8 +317,7 @@ class ZServer(RyuApp):
             'Client %s advertised IP route: %s', ev.zclient, ev.body)
 
         for nexthop in ev.body.nexthops:
-            route = db.route.ip_route_add(
-                SESSION,
+            route = self.routes.add(
                 destination=ev.body.prefix,
                 gateway=nexthop.addr,
                 ifindex=nexthop.ifindex or 0,
@@ -324,8 +333,7 @@ class ZServer(RyuApp):
             'Client %s withdrew IP route: %s', ev.zclient, ev.body)
 
         for nexthop in ev.body.nexthops:
-            routes = db.route.ip_route_delete(
-                SESSION,
+            routes = self.routes.delete(
                 destination=ev.body.prefix,
                 gateway=nexthop.addr,
                 route_type=ev.body.route_type)
@@ -0,0 +1,107 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the best path selection among the paths learned from the iBGP
+peers, comparing processor.select_best_path with the pairwise
+processor.compute_best_path.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import processor
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.tests.benchmark import bench_lib
+
+LOCAL_AS = 65000
+
+
+class _OpenMsg(object):
+    def __init__(self, bgp_identifier):
+        self.bgp_identifier = bgp_identifier
+
+
+class _Protocol(object):
+    def __init__(self, router_id):
+        self.recv_open_msg = _OpenMsg(router_id)
+        self.sent_open_msg = _OpenMsg('10.0.0.1')
+
+
+class _Peer(object):
+    def __init__(self, router_id):
+        self.remote_as = LOCAL_AS
+        self.version_num = 1
+        self.protocol = _Protocol(router_id)
+
+
+def _paths(count, peers):
+    # The paths tie up to the router ID, the worst case of the selection.
+    sources = [_Peer('10.0.1.%d' % (i + 1)) for i in range(peers)]
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+        [[65001, 65002]])
+    pattrs[bgp.BGP_ATTR_TYPE_LOCAL_PREF] = bgp.BGPPathAttributeLocalPref(100)
+    pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+        bgp.BGPPathAttributeMultiExitDisc(10)
+    dests = []
+    for i in range(count):
+        nlri = bgp.IPAddrPrefix(24, '%d.%d.%d.0' % (
+            i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff))
+        dests.append([Ipv4Path(source, nlri, 1, pattrs=pattrs,
+                               nexthop='192.168.0.1')
+                      for source in sources])
+    return dests
+
+
+def _compute_best_path(dests, rounds):
+    for _ in range(rounds):
+        for paths in dests:
+            best_path = paths[0]
+            for path in paths[1:]:
+                new_best_path, _ = processor.compute_best_path(
+                    LOCAL_AS, best_path, path)
+                if new_best_path is not None:
+                    best_path = new_best_path
+
+
+def _select_best_path(dests, rounds):
+    for _ in range(rounds):
+        for paths in dests:
+            processor.select_best_path(LOCAL_AS, paths)
+
+
+def main():
+    p = bench_lib.parser(__doc__, 20000)
+    p.add_argument('-p', '--peers', type=int, default=4,
+                   help='number of paths per prefix (default: %(default)d)')
+    p.add_argument('-r', '--rounds', type=int, default=5,
+                   help='number of selections per prefix '
+                        '(default: %(default)d)')
+    args = p.parse_args()
+
+    dests = _paths(args.count, args.peers)
+    total = args.count * args.rounds
+    elapsed, _ = bench_lib.measure(_compute_best_path, dests, args.rounds)
+    bench_lib.report('compute_best_path() pairwise', elapsed, total)
+    elapsed, _ = bench_lib.measure(_select_best_path, dests, args.rounds)
+    bench_lib.report('select_best_path()', elapsed, total)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the time BgpProcessor takes to process the queued destinations
+and the latency of another greenthread in the meantime, with the
+fixed and the adaptive number of destinations processed per cycle.
+"""
+
+from __future__ import print_function
+
+import time
+
+from ryu.lib import hub
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import processor
+from ryu.tests.benchmark import bench_lib
+
+
+class _Destination(object):
+    route_family = bgp.RF_IPv4_UC
+
+    def __init__(self, work):
+        self._work = work
+
+    def process(self):
+        sum(range(self._work))
+
+
+class _Ticker(object):
+    def __init__(self):
+        self.latencies = []
+        self.running = True
+
+    def run(self):
+        last = time.time()
+        while self.running:
+            hub.sleep(0.001)
+            now = time.time()
+            self.latencies.append(now - last)
+            last = now
+
+
+def _process(count, work, work_units_per_cycle):
+    proc = processor.BgpProcessor(None, work_units_per_cycle)
+    ticker = _Ticker()
+    ticker_thread = hub.spawn(ticker.run)
+    for _ in range(count):
+        proc.enqueue(_Destination(work))
+    proc_thread = hub.spawn(proc.start)
+    start = time.time()
+    while not proc._dest_queue.is_empty():
+        hub.sleep(0.001)
+    elapsed = time.time() - start
+    hub.kill(proc_thread)
+    ticker.running = False
+    hub.joinall([ticker_thread])
+    latencies = sorted(ticker.latencies)
+    return (elapsed, latencies[len(latencies) * 99 // 100], latencies[-1],
+            proc.work_units_per_cycle)
+
+
+def main():
+    p = bench_lib.parser(__doc__, 200000)
+    p.add_argument('-w', '--work', type=int, default=20,
+                   help='work per destination (default: %(default)d)')
+    args = p.parse_args()
+
+    for name, work_units in (
+            ('fixed', processor.BgpProcessor.MAX_DEST_PROCESSED_PER_CYCLE),
+            ('adaptive', None)):
+        elapsed, p99, max_latency, work_units = _process(
+            args.count, args.work, work_units)
+        bench_lib.report('BgpProcessor %s' % name, elapsed, args.count)
+        print('  latency p99 %.3f sec, max. %.3f sec, '
+              '%d destinations per cycle'
+              % (p99, max_latency, work_units))
+
+
+if __name__ == '__main__':
+    main()
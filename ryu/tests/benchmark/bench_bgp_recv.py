@@ -0,0 +1,81 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures BgpProtocol receiving a full-table dump, i.e., framing and
+parsing UPDATE messages packed with NLRIs, as received from the socket
+in chunks.
+"""
+
+from __future__ import print_function
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import speaker
+from ryu.tests.benchmark import bench_lib
+
+
+def _dump(count, per_update):
+    data = bytearray()
+    for i in range(0, count, per_update):
+        update = bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                bgp.BGPPathAttributeAsPath([[65001, 65002]]),
+                bgp.BGPPathAttributeNextHop('192.0.2.1'),
+            ],
+            nlri=[bgp.BGPNLRI(24, '%d.%d.%d.0' % (
+                j >> 16 & 0xff, j >> 8 & 0xff, j & 0xff))
+                for j in range(i, min(i + per_update, count))])
+        data += update.serialize()
+    return bytes(data)
+
+
+def _receive(data, chunk_size):
+    sock = mock.MagicMock()
+    sock.getpeername.return_value = ('192.0.2.2', 179)
+    sock.getsockname.return_value = ('192.0.2.1', 10179)
+    protocol = speaker.BgpProtocol(sock, None)
+    msgs = []
+    protocol._handle_msg = msgs.append
+    for i in range(0, len(data), chunk_size):
+        protocol._data_received(data[i:i + chunk_size])
+    return sum(len(msg.nlri) for msg in msgs)
+
+
+def main():
+    p = bench_lib.parser(__doc__, 200000)
+    p.add_argument('-u', '--per-update', type=int, default=1000,
+                   help='number of prefixes per UPDATE '
+                        '(default: %(default)d)')
+    p.add_argument('-c', '--chunk-size', type=int,
+                   default=speaker.BGP_RECV_BUF_SIZE,
+                   help='number of bytes received at once '
+                        '(default: %(default)d)')
+    args = p.parse_args()
+
+    data = _dump(args.count, args.per_update)
+    elapsed, nlri = bench_lib.measure(_receive, data, args.chunk_size)
+    assert nlri == args.count
+    bench_lib.report('BgpProtocol._data_received() (%d bytes chunks)'
+                     % args.chunk_size, elapsed, args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures serializing the BGP UPDATE messages for an initial table transfer
+with one UPDATE per route and with the routes packed by
+utils.bgp.pack_updates().
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.speaker import BGP_MAX_MSG_LEN
+from ryu.services.protocols.bgp.utils.bgp import pack_updates
+from ryu.tests.benchmark import bench_lib
+
+
+def _single_route_updates(count, attr_sets):
+    pattrs = [
+        [bgp.BGPPathAttributeNextHop('192.168.0.1'),
+         bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+         bgp.BGPPathAttributeAsPath([[65000, 65001 + i]])]
+        for i in range(attr_sets)
+    ]
+    return [
+        bgp.BGPUpdate(
+            path_attributes=pattrs[i % attr_sets],
+            nlri=[bgp.IPAddrPrefix(
+                24, '10.%d.%d.0' % (i >> 8 & 0xff, i & 0xff))])
+        for i in range(count)
+    ]
+
+
+def _serialize(updates):
+    return sum(len(u.serialize()) for u in updates), len(updates)
+
+
+def _pack_and_serialize(updates):
+    return _serialize(pack_updates(updates, BGP_MAX_MSG_LEN))
+
+
+def main():
+    p = bench_lib.parser(__doc__, 100000)
+    p.add_argument('-a', '--attr-sets', type=int, default=100,
+                   help='number of distinct path attribute sets '
+                        '(default: %(default)d)')
+    args = p.parse_args()
+
+    updates = _single_route_updates(args.count, args.attr_sets)
+    elapsed, (size, msgs) = bench_lib.measure(_serialize, updates)
+    bench_lib.report('one route per UPDATE (%d msgs, %d bytes)'
+                     % (msgs, size), elapsed, args.count)
+    elapsed, (size, msgs) = bench_lib.measure(_pack_and_serialize, updates)
+    bench_lib.report('packed UPDATEs (%d msgs, %d bytes)'
+                     % (msgs, size), elapsed, args.count)
+
+
+if __name__ == '__main__':
+    main()
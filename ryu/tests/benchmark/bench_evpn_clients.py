@@ -0,0 +1,94 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the churn of EvpnNetwork of RestSdnmdr on VTEP failures, i.e.,
+withdrawing all the clients behind a VTEP and then learning them again,
+comparing the lookup by the next_hop index with the full scan.
+"""
+
+from __future__ import print_function
+
+from ryu.app.rest_sdnmdr import EvpnClient
+from ryu.app.rest_sdnmdr import EvpnNetwork
+from ryu.tests.benchmark import bench_lib
+
+
+def _vtep(i):
+    return '192.168.%d.%d' % (i >> 8 & 0xff, i & 0xff)
+
+
+def _evpn_network(count, vteps):
+    network = EvpnNetwork(vni=100, route_dist='65000:100',
+                          ethernet_tag_id=0)
+    for i in range(count):
+        network.add_client(_client(i, vteps))
+    return network
+
+
+def _client(i, vteps):
+    mac = '02:00:00:%02x:%02x:%02x' % (
+        i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff)
+    return EvpnClient(
+        port=i % 48 + 1, mac=mac,
+        ip='10.%d.%d.%d' % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff),
+        next_hop=_vtep(i % vteps))
+
+
+def _scan_withdraw(network, next_hop):
+    # Same as RestSdnmdr.del_neighbor() without the index
+    clients = [c for c in network.clients.values()
+               if c.next_hop == next_hop]
+    for client in clients:
+        network.del_client(client.mac)
+    return clients
+
+
+def _index_withdraw(network, next_hop):
+    clients = network.get_clients(next_hop=next_hop)
+    for client in clients:
+        network.del_client(client.mac)
+    return clients
+
+
+def _churn(withdraw, network, vteps, failures):
+    count = 0
+    for i in range(failures):
+        clients = withdraw(network, _vtep(i % vteps))
+        for client in clients:
+            network.add_client(client)
+        count += len(clients)
+    return count
+
+
+def main():
+    p = bench_lib.parser(__doc__, 100000)
+    p.add_argument('-v', '--vteps', type=int, default=100,
+                   help='number of VTEPs (default: %(default)d)')
+    p.add_argument('-f', '--failures', type=int, default=200,
+                   help='number of VTEP failures (default: %(default)d)')
+    args = p.parse_args()
+
+    network = _evpn_network(args.count, args.vteps)
+    elapsed, count = bench_lib.measure(
+        _churn, _scan_withdraw, network, args.vteps, args.failures)
+    bench_lib.report('VTEP failure with full scan', elapsed, count)
+    elapsed, count = bench_lib.measure(
+        _churn, _index_withdraw, network, args.vteps, args.failures)
+    bench_lib.report('VTEP failure with next_hop index', elapsed, count)
+
+
+if __name__ == '__main__':
+    main()
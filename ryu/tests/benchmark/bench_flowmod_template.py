@@ -0,0 +1,95 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares generating OFPFlowMod messages by OFPFlowMod.serialize() and
+by FlowModTemplate.
+"""
+
+from __future__ import print_function
+
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto.ofproto_template import FlowModTemplate
+from ryu.tests.benchmark import bench_lib
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    def __init__(self):
+        super(_Datapath, self).__init__(ofproto_v1_3.OFP_VERSION)
+        self.xid = 0
+        self.sent = 0
+
+    def send(self, buf):
+        self.sent += 1
+        return True
+
+
+def _flows(count):
+    for i in range(count):
+        yield ('10.%d.%d.%d' % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff),
+               '02:00:00:%02x:%02x:%02x'
+               % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff),
+               i % 48 + 1)
+
+
+def _send_flow_mod(dp, flows):
+    ofproto = dp.ofproto
+    parser = dp.ofproto_parser
+    for ipv4_dst, eth_dst, out_port in flows:
+        match = parser.OFPMatch(eth_type=0x0800, ipv4_dst=ipv4_dst)
+        actions = [parser.OFPActionSetField(eth_dst=eth_dst),
+                   parser.OFPActionOutput(out_port)]
+        inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS,
+                                             actions)]
+        msg = parser.OFPFlowMod(datapath=dp, priority=1, match=match,
+                                instructions=inst)
+        dp.xid += 1
+        msg.set_xid(dp.xid)
+        msg.serialize()
+        dp.send(msg.buf)
+
+
+def _send_template(dp, flows):
+    ofproto = dp.ofproto
+    parser = dp.ofproto_parser
+    tmpl = FlowModTemplate(
+        dp, ['ipv4_dst', 'set_eth_dst', 'output'],
+        priority=1,
+        match=parser.OFPMatch(eth_type=0x0800, ipv4_dst='0.0.0.0'),
+        instructions=[parser.OFPInstructionActions(
+            ofproto.OFPIT_APPLY_ACTIONS,
+            [parser.OFPActionSetField(eth_dst='00:00:00:00:00:00'),
+             parser.OFPActionOutput(0)])])
+    for ipv4_dst, eth_dst, out_port in flows:
+        tmpl.send(dp, ipv4_dst=ipv4_dst, set_eth_dst=eth_dst,
+                  output=out_port)
+
+
+def main():
+    args = bench_lib.parser(__doc__, 100000).parse_args()
+    flows = list(_flows(args.count))
+
+    elapsed, _ = bench_lib.measure(_send_flow_mod, _Datapath(), flows)
+    bench_lib.report('OFPFlowMod.serialize()', elapsed, args.count)
+    base = elapsed
+
+    elapsed, _ = bench_lib.measure(_send_template, _Datapath(), flows)
+    bench_lib.report('FlowModTemplate.send()', elapsed, args.count)
+    print('speedup: %.1fx' % (base / elapsed))
+
+
+if __name__ == '__main__':
+    main()
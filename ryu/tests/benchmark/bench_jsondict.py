@@ -0,0 +1,91 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures StringifyMixin.to_jsondict() and from_jsondict() with
+OFPFlowStatsReply messages and an EVPN network of RestSdnmdr.
+"""
+
+from __future__ import print_function
+
+from ryu.app.rest_sdnmdr import EvpnClient
+from ryu.app.rest_sdnmdr import EvpnNetwork
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.tests.benchmark import bench_lib
+
+
+def _parse_replies(dp, bufs):
+    return [ofproto_parser.msg(dp, ofproto_v1_3.OFP_VERSION,
+                               ofproto_v1_3.OFPT_MULTIPART_REPLY,
+                               len(buf), 1, buf)
+            for buf in bufs]
+
+
+def _replies_to_jsondict(msgs):
+    return [msg.to_jsondict() for msg in msgs]
+
+
+def _replies_from_jsondict(dp, jsondicts):
+    return [ofproto_parser.ofp_msg_from_jsondict(dp, j) for j in jsondicts]
+
+
+def _evpn_network(count):
+    network = EvpnNetwork(vni=100, route_dist='65000:100',
+                          ethernet_tag_id=0)
+    for i in range(count):
+        mac = '02:00:00:%02x:%02x:%02x' % (
+            i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff)
+        network.add_client(EvpnClient(
+            port=i % 48 + 1, mac=mac,
+            ip='10.%d.%d.%d' % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff),
+            next_hop='192.168.0.%d' % (i % 4 + 1)))
+    return network
+
+
+def _evpn_from_jsondict(jsondict):
+    jsondict = dict(jsondict['EvpnNetwork'])
+    clients = jsondict.pop('clients')
+    network = EvpnNetwork.from_jsondict(jsondict)
+    for c in clients.values():
+        network.add_client(EvpnClient.from_jsondict(c['EvpnClient']))
+    return network
+
+
+def main():
+    p = bench_lib.parser(__doc__, 50000)
+    p.add_argument('-c', '--clients', type=int, default=10000,
+                   help='number of EVPN clients (default: %(default)d)')
+    args = p.parse_args()
+
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    msgs = _parse_replies(dp, bench_lib.flow_stats_reply_bufs(args.count))
+    elapsed, jsondicts = bench_lib.measure(_replies_to_jsondict, msgs)
+    bench_lib.report('OFPFlowStatsReply.to_jsondict()', elapsed,
+                     args.count)
+    elapsed, _ = bench_lib.measure(_replies_from_jsondict, dp, jsondicts)
+    bench_lib.report('OFPFlowStatsReply.from_jsondict()', elapsed,
+                     args.count)
+
+    network = _evpn_network(args.clients)
+    elapsed, jsondict = bench_lib.measure(network.to_jsondict)
+    bench_lib.report('EvpnNetwork.to_jsondict()', elapsed, args.clients)
+    elapsed, _ = bench_lib.measure(_evpn_from_jsondict, jsondict)
+    bench_lib.report('EvpnNetwork.from_jsondict()', elapsed, args.clients)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Utilities for the benchmark scripts in this directory.
+
+Each benchmark script is executable as a module. e.g.)
+
+    $ python -m ryu.tests.benchmark.bench_flowmod_template
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import struct
+import time
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+def measure(func, *args, **kwargs):
+    """
+    Calls func with the given arguments and returns the tuple of
+    (elapsed seconds, return value).
+    """
+    gc.collect()
+    start = time.time()
+    ret = func(*args, **kwargs)
+    return time.time() - start, ret
+
+
+def measure_memory(func, *args, **kwargs):
+    """
+    Calls func with the given arguments and returns the tuple of
+    (allocated bytes still alive, peak bytes, return value).
+
+    Note: This function requires tracemalloc module (Python 3.4 or later).
+    """
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        ret = func(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current, peak, ret
+
+
+def report(name, elapsed, count):
+    print('%-40s %10.3f sec %12.1f ops/sec'
+          % (name, elapsed, count / elapsed if elapsed else 0))
+
+
+def report_memory(name, current, peak):
+    print('%-40s %10.1f MiB (peak %.1f MiB)'
+          % (name, current / 1048576.0, peak / 1048576.0))
+
+
+def parser(description, count):
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument('-n', '--count', type=int, default=count,
+                   help='number of iterations (default: %d)' % count)
+    return p
+
+
+# Flow stats are split into the multiple replies because the length of
+# an OpenFlow message is limited to 64KB.
+_FLOWS_PER_REPLY = 500
+
+
+def _flow_stats_body(i):
+    ofproto = ofproto_v1_3
+    parser = ofproto_v1_3_parser
+    buf = bytearray()
+    match = parser.OFPMatch(in_port=i % 48 + 1, eth_type=0x0800,
+                            ipv4_dst='10.%d.%d.%d'
+                            % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff))
+    match_len = match.serialize(buf, ofproto.OFP_FLOW_STATS_0_SIZE)
+    inst = parser.OFPInstructionActions(
+        ofproto.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(i % 48 + 1)])
+    inst.serialize(buf, ofproto.OFP_FLOW_STATS_0_SIZE + match_len)
+    struct.pack_into(ofproto.OFP_FLOW_STATS_0_PACK_STR, buf, 0,
+                     len(buf), 0, 10, 0, 1, 0, 0, 0, i, 100, 6400)
+    return buf
+
+
+def flow_stats_reply_bufs(count):
+    """
+    Returns the list of OpenFlow 1.3 OFPFlowStatsReply message buffers
+    which contain the given number of flow stats in total.
+    """
+    ofproto = ofproto_v1_3
+    bufs = []
+    for start in range(0, count, _FLOWS_PER_REPLY):
+        buf = bytearray(ofproto.OFP_MULTIPART_REPLY_SIZE)
+        for i in range(start, min(start + _FLOWS_PER_REPLY, count)):
+            buf += _flow_stats_body(i)
+        struct.pack_into(ofproto.OFP_HEADER_PACK_STR, buf, 0,
+                         ofproto.OFP_VERSION, ofproto.OFPT_MULTIPART_REPLY,
+                         len(buf), 1)
+        struct.pack_into(ofproto.OFP_MULTIPART_REPLY_PACK_STR, buf,
+                         ofproto.OFP_HEADER_SIZE, ofproto.OFPMP_FLOW,
+                         ofproto.OFPMPF_REPLY_MORE)
+        bufs.append(buf)
+    return bufs
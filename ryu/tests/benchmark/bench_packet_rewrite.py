@@ -0,0 +1,84 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures serializing a packet with packet.Packet and rewriting the
+destination address and TTL of a packet with packet.Packet and with
+packet_rewriter.PacketRewriter.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import packet_rewriter
+from ryu.lib.packet import tcp
+from ryu.lib.packet import vlan
+from ryu.tests.benchmark import bench_lib
+
+
+def _protocols(payload_len):
+    return [ethernet.ethernet(ethertype=0x8100),
+            vlan.vlan(vid=10),
+            ipv4.ipv4(proto=6),
+            tcp.tcp(src_port=1024, dst_port=80),
+            b'\x00' * payload_len]
+
+
+def _serialize(count, payload_len):
+    for _ in range(count):
+        pkt = packet.Packet(protocols=_protocols(payload_len))
+        pkt.serialize()
+
+
+def _rewrite_with_packet(buf, count):
+    for _ in range(count):
+        pkt = packet.Packet(buf)
+        ip = pkt.get_protocol(ipv4.ipv4)
+        ip.dst = '192.0.2.2'
+        ip.ttl -= 1
+        ip.total_length = 0
+        pkt.get_protocol(tcp.tcp).csum = 0
+        pkt.serialize()
+
+
+def _rewrite_with_rewriter(buf, count):
+    for _ in range(count):
+        rewriter = packet_rewriter.PacketRewriter(buf)
+        rewriter.set_field(ipv4_dst='192.0.2.2')
+        rewriter.dec_nw_ttl()
+
+
+def main():
+    p = bench_lib.parser(__doc__, 20000)
+    p.add_argument('-l', '--payload-len', type=int, default=1400,
+                   help='length of TCP payload (default: %(default)d)')
+    args = p.parse_args()
+
+    elapsed, _ = bench_lib.measure(_serialize, args.count, args.payload_len)
+    bench_lib.report('Packet.serialize()', elapsed, args.count)
+
+    pkt = packet.Packet(protocols=_protocols(args.payload_len))
+    pkt.serialize()
+    buf = bytes(pkt.data)
+    elapsed, _ = bench_lib.measure(_rewrite_with_packet, buf, args.count)
+    bench_lib.report('Packet rewrite', elapsed, args.count)
+    elapsed, _ = bench_lib.measure(_rewrite_with_rewriter, buf, args.count)
+    bench_lib.report('PacketRewriter rewrite', elapsed, args.count)
+
+
+if __name__ == '__main__':
+    main()
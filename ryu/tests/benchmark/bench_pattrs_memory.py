@@ -0,0 +1,80 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the memory footprint of the BGP paths learned from the peers
+which advertise the same prefixes with the same set of path attributes,
+as Peer does for the received UPDATE messages.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.tests.benchmark import bench_lib
+
+
+def _update_bufs(count, per_update, attr_sets):
+    bufs = []
+    for i in range(0, count, per_update):
+        as_path = [[65000, 1 + (i // per_update) % attr_sets]]
+        nlri = [bgp.IPAddrPrefix(24, '%d.%d.%d.0' % (
+            j >> 16 & 0xff, j >> 8 & 0xff, j & 0xff))
+            for j in range(i, min(i + per_update, count))]
+        update = bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                bgp.BGPPathAttributeAsPath(as_path),
+                bgp.BGPPathAttributeNextHop('192.168.0.1'),
+                bgp.BGPPathAttributeCommunities([0xfde80001, 0xfde80002]),
+            ],
+            nlri=nlri)
+        bufs.append(update.serialize())
+    return bufs
+
+
+def _learn_paths(peers, bufs):
+    paths = []
+    for _ in range(peers):
+        for buf in bufs:
+            msg, _, _ = bgp.BGPMessage.parser(buf)
+            pattrs = msg.pathattr_map
+            for nlri in msg.nlri:
+                paths.append(Ipv4Path(None, nlri, 0, pattrs=pattrs,
+                                      nexthop='192.168.0.1'))
+    return paths
+
+
+def main():
+    p = bench_lib.parser(__doc__, 100000)
+    p.add_argument('-p', '--peers', type=int, default=2,
+                   help='number of peers (default: %(default)d)')
+    p.add_argument('-u', '--per-update', type=int, default=20,
+                   help='number of prefixes per UPDATE '
+                        '(default: %(default)d)')
+    p.add_argument('-a', '--attr-sets', type=int, default=1000,
+                   help='number of distinct path attribute sets '
+                        '(default: %(default)d)')
+    args = p.parse_args()
+
+    bufs = _update_bufs(args.count, args.per_update, args.attr_sets)
+    current, peak, _ = bench_lib.measure_memory(_learn_paths, args.peers,
+                                                bufs)
+    bench_lib.report_memory('Ipv4Path (%d peers x %d prefixes)'
+                            % (args.peers, args.count), current, peak)
+
+
+if __name__ == '__main__':
+    main()
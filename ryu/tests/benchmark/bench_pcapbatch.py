@@ -0,0 +1,90 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures decoding the packets in a PCAP file and selecting the TCP
+packets to port 80 with pcaplib.Reader + packet.Packet and with
+pcapbatch.BatchReader.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+from ryu.lib import pcapbatch
+from ryu.lib import pcaplib
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.tests.benchmark import bench_lib
+
+
+def _write_pcap(file_name, count):
+    bufs = []
+    for port in (80, 443):
+        pkt = packet.Packet()
+        pkt.add_protocol(ethernet.ethernet())
+        pkt.add_protocol(ipv4.ipv4(proto=6))
+        pkt.add_protocol(tcp.tcp(src_port=1024, dst_port=port))
+        pkt.serialize()
+        bufs.append(pkt.data)
+
+    writer = pcaplib.Writer(open(file_name, 'wb'))
+    for i in range(count):
+        writer.write_pkt(bufs[i % 2], ts=i)
+    del writer
+
+
+def _select_with_reader(file_name):
+    selected = []
+    with open(file_name, 'rb') as f:
+        for ts, buf in pcaplib.Reader(f):
+            pkt = packet.Packet(buf)
+            tcp_pkt = pkt.get_protocol(tcp.tcp)
+            if tcp_pkt and tcp_pkt.dst_port == 80:
+                selected.append(ts)
+    return selected
+
+
+def _select_with_batch_reader(file_name):
+    reader = pcapbatch.BatchReader(file_name)
+    selected = reader.filter('(ip_proto == 6) & (tcp_dst == 80)')['ts']
+    reader.close()
+    return selected
+
+
+def main():
+    p = bench_lib.parser(__doc__, 100000)
+    args = p.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        file_name = os.path.join(tmpdir, 'bench.pcap')
+        _write_pcap(file_name, args.count)
+
+        elapsed, _ = bench_lib.measure(_select_with_reader, file_name)
+        bench_lib.report('pcaplib.Reader + packet.Packet', elapsed,
+                         args.count)
+        elapsed, _ = bench_lib.measure(_select_with_batch_reader, file_name)
+        bench_lib.report('pcapbatch.BatchReader', elapsed, args.count)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the memory footprint of the parsed OFPFlowStatsReply, the BGP
+paths in RIB and the parsed packets.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import bgp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.tests.benchmark import bench_lib
+
+
+def _parse_flow_stats_replies(dp, bufs):
+    return [ofproto_parser.msg(dp, ofproto_v1_3.OFP_VERSION,
+                               ofproto_v1_3.OFPT_MULTIPART_REPLY,
+                               len(buf), 1, buf)
+            for buf in bufs]
+
+
+def _create_paths(count):
+    pattrs = {
+        bgp.BGP_ATTR_TYPE_ORIGIN: bgp.BGPPathAttributeOrigin(
+            bgp.BGP_ATTR_ORIGIN_IGP),
+    }
+    paths = []
+    for i in range(count):
+        nlri = bgp.IPAddrPrefix(
+            32, '10.%d.%d.%d' % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff))
+        paths.append(Ipv4Path(None, nlri, 0, pattrs=pattrs,
+                              nexthop='192.168.0.1'))
+    return paths
+
+
+def _packet_buf():
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet())
+    pkt.add_protocol(ipv4.ipv4(proto=6))
+    pkt.add_protocol(tcp.tcp(src_port=1024, dst_port=80))
+    pkt.serialize()
+    return pkt.data
+
+
+def _parse_packets(buf, count):
+    return [packet.Packet(buf) for _ in range(count)]
+
+
+def main():
+    p = bench_lib.parser(__doc__, 100000)
+    p.add_argument('-r', '--routes', type=int, default=1000000,
+                   help='number of BGP paths (default: %(default)d)')
+    args = p.parse_args()
+
+    dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+    bufs = bench_lib.flow_stats_reply_bufs(args.count)
+    current, peak, _ = bench_lib.measure_memory(
+        _parse_flow_stats_replies, dp, bufs)
+    bench_lib.report_memory('OFPFlowStatsReply (%d flows)' % args.count,
+                            current, peak)
+
+    current, peak, _ = bench_lib.measure_memory(_create_paths, args.routes)
+    bench_lib.report_memory('Ipv4Path (%d routes)' % args.routes,
+                            current, peak)
+
+    buf = _packet_buf()
+    current, peak, _ = bench_lib.measure_memory(
+        _parse_packets, buf, args.count)
+    bench_lib.report_memory('Packet eth/ipv4/tcp (%d packets)' % args.count,
+                            current, peak)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,512 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+import six
+from nose.tools import eq_
+from nose.tools import ok_
+from ovs.db.idl import ROW_CREATE
+from ovs.db.idl import ROW_DELETE
+from ovs.db.idl import ROW_UPDATE
+
+from ryu.app import rest_sdnmdr
+from ryu.lib import hub
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+
+
+LOG = logging.getLogger(__name__)
+
+VNI = 10
+ROUTER_ID = '172.17.0.1'
+
+
+class DummyDatapath(ofproto_protocol.ProtocolDesc):
+    def __init__(self):
+        super(DummyDatapath, self).__init__(ofproto_v1_3.OFP_VERSION)
+        self.id = 1
+        self.xid = 0
+        self.sent = []
+
+    def send(self, buf):
+        self.sent.append(six.binary_type(buf))
+        return True
+
+    def send_msg(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        msg.serialize()
+        self.send(msg.buf)
+
+
+def _flow_mods(datapath, bufs=None):
+    # Parses the sent FlowMods into the tuples of the command, the table
+    # and the key field of the flows.
+    ofproto = datapath.ofproto
+    result = []
+    for buf in datapath.sent if bufs is None else bufs:
+        while buf:
+            version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+            msg = ofproto_parser.msg(datapath, version, msg_type, msg_len,
+                                     xid, buf[:msg_len])
+            buf = buf[msg_len:]
+            command = 'add' if msg.command == ofproto.OFPFC_ADD else 'del'
+            if msg.priority == rest_sdnmdr.PRIORITY_ARP_REPLAY:
+                result.append((command, 'arp', msg.match['arp_tpa']))
+            elif 'eth_dst' in msg.match:
+                result.append((command, 'l2', msg.match['eth_dst']))
+            else:
+                result.append((command, 'ingress', msg.match['in_port']))
+    return result
+
+
+class _Test_RestSdnmdr(unittest.TestCase):
+
+    def setUp(self):
+        self.app = rest_sdnmdr.RestSdnmdr(wsgi=mock.MagicMock())
+        self.app.speaker = mock.MagicMock(dpid=1, router_id=ROUTER_ID)
+        self.network = rest_sdnmdr.EvpnNetwork(
+            vni=VNI, route_dist='65000:%d' % VNI, ethernet_tag_id=0)
+        self.app.networks[VNI] = self.network
+        self.datapath = DummyDatapath()
+        self._patch(self.app, '_get_datapath', return_value=self.datapath)
+        self.spawn = self._patch(rest_sdnmdr.hub, 'spawn')
+        self.send_msg = self._patch(rest_sdnmdr.ofctl_api, 'send_msg')
+
+    def _patch(self, target, attribute, **kwargs):
+        patcher = mock.patch.object(target, attribute, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+
+class Test_RestSdnmdr_flows(_Test_RestSdnmdr):
+    """
+    Test case for the asynchronous flow programming of RestSdnmdr
+    """
+
+    def test_coalesce(self):
+        mac = 'aa:bb:cc:00:00:01'
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1', 5)
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1')
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.2', 6)
+        eq_(1, len(self.app.flow_queue))
+        eq_(3, self.app.flow_stats['queued'])
+        eq_(2, self.app.flow_stats['coalesced'])
+        # The thread is spawned once
+        self.spawn.assert_called_once_with(self.app._program_flows)
+
+        self.app._program_flows()
+        # Deletes the ARP reply flow of the old IP address, and then
+        # adds the latest flows.
+        eq_([('del', 'arp', '10.0.0.1'),
+             ('add', 'l2', mac),
+             ('add', 'arp', '10.0.0.2')],
+            _flow_mods(self.datapath))
+        eq_(0, len(self.app.flow_queue))
+        eq_(None, self.app.flow_thread)
+        eq_(1, self.app.flow_stats['programmed'])
+        eq_(3, self.app.flow_stats['flow_mods'])
+
+    def test_coalesce_same_ip(self):
+        mac = 'aa:bb:cc:00:00:01'
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1', 5)
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1')
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1', 6)
+        self.app._program_flows()
+        eq_([('add', 'l2', mac),
+             ('add', 'arp', '10.0.0.1')],
+            _flow_mods(self.datapath))
+
+    def test_batch_order(self):
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:02', '10.0.0.2')
+        self.app._program_flows()
+        # In the order of queueing, the deletions before the additions
+        # for each client
+        eq_([('add', 'l2', 'aa:bb:cc:00:00:01'),
+             ('add', 'arp', '10.0.0.1'),
+             ('del', 'l2', 'aa:bb:cc:00:00:02'),
+             ('del', 'arp', '10.0.0.2')],
+            _flow_mods(self.datapath))
+        # Sent at once and committed by a barrier
+        eq_(1, len(self.datapath.sent))
+        eq_(1, self.send_msg.call_count)
+
+    def test_batches(self):
+        for i in range(5):
+            self.app._queue_remote_client_flows(
+                VNI, 'aa:bb:cc:00:00:%02x' % i, '10.0.0.%d' % i, i + 1)
+        with mock.patch.object(rest_sdnmdr, 'FLOW_BATCH_SIZE', 2):
+            self.app._program_flows()
+        eq_([4, 4, 2], [len(_flow_mods(self.datapath, [buf]))
+                        for buf in self.datapath.sent])
+        eq_(3, self.send_msg.call_count)
+        eq_(3, self.app.flow_stats['batches'])
+        eq_(5, self.app.flow_stats['programmed'])
+        eq_(10, self.app.flow_stats['flow_mods'])
+        eq_(['10.0.0.%d' % i for i in range(5)],
+            [key for _, table, key in _flow_mods(self.datapath)
+             if table == 'arp'])
+
+    def test_barrier_timeout(self):
+        self.send_msg.side_effect = hub.Timeout()
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        self.app._program_flows()
+        eq_(1, self.app.flow_stats['barrier_errors'])
+        eq_(1, self.app.flow_stats['programmed'])
+
+        self.send_msg.side_effect = Exception('error')
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:02', '10.0.0.2', 5)
+        self.app._program_flows()
+        eq_(2, self.app.flow_stats['barrier_errors'])
+        eq_(2, self.app.flow_stats['programmed'])
+
+    def test_no_datapath(self):
+        self.app._get_datapath.side_effect = [None, self.datapath]
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:02', '10.0.0.2', 5)
+
+        # Kept in the queue in order and retried
+        def _sleep(_):
+            eq_([(VNI, 'aa:bb:cc:00:00:01'), (VNI, 'aa:bb:cc:00:00:02')],
+                list(self.app.flow_queue.keys()))
+
+        with mock.patch.object(rest_sdnmdr.hub, 'sleep',
+                               side_effect=_sleep) as sleep:
+            self.app._program_flows()
+        sleep.assert_called_once_with(rest_sdnmdr.FLOW_RETRY_INTERVAL)
+        eq_(1, self.app.flow_stats['datapath_errors'])
+        eq_(2, self.app.flow_stats['programmed'])
+        eq_(4, len(_flow_mods(self.datapath)))
+        eq_(0, len(self.app.flow_queue))
+
+    def test_requeue(self):
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        batch = list(self.app.flow_queue.items())
+        self.app.flow_queue.clear()
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:02', '10.0.0.2', 5)
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1')
+        pending = self.app.flow_queue[(VNI, 'aa:bb:cc:00:00:01')]
+
+        self.app._requeue_flows(batch)
+        # The newer flows for the same client supersede the batch
+        eq_([(VNI, 'aa:bb:cc:00:00:02'), (VNI, 'aa:bb:cc:00:00:01')],
+            list(self.app.flow_queue.keys()))
+        ok_(self.app.flow_queue[(VNI, 'aa:bb:cc:00:00:01')] is pending)
+
+    def test_drop(self):
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        self.app._queue_remote_client_flows(
+            20, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:02', '10.0.0.2')
+        self.app._drop_remote_client_flows(VNI)
+        eq_([(20, 'aa:bb:cc:00:00:01')], list(self.app.flow_queue.keys()))
+
+    def test_local_client(self):
+        mac = 'aa:bb:cc:00:00:01'
+        self.network.add_client(rest_sdnmdr.EvpnClient(
+            port=5, mac=mac, ip='10.0.0.1', next_hop='172.17.0.2'))
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1')
+        self.network.del_client(mac)
+
+        # The remote client moved to the local port
+        with mock.patch.object(self.app, '_get_ofport', return_value=3):
+            self.app.add_client(VNI, 's1-eth1', mac, '10.0.0.1')
+        eq_(0, len(self.app.flow_queue))
+        eq_([('del', 'arp', '10.0.0.1'),
+             ('add', 'ingress', 3),
+             ('add', 'l2', mac)],
+            _flow_mods(self.datapath))
+
+        # Not overwritten by the remote client queued before
+        self.app._queue_remote_client_flows(VNI, mac, '10.0.0.1', 5)
+        del self.datapath.sent[:]
+        self.app.del_client(VNI, mac)
+        eq_(0, len(self.app.flow_queue))
+        eq_([('del', 'ingress', 3),
+             ('del', 'l2', mac)],
+            _flow_mods(self.datapath))
+
+    def test_flow_stats(self):
+        self.app._queue_remote_client_flows(
+            VNI, 'aa:bb:cc:00:00:01', '10.0.0.1', 5)
+        stats = self.app.get_flow_stats()
+        eq_(1, stats['pending'])
+        eq_(0.0, stats['avg_lag'])
+        ok_('total_lag' not in stats)
+
+        self.app._program_flows()
+        stats = self.app.get_flow_stats()
+        eq_(0, stats['pending'])
+        eq_(1, stats['programmed'])
+        ok_(stats['avg_lag'] >= 0.0)
+
+
+REMOTE_IP = '172.17.0.2'
+
+
+def _iface(remote_ip, key, ofport):
+    # Row of Interface table notified by OVSDB
+    row = mock.Mock(ofport=ofport)
+    row.name = rest_sdnmdr.vxlan_port_name(remote_ip, key)
+    return row
+
+
+class Test_RestSdnmdr_vxlan_ports(_Test_RestSdnmdr):
+    """
+    Test case for the VXLAN port cache and the routes waiting for the ports
+    """
+
+    def setUp(self):
+        super(Test_RestSdnmdr_vxlan_ports, self).setUp()
+        self.ovs = mock.MagicMock()
+        self._patch(self.app, '_get_ovs_bridge', return_value=self.ovs)
+        self.sleep = self._patch(rest_sdnmdr.hub, 'sleep')
+        self.func = mock.MagicMock()
+
+    def _create_ports(self, ports):
+        # Notifies the created ports as OVSDB does
+        for port in ports:
+            remote_ip, key = rest_sdnmdr.parse_vxlan_port_name(port['name'])
+            self.app._vxlan_port_listener(
+                ROW_CREATE, _iface(remote_ip, key, [5]))
+
+    def test_listener(self):
+        listener = self.app._vxlan_port_listener
+        listener(ROW_CREATE, _iface(REMOTE_IP, VNI, [5]))
+        eq_({(REMOTE_IP, VNI): 5}, self.app.vxlan_ports)
+
+        # Not VXLAN port
+        row = mock.Mock(ofport=[6])
+        row.name = 's1-eth1'
+        listener(ROW_CREATE, row)
+        eq_({(REMOTE_IP, VNI): 5}, self.app.vxlan_ports)
+
+        # Failed to create
+        listener(ROW_UPDATE, _iface(REMOTE_IP, VNI, [-1]))
+        eq_({}, self.app.vxlan_ports)
+
+        listener(ROW_UPDATE, _iface(REMOTE_IP, VNI, [5]))
+        listener(ROW_DELETE, _iface(REMOTE_IP, VNI, [5]))
+        eq_({}, self.app.vxlan_ports)
+
+    def test_cache_hit(self):
+        self.app._vxlan_port_listener(
+            ROW_CREATE, _iface(REMOTE_IP, VNI, [5]))
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'arg')
+
+        # Called at once without OVSDB transaction
+        self.func.assert_called_once_with(5, 'arg')
+        ok_(not self.spawn.called)
+        ok_(not self.ovs.add_tunnel_ports.called)
+        eq_({}, self.app.pending_vxlan_ports)
+
+    def test_deferred(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac1', self.func, 'arg1')
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac2', self.func, 'arg2')
+        self.app._wait_vxlan_port(REMOTE_IP, VNI + 1, None, self.func, 'arg3')
+        ok_(not self.func.called)
+        self.spawn.assert_called_once_with(self.app._provision_vxlan_ports)
+        self.app.vxlan_port_thread = self.spawn.return_value
+
+        # Creates all the ports in a single transaction
+        self.ovs.add_tunnel_ports.side_effect = self._create_ports
+        self.app._provision_vxlan_ports()
+        eq_(1, self.ovs.add_tunnel_ports.call_count)
+        eq_(sorted([rest_sdnmdr.vxlan_port_name(REMOTE_IP, VNI),
+                    rest_sdnmdr.vxlan_port_name(REMOTE_IP, VNI + 1)]),
+            sorted(p['name']
+                   for p in self.ovs.add_tunnel_ports.call_args[0][0]))
+        eq_(3, self.func.call_count)
+        self.func.assert_has_calls([mock.call(5, 'arg1'),
+                                    mock.call(5, 'arg2'),
+                                    mock.call(5, 'arg3')], any_order=True)
+        eq_({}, self.app.pending_vxlan_ports)
+        eq_(None, self.app.vxlan_port_thread)
+        eq_(0, self.app.vxlan_port_errors)
+
+    def test_cancel(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac1', self.func, 'arg1')
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac2', self.func, 'arg2')
+        ok_(self.app._cancel_vxlan_port(REMOTE_IP, VNI, 'mac1'))
+        ok_(not self.app._cancel_vxlan_port(REMOTE_IP, VNI, 'mac1'))
+        ok_(not self.app._cancel_vxlan_port(REMOTE_IP, VNI + 1, 'mac1'))
+
+        self.ovs.add_tunnel_ports.side_effect = self._create_ports
+        self.app._provision_vxlan_ports()
+        self.func.assert_called_once_with(5, 'arg2')
+
+    def test_retry(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'arg')
+
+        def _add_tunnel_ports(ports):
+            # Created at the second attempt
+            if self.ovs.add_tunnel_ports.call_count > 1:
+                self._create_ports(ports)
+
+        self.ovs.add_tunnel_ports.side_effect = _add_tunnel_ports
+        self.app._provision_vxlan_ports()
+        eq_(2, self.ovs.add_tunnel_ports.call_count)
+        self.sleep.assert_called_once_with(
+            rest_sdnmdr.VXLAN_PORT_RETRY_INTERVAL)
+        self.func.assert_called_once_with(5, 'arg')
+        eq_(1, self.app.vxlan_port_errors)
+        eq_({}, self.app.pending_vxlan_ports)
+
+    def test_retry_superseded(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'old')
+
+        def _add_tunnel_ports(ports):
+            if self.ovs.add_tunnel_ports.call_count == 1:
+                # Received again while creating the port
+                self.app._wait_vxlan_port(
+                    REMOTE_IP, VNI, 'mac', self.func, 'new')
+            else:
+                self._create_ports(ports)
+
+        self.ovs.add_tunnel_ports.side_effect = _add_tunnel_ports
+        self.app._provision_vxlan_ports()
+        self.func.assert_called_once_with(5, 'new')
+
+    def test_retry_drop(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'arg')
+        self.app._provision_vxlan_ports()
+
+        max_retries = rest_sdnmdr.VXLAN_PORT_MAX_RETRIES
+        eq_(max_retries + 1, self.ovs.add_tunnel_ports.call_count)
+        eq_(max_retries, self.sleep.call_count)
+        eq_(max_retries + 1, self.app.vxlan_port_errors)
+        ok_(not self.func.called)
+        eq_({}, self.app.pending_vxlan_ports)
+        eq_(None, self.app.vxlan_port_thread)
+
+
+def _linear_get_clients(network, **kwargs):
+    # get_clients() without the indexes
+    return [c for c in network.clients.values()
+            if all(getattr(c, k) == v for k, v in kwargs.items())]
+
+
+class Test_EvpnNetwork(unittest.TestCase):
+    """
+    Test case for the client indexes of rest_sdnmdr.EvpnNetwork
+    """
+
+    def setUp(self):
+        self.network = rest_sdnmdr.EvpnNetwork(
+            vni=VNI, route_dist='65000:%d' % VNI, ethernet_tag_id=0)
+        for i in range(1, 7):
+            self.network.add_client(rest_sdnmdr.EvpnClient(
+                port=i % 3, mac='aa:bb:cc:00:00:%02x' % i,
+                ip='10.0.0.%d' % (i % 4),
+                next_hop='172.17.0.%d' % (i % 2)))
+
+    def _check_indexes(self):
+        # The indexes contain exactly the current clients
+        for attr, index in self.network._indexes.items():
+            entries = set()
+            for value, clients in index.items():
+                ok_(clients)
+                for mac, client in clients.items():
+                    ok_(self.network.clients[mac] is client)
+                    eq_(value, getattr(client, attr))
+                    entries.add(mac)
+            eq_(set(self.network.clients), entries)
+
+    def _check_get_clients(self):
+        def _macs(clients):
+            return sorted(c.mac for c in clients)
+
+        values = set()
+        for client in self.network.clients.values():
+            values.add(('next_hop', client.next_hop))
+            values.add(('port', client.port))
+            values.add(('ip', client.ip))
+        values.update([('next_hop', '172.17.0.9'), ('port', 9),
+                       ('ip', '10.0.0.9')])
+        for k, v in values:
+            eq_(_macs(_linear_get_clients(self.network, **{k: v})),
+                _macs(self.network.get_clients(**{k: v})))
+
+        for kwargs in ({}, {'next_hop': '172.17.0.1', 'port': 1},
+                       {'port': 2, 'ip': '10.0.0.1'},
+                       {'mac': 'aa:bb:cc:00:00:01'},
+                       {'mac': 'aa:bb:cc:00:00:01', 'next_hop': '172.17.0.0'}):
+            eq_(_macs(_linear_get_clients(self.network, **kwargs)),
+                _macs(self.network.get_clients(**kwargs)))
+
+    def test_get_clients(self):
+        self._check_indexes()
+        self._check_get_clients()
+        eq_(['aa:bb:cc:00:00:01', 'aa:bb:cc:00:00:03',
+             'aa:bb:cc:00:00:05'],
+            sorted(c.mac for c in
+                   self.network.get_clients(next_hop='172.17.0.1')))
+
+    def test_replace(self):
+        # The same MAC address with the new next hop, port and IP
+        mac = 'aa:bb:cc:00:00:01'
+        old = self.network.clients[mac]
+        new = rest_sdnmdr.EvpnClient(
+            port=5, mac=mac, ip='10.0.0.5', next_hop='172.17.0.5')
+        self.network.add_client(new)
+        self._check_indexes()
+        self._check_get_clients()
+        eq_([new], self.network.get_clients(next_hop='172.17.0.5'))
+        eq_([new], self.network.get_clients(port=5))
+        eq_([new], self.network.get_clients(ip='10.0.0.5'))
+        ok_(old not in self.network.get_clients(next_hop=old.next_hop))
+        ok_(old not in self.network.get_clients(port=old.port))
+        ok_(old not in self.network.get_clients(ip=old.ip))
+
+    def test_del_client(self):
+        client = self.network.del_client('aa:bb:cc:00:00:01')
+        eq_('aa:bb:cc:00:00:01', client.mac)
+        eq_(None, self.network.del_client('aa:bb:cc:00:00:01'))
+        self._check_indexes()
+        self._check_get_clients()
+
+        for mac in list(self.network.clients):
+            self.network.del_client(mac)
+        eq_({}, self.network.clients)
+        eq_(dict((k, {}) for k in rest_sdnmdr.EvpnNetwork._INDEXED_ATTRS),
+            self.network._indexes)
+        eq_([], self.network.get_clients(next_hop='172.17.0.1'))
+
+    def test_init(self):
+        network = rest_sdnmdr.EvpnNetwork(
+            vni=VNI, route_dist='65000:%d' % VNI, ethernet_tag_id=0,
+            clients=self.network.clients)
+        self.network = network
+        self._check_indexes()
+        self._check_get_clients()
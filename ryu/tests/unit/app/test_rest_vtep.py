@@ -0,0 +1,178 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from ovs.db.idl import ROW_CREATE
+from ovs.db.idl import ROW_DELETE
+from ovs.db.idl import ROW_UPDATE
+
+from ryu.app import rest_vtep
+
+
+LOG = logging.getLogger(__name__)
+
+VNI = 10
+REMOTE_IP = '172.17.0.2'
+
+
+def _iface(remote_ip, key, ofport):
+    # Row of Interface table notified by OVSDB
+    row = mock.Mock(ofport=ofport)
+    row.name = rest_vtep.vxlan_port_name(remote_ip, key)
+    return row
+
+
+class Test_RestVtep_vxlan_ports(unittest.TestCase):
+    """
+    Test case for the VXLAN port cache and the routes waiting for the ports
+    """
+
+    def setUp(self):
+        self.app = rest_vtep.RestVtep(wsgi=mock.MagicMock())
+        self.app.speaker = mock.MagicMock(dpid=1)
+        self.spawn = self._patch(rest_vtep.hub, 'spawn')
+        self.ovs = mock.MagicMock()
+        self._patch(self.app, '_get_ovs_bridge', return_value=self.ovs)
+        self.sleep = self._patch(rest_vtep.hub, 'sleep')
+        self.func = mock.MagicMock()
+
+    def _patch(self, target, attribute, **kwargs):
+        patcher = mock.patch.object(target, attribute, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _create_ports(self, ports):
+        # Notifies the created ports as OVSDB does
+        for port in ports:
+            remote_ip, key = rest_vtep.parse_vxlan_port_name(port['name'])
+            self.app._vxlan_port_listener(
+                ROW_CREATE, _iface(remote_ip, key, [5]))
+
+    def test_listener(self):
+        listener = self.app._vxlan_port_listener
+        listener(ROW_CREATE, _iface(REMOTE_IP, VNI, [5]))
+        eq_({(REMOTE_IP, VNI): 5}, self.app.vxlan_ports)
+
+        # Not VXLAN port
+        row = mock.Mock(ofport=[6])
+        row.name = 's1-eth1'
+        listener(ROW_CREATE, row)
+        eq_({(REMOTE_IP, VNI): 5}, self.app.vxlan_ports)
+
+        # Failed to create
+        listener(ROW_UPDATE, _iface(REMOTE_IP, VNI, [-1]))
+        eq_({}, self.app.vxlan_ports)
+
+        listener(ROW_UPDATE, _iface(REMOTE_IP, VNI, [5]))
+        listener(ROW_DELETE, _iface(REMOTE_IP, VNI, [5]))
+        eq_({}, self.app.vxlan_ports)
+
+    def test_cache_hit(self):
+        self.app._vxlan_port_listener(
+            ROW_CREATE, _iface(REMOTE_IP, VNI, [5]))
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'arg')
+
+        # Called at once without OVSDB transaction
+        self.func.assert_called_once_with(5, 'arg')
+        ok_(not self.spawn.called)
+        ok_(not self.ovs.add_tunnel_ports.called)
+        eq_({}, self.app.pending_vxlan_ports)
+
+    def test_deferred(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac1', self.func, 'arg1')
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac2', self.func, 'arg2')
+        self.app._wait_vxlan_port(REMOTE_IP, VNI + 1, None, self.func, 'arg3')
+        ok_(not self.func.called)
+        self.spawn.assert_called_once_with(self.app._provision_vxlan_ports)
+        self.app.vxlan_port_thread = self.spawn.return_value
+
+        # Creates all the ports in a single transaction
+        self.ovs.add_tunnel_ports.side_effect = self._create_ports
+        self.app._provision_vxlan_ports()
+        eq_(1, self.ovs.add_tunnel_ports.call_count)
+        eq_(sorted([rest_vtep.vxlan_port_name(REMOTE_IP, VNI),
+                    rest_vtep.vxlan_port_name(REMOTE_IP, VNI + 1)]),
+            sorted(p['name']
+                   for p in self.ovs.add_tunnel_ports.call_args[0][0]))
+        eq_(3, self.func.call_count)
+        self.func.assert_has_calls([mock.call(5, 'arg1'),
+                                    mock.call(5, 'arg2'),
+                                    mock.call(5, 'arg3')], any_order=True)
+        eq_({}, self.app.pending_vxlan_ports)
+        eq_(None, self.app.vxlan_port_thread)
+        eq_(0, self.app.vxlan_port_errors)
+
+    def test_cancel(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac1', self.func, 'arg1')
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac2', self.func, 'arg2')
+        ok_(self.app._cancel_vxlan_port(REMOTE_IP, VNI, 'mac1'))
+        ok_(not self.app._cancel_vxlan_port(REMOTE_IP, VNI, 'mac1'))
+        ok_(not self.app._cancel_vxlan_port(REMOTE_IP, VNI + 1, 'mac1'))
+
+        self.ovs.add_tunnel_ports.side_effect = self._create_ports
+        self.app._provision_vxlan_ports()
+        self.func.assert_called_once_with(5, 'arg2')
+
+    def test_retry(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'arg')
+
+        def _add_tunnel_ports(ports):
+            # Created at the second attempt
+            if self.ovs.add_tunnel_ports.call_count > 1:
+                self._create_ports(ports)
+
+        self.ovs.add_tunnel_ports.side_effect = _add_tunnel_ports
+        self.app._provision_vxlan_ports()
+        eq_(2, self.ovs.add_tunnel_ports.call_count)
+        self.sleep.assert_called_once_with(
+            rest_vtep.VXLAN_PORT_RETRY_INTERVAL)
+        self.func.assert_called_once_with(5, 'arg')
+        eq_(1, self.app.vxlan_port_errors)
+        eq_({}, self.app.pending_vxlan_ports)
+
+    def test_retry_superseded(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'old')
+
+        def _add_tunnel_ports(ports):
+            if self.ovs.add_tunnel_ports.call_count == 1:
+                # Received again while creating the port
+                self.app._wait_vxlan_port(
+                    REMOTE_IP, VNI, 'mac', self.func, 'new')
+            else:
+                self._create_ports(ports)
+
+        self.ovs.add_tunnel_ports.side_effect = _add_tunnel_ports
+        self.app._provision_vxlan_ports()
+        self.func.assert_called_once_with(5, 'new')
+
+    def test_retry_drop(self):
+        self.app._wait_vxlan_port(REMOTE_IP, VNI, 'mac', self.func, 'arg')
+        self.app._provision_vxlan_ports()
+
+        max_retries = rest_vtep.VXLAN_PORT_MAX_RETRIES
+        eq_(max_retries + 1, self.ovs.add_tunnel_ports.call_count)
+        eq_(max_retries, self.sleep.call_count)
+        eq_(max_retries + 1, self.app.vxlan_port_errors)
+        ok_(not self.func.called)
+        eq_({}, self.app.pending_vxlan_ports)
+        eq_(None, self.app.vxlan_port_thread)
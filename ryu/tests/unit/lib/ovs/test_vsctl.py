@@ -164,6 +164,39 @@ class TestVSCtl(unittest.TestCase):
 
         ok_(command.result is not None)
 
+    def test_00_03_idl_session(self):
+        bridge = 's0'
+        other = vsctl.VSCtl(self.vsctl.remote)
+        command = vsctl.VSCtlCommand('list-br')
+        other.run_command([command], timeout_sec=1)
+        session = vsctl._idl_sessions[self.vsctl.remote]
+
+        # The local replica follows the changes by other clients.
+        self._docker_exec_mn('ovs-vsctl add-br %s' % bridge)
+        sleep(1)
+        command = vsctl.VSCtlCommand('br-exists', (bridge, ))
+        self._run_commands([command])
+        eq_(True, command.result)
+        ok_(session is vsctl._idl_sessions[self.vsctl.remote])
+
+        self._docker_exec_mn('ovs-vsctl del-br %s' % bridge)
+
+    def test_00_04_row_listener(self):
+        bridge = 's0'
+        events = []
+
+        def _listener(event, row, updates=None):
+            events.append((event, row.name))
+
+        self.vsctl.add_row_listener('Bridge', _listener)
+        self._docker_exec_mn('ovs-vsctl add-br %s' % bridge)
+        self._docker_exec_mn('ovs-vsctl del-br %s' % bridge)
+        sleep(3)
+        self.vsctl.remove_row_listener('Bridge', _listener)
+
+        ok_(('create', bridge) in events)
+        ok_(('delete', bridge) in events)
+
     # 01: Bridge commands
 
     def test_01_01_add_br_bridge(self):
@@ -0,0 +1,175 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.ovs import vsctl
+
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+
+LOG = logging.getLogger(__name__)
+
+REMOTE = 'tcp:127.0.0.1:6640'
+
+SCHEMA = {
+    'name': 'Open_vSwitch',
+    'version': '7.12.1',
+    'tables': {
+        'Open_vSwitch': {
+            'columns': {
+                'cur_cfg': {'type': 'integer'},
+                'next_cfg': {'type': 'integer'},
+            },
+        },
+    },
+}
+
+
+def _idl(*args, **kwargs):
+    # Stub of _Idl which has already received the database contents.
+    idl_ = mock.MagicMock()
+    idl_.run.return_value = False
+    idl_.has_ever_connected.return_value = True
+    idl_._session.is_connected.return_value = True
+    ovs_table = mock.MagicMock()
+    ovs_table.rows = {'uuid': mock.MagicMock()}
+    idl_.tables = {'Open_vSwitch': ovs_table}
+    return idl_
+
+
+class Test_VSCtl_IdlSession(unittest.TestCase):
+    """
+    Test cases for the IDL sessions shared by VSCtl instances.
+    """
+
+    def setUp(self):
+        self.addCleanup(vsctl._idl_sessions.clear)
+        self.addCleanup(vsctl._idl_listeners.clear)
+        self.mock_idl = self._patch(vsctl, '_Idl', side_effect=_idl)
+        self.mock_get_schema = self._patch(
+            vsctl.VSCtl, '_rpc_get_schema_json', return_value=SCHEMA)
+        self.mock_spawn = self._patch(vsctl.hub, 'spawn')
+        self.mock_kill = self._patch(vsctl.hub, 'kill')
+
+    def _patch(self, target, attribute, **kwargs):
+        patcher = mock.patch.object(target, attribute, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_session_reuse(self):
+        session = vsctl.VSCtl(REMOTE)._get_idl_session()
+        ok_(session is vsctl.VSCtl(REMOTE)._get_idl_session())
+        eq_(1, self.mock_get_schema.call_count)
+        eq_(1, self.mock_idl.call_count)
+
+        # Another remote
+        other = vsctl.VSCtl('tcp:127.0.0.2:6640')._get_idl_session()
+        ok_(other is not session)
+        eq_(2, self.mock_idl.call_count)
+
+    def test_read_only(self):
+        ovs = vsctl.VSCtl(REMOTE)
+        command = vsctl.VSCtlCommand('init')
+        with mock.patch.object(vsctl.idl, 'Transaction') as txn_cls:
+            ovs.run_command([command])
+        # Served from the local replica and never committed
+        txn = txn_cls.return_value
+        ok_(txn.abort.called)
+        ok_(not txn.commit_block.called)
+        ok_(not txn.commit.called)
+        eq_(None, ovs.txn)
+
+    def test_read_write(self):
+        ovs = vsctl.VSCtl(REMOTE)
+        session = ovs._get_idl_session()
+        with mock.patch.object(ovs, '_do_vsctl_read_only') as read_only, \
+                mock.patch.object(ovs, '_do_vsctl',
+                                  return_value=True) as read_write:
+            ovs._do_idl(session, [vsctl.VSCtlCommand('list-br')])
+            eq_(1, read_only.call_count)
+            ok_(not read_write.called)
+
+            ovs._do_idl(session, [vsctl.VSCtlCommand('list-br'),
+                                  vsctl.VSCtlCommand('add-br')])
+            eq_(1, read_only.call_count)
+            eq_(1, read_write.call_count)
+
+            # Not read only until the database contents are received
+            session.idl.tables['Open_vSwitch'].rows = {}
+            ovs._do_idl(session, [vsctl.VSCtlCommand('list-br')])
+            eq_(1, read_only.call_count)
+            eq_(2, read_write.call_count)
+
+    def test_wait_reconnected(self):
+        ovs = vsctl.VSCtl(REMOTE)
+        session = ovs._get_idl_session()
+        session.idl._session.is_connected.return_value = False
+        with mock.patch.object(ovs, '_idl_wait') as idl_wait, \
+                mock.patch.object(ovs, '_do_vsctl_read_only'):
+            ovs._do_idl(session, [vsctl.VSCtlCommand('list-br')])
+        # Waits for the database contents sent again after reconnecting
+        idl_wait.assert_called_once_with(session.idl,
+                                         session.idl.change_seqno)
+
+    def test_monitor(self):
+        listener = mock.MagicMock()
+        ovs = vsctl.VSCtl(REMOTE)
+        ovs.add_row_listener('Interface', listener)
+        session = vsctl._idl_sessions[REMOTE]
+        self.mock_spawn.assert_called_once_with(session._monitor)
+
+        # The IDL notifies the listeners of the remote
+        eq_([listener], vsctl._idl_listeners[REMOTE]['Interface'])
+        ok_(self.mock_idl.call_args[0][2] is vsctl._idl_listeners[REMOTE])
+
+        # The monitor keeps running the IDL, which reconnects the session
+        # if disconnected, holding the lock.
+        with mock.patch.object(vsctl.hub, 'sleep',
+                               side_effect=[None, None, StopIteration]):
+            self.assertRaises(StopIteration, session._monitor)
+        eq_(2, session.idl.run.call_count)
+
+    def test_close(self):
+        ovs = vsctl.VSCtl(REMOTE)
+        ovs.add_row_listener('Interface', mock.MagicMock())
+        session = vsctl._idl_sessions[REMOTE]
+
+        ovs.close()
+        self.mock_kill.assert_called_once_with(self.mock_spawn.return_value)
+        ok_(session.idl.close.called)
+        ok_(REMOTE not in vsctl._idl_sessions)
+
+        # Opened again with the monitor for the listeners
+        new_session = ovs._get_idl_session()
+        ok_(new_session is not session)
+        eq_(2, self.mock_spawn.call_count)
+
+    def test_close_on_timeout(self):
+        ovs = vsctl.VSCtl(REMOTE)
+        session = ovs._get_idl_session()
+        with mock.patch.object(ovs, '_do_idl', side_effect=KeyboardInterrupt):
+            self.assertRaises(KeyboardInterrupt, ovs.run_command,
+                              [vsctl.VSCtlCommand('init')])
+        # Dropped in the unknown state
+        ok_(session.idl.close.called)
+        ok_(REMOTE not in vsctl._idl_sessions)
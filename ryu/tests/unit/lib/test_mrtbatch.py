@@ -0,0 +1,99 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bz2
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib import mrtbatch
+from ryu.lib import mrtlib
+
+
+MRT_DATA_DIR = os.path.join(
+    os.path.dirname(sys.modules[__name__].__file__), '../../packet_data/mrt/')
+
+
+class Test_BatchReader(unittest.TestCase):
+    """
+    Test case for mrtbatch.BatchReader class
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.bz2_name = os.path.join(MRT_DATA_DIR, 'updates.20161101.0000.bz2')
+        self.file_name = os.path.join(self.tmpdir, 'updates')
+        self.buf = bz2.BZ2File(self.bz2_name, 'rb').read()
+        with open(self.file_name, 'wb') as f:
+            f.write(self.buf)
+        self.records = [str(r) for r in mrtlib.Reader(
+            bz2.BZ2File(self.bz2_name, 'rb'))]
+
+    def test_records(self):
+        reader = mrtbatch.BatchReader(self.file_name)
+        eq_(len(self.records), len(reader))
+        eq_(len(self.buf), reader.offsets()[-1])
+        eq_(self.records, [str(r) for r in reader.records()])
+        eq_(self.records[10:20], [str(r) for r in reader.records(10, 20)])
+        eq_(self.records[-1], str(reader.record(-1)))
+        reader.close()
+
+    def test_file_obj(self):
+        reader = mrtbatch.BatchReader(open(self.file_name, 'rb'),
+                                      use_mmap=False)
+        eq_(self.records[5], str(reader.record(5)))
+
+    def test_compressed(self):
+        reader = mrtbatch.BatchReader(self.bz2_name)
+        eq_(len(self.records), len(reader))
+        eq_(self.records[5], str(reader.record(5)))
+
+    def test_truncated(self):
+        with open(self.file_name, 'wb') as f:
+            f.write(self.buf[:-1])
+        reader = mrtbatch.BatchReader(self.file_name)
+        eq_(len(self.records) - 1, len(reader))
+        eq_(self.records[-2], str(reader.record(-1)))
+
+    @raises(IndexError)
+    def test_record_out_of_range(self):
+        reader = mrtbatch.BatchReader(self.file_name)
+        reader.record(len(reader))
+
+    def test_parse(self):
+        reader = mrtbatch.BatchReader(self.file_name)
+        eq_(self.records,
+            [str(r) for r in reader.parse(processes=2, chunk_size=7)])
+        eq_(self.records[3:30],
+            [str(r) for r in reader.parse(processes=2, chunk_size=7,
+                                          start=3, stop=30)])
+
+    @mock.patch('ryu.lib.mrtbatch._is_thread_patched', return_value=True)
+    @mock.patch('multiprocessing.Pool')
+    def test_parse_thread_patched(self, mock_pool, _):
+        reader = mrtbatch.BatchReader(self.file_name)
+        eq_(self.records[3:30],
+            [str(r) for r in reader.parse(processes=2, start=3, stop=30)])
+        eq_(0, mock_pool.call_count)
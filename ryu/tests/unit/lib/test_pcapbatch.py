@@ -0,0 +1,187 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+try:
+    import numpy
+    from ryu.lib import pcapbatch
+except ImportError:
+    numpy = None
+
+from ryu.lib import addrconv
+from ryu.lib import pcaplib
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+
+
+def _pkt(*protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return pkt.data
+
+
+def _ipv4_int(addr):
+    return struct.unpack('!I', addrconv.ipv4.text_to_bin(addr))[0]
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class Test_BatchReader(unittest.TestCase):
+    """
+    Test case for pcapbatch.BatchReader class
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.tmpdir, 'test.pcap')
+
+        tcp_pkt = _pkt(
+            ethernet.ethernet(dst='00:00:00:00:00:02',
+                              src='00:00:00:00:00:01'),
+            ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                      proto=in_proto.IPPROTO_TCP),
+            tcp.tcp(src_port=1024, dst_port=80, bits=tcp.TCP_SYN))
+        self.bufs = [
+            tcp_pkt,
+            _pkt(ethernet.ethernet(ethertype=ether_types.ETH_TYPE_8021Q),
+                 vlan.vlan(vid=100),
+                 ipv4.ipv4(src='10.0.0.3', dst='10.0.0.4',
+                           proto=in_proto.IPPROTO_UDP),
+                 udp.udp(src_port=5353, dst_port=53)),
+            _pkt(ethernet.ethernet(ethertype=ether_types.ETH_TYPE_IPV6),
+                 ipv6.ipv6(src='2001:db8::1', dst='2001:db8::2',
+                           nxt=in_proto.IPPROTO_TCP),
+                 tcp.tcp(src_port=2048, dst_port=443,
+                         bits=tcp.TCP_SYN | tcp.TCP_ACK)),
+            _pkt(ethernet.ethernet(ethertype=ether_types.ETH_TYPE_ARP),
+                 arp.arp()),
+            # truncated in the middle of TCP header
+            tcp_pkt[:14 + 20 + 2],
+            # non-first fragment of TCP segment
+            _pkt(ethernet.ethernet(),
+                 ipv4.ipv4(src='10.0.0.5', dst='10.0.0.6', offset=100,
+                           proto=in_proto.IPPROTO_TCP),
+                 tcp.tcp(src_port=1, dst_port=2)),
+        ]
+        writer = pcaplib.Writer(open(self.file_name, 'wb'))
+        for i, buf in enumerate(self.bufs):
+            writer.write_pkt(buf, ts=1000 + i)
+        del writer
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _test_headers(self, reader):
+        hdrs = reader.headers()
+        eq_(len(self.bufs), len(hdrs))
+        eq_(len(self.bufs), len(reader))
+
+        for i, (hdr, buf) in enumerate(zip(hdrs, self.bufs)):
+            eq_(1000 + i, hdr['ts'])
+            eq_(len(buf), hdr['caplen'])
+            eq_(buf, reader.data(hdr))
+
+        eq_(0x000000000002, hdrs[0]['eth_dst'])
+        eq_(0x000000000001, hdrs[0]['eth_src'])
+        eq_(0, hdrs[0]['vlan_vid'])
+        eq_(ether_types.ETH_TYPE_IP, hdrs[0]['eth_type'])
+        eq_(in_proto.IPPROTO_TCP, hdrs[0]['ip_proto'])
+        eq_(_ipv4_int('10.0.0.1'), hdrs[0]['ipv4_src'])
+        eq_(_ipv4_int('10.0.0.2'), hdrs[0]['ipv4_dst'])
+        eq_(40, hdrs[0]['ip_len'])
+        eq_(1024, hdrs[0]['tcp_src'])
+        eq_(80, hdrs[0]['tcp_dst'])
+        eq_(tcp.TCP_SYN, hdrs[0]['tcp_flags'])
+        eq_(0, hdrs[0]['udp_dst'])
+
+        eq_(0x1000 | 100, hdrs[1]['vlan_vid'])
+        eq_(ether_types.ETH_TYPE_IP, hdrs[1]['eth_type'])
+        eq_(_ipv4_int('10.0.0.4'), hdrs[1]['ipv4_dst'])
+        eq_(5353, hdrs[1]['udp_src'])
+        eq_(53, hdrs[1]['udp_dst'])
+        eq_(0, hdrs[1]['tcp_dst'])
+
+        eq_(ether_types.ETH_TYPE_IPV6, hdrs[2]['eth_type'])
+        eq_(addrconv.ipv6.text_to_bin('2001:db8::1'),
+            hdrs[2]['ipv6_src'].tobytes())
+        eq_(addrconv.ipv6.text_to_bin('2001:db8::2'),
+            hdrs[2]['ipv6_dst'].tobytes())
+        eq_(0, hdrs[2]['ipv4_src'])
+        eq_(443, hdrs[2]['tcp_dst'])
+        eq_(tcp.TCP_SYN | tcp.TCP_ACK, hdrs[2]['tcp_flags'])
+
+        eq_(ether_types.ETH_TYPE_ARP, hdrs[3]['eth_type'])
+        eq_(0, hdrs[3]['ip_proto'])
+
+        eq_(_ipv4_int('10.0.0.2'), hdrs[4]['ipv4_dst'])
+        eq_(1024, hdrs[4]['tcp_src'])
+        eq_(0, hdrs[4]['tcp_dst'])
+
+        eq_(in_proto.IPPROTO_TCP, hdrs[5]['ip_proto'])
+        eq_(0, hdrs[5]['tcp_src'])
+        eq_(0, hdrs[5]['tcp_dst'])
+
+    def test_headers_mmap(self):
+        reader = pcapbatch.BatchReader(self.file_name)
+        self._test_headers(reader)
+        reader.close()
+
+    def test_headers_file_obj(self):
+        reader = pcapbatch.BatchReader(open(self.file_name, 'rb'),
+                                       use_mmap=False)
+        self._test_headers(reader)
+
+    def test_filter(self):
+        reader = pcapbatch.BatchReader(self.file_name)
+
+        hdrs = reader.filter('(ip_proto == 6) & (tcp_dst == 80)')
+        eq_([1000], hdrs['ts'].tolist())
+
+        hdrs = reader.filter(lambda h: h['vlan_vid'] & 0x1000 != 0)
+        eq_([1001], hdrs['ts'].tolist())
+
+        hdrs = reader.filter('tcp_dst != 0',
+                             headers=reader.filter('eth_type == 0x86dd'))
+        eq_([1002], hdrs['ts'].tolist())
+
+    @raises(ValueError)
+    def test_filter_unknown_field(self):
+        reader = pcapbatch.BatchReader(self.file_name)
+        reader.filter('open("foo")')
+
+    def test_packets(self):
+        reader = pcapbatch.BatchReader(self.file_name)
+        pkts = list(reader.packets(reader.filter('udp_dst == 53')))
+        eq_(1, len(pkts))
+        ok_(pkts[0].get_protocol(udp.udp))
+        eq_(53, pkts[0].get_protocol(udp.udp).dst_port)
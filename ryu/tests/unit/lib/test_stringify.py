@@ -20,6 +20,7 @@ import base64
 import six
 import unittest
 from nose.tools import eq_
+from nose.tools import ok_
 
 from ryu.lib import stringify
 
@@ -32,6 +33,28 @@ class C1(stringify.StringifyMixin):
         self.c = c
 
 
+class C2(stringify.StringifyMixin):
+    __slots__ = ('a', '_b', 'c', 'd')
+
+    def __init__(self, a, c):
+        self.a = a
+        self._b = 'B'
+        self.c = c
+
+
+class C3(stringify.StringifyMixin):
+    _TYPE = {
+        'ascii': [
+            'name',
+        ]
+    }
+
+    def __init__(self, name, type_, data=None):
+        self.name = name
+        self.type = type_
+        self.data = data
+
+
 class Test_stringify(unittest.TestCase):
     """ Test case for ryu.lib.stringify
     """
@@ -73,3 +96,30 @@ class Test_stringify(unittest.TestCase):
         eq_(c.__class__, c2.__class__)
         eq_(c.__dict__, c2.__dict__)
         eq_(j, c.to_jsondict(encode_string=my_encode))
+
+    def test_slots(self):
+        c = C2(a='AAA', c='CCC')
+        ok_(not hasattr(c, '__dict__'))
+        eq_([('a', 'AAA'), ('c', 'CCC')],
+            list(stringify.obj_python_attrs(c)))
+        eq_("C2(a='AAA',c='CCC')", str(c))
+
+        j = {'C2': {'a': 'aaa', 'c': 'ccc'}}
+        eq_(j, c.to_jsondict(encode_string=lambda x: x.lower()))
+        c2 = C2.from_jsondict(j['C2'], decode_string=lambda x: x.upper())
+        eq_(c.__class__, c2.__class__)
+        eq_((c.a, c._b, c.c), (c2.a, c2._b, c2.c))
+
+    def test_jsondict_typed_and_reserved(self):
+        j = {'C3': {'name': 'foo', 'type': 1, 'data': 'QUFB'}}
+        c = C3(name='foo', type_=1, data=b'AAA')
+        for _ in range(2):
+            # the second iteration uses the cached class plan
+            eq_(j, c.to_jsondict())
+            c2 = C3.from_jsondict(j['C3'])
+            eq_(c.__dict__, c2.__dict__)
+
+        j = {'C3': {'name': None, 'type': 2, 'data': None}}
+        c = C3(name=None, type_=2)
+        eq_(j, c.to_jsondict())
+        eq_(c.__dict__, C3.from_jsondict(j['C3']).__dict__)
@@ -0,0 +1,137 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import six
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_2
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_4
+from ryu.ofproto import ofproto_v1_5
+from ryu.ofproto.ofproto_template import FlowModTemplate
+
+
+class DummyDatapath(ofproto_protocol.ProtocolDesc):
+    def __init__(self, version):
+        super(DummyDatapath, self).__init__(version)
+        self.xid = 0
+        self.sent = []
+
+    def send(self, buf):
+        self.sent.append(six.binary_type(buf))
+        return True
+
+
+class Test_FlowModTemplate(unittest.TestCase):
+    """ Test case for ryu.ofproto.ofproto_template.FlowModTemplate
+    """
+
+    versions = [ofproto_v1_2.OFP_VERSION,
+                ofproto_v1_3.OFP_VERSION,
+                ofproto_v1_4.OFP_VERSION,
+                ofproto_v1_5.OFP_VERSION]
+
+    @staticmethod
+    def _flow_mod_kwargs(dp, priority, in_port, ipv4_dst, eth_dst, out_port):
+        ofproto = dp.ofproto
+        parser = dp.ofproto_parser
+        match = parser.OFPMatch(in_port=in_port,
+                                eth_type=0x0800,
+                                ipv4_dst=ipv4_dst,
+                                metadata=(10, 0xffffffffffffffff))
+        actions = [parser.OFPActionSetField(eth_dst=eth_dst),
+                   parser.OFPActionOutput(out_port)]
+        instructions = [
+            parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS,
+                                         actions)]
+        return dict(priority=priority, idle_timeout=15, match=match,
+                    instructions=instructions)
+
+    def _test_serialize(self, version):
+        dp = DummyDatapath(version)
+        tmpl = FlowModTemplate(
+            dp, ['priority', 'in_port', 'ipv4_dst', 'set_eth_dst', 'output'],
+            **self._flow_mod_kwargs(dp, 0, 0, '0.0.0.0',
+                                    '00:00:00:00:00:00', 0))
+
+        buf = tmpl.serialize(xid=100, priority=3, in_port=1,
+                             ipv4_dst='192.168.0.1',
+                             set_eth_dst='aa:bb:cc:dd:ee:ff', output=2)
+
+        msg = dp.ofproto_parser.OFPFlowMod(
+            datapath=dp, **self._flow_mod_kwargs(
+                dp, 3, 1, '192.168.0.1', 'aa:bb:cc:dd:ee:ff', 2))
+        msg.set_xid(100)
+        msg.serialize()
+        eq_(six.binary_type(msg.buf), six.binary_type(buf))
+
+    def test_serialize(self):
+        for version in self.versions:
+            self._test_serialize(version)
+
+    def test_serialize_masked_field(self):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        tmpl = FlowModTemplate(
+            dp, ['metadata'],
+            **self._flow_mod_kwargs(dp, 1, 1, '10.0.0.1',
+                                    '00:00:00:00:00:01', 1))
+        buf = tmpl.serialize(metadata=20)
+
+        msg = dp.ofproto_parser.OFPFlowMod(
+            datapath=dp, **self._flow_mod_kwargs(
+                dp, 1, 1, '10.0.0.1', '00:00:00:00:00:01', 1))
+        msg.match = dp.ofproto_parser.OFPMatch(
+            in_port=1, eth_type=0x0800, ipv4_dst='10.0.0.1',
+            metadata=(20, 0xffffffffffffffff))
+        msg.set_xid(0)
+        msg.serialize()
+        eq_(six.binary_type(msg.buf), six.binary_type(buf))
+
+    def test_send(self):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        tmpl = FlowModTemplate(
+            dp, ['ipv4_dst', 'output'],
+            **self._flow_mod_kwargs(dp, 1, 1, '0.0.0.0',
+                                    '00:00:00:00:00:01', 0))
+        tmpl.send(dp, ipv4_dst='10.0.0.1', output=1)
+        tmpl.send(dp, ipv4_dst='10.0.0.2', output=2)
+
+        eq_(2, len(dp.sent))
+        for xid, buf in enumerate(dp.sent, 1):
+            msg = ofproto_parser.msg(
+                dp, ofproto_v1_3.OFP_VERSION, ofproto_v1_3.OFPT_FLOW_MOD,
+                len(buf), xid, buf)
+            eq_(xid, msg.xid)
+            eq_('10.0.0.%d' % xid, msg.match['ipv4_dst'])
+            eq_(xid, msg.instructions[0].actions[1].port)
+
+    @raises(ValueError)
+    def test_unknown_variable(self):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        FlowModTemplate(
+            dp, ['ipv6_dst'],
+            **self._flow_mod_kwargs(dp, 1, 1, '0.0.0.0',
+                                    '00:00:00:00:00:01', 0))
+
+    @raises(ValueError)
+    def test_unsupported_version(self):
+        dp = DummyDatapath(ofproto_v1_0.OFP_VERSION)
+        FlowModTemplate(dp, ['priority'])
@@ -0,0 +1,202 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import struct
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ether_types
+from ryu.lib.packet import in_proto
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import packet_rewriter
+from ryu.lib.packet import packet_utils
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+
+
+PAYLOAD = b'\x01\x02\x03\x04\x05\x06\x07\x08\x09'
+
+
+def _ipv4_tcp(src='192.0.2.1', dst='192.0.2.2', ttl=64, dst_port=80):
+    return _serialize(
+        ethernet.ethernet(),
+        ipv4.ipv4(src=src, dst=dst, ttl=ttl, proto=in_proto.IPPROTO_TCP),
+        tcp.tcp(src_port=1024, dst_port=dst_port),
+        PAYLOAD)
+
+
+def _vlan_ipv4_udp(vid=10, pcp=0, src='192.0.2.1', src_port=1024):
+    return _serialize(
+        ethernet.ethernet(ethertype=ether_types.ETH_TYPE_8021Q),
+        vlan.vlan(vid=vid, pcp=pcp),
+        ipv4.ipv4(src=src, dst='192.0.2.2', proto=in_proto.IPPROTO_UDP),
+        udp.udp(src_port=src_port, dst_port=53),
+        PAYLOAD)
+
+
+def _ipv6_tcp(src='2001:db8::1', hop_limit=255):
+    return _serialize(
+        ethernet.ethernet(ethertype=ether_types.ETH_TYPE_IPV6),
+        ipv6.ipv6(src=src, dst='2001:db8::2', hop_limit=hop_limit,
+                  nxt=in_proto.IPPROTO_TCP),
+        tcp.tcp(src_port=1024, dst_port=80),
+        PAYLOAD)
+
+
+def _serialize(*protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return bytes(pkt.data)
+
+
+class Test_checksum_update(unittest.TestCase):
+    """ Test case for packet_utils.checksum_update
+    """
+
+    def test_random(self):
+        rand = random.Random(0)
+        for _ in range(100):
+            data = bytearray(rand.getrandbits(8) for _ in range(40))
+            csum = packet_utils.checksum(data)
+            pos = rand.randrange(0, 40, 2)
+            size = rand.randrange(2, 40 - pos + 1, 2)
+            old = bytes(data[pos:pos + size])
+            data[pos:pos + size] = bytearray(
+                rand.getrandbits(8) for _ in range(size))
+            eq_(packet_utils.checksum(data),
+                packet_utils.checksum_update(csum, old,
+                                             bytes(data[pos:pos + size])))
+
+    @raises(ValueError)
+    def test_length_mismatch(self):
+        packet_utils.checksum_update(0, b'\x00\x00', b'\x00')
+
+
+class Test_PacketRewriter(unittest.TestCase):
+    """ Test case for packet_rewriter.PacketRewriter
+    """
+
+    def test_ipv4_tcp(self):
+        rewriter = packet_rewriter.PacketRewriter(_ipv4_tcp())
+        rewriter.set_field(ipv4_dst='198.51.100.1', tcp_dst=8080)
+        eq_(63, rewriter.dec_nw_ttl())
+        eq_(_ipv4_tcp(dst='198.51.100.1', ttl=63, dst_port=8080),
+            bytes(rewriter.data))
+        eq_('198.51.100.1', rewriter.get_field('ipv4_dst'))
+        eq_(8080, rewriter.get_field('tcp_dst'))
+
+    def test_in_place(self):
+        data = bytearray(_ipv4_tcp())
+        rewriter = packet_rewriter.PacketRewriter(data)
+        rewriter.set_field(eth_dst='00:00:00:00:00:02')
+        ok_(rewriter.data is data)
+        eq_('00:00:00:00:00:02', packet.Packet(data)[0].dst)
+
+    def test_vlan_ipv4_udp(self):
+        rewriter = packet_rewriter.PacketRewriter(_vlan_ipv4_udp())
+        rewriter.set_field(vlan_vid=100, vlan_pcp=5,
+                           ipv4_src='198.51.100.1', udp_src=5353)
+        eq_(_vlan_ipv4_udp(vid=100, pcp=5, src='198.51.100.1',
+                           src_port=5353),
+            bytes(rewriter.data))
+        eq_(100, rewriter.get_field('vlan_vid'))
+        eq_(5, rewriter.get_field('vlan_pcp'))
+
+    def test_udp_without_checksum(self):
+        data = bytearray(_vlan_ipv4_udp())
+        struct.pack_into('!H', data, 18 + 20 + 6, 0)
+        rewriter = packet_rewriter.PacketRewriter(data)
+        rewriter.set_field(ipv4_src='198.51.100.1', udp_src=5353)
+        eq_(0, struct.unpack_from('!H', rewriter.data, 18 + 20 + 6)[0])
+
+    def test_ipv6_tcp(self):
+        rewriter = packet_rewriter.PacketRewriter(_ipv6_tcp())
+        rewriter.set_field(ipv6_src='2001:db8::100')
+        eq_(254, rewriter.dec_nw_ttl())
+        eq_(_ipv6_tcp(src='2001:db8::100', hop_limit=254),
+            bytes(rewriter.data))
+
+    def test_truncated(self):
+        data = _ipv4_tcp()
+        rewriter = packet_rewriter.PacketRewriter(data[:14 + 20 + 20])
+        rewriter.set_field(ipv4_dst='198.51.100.1', tcp_dst=8080)
+        eq_(_ipv4_tcp(dst='198.51.100.1', dst_port=8080)[:14 + 20 + 20],
+            bytes(rewriter.data))
+
+    def test_arp_reply(self):
+        req = _serialize(
+            ethernet.ethernet(dst='ff:ff:ff:ff:ff:ff',
+                              src='00:00:00:00:00:01',
+                              ethertype=ether_types.ETH_TYPE_ARP),
+            arp.arp(opcode=arp.ARP_REQUEST,
+                    src_mac='00:00:00:00:00:01', src_ip='192.0.2.1',
+                    dst_mac='00:00:00:00:00:00', dst_ip='192.0.2.2'))
+        reply = _serialize(
+            ethernet.ethernet(dst='00:00:00:00:00:01',
+                              src='00:00:00:00:00:02',
+                              ethertype=ether_types.ETH_TYPE_ARP),
+            arp.arp(opcode=arp.ARP_REPLY,
+                    src_mac='00:00:00:00:00:02', src_ip='192.0.2.2',
+                    dst_mac='00:00:00:00:00:01', dst_ip='192.0.2.1'))
+        rewriter = packet_rewriter.PacketRewriter(req)
+        rewriter.set_field(eth_dst='00:00:00:00:00:01',
+                           eth_src='00:00:00:00:00:02',
+                           arp_op=arp.ARP_REPLY,
+                           arp_sha='00:00:00:00:00:02', arp_spa='192.0.2.2',
+                           arp_tha='00:00:00:00:00:01', arp_tpa='192.0.2.1')
+        eq_(reply, bytes(rewriter.data))
+
+    def test_push_pop_vlan(self):
+        rewriter = packet_rewriter.PacketRewriter(_ipv4_tcp())
+        ok_(not rewriter.has_field('vlan_vid'))
+        rewriter.push_vlan()
+        rewriter.set_field(vlan_vid=10)
+        pkt = packet.Packet(rewriter.data)
+        eq_(10, pkt.get_protocol(vlan.vlan).vid)
+        eq_(ether_types.ETH_TYPE_IP, pkt.get_protocol(vlan.vlan).ethertype)
+
+        # the TCP fields are still found after pushing the tag
+        rewriter.set_field(tcp_dst=8080)
+        eq_(8080, packet.Packet(rewriter.data).get_protocol(tcp.tcp).dst_port)
+
+        rewriter.pop_vlan()
+        eq_(_ipv4_tcp(dst_port=8080), bytes(rewriter.data))
+
+    @raises(ValueError)
+    def test_pop_vlan_untagged(self):
+        packet_rewriter.PacketRewriter(_ipv4_tcp()).pop_vlan()
+
+    @raises(ValueError)
+    def test_missing_field(self):
+        packet_rewriter.PacketRewriter(_ipv4_tcp()).set_field(udp_dst=53)
+
+    @raises(ValueError)
+    def test_unknown_field(self):
+        packet_rewriter.PacketRewriter(_ipv4_tcp()).set_field(foo=1)
+
+    @raises(ValueError)
+    def test_dec_nw_ttl_zero(self):
+        packet_rewriter.PacketRewriter(_ipv4_tcp(ttl=0)).dec_nw_ttl()
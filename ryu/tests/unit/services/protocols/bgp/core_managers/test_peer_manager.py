@@ -0,0 +1,182 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.core_managers import peer_manager
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.model import OutgoingRoute
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _path(prefix, is_withdraw=False):
+    addr, length = prefix.split('/')
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    return Ipv4Path(None, bgp.IPAddrPrefix(int(length), addr), 0,
+                    pattrs=pattrs, nexthop='192.168.0.1',
+                    is_withdraw=is_withdraw)
+
+
+def _construct_update(outgoing_route):
+    path = outgoing_route.path
+    if path.is_withdraw:
+        return bgp.BGPUpdate(withdrawn_routes=[path.nlri])
+    return bgp.BGPUpdate(path_attributes=list(path.pathattr_map.values()),
+                         nlri=[path.nlri])
+
+
+def _peer(key):
+    peer = mock.MagicMock()
+    peer.update_group_key.return_value = key
+    peer._apply_out_filter.return_value = (False, None)
+    peer._construct_update.side_effect = _construct_update
+    return peer
+
+
+class Test_UpdateGroup(unittest.TestCase):
+    """
+    Test case for peer_manager.UpdateGroup
+    """
+
+    def setUp(self):
+        self.peers = [_peer('key'), _peer('key')]
+        self.group = peer_manager.UpdateGroup('key')
+        for peer in self.peers:
+            self.group.add_member(peer)
+
+    def test_get_update(self):
+        path = _path('10.0.0.0/8')
+        results = [self.group.get_update(peer, OutgoingRoute(path))
+                   for peer in self.peers]
+
+        # Computed only by the first member and shared
+        eq_(1, self.group.computed)
+        eq_(1, self.peers[0]._construct_update.call_count)
+        eq_(0, self.peers[1]._construct_update.call_count)
+        block, update, pack_key = results[0]
+        eq_(False, block)
+        eq_('10.0.0.0/8', update.nlri[0].prefix)
+        ok_(results[1][1] is update)
+        ok_(results[1][2] is pack_key)
+        eq_(1, len(self.group))
+        eq_({self.peers[0]: 1, self.peers[1]: 1}, self.group.progress)
+
+        # New path for the same prefix
+        new_path = _path('10.0.0.0/8')
+        self.group.get_update(self.peers[0], OutgoingRoute(new_path))
+        eq_(2, self.group.computed)
+
+    def test_withdraw(self):
+        path = _path('10.0.0.0/8')
+        self.group.get_update(self.peers[0], OutgoingRoute(path))
+
+        # Withdrawals cloned for each peer
+        for peer in self.peers:
+            self.group.get_update(
+                peer, OutgoingRoute(path.clone(for_withdrawal=True)))
+        eq_(2, self.group.computed)
+        # Dropped after sent to all members
+        eq_(0, len(self.group))
+
+    def test_withdraw_member_left(self):
+        path = _path('10.0.0.0/8', is_withdraw=True)
+        self.group.get_update(self.peers[0], OutgoingRoute(path))
+        eq_(1, len(self.group))
+
+        # Dropped once the member yet to take it leaves
+        self.group.remove_member(self.peers[1])
+        eq_(0, len(self.group))
+
+    def test_withdraw_source(self):
+        path = _path('10.0.0.0/8', is_withdraw=True)
+        path._source = self.peers[1]
+        self.group.get_update(self.peers[0], OutgoingRoute(path))
+
+        # Never sent back to its source
+        eq_(0, len(self.group))
+
+    def test_withdraw_joined(self):
+        path = _path('10.0.0.0/8', is_withdraw=True)
+        self.group.get_update(self.peers[0], OutgoingRoute(path))
+
+        # Not waited for the member joined after computed
+        peer = _peer('key')
+        self.group.add_member(peer)
+        self.group.get_update(self.peers[1], OutgoingRoute(path))
+        eq_(0, len(self.group))
+
+    def test_withdraw_bound(self):
+        self.group.MAX_WITHDRAWALS = 2
+        prefixes = ['10.0.0.0/8', '20.0.0.0/8', '30.0.0.0/8']
+        for prefix in prefixes:
+            self.group.get_update(
+                self.peers[0],
+                OutgoingRoute(_path(prefix, is_withdraw=True)))
+
+        # The oldest one dropped and computed again if needed
+        eq_(2, len(self.group))
+        self.group.get_update(
+            self.peers[1],
+            OutgoingRoute(_path(prefixes[0], is_withdraw=True)))
+        eq_(4, self.group.computed)
+
+    def test_out_filter(self):
+        self.peers[0]._apply_out_filter.return_value = (True, 'DENY')
+        block, update, _ = self.group.get_update(
+            self.peers[0], OutgoingRoute(_path('10.0.0.0/8')))
+        eq_(True, block)
+        eq_(None, update)
+        ok_(not self.peers[0]._construct_update.called)
+
+
+class Test_PeerManager_update_groups(unittest.TestCase):
+    """
+    Test case for the update groups of peer_manager.PeerManager
+    """
+
+    def setUp(self):
+        self.manager = peer_manager.PeerManager(mock.MagicMock(), None)
+
+    def test_get_update_group(self):
+        peers = [_peer('a'), _peer('a'), _peer('b')]
+        groups = [self.manager.get_update_group(p) for p in peers]
+        ok_(groups[0] is groups[1])
+        ok_(groups[0] is not groups[2])
+        eq_(set(peers[:2]), groups[0].members)
+        eq_(2, len(self.manager.update_groups))
+
+        # Moves to the group of the new policy
+        peers[1].update_group_key.return_value = 'b'
+        ok_(self.manager.get_update_group(peers[1]) is groups[2])
+        eq_(set([peers[0]]), groups[0].members)
+
+        # Leaves the group on peer down, and the empty group is removed
+        self.manager.on_peer_down(peers[0])
+        eq_([groups[2]], self.manager.update_groups)
+        eq_(set(peers[1:]), groups[2].members)
@@ -37,6 +37,10 @@ from ryu.lib.packet.bgp import EvpnEthernetAutoDiscoveryNLRI
 from ryu.lib.packet.bgp import EvpnMacIPAdvertisementNLRI
 from ryu.lib.packet.bgp import EvpnInclusiveMulticastEthernetTagNLRI
 from ryu.lib.packet.bgp import FlowSpecIPv4NLRI
+from ryu.lib.packet.bgp import RF_IPv4_UC
+from ryu.lib.packet.bgp import RF_IPv6_UC
+from ryu.lib.packet.bgp import RF_IPv4_VPN
+from ryu.lib.packet.bgp import RF_IPv6_VPN
 from ryu.lib.packet.bgp import BGPPathAttributeExtendedCommunities
 from ryu.services.protocols.bgp.bgpspeaker import EVPN_MAX_ET
 from ryu.services.protocols.bgp.bgpspeaker import ESI_TYPE_LACP
@@ -935,3 +939,87 @@ class Test_TableCoreManager(unittest.TestCase):
             prefix=prefix,
             is_withdraw=False,
         )
+
+    def _get_vpn_dest(self, route_family, rts):
+        vpn_dest = mock.MagicMock()
+        vpn_dest.best_path.route_family = route_family
+        vpn_dest.best_path.get_rts.return_value = rts
+        return vpn_dest
+
+    @mock.patch(
+        'ryu.services.protocols.bgp.core_managers.TableCoreManager.__init__',
+        mock.MagicMock(return_value=None))
+    def test_update_vpn_dest_rt_index(self):
+        tbl_mng = table_manager.TableCoreManager(None, None)
+        tbl_mng._vpn_dests_for_rt = {}
+        tbl_mng._rt_keys_for_vpn_dest = {}
+        vpn_dest = self._get_vpn_dest(RF_IPv4_VPN, ['65000:100', '65000:200'])
+
+        tbl_mng.update_vpn_dest_rt_index(vpn_dest)
+        eq_({('65000:100', RF_IPv4_VPN), ('65000:200', RF_IPv4_VPN)},
+            set(tbl_mng._vpn_dests_for_rt))
+
+        # The new best path has another set of RTs.
+        vpn_dest.best_path.get_rts.return_value = ['65000:200', '65000:300']
+        tbl_mng.update_vpn_dest_rt_index(vpn_dest)
+        eq_({('65000:200', RF_IPv4_VPN), ('65000:300', RF_IPv4_VPN)},
+            set(tbl_mng._vpn_dests_for_rt))
+        eq_([vpn_dest],
+            list(tbl_mng._vpn_dests_for_rt[
+                ('65000:300', RF_IPv4_VPN)].values()))
+
+        # The best path is lost.
+        vpn_dest.best_path = None
+        tbl_mng.update_vpn_dest_rt_index(vpn_dest)
+        eq_({}, tbl_mng._vpn_dests_for_rt)
+        eq_({}, tbl_mng._rt_keys_for_vpn_dest)
+
+    @mock.patch(
+        'ryu.services.protocols.bgp.core_managers.TableCoreManager.__init__',
+        mock.MagicMock(return_value=None))
+    def test_import_all_vpn_paths_to_vrf(self):
+        tbl_mng = table_manager.TableCoreManager(None, None)
+        tbl_mng._vpn_dests_for_rt = {}
+        tbl_mng._rt_keys_for_vpn_dest = {}
+        vpn_dest1 = self._get_vpn_dest(RF_IPv4_VPN, ['65000:100'])
+        vpn_dest2 = self._get_vpn_dest(RF_IPv4_VPN, ['65000:100', '65000:200'])
+        vpn_dest3 = self._get_vpn_dest(RF_IPv4_VPN, ['65000:300'])
+        vpn_dest4 = self._get_vpn_dest(RF_IPv6_VPN, ['65000:100'])
+        for vpn_dest in (vpn_dest1, vpn_dest2, vpn_dest3, vpn_dest4):
+            tbl_mng.update_vpn_dest_rt_index(vpn_dest)
+
+        vrf_table = mock.MagicMock()
+        vrf_table.VPN_ROUTE_FAMILY = RF_IPv4_VPN
+        vrf_table.import_rts = ['65000:100', '65000:200']
+        tbl_mng.import_all_vpn_paths_to_vrf(vrf_table)
+
+        # Only the destinations with the import RTs of the same family
+        # are passed, each of them once.
+        args, _ = vrf_table.import_vpn_paths_from_dests.call_args
+        eq_(2, len(args[0]))
+        eq_({id(vpn_dest1), id(vpn_dest2)}, set(id(d) for d in args[0]))
+        eq_(vrf_table.import_rts, args[1])
+
+        tbl_mng.import_all_vpn_paths_to_vrf(vrf_table, ['65000:300'])
+        args, _ = vrf_table.import_vpn_paths_from_dests.call_args
+        eq_([vpn_dest3], list(args[0]))
+
+    @mock.patch(
+        'ryu.services.protocols.bgp.core_managers.TableCoreManager.__init__',
+        mock.MagicMock(return_value=None))
+    def test_clean_stale_routes_new_table(self):
+        tbl_mng = table_manager.TableCoreManager(None, None)
+        tbl_mng._global_tables = {}
+        peer = mock.MagicMock()
+        new_table = mock.MagicMock()
+
+        # A table created while cleaning up, as the cleanup yields.
+        def _cleanup_paths_for_peer(peer):
+            tbl_mng._global_tables[RF_IPv6_UC] = new_table
+
+        table = mock.MagicMock()
+        table.cleanup_paths_for_peer.side_effect = _cleanup_paths_for_peer
+        tbl_mng._global_tables[RF_IPv4_UC] = table
+
+        tbl_mng.clean_stale_routes(peer)
+        table.cleanup_paths_for_peer.assert_called_once_with(peer)
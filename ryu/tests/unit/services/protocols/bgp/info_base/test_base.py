@@ -0,0 +1,253 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import logging
+import unittest
+import weakref
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.info_base.base import PathAttrSet
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Table
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Table
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Table
+from ryu.services.protocols.bgp.model import SentRoute
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _pattrs(as_path):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(as_path)
+    return pattrs
+
+
+def _path(prefix, pattrs, length=24, source=None, src_ver_num=0):
+    return Ipv4Path(source, bgp.IPAddrPrefix(length, prefix), src_ver_num,
+                    pattrs=pattrs, nexthop='192.168.0.1')
+
+
+class Test_PathAttrSet(unittest.TestCase):
+    """
+    Test case for info_base.base.PathAttrSet
+    """
+
+    def test_shared_by_identical_pattrs(self):
+        path1 = _path('10.0.0.0', _pattrs([[65001]]))
+        path2 = _path('10.0.1.0', _pattrs([[65001]]))
+        path3 = _path('10.0.2.0', _pattrs([[65002]]))
+
+        ok_(path1._path_attr_map is path2._path_attr_map)
+        ok_(path1._path_attr_map is not path3._path_attr_map)
+        eq_([[65002]], path3.get_pattr(bgp.BGP_ATTR_TYPE_AS_PATH).value)
+
+    def test_pattrs_not_modified(self):
+        pattrs = _pattrs([[65001]])
+        path = _path('10.0.0.0', pattrs)
+
+        # the given path attributes are not fixed up by encoding
+        eq_(0, pattrs[bgp.BGP_ATTR_TYPE_ORIGIN].flags)
+        eq_(None, pattrs[bgp.BGP_ATTR_TYPE_ORIGIN].length)
+
+        # pathattr_map returns a mutable copy
+        pathattr_map = path.pathattr_map
+        pathattr_map[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(100)
+        eq_(None, path.get_pattr(bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC))
+        eq_(list(pattrs.keys()), list(path.pathattr_map.keys()))
+
+    def test_not_encodable(self):
+        # Four-octet AS number in two-octet AS_PATH
+        path1 = _path('10.0.0.0', _pattrs([[4200000000]]))
+        path2 = _path('10.0.1.0', _pattrs([[4200000000]]))
+
+        ok_(path1._path_attr_map is not path2._path_attr_map)
+        ok_(path1._path_attr_map not in PathAttrSet._interned.values())
+
+    def test_released(self):
+        path = _path('10.0.0.0', _pattrs([[65003]]))
+        ref = weakref.ref(path._path_attr_map)
+        ok_(ref() in PathAttrSet._interned.values())
+
+        del path
+        PathAttrSet._recent.clear()
+        gc.collect()
+        eq_(None, ref())
+
+
+class Test_Table(unittest.TestCase):
+    """
+    Test case for info_base.base.Table
+    """
+
+    def setUp(self):
+        self.table = Ipv4Table(None, None)
+        pattrs = _pattrs([[65001]])
+        for prefix in ('10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24',
+                       '192.168.0.0/16'):
+            addr, length = prefix.split('/')
+            self.table.insert(_path(addr, pattrs, int(length)))
+
+    def _prefixes(self, dests):
+        return [dest.nlri.prefix for dest in dests]
+
+    def test_longest_match(self):
+        eq_('10.1.2.0/24',
+            self.table.get_longest_match('10.1.2.3').nlri.prefix)
+        eq_('10.1.0.0/16',
+            self.table.get_longest_match('10.1.3.0/24').nlri.prefix)
+        eq_(None, self.table.get_longest_match('172.16.0.1'))
+
+    def test_covering_covered(self):
+        eq_(['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24'],
+            self._prefixes(self.table.get_covering('10.1.2.0/24')))
+        eq_(['10.1.0.0/16', '10.1.2.0/24'],
+            self._prefixes(self.table.get_covered('10.1.0.0/16')))
+        eq_(['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24', '192.168.0.0/16'],
+            self._prefixes(self.table.get_covered('0.0.0.0/0')))
+
+    def test_items_after(self):
+        eq_(['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24', '192.168.0.0/16'],
+            [k for k, _ in self.table.items_after()])
+        eq_(['10.1.2.0/24', '192.168.0.0/16'],
+            [k for k, _ in self.table.items_after('10.1.0.0/16')])
+        eq_(['10.1.2.0/24'],
+            [k for k, _ in self.table.items_after('10.1.0.0/16',
+                                                  prefix='10.0.0.0/8')])
+        key, dest = next(self.table.items_after('10.0.0.0/8'))
+        eq_(key, dest.nlri.prefix)
+
+    def test_items_after_not_indexed(self):
+        table = Vpnv4Table(None, None)
+        for rd in ('65000:2', '65000:1'):
+            table.insert(Vpnv4Path(
+                None, bgp.LabelledVPNIPAddrPrefix(
+                    24, '10.0.0.0', route_dist=rd, labels=[100]),
+                0, pattrs=_pattrs([[65001]]), nexthop='192.168.0.1'))
+        keys = [k for k, _ in table.items_after()]
+        eq_(sorted(keys), keys)
+        eq_(keys[1:], [k for k, _ in table.items_after(keys[0])])
+
+    def test_delete_dest(self):
+        dest = self.table.get_longest_match('10.1.2.3')
+        self.table.delete_dest(dest)
+        eq_('10.1.0.0/16',
+            self.table.get_longest_match('10.1.2.3').nlri.prefix)
+
+        self.table.delete_dest_by_nlri(bgp.IPAddrPrefix(16, '10.1.0.0'))
+        eq_('10.0.0.0/8',
+            self.table.get_longest_match('10.1.2.3').nlri.prefix)
+        eq_(2, len(list(self.table.values())))
+
+    def test_ipv6(self):
+        table = Ipv6Table(None, None)
+        table.insert(Ipv6Path(None, bgp.IP6AddrPrefix(32, '2001:db8::'), 0,
+                              pattrs=_pattrs([[65001]]),
+                              nexthop='2001:db8::1'))
+        eq_('2001:db8::/32',
+            table.get_longest_match('2001:db8::1').nlri.prefix)
+
+    @raises(ValueError)
+    def test_not_supported(self):
+        Vpnv4Table(None, None).get_longest_match('10.0.0.1')
+
+    def test_dest_slots(self):
+        dest = self.table.get_longest_match('10.1.2.3')
+        ok_(not hasattr(dest, '__dict__'))
+
+
+class Test_Table_cleanup_paths_for_peer(unittest.TestCase):
+    """
+    Test case for info_base.base.Table.cleanup_paths_for_peer
+    """
+
+    def setUp(self):
+        self.signal_bus = mock.MagicMock()
+        self.table = Ipv4Table(None, self.signal_bus)
+        self.peer1 = mock.MagicMock(version_num=1)
+        self.peer2 = mock.MagicMock(version_num=1)
+        pattrs = _pattrs([[65001]])
+        for prefix, peer in (('10.0.0.0', self.peer1),
+                             ('10.1.0.0', self.peer1),
+                             ('192.168.0.0', self.peer2)):
+            dest = self.table.insert(
+                _path(prefix, pattrs, 16, source=peer, src_ver_num=1))
+            # Makes the new path known as the best path processing does.
+            dest._process_paths()
+
+    def _get_dest(self, prefix):
+        return self.table.get_longest_match(prefix)
+
+    def _indexed_prefixes(self, peer):
+        return sorted(dest.nlri.prefix for dest in
+                      self.table._dests_for_peer[peer].values())
+
+    def test_cleanup(self):
+        self.peer1.version_num = 2
+        # A path re-learned in the new version is kept.
+        self.table.insert(_path('10.1.0.0', _pattrs([[65001]]), 16,
+                                source=self.peer1, src_ver_num=2))
+
+        self.table.cleanup_paths_for_peer(self.peer1)
+
+        eq_(['10.0.0.0/16', '10.1.0.0/16'],
+            sorted(args[0].nlri.prefix for args, _ in
+                   self.signal_bus.dest_changed.call_args_list))
+        eq_(['10.1.0.0/16'], self._indexed_prefixes(self.peer1))
+        # The destinations from the other peers are not visited.
+        eq_(1, len(self.table._dests_for_peer[self.peer2]))
+        eq_(1, len(self._get_dest('192.168.0.1').known_path_list))
+
+    def test_cleanup_sent_routes(self):
+        dest = self._get_dest('192.168.0.1')
+        sent_route = SentRoute(dest.known_path_list[0], self.peer1)
+        self.table.insert_sent_route(sent_route)
+        ok_(dest.was_sent_to(self.peer1))
+
+        self.table.cleanup_paths_for_peer(self.peer1)
+
+        ok_(not dest.was_sent_to(self.peer1))
+        eq_(1, len(dest.known_path_list))
+        # The current paths from the peer are kept indexed.
+        eq_(['10.0.0.0/16', '10.1.0.0/16'],
+            self._indexed_prefixes(self.peer1))
+
+    def test_cleanup_yield(self):
+        self.peer1.version_num = 2
+        self.table.CLEANUP_SLICE_TIME = 0
+        with mock.patch('ryu.services.protocols.bgp.info_base.base.hub'
+                        '.sleep') as mock_sleep:
+            self.table.cleanup_paths_for_peer(self.peer1)
+        eq_(2, mock_sleep.call_count)
+        eq_(2, self.signal_bus.dest_changed.call_count)
+
+    def test_delete_dest(self):
+        self.table.delete_dest(self._get_dest('10.0.0.1'))
+        eq_(['10.1.0.0/16'], self._indexed_prefixes(self.peer1))
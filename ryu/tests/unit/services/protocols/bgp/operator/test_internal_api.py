@@ -0,0 +1,201 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Table
+from ryu.services.protocols.bgp.model import ReceivedRoute
+from ryu.services.protocols.bgp.operator import internal_api
+from ryu.services.protocols.bgp.operator.internal_api import InternalApi
+from ryu.services.protocols.bgp.operator.internal_api import WrongParamError
+from ryu.services.protocols.bgp.utils.sorteddict import SortedKeyDict
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _path(prefix, as_path, communities=None):
+    addr, length = prefix.split('/')
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(as_path)
+    if communities:
+        pattrs[bgp.BGP_ATTR_TYPE_COMMUNITIES] = \
+            bgp.BGPPathAttributeCommunities(communities)
+    return Ipv4Path(None, bgp.IPAddrPrefix(int(length), addr), 0,
+                    pattrs=pattrs, nexthop='192.168.0.1')
+
+
+class Test_InternalApi_routes_page(unittest.TestCase):
+    """
+    Test case for the paginated route dumps of operator.InternalApi
+    """
+
+    def setUp(self):
+        self.table = Ipv4Table(None, None)
+        self.paths = [
+            _path('10.0.0.0/8', [[65001]]),
+            _path('10.1.0.0/16', [[65001, 65002]], [65000 << 16 | 100]),
+            _path('10.1.2.0/24', [[65002]]),
+            _path('192.168.0.0/16', [[65003, 65001]], [65000 << 16 | 100]),
+        ]
+        for path in self.paths:
+            self.table.insert(path)
+        # Makes the new paths known without processing the destinations.
+        for dest in self.table.values():
+            dest._known_path_list = list(dest._new_path_list)
+        self.api = InternalApi()
+        patcher = mock.patch.object(InternalApi, '_get_global_table',
+                                    return_value=self.table)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _prefixes(self, page):
+        return [route['prefix'] for route in page['routes']]
+
+    def test_pages(self):
+        page = self.api.get_rib_routes_page('ipv4', limit=3)
+        eq_(['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24'],
+            self._prefixes(page))
+        eq_('10.1.2.0/24', page['next'])
+
+        page = self.api.get_rib_routes_page('ipv4', cursor=page['next'],
+                                            limit=3)
+        eq_(['192.168.0.0/16'], self._prefixes(page))
+        eq_(None, page['next'])
+
+    def test_resume_after_modification(self):
+        page = self.api.get_rib_routes_page('ipv4', limit=2)
+        eq_('10.1.0.0/16', page['next'])
+        self.table.delete_dest(
+            self.table.get_longest_match('10.1.0.0/16'))
+        self.table.insert(_path('10.0.0.0/9', [[65001]]))
+        self.table.insert(_path('172.16.0.0/12', [[65001]]))
+
+        page = self.api.get_rib_routes_page('ipv4', cursor=page['next'])
+        eq_(['10.1.2.0/24', '172.16.0.0/12', '192.168.0.0/16'],
+            self._prefixes(page))
+
+    def test_filters(self):
+        page = self.api.get_rib_routes_page('ipv4', prefix='10.1.0.0/16')
+        eq_(['10.1.0.0/16', '10.1.2.0/24'], self._prefixes(page))
+
+        page = self.api.get_rib_routes_page('ipv4', community='65000:100')
+        eq_(['10.1.0.0/16', '192.168.0.0/16'], self._prefixes(page))
+
+        page = self.api.get_rib_routes_page('ipv4', as_path='^65001( |$)')
+        eq_(['10.0.0.0/8', '10.1.0.0/16'], self._prefixes(page))
+
+        page = self.api.get_rib_routes_page('ipv4', prefix='10.0.0.0/8',
+                                            community=65000 << 16 | 100,
+                                            as_path='65002')
+        eq_(['10.1.0.0/16'], self._prefixes(page))
+
+    def test_scan_bounded(self):
+        with mock.patch.object(internal_api, 'PAGE_SCAN_FACTOR', 2):
+            page = self.api.get_rib_routes_page('ipv4', limit=1,
+                                                as_path='65003')
+        eq_([], page['routes'])
+        eq_('10.1.0.0/16', page['next'])
+
+    def test_iter(self):
+        with mock.patch.object(internal_api.hub, 'sleep') as sleep:
+            routes = self.api.iter_rib_routes('ipv4', page_size=1)
+            eq_(['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24',
+                 '192.168.0.0/16'],
+                [route['prefix'] for route in routes])
+        # Yields to the other threads between the pages.
+        eq_(4, sleep.call_count)
+
+    @raises(WrongParamError)
+    def test_iter_invalid_prefix(self):
+        self.api.iter_rib_routes('ipv4', prefix='10.0.0.0/33')
+
+    def test_by_prefix(self):
+        def _prefixes(prefix, match):
+            return [route['prefix'] for route in
+                    self.api.get_single_rib_routes_by_prefix(
+                        'ipv4', prefix, match)]
+
+        eq_(['10.1.0.0/16'], _prefixes('10.1.0.0/16', 'exact'))
+        # The host bits are ignored.
+        eq_(['10.0.0.0/8'], _prefixes('10.0.0.1/8', 'exact'))
+        eq_([], _prefixes('10.1.3.0/24', 'exact'))
+        eq_(['10.1.0.0/16'], _prefixes('10.1.3.0/24', 'longest'))
+        eq_(['10.0.0.0/8', '10.1.0.0/16'],
+            _prefixes('10.1.3.0/24', 'shorter'))
+        eq_(['10.1.0.0/16', '10.1.2.0/24'],
+            _prefixes('10.1.0.0/16', 'longer'))
+
+    def test_by_prefix_invalid_length(self):
+        for match in ('exact', 'longest', 'shorter', 'longer'):
+            self.assertRaises(
+                WrongParamError, self.api.get_single_rib_routes_by_prefix,
+                'ipv4', '10.0.0.0/40', match)
+
+    @raises(WrongParamError)
+    def test_invalid_cursor(self):
+        self.api.get_rib_routes_page('ipv4', cursor='foo')
+
+    @raises(WrongParamError)
+    def test_invalid_limit(self):
+        self.api.get_rib_routes_page('ipv4', limit=0)
+
+    def test_neighbor_routes(self):
+        peer = mock.MagicMock()
+        peer.adj_rib_in = SortedKeyDict(
+            (path.nlri_str, ReceivedRoute(path, peer))
+            for path in self.paths)
+        core_service = mock.MagicMock()
+        core_service.peer_manager.get_by_addr.return_value = peer
+        with mock.patch.object(InternalApi, 'get_core_service',
+                               return_value=core_service):
+            page = self.api.get_neighbor_routes_page(
+                'received-routes', '192.168.0.2', limit=3,
+                community='65000:100')
+            eq_(['10.1.0.0/16', '192.168.0.0/16'],
+                [route['path']['nlri']['prefix']
+                 for route in page['routes']])
+            eq_(None, page['next'])
+
+            routes = self.api.iter_neighbor_routes(
+                'received-routes', '192.168.0.2', addr_family='ipv4',
+                page_size=1)
+            eq_(4, len(list(routes)))
+
+            # The routes filtered out are counted in the scan bound
+            with mock.patch.object(internal_api, 'PAGE_SCAN_FACTOR', 2):
+                page = self.api.get_neighbor_routes_page(
+                    'received-routes', '192.168.0.2', limit=1,
+                    as_path='65003')
+            eq_([], page['routes'])
+            eq_('10.1.0.0/16', page['next'])
+
+            # Invalid cursor
+            self.assertRaises(
+                WrongParamError, self.api.get_neighbor_routes_page,
+                'received-routes', '192.168.0.2', cursor=1)
@@ -20,8 +20,11 @@ try:
 except ImportError:
     from unittest import mock  # Python 3
 
+from nose.tools import eq_
+from nose.tools import ok_
 from nose.tools import raises
 
+from ryu.lib.packet.bgp import RF_IPv4_UC
 from ryu.services.protocols.bgp import bgpspeaker
 from ryu.services.protocols.bgp.bgpspeaker import EVPN_MAX_ET
 from ryu.services.protocols.bgp.bgpspeaker import ESI_TYPE_LACP
@@ -29,6 +32,7 @@ from ryu.services.protocols.bgp.api.prefix import ESI_TYPE_L2_BRIDGE
 from ryu.services.protocols.bgp.bgpspeaker import ESI_TYPE_MAC_BASED
 from ryu.services.protocols.bgp.api.prefix import REDUNDANCY_MODE_ALL_ACTIVE
 from ryu.services.protocols.bgp.api.prefix import REDUNDANCY_MODE_SINGLE_ACTIVE
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
 
 
 LOG = logging.getLogger(__name__)
@@ -1086,3 +1090,95 @@ class Test_BGPSpeaker(unittest.TestCase):
         # Check
         mock_call.assert_called_with(
             'flowspec.del_local', **expected_kwargs)
+
+
+class Test_BestPathSubscription(unittest.TestCase):
+    """
+    Test case for bgp.bgpspeaker.BestPathSubscription
+    """
+
+    def _get_event(self, prefix, is_withdraw=False):
+        path = mock.MagicMock()
+        path.route_family = RF_IPv4_UC
+        path.nlri.formatted_nlri_str = prefix
+        return bgpspeaker.EventPrefix(path, is_withdraw)
+
+    def test_get(self):
+        subscription = bgpspeaker.BestPathSubscription(batch_size=2)
+        evs = [self._get_event('10.0.%d.0/24' % i) for i in range(3)]
+        for ev in evs:
+            subscription.put(ev)
+
+        eq_(evs[:2], subscription.get())
+        eq_(evs[2:], subscription.get())
+        eq_([], subscription.get(timeout=0.01))
+        eq_({'received': 3, 'coalesced': 0, 'delivered': 3, 'queued': 0},
+            subscription.get_stats())
+
+    def test_coalesce(self):
+        subscription = bgpspeaker.BestPathSubscription()
+        ev1 = self._get_event('10.0.1.0/24')
+        ev2 = self._get_event('10.0.2.0/24')
+        ev1_update = self._get_event('10.0.1.0/24')
+        subscription.put(ev1)
+        subscription.put(ev2)
+        subscription.put(ev1_update)
+
+        # The latest change in the order of the first change.
+        eq_([ev1_update, ev2], subscription.get())
+
+        # The addition and withdrawal of a new prefix cancel each other.
+        subscription.put(self._get_event('10.0.3.0/24'))
+        subscription.put(self._get_event('10.0.3.0/24', is_withdraw=True))
+        eq_([], subscription.get(timeout=0.01))
+
+        # The withdrawal of a delivered prefix is kept.
+        ev1_withdraw = self._get_event('10.0.1.0/24', is_withdraw=True)
+        subscription.put(self._get_event('10.0.1.0/24'))
+        subscription.put(ev1_withdraw)
+        eq_([ev1_withdraw], subscription.get())
+
+        # So is the withdrawal queued before the addition.
+        ev2_withdraw = self._get_event('10.0.2.0/24', is_withdraw=True)
+        subscription.put(self._get_event('10.0.2.0/24', is_withdraw=True))
+        subscription.put(self._get_event('10.0.2.0/24'))
+        subscription.put(ev2_withdraw)
+        eq_([ev2_withdraw], subscription.get())
+
+        eq_(5, subscription.get_stats()['coalesced'])
+
+    def test_close(self):
+        subscription = bgpspeaker.BestPathSubscription()
+        subscription.put(self._get_event('10.0.1.0/24'))
+        subscription.close()
+        subscription.put(self._get_event('10.0.2.0/24'))
+
+        eq_([], subscription.get())
+        eq_([], list(subscription))
+
+    @raises(ValueError)
+    def test_invalid_batch_size(self):
+        bgpspeaker.BestPathSubscription(batch_size=0)
+
+    @mock.patch('ryu.services.protocols.bgp.bgpspeaker.BGPSpeaker.__init__',
+                mock.MagicMock(return_value=None))
+    @mock.patch('ryu.services.protocols.bgp.bgpspeaker.call')
+    def test_best_path_subscribe(self, mock_call):
+        speaker = bgpspeaker.BGPSpeaker(65000, '10.0.0.1')
+        speaker._best_path_subscriptions = []
+        speaker._best_path_change_handler = None
+        subscription = speaker.best_path_subscribe(batch_size=10)
+
+        path = mock.MagicMock(spec=Ipv4Path)
+        path.route_family = RF_IPv4_UC
+        path.nlri.formatted_nlri_str = '10.0.1.0/24'
+        speaker._notify_best_path_changed(path, False)
+
+        evs = subscription.get()
+        eq_(1, len(evs))
+        eq_(path, evs[0].path)
+
+        speaker.best_path_unsubscribe(subscription)
+        speaker._notify_best_path_changed(path, True)
+        ok_(subscription.closed)
+        eq_([], subscription.get())
@@ -0,0 +1,152 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib.packet import bmp
+from ryu.services.protocols.bgp import bmp as bmp_client
+
+
+def _msg(data):
+    msg = mock.MagicMock(spec=bmp.BMPMessage)
+    msg.serialize.return_value = data
+    return msg
+
+
+class Test_BMPClient(unittest.TestCase):
+    """
+    Test case for bgp.bmp.BMPClient
+    """
+
+    def setUp(self):
+        self.core = mock.MagicMock()
+        self.sock = mock.MagicMock()
+
+    def _client(self, **kwargs):
+        client = bmp_client.BMPClient(self.core, '127.0.0.1', 11019,
+                                      **kwargs)
+        client.pause = mock.MagicMock()
+        return client
+
+    @raises(ValueError)
+    def test_invalid_overflow(self):
+        self._client(overflow='block')
+
+    def test_send_not_connected(self):
+        client = self._client()
+        client._send(_msg(b'a'))
+        eq_(0, len(client._queue))
+
+    def test_overflow_drop(self):
+        client = self._client(queue_size=2,
+                              overflow=bmp_client.BMP_OVERFLOW_DROP)
+        client._socket = self.sock
+        for data in (b'a', b'b', b'c'):
+            client._send(_msg(data))
+        eq_(2, len(client._queue))
+        eq_(1, client.dropped)
+        eq_(0, client.resets)
+        eq_(2, client.get_stats()['max_queued'])
+        eq_(0, self.sock.shutdown.call_count)
+
+    def test_overflow_reconnect(self):
+        client = self._client(queue_size=2)
+        client._socket = self.sock
+        for data in (b'a', b'b', b'c'):
+            client._send(_msg(data))
+        eq_(0, len(client._queue))
+        eq_(0, client.dropped)
+        eq_(1, client.resets)
+        self.sock.shutdown.assert_called_once_with(socket.SHUT_RDWR)
+
+    def test_write_batches(self):
+        client = self._client()
+        msgs = [_msg(b'%d' % (i % 10)) for i in range(250)]
+        client._write(self.sock, msgs)
+        eq_([mock.call(b'0123456789' * 10),
+             mock.call(b'0123456789' * 10),
+             mock.call(b'0123456789' * 5)],
+            self.sock.sendall.call_args_list)
+        eq_(250, client.sent)
+
+    def test_write_flush(self):
+        client = self._client()
+        client._write(self.sock, [_msg(b'a'), _msg(b'b'), None, _msg(b'c')])
+        eq_([mock.call(b'ab'), mock.call(b'c')],
+            self.sock.sendall.call_args_list)
+
+    def test_write_encode_error(self):
+        client = self._client()
+        msg = _msg(b'b')
+        msg.serialize.side_effect = ValueError
+        client._write(self.sock, [_msg(b'a'), msg, _msg(b'c')])
+        self.sock.sendall.assert_called_once_with(b'ac')
+        eq_(2, client.sent)
+
+    @mock.patch('ryu.services.protocols.bgp.bmp.time.time')
+    def test_queued_messages(self, mock_time):
+        client = self._client()
+        client._socket = self.sock
+        mock_time.return_value = 100
+        msg1 = _msg(b'a')
+        msg2 = _msg(b'b')
+        client._send(msg1)
+        client._send(msg2)
+        mock_time.return_value = 103
+        eq_(3, client.get_stats()['lag'])
+
+        msgs = client._iter_queued_messages(self.sock)
+        ok_(next(msgs) is msg1)
+        ok_(next(msgs) is msg2)
+        # flushes before waiting for the messages
+        ok_(next(msgs) is None)
+        eq_(0, client.get_stats()['lag'])
+        eq_(3, client.get_stats()['max_lag'])
+
+        # stops when the session is closed
+        client._socket = None
+        eq_([], list(msgs))
+
+    def test_initial_messages(self):
+        client = self._client()
+        peer1 = mock.MagicMock()
+        peer1.in_established.return_value = True
+        peer1._adj_rib_in = {'10.0.0.0/8': 'route1', '20.0.0.0/8': 'route2'}
+        peer2 = mock.MagicMock()
+        peer2.in_established.return_value = False
+        self.core.peer_manager.iterpeers = [peer1, peer2]
+        client._construct_peer_up_notification = mock.MagicMock(
+            return_value='peer-up')
+
+        def _route_monitoring(peer, path):
+            # The routes changed while sending are not affected.
+            peer1._adj_rib_in.pop('20.0.0.0/8', None)
+            peer1._adj_rib_in['30.0.0.0/8'] = 'route3'
+            return path
+
+        client._construct_route_monitoring = _route_monitoring
+        msgs = list(client._iter_initial_messages())
+        ok_(isinstance(msgs[0], bmp.BMPInitiation))
+        eq_(['peer-up', 'route1', 'route2'], [msgs[1]] + sorted(msgs[2:]))
+        client._construct_peer_up_notification.assert_called_once_with(peer1)
@@ -0,0 +1,346 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.lib import mrtlib
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import mrt
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Table
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Path
+from ryu.services.protocols.bgp.info_base.ipv6 import Ipv6Table
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Path
+from ryu.services.protocols.bgp.info_base.vpnv4 import Vpnv4Table
+from ryu.services.protocols.bgp.signals.emit import BgpSignalBus
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _pattrs(as_path):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(
+        bgp.BGP_ATTR_ORIGIN_IGP)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(as_path)
+    return pattrs
+
+
+def _peer(ip_address, remote_as, bgp_id=None):
+    peer = mock.MagicMock()
+    peer.ip_address = ip_address
+    peer.remote_as = remote_as
+    peer.local_as = None
+    peer.host_bind_ip = None
+    peer.in_established.return_value = bgp_id is not None
+    peer.protocol.recv_open_msg.bgp_identifier = bgp_id
+    return peer
+
+
+def _insert(table, path):
+    table.insert(path)
+    # Makes the new paths known without processing the destinations.
+    for dest in table.values():
+        dest._known_path_list = list(dest._new_path_list)
+
+
+class Test_MrtDumper(unittest.TestCase):
+    """
+    Test case for bgp.mrt.MrtDumper
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+        self.peer1 = _peer('192.168.0.1', 65001, bgp_id='1.1.1.1')
+        self.peer2 = _peer('2001:db8::2', 65002)
+
+        ipv4_table = Ipv4Table(None, None)
+        _insert(ipv4_table, Ipv4Path(
+            self.peer1, bgp.IPAddrPrefix(8, '10.0.0.0'), 0,
+            pattrs=_pattrs([[65001]]), nexthop='192.168.0.1'))
+        _insert(ipv4_table, Ipv4Path(
+            None, bgp.IPAddrPrefix(8, '10.0.0.0'), 0,
+            pattrs=_pattrs([]), nexthop='0.0.0.0'))
+        _insert(ipv4_table, Ipv4Path(
+            self.peer1, bgp.IPAddrPrefix(16, '10.1.0.0'), 0,
+            pattrs=_pattrs([[65001, 65003]]), nexthop='192.168.0.1'))
+        ipv6_table = Ipv6Table(None, None)
+        _insert(ipv6_table, Ipv6Path(
+            self.peer2, bgp.IP6AddrPrefix(32, '2001:db8::'), 0,
+            pattrs=_pattrs([[65002]]), nexthop='2001:db8::2'))
+        vpnv4_table = Vpnv4Table(None, None)
+        _insert(vpnv4_table, Vpnv4Path(
+            self.peer1, bgp.LabelledVPNIPAddrPrefix(
+                24, '10.0.0.0', route_dist='65000:1', labels=[100]),
+            0, pattrs=_pattrs([[65001]]), nexthop='192.168.0.1'))
+
+        self.core = mock.MagicMock()
+        self.core.router_id = '10.10.10.10'
+        self.core.asn = 65000
+        self.core.signal_bus = BgpSignalBus()
+        self.core.peer_manager.iterpeers = [self.peer1, self.peer2]
+        self.core.table_manager.global_tables = {
+            bgp.RF_IPv4_UC: ipv4_table,
+            bgp.RF_IPv6_UC: ipv6_table,
+            bgp.RF_IPv4_VPN: vpnv4_table,
+        }
+        self.core.table_manager.get_vrf_tables.return_value = {}
+
+    def _dumper(self, **kwargs):
+        return mrt.MrtDumper(self.core, self.tmpdir, **kwargs)
+
+    def _routes(self, path):
+        f = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+        try:
+            return list(mrt.read_rib(f))
+        finally:
+            f.close()
+
+    def _test_dump_rib(self, compress):
+        path = self._dumper(compress=compress).dump_rib()
+        eq_(compress, path.endswith('.gz'))
+        eq_([os.path.basename(path)], os.listdir(self.tmpdir))
+
+        routes = self._routes(path)
+        eq_(5, len(routes))
+        for route in routes:
+            eq_('', route.view_name)
+
+        # IPv4 unicast with the peer and the local paths
+        eq_(bgp.RF_IPv4_UC, routes[0].route_family)
+        eq_('10.0.0.0/8', routes[0].nlri.prefix)
+        eq_('192.168.0.1', routes[0].peer.ip_addr)
+        eq_('1.1.1.1', routes[0].peer.bgp_id)
+        eq_(65001, routes[0].peer.as_num)
+        eq_('10.0.0.0/8', routes[1].nlri.prefix)
+        eq_('10.10.10.10', routes[1].peer.bgp_id)
+        eq_(65000, routes[1].peer.as_num)
+        attrs = dict((a.type, a) for a in routes[2].path_attributes)
+        eq_('192.168.0.1', attrs[bgp.BGP_ATTR_TYPE_NEXT_HOP].value)
+        eq_([[65001, 65003]], attrs[bgp.BGP_ATTR_TYPE_AS_PATH].path_seg_list)
+
+        # VPNv4 as RIB_GENERIC
+        eq_(bgp.RF_IPv4_VPN, routes[3].route_family)
+        eq_('65000:1:10.0.0.0/24', routes[3].nlri.formatted_nlri_str)
+
+        # IPv6 unicast with MP_REACH_NLRI
+        eq_(bgp.RF_IPv6_UC, routes[4].route_family)
+        eq_('2001:db8::/32', routes[4].nlri.prefix)
+        eq_('2001:db8::2', routes[4].peer.ip_addr)
+        eq_('0.0.0.0', routes[4].peer.bgp_id)
+        attrs = dict((a.type, a) for a in routes[4].path_attributes)
+        ok_(bgp.BGP_ATTR_TYPE_NEXT_HOP not in attrs)
+        eq_('2001:db8::2', attrs[bgp.BGP_ATTR_TYPE_MP_REACH_NLRI].next_hop)
+
+    def test_dump_rib(self):
+        self._test_dump_rib(False)
+
+    def test_dump_rib_gzip(self):
+        self._test_dump_rib(True)
+
+    def test_dump_rib_vrf_views(self):
+        vrf_table = Ipv4Table(None, None)
+        _insert(vrf_table, Ipv4Path(
+            self.peer1, bgp.IPAddrPrefix(24, '172.16.0.0'), 0,
+            pattrs=_pattrs([[65001]]), nexthop='192.168.0.1'))
+        self.core.table_manager.global_tables = {}
+        self.core.table_manager.get_vrf_tables.return_value = {
+            ('65000:100', 'ipv4'): vrf_table,
+        }
+        routes = self._routes(self._dumper().dump_rib())
+        eq_(1, len(routes))
+        eq_('65000:100:ipv4', routes[0].view_name)
+        eq_('172.16.0.0/24', routes[0].nlri.prefix)
+
+    def test_dump_rib_batches(self):
+        table = self.core.table_manager.global_tables[bgp.RF_IPv4_UC]
+        with mock.patch.object(mrt, 'RIB_DUMP_BATCH_SIZE', 1):
+            batches = list(self._dumper()._iter_batches(table))
+        eq_(['10.0.0.0/8', '10.1.0.0/16'],
+            [dest.nlri.prefix for dests in batches for dest in dests])
+        eq_([1, 1], [len(dests) for dests in batches])
+
+    def test_dump_rib_batches_vpn(self):
+        table = self.core.table_manager.global_tables[bgp.RF_IPv4_VPN]
+        for rd in ('65000:3', '65000:2'):
+            _insert(table, Vpnv4Path(
+                self.peer1, bgp.LabelledVPNIPAddrPrefix(
+                    24, '10.0.0.0', route_dist=rd, labels=[100]),
+                0, pattrs=_pattrs([[65001]]), nexthop='192.168.0.1'))
+        with mock.patch.object(mrt, 'RIB_DUMP_BATCH_SIZE', 1):
+            batches = self._dumper()._iter_batches(table)
+            rds = [next(batches)[0].nlri.route_dist]
+            # The walk resumes after the destinations are modified.
+            table.delete_dest_by_nlri(bgp.LabelledVPNIPAddrPrefix(
+                24, '10.0.0.0', route_dist='65000:2', labels=[100]))
+            rds.extend(dests[0].nlri.route_dist for dests in batches)
+        eq_(['65000:1', '65000:3'], rds)
+
+    def test_bgp4mp_record(self):
+        update = bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                bgp.BGPPathAttributeAsPath([[65001]]),
+                bgp.BGPPathAttributeNextHop('192.168.0.1')],
+            nlri=[bgp.IPAddrPrefix(8, '10.0.0.0')])
+        self.peer1.host_bind_ip = '192.168.0.100'
+        dumper = self._dumper()
+
+        for sent, msg_cls in (
+                (False, mrtlib.Bgp4MpMessageAs4MrtMessage),
+                (True, mrtlib.Bgp4MpMessageAs4LocalMrtMessage)):
+            buf = dumper._construct_bgp4mp_record(
+                self.peer1, update, 1500000000.25, sent).serialize()
+            record, rest = mrtlib.MrtRecord.parse(buf)
+            eq_(b'', rest)
+            ok_(isinstance(record, mrtlib.Bgp4MpMrtRecord))
+            eq_(1500000000, record.timestamp)
+            ok_(isinstance(record.message, msg_cls))
+            eq_(65001, record.message.peer_as)
+            eq_(65000, record.message.local_as)
+            eq_('192.168.0.1', record.message.peer_ip)
+            eq_('192.168.0.100', record.message.local_ip)
+            eq_('10.0.0.0/8', record.message.bgp_message.nlri[0].prefix)
+
+        # The local address falls back to the same family as the peer
+        buf = dumper._construct_bgp4mp_record(
+            self.peer2, update, 1500000000, False).serialize()
+        record, _ = mrtlib.MrtRecord.parse(buf)
+        eq_('::', record.message.local_ip)
+
+    def test_updates_queue(self):
+        dumper = self._dumper(queue_size=2)
+        update = bgp.BGPUpdate()
+
+        # Not queued until started
+        self.core.signal_bus.bgp_update_received(self.peer1, update)
+        eq_(0, dumper._queue.qsize())
+
+        dumper._started = True
+        self.core.signal_bus.bgp_update_received(self.peer1, update)
+        self.core.signal_bus.bgp_update_sent(self.peer1, update)
+        self.core.signal_bus.bgp_update_sent(self.peer1, update)
+        eq_(2, dumper._queue.qsize())
+        eq_(1, dumper.dropped)
+
+        _, peer, msg, sent = dumper._queue.get()
+        ok_(peer is self.peer1)
+        ok_(msg is update)
+        eq_(False, sent)
+        eq_(True, dumper._queue.get()[3])
+
+
+class Test_MrtReplayer(unittest.TestCase):
+    """
+    Test case for bgp.mrt.MrtReplayer
+    """
+
+    def setUp(self):
+        attrs = list(_pattrs([[65001]]).values())
+        entries = [
+            mrtlib.MrtRibEntry(
+                0, 0, attrs + [bgp.BGPPathAttributeNextHop('192.168.0.1')]),
+            mrtlib.MrtRibEntry(
+                1, 0, attrs + [bgp.BGPPathAttributeNextHop('192.168.0.2')]),
+        ]
+        update = bgp.BGPUpdate(
+            withdrawn_routes=[bgp.IPAddrPrefix(8, '10.0.0.0')],
+            path_attributes=attrs + [bgp.BGPPathAttributeMpReachNLRI(
+                bgp.RF_IPv6_UC.afi, bgp.RF_IPv6_UC.safi, '2001:db8::1',
+                [bgp.IP6AddrPrefix(32, '2001:db8::')])])
+        self.records = [
+            mrtlib.TableDump2MrtRecord(
+                mrtlib.TableDump2PeerIndexTableMrtMessage(
+                    '1.1.1.1', [mrtlib.MrtPeer('1.1.1.1', '192.168.0.1', 1),
+                                mrtlib.MrtPeer('2.2.2.2', '192.168.0.2', 2)])),
+            mrtlib.TableDump2MrtRecord(
+                mrtlib.TableDump2RibIPv4UnicastMrtMessage(
+                    0, bgp.IPAddrPrefix(8, '10.0.0.0'), entries)),
+            mrtlib.TableDump2MrtRecord(
+                mrtlib.TableDump2RibGenericMrtMessage(
+                    1, bgp.RF_IPv4_VPN.afi, bgp.RF_IPv4_VPN.safi,
+                    bgp.LabelledVPNIPAddrPrefix(
+                        24, '10.0.0.0', route_dist='65000:1', labels=[100]),
+                    [mrtlib.MrtRibEntry(0, 0, attrs + [
+                        bgp.BGPPathAttributeMpReachNLRI(
+                            bgp.RF_IPv4_VPN.afi, bgp.RF_IPv4_VPN.safi,
+                            '192.168.0.1', [])])])),
+            mrtlib.Bgp4MpMrtRecord(
+                mrtlib.Bgp4MpMessageAs4MrtMessage(
+                    1, 65000, 0, '192.168.0.1', '192.168.0.100', update)),
+        ]
+        self.core = mock.MagicMock()
+
+    def test_replay_local(self):
+        replayer = mrt.MrtReplayer(self.core, peer_index=1)
+        eq_(3, replayer.replay(self.records))
+
+        paths = [c[0][0] for c in self.core.table_manager.learn_path.
+                 call_args_list]
+        eq_(['10.0.0.0/8', '10.0.0.0/8', '2001:db8::/32'],
+            [p.nlri.prefix for p in paths])
+        eq_('192.168.0.2', paths[0].nexthop)
+        eq_([[65001]], paths[0].get_pattr(
+            bgp.BGP_ATTR_TYPE_AS_PATH).path_seg_list)
+        ok_(paths[0].source is None)
+        ok_(paths[1].is_withdraw)
+        eq_('2001:db8::1', paths[2].nexthop)
+
+    def test_replay_neighbor(self):
+        peer = self.core.peer_manager.get_by_addr.return_value
+        peer.in_established.return_value = True
+        replayer = mrt.MrtReplayer(self.core, neighbor='192.168.0.1')
+        eq_(4, replayer.replay(self.records))
+
+        updates = [c[0][0] for c in peer.handle_msg.call_args_list]
+        eq_(3, len(updates))
+        eq_('10.0.0.0/8', updates[0].nlri[0].prefix)
+        eq_('192.168.0.1', updates[0].get_path_attr(
+            bgp.BGP_ATTR_TYPE_NEXT_HOP).value)
+        mp_reach = updates[1].get_path_attr(bgp.BGP_ATTR_TYPE_MP_REACH_NLRI)
+        eq_(bgp.RF_IPv4_VPN, mp_reach.route_family)
+        eq_('65000:1:10.0.0.0/24', mp_reach.nlri[0].formatted_nlri_str)
+        ok_(updates[2] is self.records[3].message.bgp_message)
+        ok_(not self.core.table_manager.learn_path.called)
+
+    @raises(ValueError)
+    def test_replay_neighbor_not_established(self):
+        peer = self.core.peer_manager.get_by_addr.return_value
+        peer.in_established.return_value = False
+        mrt.MrtReplayer(self.core, neighbor='192.168.0.1')
+
+    @mock.patch('ryu.services.protocols.bgp.mrt.time.time')
+    @mock.patch('ryu.services.protocols.bgp.mrt.hub.sleep')
+    def test_replay_rate(self, mock_sleep, mock_time):
+        mock_time.return_value = 100.0
+        replayer = mrt.MrtReplayer(self.core, rate=2)
+        eq_(3, replayer.replay(self.records))
+        eq_([mock.call(0.5), mock.call(1.5)], mock_sleep.call_args_list)
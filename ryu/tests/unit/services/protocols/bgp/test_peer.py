@@ -21,9 +21,14 @@ except ImportError:
     from unittest import mock  # Python 3
 
 from nose.tools import eq_
+from nose.tools import ok_
 
 from ryu.lib.packet import bgp
 from ryu.services.protocols.bgp import peer
+from ryu.services.protocols.bgp.core_managers import peer_manager
+from ryu.services.protocols.bgp.info_base.base import PrefixFilter
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+from ryu.services.protocols.bgp.model import OutgoingRoute
 
 
 LOG = logging.getLogger(__name__)
@@ -373,3 +378,85 @@ class Test_Peer(unittest.TestCase):
         self._test_extract_and_reconstruct_as_path(
             path_attributes, ex_as_path_value,
             ex_aggregator_as_number, ex_aggregator_addr)
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def test_send_outgoing_routes(self):
+        # Prepare test data
+        pattrs = {
+            bgp.BGP_ATTR_TYPE_ORIGIN: bgp.BGPPathAttributeOrigin(
+                bgp.BGP_ATTR_ORIGIN_IGP),
+        }
+        paths = [
+            Ipv4Path(None, bgp.IPAddrPrefix(32, '10.0.0.%d' % i), 0,
+                     pattrs=pattrs, nexthop='192.168.0.1')
+            for i in range(3)
+        ]
+        outgoing_routes = [OutgoingRoute(p) for p in paths]
+        # Withdraw for the prefix which is already in this batch
+        outgoing_routes.append(
+            OutgoingRoute(paths[0].clone(for_withdrawal=True)))
+
+        def _construct_update(outgoing_route):
+            path = outgoing_route.path
+            if path.is_withdraw:
+                return bgp.BGPUpdate(withdrawn_routes=[path.nlri])
+            return bgp.BGPUpdate(path_attributes=list(pattrs.values()),
+                                 nlri=[path.nlri])
+
+        _peer = peer.Peer(None, None, None, None, None)
+        _peer._protocol = mock.MagicMock()
+        _peer._core_service = mock.MagicMock()
+        _peer._signal_bus = mock.MagicMock()
+        _peer._adj_rib_out = {}
+        _peer.version_num = 1
+        _peer.state = mock.MagicMock()
+        _peer._apply_out_filter = mock.MagicMock(return_value=(False, None))
+        _peer._construct_update = _construct_update
+        _peer._peer_manager = mock.MagicMock()
+        _peer._peer_manager.get_update_group.return_value = \
+            peer_manager.UpdateGroup(None)
+
+        # Test
+        _peer._send_outgoing_routes(outgoing_routes)
+
+        sent = [c[0][0] for c in _peer._protocol.send.call_args_list]
+        eq_(2, len(sent))
+        eq_(['10.0.0.0/32', '10.0.0.1/32', '10.0.0.2/32'],
+            [n.prefix for n in sent[0].nlri])
+        eq_(['10.0.0.0/32'], [n.prefix for n in sent[1].withdrawn_routes])
+        eq_(2, _peer.state.incr.call_count)
+        tm = _peer._core_service.table_manager
+        eq_(3, tm.remember_sent_route.call_count)
+        ok_(_peer._adj_rib_out['10.0.0.0/32'].path.is_withdraw)
+
+    @mock.patch.object(
+        peer.Peer, '__init__', mock.MagicMock(return_value=None))
+    def test_update_group_key(self):
+        def _peer(host_bind_ip, out_filters):
+            _peer = peer.Peer(None, None, None, None, None)
+            _peer._common_conf = mock.MagicMock(
+                local_as=65000, router_id='1.1.1.1', cluster_id='1.1.1.1',
+                local_pref=100)
+            _peer._neigh_conf = mock.MagicMock(
+                remote_as=65001, local_as=65000, next_hop=None,
+                is_next_hop_self=False, multi_exit_disc=None, soo_list=[],
+                is_route_server_client=False,
+                is_route_reflector_client=False)
+            _peer._host_bind_ip = host_bind_ip
+            _peer._protocol = mock.MagicMock()
+            _peer._protocol.is_four_octet_as_number_cap_valid.return_value = \
+                True
+            _peer.state = mock.MagicMock()
+            _peer._out_filters = out_filters
+            _peer._attribute_maps = {}
+            return _peer
+
+        key = _peer('192.168.0.1', []).update_group_key()
+        eq_(key, _peer('192.168.0.1', []).update_group_key())
+        # Different next hop to advertise
+        ok_(key != _peer('192.168.0.2', []).update_group_key())
+        # Different out filters
+        ok_(key != _peer('192.168.0.1', [
+            PrefixFilter('10.0.0.0/8', PrefixFilter.POLICY_DENY)
+        ]).update_group_key())
@@ -0,0 +1,244 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import processor
+from ryu.services.protocols.bgp.base import OrderedDict
+from ryu.services.protocols.bgp.info_base.ipv4 import Ipv4Path
+
+
+LOG = logging.getLogger(__name__)
+
+LOCAL_AS = 65000
+LOCAL_BGP_ID = '10.0.0.1'
+
+
+class _OpenMsg(object):
+    def __init__(self, bgp_identifier):
+        self.bgp_identifier = bgp_identifier
+
+
+class _Protocol(object):
+    def __init__(self, router_id):
+        self.recv_open_msg = _OpenMsg(router_id)
+        self.sent_open_msg = _OpenMsg(LOCAL_BGP_ID)
+
+
+class _Peer(object):
+    def __init__(self, remote_as, router_id):
+        self.remote_as = remote_as
+        self.version_num = 1
+        self.protocol = _Protocol(router_id)
+
+
+def _path(source, as_path_len=1, origin=bgp.BGP_ATTR_ORIGIN_IGP,
+          local_pref=None, med=None, originator_id=None, cluster_list=None):
+    pattrs = OrderedDict()
+    pattrs[bgp.BGP_ATTR_TYPE_ORIGIN] = bgp.BGPPathAttributeOrigin(origin)
+    pattrs[bgp.BGP_ATTR_TYPE_AS_PATH] = bgp.BGPPathAttributeAsPath(
+        [list(range(65001, 65001 + as_path_len))])
+    if local_pref is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_LOCAL_PREF] = \
+            bgp.BGPPathAttributeLocalPref(local_pref)
+    if med is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_MULTI_EXIT_DISC] = \
+            bgp.BGPPathAttributeMultiExitDisc(med)
+    if originator_id is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_ORIGINATOR_ID] = \
+            bgp.BGPPathAttributeOriginatorId(originator_id)
+    if cluster_list is not None:
+        pattrs[bgp.BGP_ATTR_TYPE_CLUSTER_LIST] = \
+            bgp.BGPPathAttributeClusterList(cluster_list)
+    return Ipv4Path(source, bgp.IPAddrPrefix(24, '192.168.0.0'), 1,
+                    pattrs=pattrs, nexthop='192.0.2.1')
+
+
+class _Destination(object):
+    route_family = bgp.RF_IPv4_UC
+
+    def __init__(self):
+        self.processed = False
+
+    def process(self):
+        self.processed = True
+
+
+def _compute_best_path_pairwise(paths):
+    best_path = paths[0]
+    reason = processor.BPR_ONLY_PATH
+    for path in paths[1:]:
+        new_best_path, reason = processor.compute_best_path(
+            LOCAL_AS, best_path, path)
+        if new_best_path is not None:
+            best_path = new_best_path
+    return best_path, reason
+
+
+class Test_select_best_path(unittest.TestCase):
+    """
+    Test case for processor.select_best_path
+    """
+
+    def _test(self, paths, expected_path, expected_reason):
+        eq_((expected_path, expected_reason),
+            processor.select_best_path(LOCAL_AS, paths))
+        eq_((expected_path, expected_reason),
+            _compute_best_path_pairwise(paths))
+
+    def test_only_path(self):
+        path = _path(None)
+        self._test([path], path, processor.BPR_ONLY_PATH)
+
+    def test_local_pref(self):
+        peer = _Peer(LOCAL_AS, '10.0.0.2')
+        path1 = _path(peer, local_pref=100)
+        path2 = _path(peer, local_pref=200, as_path_len=3)
+        self._test([path1, path2], path2, processor.BPR_LOCAL_PREF)
+
+    def test_local_pref_missing(self):
+        # Local-pref is not compared if either path has no LOCAL_PREF.
+        peer = _Peer(65001, '10.0.0.2')
+        path1 = _path(peer, as_path_len=2)
+        path2 = _path(peer, local_pref=200, as_path_len=3)
+        self._test([path1, path2], path1, processor.BPR_ASPATH)
+
+    def test_local_origin(self):
+        path1 = _path(_Peer(LOCAL_AS, '10.0.0.2'))
+        path2 = _path(None, as_path_len=3)
+        self._test([path1, path2], path2, processor.BPR_LOCAL_ORIGIN)
+
+    def test_origin_and_med(self):
+        peer = _Peer(65001, '10.0.0.2')
+        path1 = _path(peer, origin=bgp.BGP_ATTR_ORIGIN_INCOMPLETE)
+        path2 = _path(peer, med=100)
+        path3 = _path(peer, med=10)
+        self._test([path1, path2, path3], path3, processor.BPR_MED)
+        self._test([path2, path1], path2, processor.BPR_ORIGIN)
+
+    def test_ebgp_over_ibgp(self):
+        path1 = _path(_Peer(LOCAL_AS, '10.0.0.2'))
+        path2 = _path(_Peer(65001, '10.0.0.3'))
+        self._test([path1, path2], path2, processor.BPR_ASN)
+
+    def test_router_id(self):
+        path1 = _path(_Peer(LOCAL_AS, '10.0.0.3'))
+        path2 = _path(_Peer(LOCAL_AS, '10.0.0.2'))
+        path3 = _path(_Peer(LOCAL_AS, '10.0.0.4'),
+                      originator_id='10.0.0.1')
+        self._test([path1, path2, path3], path3, processor.BPR_ROUTER_ID)
+
+    def test_ebgp_router_id_not_compared(self):
+        path1 = _path(_Peer(65001, '10.0.0.3'))
+        path2 = _path(_Peer(65002, '10.0.0.2'), cluster_list=[])
+        self._test([path1, path2], path1, processor.BPR_UNKNOWN)
+
+    def test_cluster_list(self):
+        path1 = _path(_Peer(65001, '10.0.0.3'), cluster_list=['10.0.0.9'])
+        path2 = _path(_Peer(65002, '10.0.0.2'))
+        self._test([path1, path2], path2, processor.BPR_CLUSTER_LIST)
+
+    def test_key_cached(self):
+        path = _path(None)
+        key = path.get_best_path_key(LOCAL_AS)
+        ok_(key is path.get_best_path_key(LOCAL_AS))
+        ok_(key is not path.get_best_path_key(65001))
+
+    def test_random(self):
+        rand = random.Random(0)
+        sources = [None]
+        for i in range(4):
+            sources.append(_Peer(LOCAL_AS, '10.0.1.%d' % (i % 3 + 1)))
+            sources.append(_Peer(65001 + i % 2, '10.0.2.%d' % (i % 3 + 1)))
+
+        def _choice(*values):
+            return rand.choice(values)
+
+        for _ in range(3000):
+            paths = []
+            for _ in range(rand.randint(1, 6)):
+                paths.append(_path(
+                    rand.choice(sources),
+                    as_path_len=rand.randint(1, 3),
+                    origin=_choice(bgp.BGP_ATTR_ORIGIN_IGP,
+                                   bgp.BGP_ATTR_ORIGIN_EGP,
+                                   bgp.BGP_ATTR_ORIGIN_INCOMPLETE),
+                    local_pref=_choice(None, 100, 200),
+                    med=_choice(None, 0, 10, 20),
+                    originator_id=_choice(None, None, '10.0.1.1',
+                                          '10.0.3.1'),
+                    cluster_list=_choice(None, [], ['10.0.0.9'],
+                                         ['10.0.0.9', '10.0.0.8'])))
+            eq_(_compute_best_path_pairwise(paths),
+                processor.select_best_path(LOCAL_AS, paths))
+
+
+class Test_BgpProcessor(unittest.TestCase):
+    """
+    Test case for processor.BgpProcessor
+    """
+
+    def setUp(self):
+        self.processor = processor.BgpProcessor(None)
+        self.dests = [_Destination() for _ in range(300)]
+        for dest in self.dests:
+            self.processor.enqueue(dest)
+
+    def test_process_dest(self):
+        eq_(100, self.processor._process_dest())
+        eq_([True] * 100 + [False] * 200,
+            [dest.processed for dest in self.dests])
+
+    def test_process_dest_deadline(self):
+        eq_(1, self.processor._process_dest(deadline=0))
+        eq_(100, self.processor._process_dest(deadline=None))
+
+    def test_fixed_work_units(self):
+        proc = processor.BgpProcessor(None, work_units_per_cycle=50)
+        ok_(not proc.adaptive)
+        eq_(50, proc.work_units_per_cycle)
+
+    def test_adapt_work_units(self):
+        proc = self.processor
+        ok_(proc.adaptive)
+        target = processor.BgpProcessor.DEST_PROCESS_CYCLE_TIME
+
+        # Grows at most twice while the queue is deeper than the batch.
+        proc._adapt_work_units(100, target / 10)
+        eq_(200, proc.work_units_per_cycle)
+        proc._adapt_work_units(200, target / 1.5)
+        eq_(300, proc.work_units_per_cycle)
+
+        # Shrinks to fit in the target time.
+        proc._adapt_work_units(300, target * 3)
+        eq_(100, proc.work_units_per_cycle)
+        proc._adapt_work_units(100, target * 1000)
+        eq_(processor.BgpProcessor.MIN_ADAPTIVE_DEST_PROCESSED_PER_CYCLE,
+            proc.work_units_per_cycle)
+
+    def test_adapt_work_units_queue_drained(self):
+        proc = self.processor
+        proc._process_dest()
+        proc._process_dest()
+        proc._process_dest()
+        ok_(proc._dest_queue.is_empty())
+        proc._adapt_work_units(100, 0)
+        eq_(100, proc.work_units_per_cycle)
@@ -0,0 +1,81 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib.packet import bgp
+from ryu.services.protocols.bgp import speaker
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _update(i):
+    return bgp.BGPUpdate(
+        path_attributes=[
+            bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+            bgp.BGPPathAttributeAsPath([[65001]]),
+            bgp.BGPPathAttributeNextHop('192.0.2.1'),
+        ],
+        nlri=[bgp.BGPNLRI(24, '10.%d.%d.0' % (i >> 8 & 0xff, i & 0xff))
+              for i in range(i, i + 50)])
+
+
+class Test_BgpProtocol(unittest.TestCase):
+    """
+    Test case for speaker.BgpProtocol
+    """
+
+    def setUp(self):
+        sock = mock.MagicMock()
+        sock.getpeername.return_value = ('192.0.2.2', 179)
+        sock.getsockname.return_value = ('192.0.2.1', 10179)
+        self.protocol = speaker.BgpProtocol(sock, None)
+        self.msgs = []
+        self.protocol._handle_msg = self.msgs.append
+
+    def test_data_received(self):
+        msgs = [_update(i * 50) for i in range(20)]
+        msgs.insert(10, bgp.BGPKeepAlive())
+        data = b''.join(bytes(msg.serialize()) for msg in msgs)
+
+        # Feeds the stream in chunks which split the messages.
+        for i in range(0, len(data), 1000):
+            self.protocol._data_received(data[i:i + 1000])
+            eq_(len(data[:i + 1000]) - sum(len(m) for m in self.msgs),
+                len(self.protocol._recv_buff))
+
+        eq_([str(msg) for msg in msgs], [str(msg) for msg in self.msgs])
+        eq_(0, len(self.protocol._recv_buff))
+
+    @raises(bgp.NotSync)
+    def test_data_received_bad_marker(self):
+        data = bytearray(bgp.BGPKeepAlive().serialize())
+        data[0] = 0
+        self.protocol._data_received(bytes(data))
+
+    @raises(bgp.BadLen)
+    def test_data_received_bad_len(self):
+        data = bytearray(bgp.BGPKeepAlive().serialize())
+        data[17] = 0xff
+        self.protocol._data_received(bytes(data))
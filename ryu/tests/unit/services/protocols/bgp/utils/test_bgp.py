@@ -17,8 +17,9 @@
 import logging
 import unittest
 
-from nose.tools import eq_, raises
+from nose.tools import eq_, ok_, raises
 
+from ryu.lib.packet import bgp
 from ryu.lib.packet.bgp import (
     BGPFlowSpecTrafficRateCommunity,
     BGPFlowSpecTrafficActionCommunity,
@@ -32,6 +33,7 @@ from ryu.services.protocols.bgp.core import BgpCoreError
 from ryu.services.protocols.bgp.utils.bgp import create_v4flowspec_actions
 from ryu.services.protocols.bgp.utils.bgp import create_v6flowspec_actions
 from ryu.services.protocols.bgp.utils.bgp import create_l2vpnflowspec_actions
+from ryu.services.protocols.bgp.utils.bgp import pack_updates
 
 
 LOG = logging.getLogger(__name__)
@@ -209,3 +211,102 @@ class Test_Utils_BGP(unittest.TestCase):
         }
         expected_communities = []
         self._test_create_l2vpnflowspec_actions(actions, expected_communities)
+
+    def _ipv4_update(self, prefix, as_path=None):
+        as_path = as_path or [[65001]]
+        return bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                bgp.BGPPathAttributeAsPath(as_path),
+                bgp.BGPPathAttributeNextHop('192.168.0.1'),
+            ],
+            nlri=[bgp.IPAddrPrefix(32, prefix)])
+
+    def _ipv6_update(self, prefix, next_hop='2001:db8::1'):
+        return bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeMpReachNLRI(
+                    bgp.RF_IPv6_UC.afi, bgp.RF_IPv6_UC.safi, next_hop,
+                    [bgp.IP6AddrPrefix(128, prefix)]),
+                bgp.BGPPathAttributeOrigin(bgp.BGP_ATTR_ORIGIN_IGP),
+                bgp.BGPPathAttributeAsPath([[65001]]),
+            ])
+
+    def test_pack_updates_ipv4(self):
+        updates = [
+            self._ipv4_update('10.0.0.1'),
+            self._ipv4_update('10.0.0.2', as_path=[[65002]]),
+            self._ipv4_update('10.0.0.3'),
+            bgp.BGPUpdate(withdrawn_routes=[bgp.IPAddrPrefix(32, '10.0.1.1')]),
+            bgp.BGPUpdate(withdrawn_routes=[bgp.IPAddrPrefix(32, '10.0.1.2')]),
+        ]
+
+        packed = pack_updates(updates, 4096)
+
+        eq_(3, len(packed))
+        eq_(['10.0.0.1/32', '10.0.0.3/32'],
+            [n.prefix for n in packed[0].nlri])
+        eq_([[65001]], packed[0].get_path_attr(bgp.BGP_ATTR_TYPE_AS_PATH).path_seg_list)
+        eq_(['10.0.0.2/32'], [n.prefix for n in packed[1].nlri])
+        eq_([[65002]], packed[1].get_path_attr(bgp.BGP_ATTR_TYPE_AS_PATH).path_seg_list)
+        eq_(['10.0.1.1/32', '10.0.1.2/32'],
+            [n.prefix for n in packed[2].withdrawn_routes])
+
+    def test_pack_updates_mp(self):
+        updates = [
+            self._ipv6_update('2001:db8:1::1'),
+            self._ipv6_update('2001:db8:1::2', next_hop='2001:db8::2'),
+            self._ipv6_update('2001:db8:1::3'),
+            bgp.BGPUpdate(path_attributes=[
+                bgp.BGPPathAttributeMpUnreachNLRI(
+                    bgp.RF_IPv6_UC.afi, bgp.RF_IPv6_UC.safi,
+                    [bgp.IP6AddrPrefix(128, '2001:db8:2::1')])]),
+            bgp.BGPUpdate(path_attributes=[
+                bgp.BGPPathAttributeMpUnreachNLRI(
+                    bgp.RF_IPv6_UC.afi, bgp.RF_IPv6_UC.safi,
+                    [bgp.IP6AddrPrefix(128, '2001:db8:2::2')])]),
+        ]
+
+        packed = pack_updates(updates, 4096)
+
+        eq_(3, len(packed))
+        mp_reach = packed[0].get_path_attr(bgp.BGP_ATTR_TYPE_MP_REACH_NLRI)
+        eq_('2001:db8::1', mp_reach.next_hop)
+        eq_(['2001:db8:1::1/128', '2001:db8:1::3/128'],
+            [n.prefix for n in mp_reach.nlri])
+        eq_(3, len(packed[0].path_attributes))
+        mp_reach = packed[1].get_path_attr(bgp.BGP_ATTR_TYPE_MP_REACH_NLRI)
+        eq_('2001:db8::2', mp_reach.next_hop)
+        mp_unreach = packed[2].get_path_attr(
+            bgp.BGP_ATTR_TYPE_MP_UNREACH_NLRI)
+        eq_(['2001:db8:2::1/128', '2001:db8:2::2/128'],
+            [n.prefix for n in mp_unreach.withdrawn_routes])
+
+    def test_pack_updates_max_len(self):
+        prefixes = ['10.0.%d.%d' % (i >> 8, i & 0xff) for i in range(3000)]
+        updates = [self._ipv4_update(p) for p in prefixes]
+
+        packed = pack_updates(updates, 4096)
+
+        ok_(len(packed) > 1)
+        nlri = []
+        for update in packed:
+            buf = update.serialize()
+            ok_(len(buf) <= 4096)
+            msg, _, _ = bgp.BGPMessage.parser(buf)
+            nlri.extend(n.addr for n in msg.nlri)
+        eq_(prefixes, nlri)
+
+        updates = [self._ipv6_update('2001:db8::%x' % i) for i in range(500)]
+        for update in pack_updates(updates, 4096):
+            ok_(len(update.serialize()) <= 4096)
+
+    def test_pack_updates_eor(self):
+        eor = bgp.BGPUpdate(path_attributes=[
+            bgp.BGPPathAttributeMpUnreachNLRI(
+                bgp.RF_IPv6_UC.afi, bgp.RF_IPv6_UC.safi, [])])
+
+        packed = pack_updates([eor], 4096)
+
+        eq_(1, len(packed))
+        ok_(packed[0] is eor)
@@ -0,0 +1,132 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import unittest
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.services.protocols.bgp.utils.radix import RadixTree
+
+
+LOG = logging.getLogger(__name__)
+
+
+def _mask(key, length, width=8):
+    shift = width - length
+    return key >> shift << shift
+
+
+class Test_RadixTree(unittest.TestCase):
+    """
+    Test case for bgp.utils.radix.RadixTree
+    """
+
+    def test_basic(self):
+        tree = RadixTree(32)
+        tree.set(0x0a000000, 8, 'a')
+        tree.set(0x0a010000, 16, 'b')
+        tree.set(0x0a010200, 24, 'c')
+        tree.set(0x0b000000, 8, 'd')
+        eq_(4, len(tree))
+
+        eq_('b', tree.get(0x0a010000, 16))
+        eq_(None, tree.get(0x0a010000, 17))
+        eq_('b', tree.longest_match(0x0a010303))
+        eq_('c', tree.longest_match(0x0a010203))
+        eq_(None, tree.longest_match(0x0c000000))
+        eq_(['a', 'b', 'c'], list(tree.covering(0x0a010200, 24)))
+        eq_(['b', 'c'], list(tree.covered(0x0a010000, 16)))
+        eq_(['a', 'b', 'c', 'd'], list(tree.covered(0x0a000000, 7)))
+        eq_(['a', 'b', 'c'], list(tree.covered(0x0a000000, 8)))
+        eq_(['a', 'b', 'c', 'd'], list(tree.values()))
+
+        eq_('b', tree.delete(0x0a010000, 16))
+        eq_(['a', 'c', 'd'], list(tree.values()))
+        eq_('a', tree.longest_match(0x0a010303))
+        eq_(3, len(tree))
+
+    def test_values_after(self):
+        tree = RadixTree(32)
+        tree.set(0x0a000000, 8, 'a')
+        tree.set(0x0a010000, 16, 'b')
+        tree.set(0x0a010200, 24, 'c')
+        tree.set(0x0b000000, 8, 'd')
+        eq_(['b', 'c', 'd'], list(tree.values(after=(0x0a000000, 8))))
+        eq_(['c', 'd'], list(tree.values(after=(0x0a010000, 16))))
+        # The given prefix itself need not exist.
+        eq_(['c', 'd'], list(tree.values(after=(0x0a010100, 24))))
+        eq_([], list(tree.values(after=(0x0b000000, 8))))
+        eq_(['c'], list(tree.covered(0x0a010000, 16,
+                                     after=(0x0a010000, 16))))
+
+    def test_host_bits_ignored(self):
+        tree = RadixTree(32)
+        tree.set(0x0a0000ff, 8, 'a')
+        eq_('a', tree.get(0x0a000000, 8))
+
+    @raises(KeyError)
+    def test_delete_not_found(self):
+        tree = RadixTree(32)
+        tree.set(0x0a000000, 8, 'a')
+        tree.delete(0x0a000000, 16)
+
+    @raises(ValueError)
+    def test_invalid_length(self):
+        RadixTree(32).set(0, 33, 'a')
+
+    @raises(ValueError)
+    def test_invalid_key(self):
+        RadixTree(32).set(1 << 32, 32, 'a')
+
+    def test_random(self):
+        # Compares with the brute force on the 8 bits address space.
+        rand = random.Random(0)
+        tree = RadixTree(8)
+        prefixes = {}
+        for _ in range(2000):
+            length = rand.randint(0, 8)
+            key = _mask(rand.getrandbits(8), length)
+            if (key, length) in prefixes and rand.random() < 0.5:
+                eq_(prefixes.pop((key, length)), tree.delete(key, length))
+            else:
+                prefixes[(key, length)] = (key, length)
+                tree.set(key, length, (key, length))
+            eq_(len(prefixes), len(tree))
+
+            length = rand.randint(0, 8)
+            key = _mask(rand.getrandbits(8), length)
+            eq_(prefixes.get((key, length)), tree.get(key, length))
+            covering = sorted(
+                (p for p in prefixes if p[1] <= length and
+                 _mask(key, p[1]) == p[0]),
+                key=lambda p: p[1])
+            eq_(covering, list(tree.covering(key, length)))
+            eq_(covering[-1] if covering else None,
+                tree.longest_match(key, length))
+            covered = sorted(p for p in prefixes if p[1] >= length and
+                             _mask(p[0], length) == key)
+            eq_(covered, list(tree.covered(key, length)))
+
+            after_length = rand.randint(0, 8)
+            after = (_mask(rand.getrandbits(8), after_length), after_length)
+            eq_(sorted(p for p in prefixes if p > after),
+                list(tree.values(after=after)))
+            eq_([p for p in covered if p > after],
+                list(tree.covered(key, length, after=after)))
+
+        eq_(sorted(prefixes), list(tree.values()))
@@ -0,0 +1,92 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.services.protocols.bgp.utils.sorteddict import SortedKeyDict
+from ryu.services.protocols.bgp.utils.sorteddict import SortedKeyList
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_SortedKeyList(unittest.TestCase):
+    """
+    Test case for bgp.utils.sorteddict.SortedKeyList
+    """
+
+    def test_random(self):
+        rand = random.Random(0)
+        keys = SortedKeyList()
+        keys.CHUNK_SIZE = 4
+        expected = set()
+        for _ in range(2000):
+            key = rand.randrange(200)
+            if rand.random() < 0.6:
+                keys.add(key)
+                expected.add(key)
+            else:
+                keys.discard(key)
+                expected.discard(key)
+        expected = sorted(expected)
+
+        eq_(len(expected), len(keys))
+        eq_(expected, list(keys))
+        for after in (-1, 0, 50, 100, 199, 200):
+            eq_([k for k in expected if k > after],
+                list(keys.keys_after(after)))
+
+    def test_modified_while_iterating(self):
+        keys = SortedKeyList()
+        keys.CHUNK_SIZE = 2
+        for key in range(10):
+            keys.add(key)
+        walked = []
+        for key in keys.keys_after(3):
+            walked.append(key)
+            keys.discard(key)
+        eq_(list(range(4, 10)), walked)
+        eq_([0, 1, 2, 3], list(keys))
+
+
+class Test_SortedKeyDict(unittest.TestCase):
+    """
+    Test case for bgp.utils.sorteddict.SortedKeyDict
+    """
+
+    def test_keys_after(self):
+        d = SortedKeyDict({'b': 2, 'd': 4})
+        d['a'] = 1
+        d['c'] = 3
+        d['c'] = 30
+        eq_(['a', 'b', 'c', 'd'], list(d.keys_after()))
+        eq_(['c', 'd'], list(d.keys_after('b')))
+        eq_(['c', 'd'], list(d.keys_after('bb')))
+
+        del d['c']
+        eq_(4, d.pop('d'))
+        eq_(None, d.pop('d', None))
+        d.setdefault('e', 5)
+        eq_(['a', 'b', 'e'], list(d.keys_after()))
+        eq_({'a': 1, 'b': 2, 'e': 5}, d)
+
+        d.clear()
+        ok_(not d)
+        eq_([], list(d.keys_after()))
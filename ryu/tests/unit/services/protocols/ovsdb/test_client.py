@@ -0,0 +1,154 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import uuid
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.services.protocols.ovsdb import client
+from ryu.services.protocols.ovsdb import event
+
+
+SCHEMA = {
+    'name': 'Open_vSwitch',
+    'version': '7.12.1',
+    'tables': {
+        'Interface': {
+            'columns': {
+                'name': {'type': 'string'},
+                'link_state': {
+                    'type': {'key': 'string', 'min': 0, 'max': 1}},
+                'statistics': {
+                    'type': {'key': 'string', 'value': 'integer',
+                             'min': 0, 'max': 'unlimited'}},
+            },
+        },
+    },
+}
+
+
+def _row(name='eth0', link_state='up', rx=0):
+    return {'name': name, 'link_state': link_state,
+            'statistics': ['map', [['rx_packets', rx]]]}
+
+
+class Test_Idl(unittest.TestCase):
+    """ Test case for ryu.services.protocols.ovsdb.client.Idl
+    """
+
+    def _idl(self, **kwargs):
+        return client.Idl(None, SCHEMA, **kwargs)
+
+    def _update(self, idl, uuid_, old, new):
+        idl._Idl__process_update(idl.tables['Interface'], uuid_, old, new)
+
+    def test_all_columns(self):
+        idl = self._idl()
+        uuid_ = uuid.uuid4()
+        self._update(idl, uuid_, None, _row())
+        self._update(idl, uuid_, {'statistics': _row()['statistics']},
+                     _row(rx=10))
+
+        events = idl.events
+        eq_(2, len(events))
+        eq_(event.EventRowInsert, events[0][0])
+        ev_cls, (table, old, new) = events[1]
+        eq_(event.EventRowUpdate, ev_cls)
+        eq_('Interface', table)
+        eq_({'rx_packets': 0}, old['statistics'])
+        eq_({'rx_packets': 10}, new['statistics'])
+        eq_('eth0', new['name'])
+        eq_([], idl.events)
+
+    def test_event_columns(self):
+        idl = self._idl(event_columns={'Interface': ['link_state']})
+        uuid_ = uuid.uuid4()
+        self._update(idl, uuid_, None, _row())
+        ev_cls, (_, row) = idl.events[0]
+        eq_(event.EventRowInsert, ev_cls)
+        eq_(set(['_uuid', 'name', 'link_state']), set(row.keys()))
+
+        # statistics is not watched
+        self._update(idl, uuid_, {'statistics': _row()['statistics']},
+                     _row(rx=10))
+        eq_([], idl.events)
+        eq_({'rx_packets': 10},
+            idl.tables['Interface'].rows[uuid_].statistics)
+
+        # the watched columns and the name are included
+        self._update(idl, uuid_,
+                     {'link_state': 'up',
+                      'statistics': _row(rx=10)['statistics']},
+                     _row(link_state='down', rx=20))
+        ev_cls, (_, old, new) = idl.events[0]
+        eq_(event.EventRowUpdate, ev_cls)
+        eq_({'_uuid': uuid_, 'name': 'eth0', 'link_state': ['up']}, old)
+        eq_({'_uuid': uuid_, 'name': 'eth0', 'link_state': ['down']}, new)
+
+        self._update(idl, uuid_, _row(link_state='down', rx=20), None)
+        ev_cls, (_, row) = idl.events[0]
+        eq_(event.EventRowDelete, ev_cls)
+        eq_('eth0', row['name'])
+
+    @mock.patch('ryu.services.protocols.ovsdb.client.now')
+    def test_coalesce(self, mock_now):
+        mock_now.return_value = 0
+        idl = self._idl(coalesce_intervals={'Interface': 1})
+        uuid1 = uuid.uuid4()
+        uuid2 = uuid.uuid4()
+        uuid3 = uuid.uuid4()
+        self._update(idl, uuid1, None, _row(name='eth1'))
+        self._update(idl, uuid2, None, _row(name='eth2'))
+        eq_([], idl.events)
+
+        mock_now.return_value = 1000
+        self._update(idl, uuid1, {'link_state': 'up'},
+                     _row(name='eth1', link_state='down'))
+        self._update(idl, uuid2, _row(name='eth2'), None)
+        ev_cls, (table, events) = idl.events[0]
+        eq_(event.EventRowBatch, ev_cls)
+        eq_('Interface', table)
+        # eth2 is inserted and deleted in the interval
+        eq_(1, len(events))
+        ev_cls, (_, row) = events[0]
+        eq_(event.EventRowInsert, ev_cls)
+        eq_(['down'], row['link_state'])
+
+        mock_now.return_value = 2000
+        self._update(idl, uuid1, {'link_state': 'down'},
+                     _row(name='eth1', link_state='up'))
+        self._update(idl, uuid1, {'statistics': _row()['statistics']},
+                     _row(name='eth1', link_state='up', rx=10))
+        self._update(idl, uuid3, None, _row(name='eth3'))
+        mock_now.return_value = 2999
+        eq_([], idl.events)
+        mock_now.return_value = 3000
+        ev = event.EventRowBatch('system-id', *idl.events[0][1])
+        eq_(2, len(ev.events))
+        update, insert = ev.events
+        ok_(isinstance(update, event.EventRowUpdate))
+        eq_(['down'], update.old['link_state'])
+        eq_({'rx_packets': 0}, update.old['statistics'])
+        eq_(['up'], update.new['link_state'])
+        eq_({'rx_packets': 10}, update.new['statistics'])
+        ok_(isinstance(insert, event.EventRowInsert))
+        eq_('system-id', insert.system_id)
+        eq_('eth3', insert.row['name'])
@@ -0,0 +1,62 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu import cfg
+from ryu.services.protocols.ovsdb import manager
+
+
+class Test_OVSDB(unittest.TestCase):
+    """ Test case for ryu.services.protocols.ovsdb.manager.OVSDB
+    """
+
+    def _set_override(self, name, value):
+        cfg.CONF.set_override(name, value, group='ovsdb')
+        self.addCleanup(cfg.CONF.clear_override, name, group='ovsdb')
+
+    def test_table_options(self):
+        self._set_override('schema_exclude_columns',
+                           ['Bridge.netflow', 'Interface.statistics'])
+        self._set_override('event_columns',
+                           ['Interface.name', 'Interface.link_state'])
+        self._set_override('event_coalesce_intervals', ['Interface:1.5'])
+        app = manager.OVSDB()
+        eq_({'Bridge': ['netflow'], 'Interface': ['statistics']},
+            app._schema_exclude_columns)
+        eq_({'Interface': ['name', 'link_state']}, app._event_columns)
+        eq_({'Interface': 1.5}, app._coalesce_intervals)
+
+    @raises(ValueError)
+    def test_invalid_event_columns(self):
+        self._set_override('event_columns', ['Interface'])
+        manager.OVSDB()
+
+    @raises(ValueError)
+    def test_invalid_coalesce_intervals(self):
+        self._set_override('event_coalesce_intervals', ['Interface:fast'])
+        manager.OVSDB()
+
+    def test_parse_table_values(self):
+        eq_([('Interface', 'name'), ('Port', 'tag')],
+            manager._parse_table_values(
+                'event-columns', ['Interface.name', 'Port.tag'], '.'))
+        for value in ('Interface', 'Interface.', '.name', 'a.b.c'):
+            self.assertRaises(
+                ValueError, manager._parse_table_values,
+                'event-columns', [value], '.')
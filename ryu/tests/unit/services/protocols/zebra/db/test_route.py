@@ -0,0 +1,188 @@
+# Copyright (C) 2016 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import logging
+import unittest
+try:
+    import mock  # Python 2
+except ImportError:
+    from unittest import mock  # Python 3
+
+from nose.tools import eq_
+from nose.tools import ok_
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from ryu import cfg
+from ryu.lib.packet import zebra  # For loading 'zapi' option definition
+
+# Not to create the database file when importing the package
+cfg.CONF.set_override('db_url', 'sqlite://', group='zapi')
+
+from ryu.services.protocols.zebra.db import base  # noqa: E402
+from ryu.services.protocols.zebra.db import interface  # noqa: E402
+from ryu.services.protocols.zebra.db import route  # noqa: E402
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Test_RouteTable(unittest.TestCase):
+    """
+    Test case for route.RouteTable
+    """
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        base.Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.queries = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     self._before_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, *args):
+        self.queries.append(statement)
+
+    def _db_routes(self, **kwargs):
+        # Reads the routes from database, not from the session
+        session = sessionmaker(bind=self.engine)()
+        routes = session.query(route.Route).filter_by(**kwargs).all()
+        session.close()
+        return [(r.destination, r.gateway, r.is_selected) for r in routes]
+
+    def test_add_delete_flush(self):
+        table = route.RouteTable(self.session)
+        table.add('10.0.0.0/8', gateway='192.168.0.1')
+        table.add('10.0.0.0/8', gateway='192.168.0.2')
+        table.add('20.0.0.0/8', gateway='192.168.0.1')
+        table.add('30.0.0.0/8', gateway='192.168.0.1')
+        eq_(None, table.add('10.0.0.0/33'))
+
+        # Served from memory, not written yet
+        eq_(4, len(table.show_all()))
+        routes = table.show_all(destination='10.0.0.0/8', is_selected=True)
+        eq_(['192.168.0.2'], [r.gateway for r in routes])
+        eq_([], self._db_routes())
+
+        table.flush()
+        eq_([('10.0.0.0/8', '192.168.0.1', False),
+             ('10.0.0.0/8', '192.168.0.2', True),
+             ('20.0.0.0/8', '192.168.0.1', True),
+             ('30.0.0.0/8', '192.168.0.1', True)],
+            self._db_routes())
+
+        # Added and deleted before written
+        table.add('40.0.0.0/8', gateway='192.168.0.1')
+        eq_(1, len(table.delete('40.0.0.0/8')))
+        eq_(1, len(table.delete('20.0.0.0/8')))
+        eq_([], table.delete('50.0.0.0/8'))
+        eq_(0, len(table._added))
+        eq_(1, len(table._deleted))
+        table.flush()
+        eq_(['10.0.0.0/8', '10.0.0.0/8', '30.0.0.0/8'],
+            [d for d, _, _ in self._db_routes()])
+
+    def test_show_all_after_flush(self):
+        table = route.RouteTable(self.session)
+        for i in range(50):
+            table.add('10.%d.0.0/16' % i, gateway='192.168.0.1')
+        table.flush()
+
+        # The cached routes are not loaded again after committed
+        del self.queries[:]
+        eq_(50, len(table.show_all(is_selected=True)))
+        eq_([], self.queries)
+
+    def test_flush_size(self):
+        table = route.RouteTable(self.session, flush_size=3)
+        table.add('10.0.0.0/8')
+        table.add('20.0.0.0/8')
+        eq_(0, len(self._db_routes()))
+
+        table.add('30.0.0.0/8')
+        eq_(3, len(self._db_routes()))
+        eq_(0, len(table._added))
+
+        table.delete('10.0.0.0/8')
+        table.delete('20.0.0.0/8')
+        eq_(3, len(self._db_routes()))
+        table.delete('30.0.0.0/8')
+        eq_(0, len(self._db_routes()))
+
+    def test_flush_interval(self):
+        table = route.RouteTable(self.session, flush_interval=5)
+        table.add('10.0.0.0/8')
+
+        with mock.patch.object(route.hub, 'sleep',
+                               side_effect=[None, StopIteration]) as sleep:
+            self.assertRaises(StopIteration, table._flush_loop)
+        sleep.assert_called_with(5)
+        eq_(1, len(self._db_routes()))
+
+    def test_start_stop(self):
+        table = route.RouteTable(self.session)
+        with mock.patch.object(route.hub, 'spawn') as spawn, \
+                mock.patch.object(route.hub, 'kill') as kill:
+            table.start()
+            table.start()
+            eq_(1, spawn.call_count)
+            table.add('10.0.0.0/8')
+            table.stop()
+            kill.assert_called_once_with(spawn.return_value)
+        eq_(1, len(self._db_routes()))
+
+    def test_flush_error(self):
+        table = route.RouteTable(self.session)
+        table.add('10.0.0.0/8', gateway='192.168.0.1')
+        table.add('20.0.0.0/8', gateway='192.168.0.1')
+        table.flush()
+
+        table.add('10.0.0.0/8', gateway='192.168.0.2')
+        table.delete('20.0.0.0/8')
+        with mock.patch.object(self.session, 'flush',
+                               side_effect=Exception('error')):
+            table.flush()
+        eq_([('10.0.0.0/8', '192.168.0.1', True),
+             ('20.0.0.0/8', '192.168.0.1', True)],
+            self._db_routes())
+
+        # Kept pending and consistent with memory
+        eq_(1, len(table._added))
+        eq_(1, len(table._deleted))
+        eq_(['192.168.0.2'],
+            [r.gateway for r in table.show_all(is_selected=True)])
+        table.flush()
+        eq_([('10.0.0.0/8', '192.168.0.1', False),
+             ('10.0.0.0/8', '192.168.0.2', True)],
+            self._db_routes())
+
+    def test_reload(self):
+        interface.ip_link_add(self.session, 'eth0')
+        table = route.RouteTable(self.session)
+        table.add('10.0.0.0/8', device='eth0', gateway='192.168.0.1')
+        table.add('10.0.0.0/8', gateway='192.168.0.2')
+        table.add('20.0.0.0/8', gateway='192.168.0.1')
+        table.stop()
+
+        # Loaded from database
+        table = route.RouteTable(sessionmaker(bind=self.engine)())
+        eq_(3, len(table.show_all()))
+        eq_(['192.168.0.2', '192.168.0.1'],
+            [r.gateway for r in table.show_all(is_selected=True)])
+        ok_(table.show('10.0.0.0/8', 'eth0') is not None)
+        eq_(None, table.show('10.0.0.0/8', 'eth1'))
@@ -56,6 +56,9 @@ CONF.register_cli_opts([
 
 class Port(object):
     # This is data class passed by EventPortXXX
+    __slots__ = ('dpid', '_ofproto', '_config', '_state', 'port_no',
+                 'hw_addr', 'name')
+
     def __init__(self, dpid, ofproto, ofpport):
         super(Port, self).__init__()
 
@@ -134,6 +137,8 @@ class Switch(object):
 
 class Link(object):
     # This is data class passed by EventLinkXXX
+    __slots__ = ('src', 'dst')
+
     def __init__(self, src, dst):
         super(Link, self).__init__()
         self.src = src